@@ -3,8 +3,14 @@
 # Also contains processor that processes information
 from nba_api.stats.static import players
 from nba_api.stats.endpoints import playercareerstats, commonplayerinfo, playergamelog
-from nba_api.stats.endpoints import playerdashboardbyyearoveryear
+from nba_api.stats.endpoints import playerdashboardbyyearoveryear, leaguegamelog, commonteamroster
+from memo import QueryCache, memoized
+from snapshots import SnapshotCache
+from packed import PackedSeason, pack_season
+from planner import plan, plan_endpoints, view_endpoints
 import json
+import time
+import numpy
 from collections import defaultdict
 
 
@@ -24,14 +30,93 @@ CONVERT = {'Points': 'PTS',
 		   'Steals': 'STL',
 		   'Turnovers': 'TOV'}
 
+COMBINATIONS = {'Pts+Rebs+Asts': ('Points', 'Rebounds', 'Assists'),
+				'Pts+Rebs': ('Points', 'Rebounds'),
+				'Pts+Asts': ('Points', 'Assists'),
+				'Rebs+Asts': ('Rebounds', 'Assists'),
+				'Blks+Stls': ('Blocks', 'Steals')}
+
+HIT_RATE_WINDOWS = ['Last 5', 'Last 10', 'Current Season', 'Career']
+
+# max number of memoized query results kept across all players
+QUERY_CACHE_SIZE = 512
+
+# every endpoint a player can be grabbed from, with the attribute its json is kept in
+ENDPOINT_ATTRIBUTES = {'playercareerstats': '_career',
+					   'commonplayerinfo': '_bio',
+					   'playerdashboardbyyearoveryear': '_year_by_year',
+					   'playergamelog': '_gamelog'}
+
+# which endpoint every view of a selected player is derived from (see planner.py)
+LOAD_PLAN = plan()
+
+# every endpoint grabbed when a player is selected, the fewest that cover every view
+PLAYER_ENDPOINTS = {endpoint: ENDPOINT_ATTRIBUTES[endpoint] for endpoint in plan_endpoints(LOAD_PLAN)}
+
+
+# Accumulates the hit rate counters of a stat one season at a time, newest season first
+class HitRateCounter:
+	def __init__(self, headers: list[str], stat_type: str):
+		self._headers = headers
+		self._stat_type = stat_type
+		self._games = 0
+
+		self._last5 = defaultdict(int)
+		self._last10 = defaultdict(int)
+		self._season = defaultdict(int)
+		self._careerlog = defaultdict(int)
+
+
+	def add_season(self, year: int, gamelog: list[list]) -> None:
+		'''Counts every game of a season; seasons must be added newest first'''
+		for game in gamelog:
+			stat = API.game_stat(game, self._headers, self._stat_type)
+
+			if self._games < 5:
+				self._last5[stat] += 1
+
+			if self._games < 10:
+				self._last10[stat] += 1
+
+			if year == CURRENT_SEASON:
+				self._season[stat] += 1
+
+			self._careerlog[stat] += 1
+
+			self._games += 1
+
+
+	def add_packed(self, season: PackedSeason) -> None:
+		'''Counts every game of a packed season at once; seasons must be added newest first'''
+		values = season.total(API.stat_columns(self._stat_type))
+
+		for counts, limit in ((self._last5, 5), (self._last10, 10)):
+			for stat in values[:max(limit - self._games, 0)].tolist():
+				counts[stat] += 1
+
+		stats, games = numpy.unique(values, return_counts=True)
+		for stat, count in zip(stats.tolist(), games.tolist()):
+			if season.year == CURRENT_SEASON:
+				self._season[stat] += count
+			self._careerlog[stat] += count
+
+		self._games += len(values)
+
+
+	def get_counts(self) -> list[dict]:
+		'''Returns the counters in the order of HIT_RATE_WINDOWS'''
+		return [self._last5, self._last10, self._season, self._careerlog]
+
 
 class API:
-	def __init__(self):
+	def __init__(self, snapshots: SnapshotCache = None, service = None, query_cache: QueryCache = None):
 		self._career = None
 		self._bio = None
 		self._pid = None
 		self._year_by_year = None
 		self._gamelog = None
+		self._career_gamelogs = None
+		self._career_seasons = None
 
 		# hit rate counts
 		self._last5 = defaultdict(int)
@@ -39,6 +124,18 @@ class API:
 		self._season = defaultdict(int)
 		self._careerlog = defaultdict(int)
 
+		# memoized query results, keyed by (pid, data version, method, arguments); apis can share one since keys have
+		# the pid, and the version changes whenever the selected player's data does
+		self._memo = query_cache if query_cache is not None else QueryCache(QUERY_CACHE_SIZE)
+		self._version = 0
+
+		# last json grabbed from each endpoint, kept on disk, and when the selected player's was grabbed
+		self._snapshots = snapshots if snapshots is not None else SnapshotCache(current_season=CURRENT_SEASON)
+		self._fetched_at = {}
+
+		# a ServiceClient (service.py) to download through instead of nba_api, so desktops share one warm cache
+		self._service = service
+
 
 	@staticmethod
 	def search_players(*, first_name: str = None, last_name: str = None) -> list[int]:
@@ -78,6 +175,31 @@ class API:
 		return matching[0]['id']
 
 
+	@staticmethod
+	def season_string(year: int) -> str:
+		'''Given the starting year of a season, returns the season in nba_api format, e.g. 2023-24'''
+		latter = year - 2000 + 1
+		if latter < 10:
+			latter = f'0{latter}'
+
+		return f'{year}-{latter}'
+
+
+	@staticmethod
+	def stat_columns(stat_type: str) -> list[str]:
+		'''Returns the nba_api columns a dropdown stat is the sum of, e.g. PTS, REB, AST for Pts+Rebs+Asts'''
+		if stat_type in COMBINATIONS:
+			return [CONVERT[part] for part in COMBINATIONS[stat_type]]
+
+		return [CONVERT[stat_type]]
+
+
+	@staticmethod
+	def game_stat(game: list, headers: list[str], stat_type: str) -> int:
+		'''Returns the value of the dropdown stat for a single game log row, summing combinations'''
+		return sum(game[headers.index(column)] for column in API.stat_columns(stat_type))
+
+
 	def get_careerstats(self) -> 'json object':
 		'''Returns the raw json data of the player's career, for testing'''
 		return self._career
@@ -135,7 +257,7 @@ class API:
 
 	def has_year_by_year(self) -> bool:
 		'''returns whether or not year by year averages were obtained'''
-		return self._year_by_year is not None
+		return getattr(self, ENDPOINT_ATTRIBUTES[LOAD_PLAN['season averages']]) is not None
 
 
 	def has_gamelog(self) -> bool:
@@ -148,35 +270,227 @@ class API:
 		return self._last5 == {} and self._last10 == {} and self._season == {} and self._careerlog == {} 
 
 
+	def invalidate_player(self, pid: int) -> None:
+		'''Drops every memoized query result for the player and moves to a new version of the data, so a copy still
+		holding the old data (e.g. a dashboard being built) can't refill the cache with it; call whenever their data
+		is refreshed'''
+		self._version = self._memo.next_version()
+		self._memo.invalidate(pid)
+
+
+	def get_service(self):
+		'''Returns the ServiceClient downloads go through, or None if they go to nba_api'''
+		return self._service
+
+
+	def get_snapshots(self) -> SnapshotCache:
+		'''Returns the snapshot cache, so other APIs (e.g. one per compared player) can share it'''
+		return self._snapshots
+
+
+	def get_diagnostics(self) -> dict:
+		'''Returns internal statistics about the api, e.g. how often memoized queries are reused, and the endpoints
+		every view is derived from'''
+		return {'query_cache': self._memo.stats(), 'load_plan': view_endpoints(LOAD_PLAN)}
+
+
+	def _download(self, endpoint: str, pid: int, season: int = None) -> dict:
+		'''Downloads the raw json of an endpoint for a player from nba_api'''
+		if endpoint == 'playercareerstats':
+			data = playercareerstats.PlayerCareerStats(player_id=pid, per_mode36='PerGame')
+		elif endpoint == 'commonplayerinfo':
+			data = commonplayerinfo.CommonPlayerInfo(player_id=pid)
+		elif endpoint == 'playerdashboardbyyearoveryear':
+			data = playerdashboardbyyearoveryear.PlayerDashboardByYearOverYear(pid)
+		elif endpoint == 'playergamelog':
+			data = playergamelog.PlayerGameLog(pid, season = API.season_string(season))
+		elif endpoint == 'leagueplayergamelog':
+			data = leaguegamelog.LeagueGameLog(player_or_team_abbreviation='P', season=API.season_string(season))
+		elif endpoint == 'leagueteamgamelog':
+			data = leaguegamelog.LeagueGameLog(player_or_team_abbreviation='T', season=API.season_string(season))
+		elif endpoint == 'commonteamroster':
+			data = commonteamroster.CommonTeamRoster(team_id=pid, season=API.season_string(season))
+		else:
+			raise ValueError(f'Unknown endpoint {endpoint}')
+
+		return json.loads(data.get_json())
+
+
+	def download_snapshot(self, endpoint: str, pid: int, season: int = None, fresh: bool = True) -> tuple[dict, float]:
+		'''Downloads an endpoint and saves it to the snapshot cache; returns (json, time grabbed). Through a query
+		service the service's copy is taken instead, as long as it is within the refresh policy, or unless fresh is
+		set, only seconds old (see service.FRESH_AGE).'''
+		if self._service is not None:
+			payload, fetched_at = self._service.fetch_snapshot(endpoint, pid, season, fresh)
+			return (payload, self._snapshots.save(endpoint, pid, payload, season, fetched_at))
+
+		payload = self._download(endpoint, pid, season)
+		return (payload, self._snapshots.save(endpoint, pid, payload, season))
+
+
+	def fetch_snapshot(self, endpoint: str, pid: int, season: int = None) -> tuple[dict, float]:
+		'''Returns (json, time grabbed) of an endpoint, from the snapshot cache unless it is stale'''
+		return self._fetch(endpoint, pid, season)
+
+
+	def has_fresh_snapshot(self, endpoint: str, pid: int, season: int = None) -> bool:
+		'''Returns whether the snapshot cache has a snapshot of an endpoint that isn't stale'''
+		snapshot = self._snapshots.load(endpoint, pid, season)
+		return snapshot is not None and not self._snapshots.is_stale(endpoint, snapshot[1], season)
+
+
+	def _fetch(self, endpoint: str, pid: int, season: int = None) -> tuple[dict, float]:
+		'''Returns (json, time grabbed) of an endpoint, from the snapshot cache unless it is stale; a stale snapshot
+		is still returned if the download fails'''
+		snapshot = self._snapshots.load(endpoint, pid, season)
+		if snapshot is not None and not self._snapshots.is_stale(endpoint, snapshot[1], season):
+			return snapshot
+
+		try:
+			return self.download_snapshot(endpoint, pid, season, fresh=False)
+		except Exception:
+			# offline (e.g. a machine running on an imported bundle) or nba_api is down: stale data beats none
+			if snapshot is not None:
+				return snapshot
+			raise
+
+
+	def fetch_league_gamelog(self, year: int) -> dict:
+		'''Returns the LeagueGameLog json of every player's games in a season (one request for the whole league)'''
+		return self._fetch('leagueplayergamelog', 0, year)[0]
+
+
+	def fetch_league_team_gamelog(self, year: int) -> dict:
+		'''Returns the LeagueGameLog json of every team's games in a season (one request for the whole league)'''
+		return self._fetch('leagueteamgamelog', 0, year)[0]
+
+
+	def fetch_team_roster(self, team_id: int, year: int = CURRENT_SEASON) -> dict:
+		'''Returns the CommonTeamRoster json of a team's players in a season (kept under the team id as the pid)'''
+		return self._fetch('commonteamroster', team_id, year)[0]
+
+
+	@staticmethod
+	def player_season(endpoint: str) -> int | None:
+		'''Returns the season an endpoint is grabbed for when a player is selected'''
+		return CURRENT_SEASON if endpoint == 'playergamelog' else None
+
+
+	def _set_player(self, pid: int, snapshots: dict[str, tuple[dict, float]]) -> None:
+		'''Makes the given player the selected player, given (json, time grabbed) of every player endpoint'''
+		for endpoint, attribute in ENDPOINT_ATTRIBUTES.items():
+			setattr(self, attribute, snapshots[endpoint][0] if endpoint in snapshots else None)
+
+		self._fetched_at = {endpoint: snapshot[1] for endpoint, snapshot in snapshots.items()}
+		self._career_gamelogs = None
+		self._career_seasons = None
+		self._pid = pid
+		self.invalidate_player(pid)
+
+
 	def get_player_info_by_id(self, pid: int) -> bool:
 		'''Given a player's id, grabs all the data for the selected player'''
 		if pid == self._pid:
 			return True
 
 		try:
-			careerstats = playercareerstats.PlayerCareerStats(player_id=pid, per_mode36='PerGame')
-			careerstats = json.loads(careerstats.get_json())
-		
-			self._career = careerstats
+			snapshots = {endpoint: self._fetch(endpoint, pid, API.player_season(endpoint))
+						 for endpoint in PLAYER_ENDPOINTS}
+			self._set_player(pid, snapshots)
 
-			playerbio = commonplayerinfo.CommonPlayerInfo(player_id=pid)
-			self._bio = json.loads(playerbio.get_json())
+			return True
+		except:
+			return False
 
-			year_by_year_data = playerdashboardbyyearoveryear.PlayerDashboardByYearOverYear(pid)
-			self._year_by_year = json.loads(year_by_year_data.get_json())
 
-			latter = CURRENT_SEASON - 2000 + 1
-			if latter < 10:
-				latter = f'0{latter}'
+	def load_cached_player(self, pid: int) -> bool:
+		'''Selects a player using only their last snapshots, however old; returns False if any are missing'''
+		snapshots = {}
+		for endpoint in PLAYER_ENDPOINTS:
+			snapshot = self._snapshots.load(endpoint, pid, API.player_season(endpoint))
+			if snapshot is None:
+				return False
+			snapshots[endpoint] = snapshot
 
-			gamelog_data = playergamelog.PlayerGameLog(pid, season = f'{CURRENT_SEASON}-{latter}')
-			self._gamelog = json.loads(gamelog_data.get_json())
-			self._pid = pid
+		self._set_player(pid, snapshots)
+		return True
 
-			return True
-		except:
+
+	def get_data_age(self) -> float | None:
+		'''Returns how many seconds old the oldest data of the selected player is'''
+		if len(self._fetched_at) == 0:
+			return None
+
+		return time.time() - min(self._fetched_at.values())
+
+
+	def stale_endpoints(self) -> list[str]:
+		'''Returns the endpoints of the selected player that are due for a refresh per the refresh policy'''
+		return [endpoint for endpoint in PLAYER_ENDPOINTS
+				if self._snapshots.is_stale(endpoint, self._fetched_at.get(endpoint), API.player_season(endpoint))]
+
+
+	def fetch_stale(self, pid: int, endpoints: list[str]) -> dict[str, tuple[dict, float]]:
+		'''Downloads fresh json of the given endpoints without touching the selected player, so it is
+		safe to run in the background; hand the result to apply_refresh()'''
+		fresh = {}
+		for endpoint in endpoints:
+			fresh[endpoint] = self.download_snapshot(endpoint, pid, API.player_season(endpoint))
+
+		return fresh
+
+
+	def apply_refresh(self, pid: int, fresh: dict[str, tuple[dict, float]]) -> list[str]:
+		'''Swaps in json grabbed by fetch_stale(); returns the endpoints whose data actually changed'''
+		if pid != self._pid:
+			return []
+
+		changed = []
+		for endpoint, (payload, fetched_at) in fresh.items():
+			self._fetched_at[endpoint] = fetched_at
+			if payload != getattr(self, ENDPOINT_ATTRIBUTES[endpoint]):
+				changed.append(endpoint)
+
+				if endpoint == 'playergamelog':
+					self.replace_current_season(payload)
+				else:
+					setattr(self, ENDPOINT_ATTRIBUTES[endpoint], payload)
+
+		if len(changed) > 0:
+			self.invalidate_player(pid)
+
+		return changed
+
+
+	def replace_current_season(self, gamelog: dict) -> None:
+		'''Swaps in a newer game log of the current season, keeping the rest of the career that is already loaded'''
+		self._gamelog = gamelog
+
+		if self._career_gamelogs is not None:
+			rows = gamelog['resultSets'][0]['rowSet']
+			self._career_gamelogs = [(year, rows if year == CURRENT_SEASON else season)
+									 for year, season in self._career_gamelogs]
+
+		if self._career_seasons is not None:
+			packed = pack_season(CURRENT_SEASON, gamelog['resultSets'][0]['headers'], gamelog['resultSets'][0]['rowSet'])
+			self._career_seasons = [packed if season.year == CURRENT_SEASON else season
+									for season in self._career_seasons]
+
+		self.invalidate_player(self._pid)
+
+
+	def merge_gamelog(self, pid: int, gamelog: dict, fetched_at: float) -> bool:
+		'''Merges a freshly polled current season game log into the selected player; returns whether it changed'''
+		if pid != self._pid:
+			return False
+
+		self._fetched_at['playergamelog'] = fetched_at
+		if gamelog == self._gamelog:
 			return False
 
+		self.replace_current_season(gamelog)
+		return True
+
 
 	def get_career_average_stat(self, stat_type: str) -> int | None:
 		'''Returns the career stat that we are looking for and None if it doesn't exist'''
@@ -187,6 +501,7 @@ class API:
 		return careerstats['rowSet'][0][careerstats['headers'].index(stat_type)]
 
 
+	@memoized
 	def career_convert(self, stat_type: str) -> list[tuple] | None:
 		'''Take dropdown input and return data accordingly'''
 		try:
@@ -236,11 +551,31 @@ class API:
 			return None
 
 
+	def _career_season_rows(self) -> tuple[list[str], list[list]]:
+		'''Returns the headers and one per game row per season of the career stats, oldest season first; a traded
+		player's season is their TOT row rather than one row per team'''
+		seasons = self._career['resultSets'][0]
+		headers = seasons['headers']
+		season_index, team_index = headers.index('SEASON_ID'), headers.index('TEAM_ABBREVIATION')
+
+		rows = {}
+		for row in seasons['rowSet']:
+			if row[season_index] not in rows or row[team_index] == 'TOT':
+				rows[row[season_index]] = row
+
+		return (headers, list(rows.values()))
+
+
 	def get_year_by_year_stat(self, stat_type: str) -> list[tuple] | None:
-		'''Returns a list of tuples that contain the cumulative stat per year'''
+		'''Returns a list of tuples that contain the cumulative stat per year, newest year first'''
 		try:
 			datapoints = []
 
+			if LOAD_PLAN['season averages'] == 'playercareerstats':
+				headers, rows = self._career_season_rows()
+				season_index, stat_index, games_index = (headers.index(header) for header in ['SEASON_ID', stat_type, 'GP'])
+				return [(row[season_index], round(row[stat_index] * row[games_index])) for row in reversed(rows)]
+
 			headers = self._year_by_year['resultSets'][1]['headers']
 			year_index = headers.index('GROUP_VALUE')
 			stat_index = headers.index(stat_type)
@@ -255,10 +590,16 @@ class API:
 
 
 	def get_year_by_year_stat_avg(self, stat_type: str) -> list[tuple] | None:
-		'''Returns the list of tuples that contains average stat per year'''
+		'''Returns the list of tuples that contains average stat per year, oldest year first; derived from the
+		career stats' season rows unless the load plan grabs the year by year dashboard'''
 		try:
 			datapoints = []
 
+			if LOAD_PLAN['season averages'] == 'playercareerstats':
+				headers, rows = self._career_season_rows()
+				season_index, stat_index = headers.index('SEASON_ID'), headers.index(stat_type)
+				return [(row[season_index], round(row[stat_index], 1)) for row in rows]
+
 			headers = self._year_by_year['resultSets'][1]['headers']
 			year_index = headers.index('GROUP_VALUE')
 			stat_index = headers.index(stat_type)
@@ -279,6 +620,7 @@ class API:
 			return None
 	
 
+	@memoized
 	def per_year_convert(self, stat_type: str) -> list[tuple] | None:
 		'''Take dropdown input and return data accordingly, e.g. PRA, RA'''
 		try:
@@ -334,111 +676,129 @@ class API:
 			return None
 
 
-	def current_season_gamelog(self, stat_type: str, max_games: int = None) -> list[str | int] | None:
+	@memoized
+	def current_season_gamelog(self, stat_type: str, max_games: int = None) -> list[tuple] | None:
 		'''Returns a list of the stat_type for a player for the number of games specified'''
 		headers = self._gamelog['resultSets'][0]['headers']
 		gameset = self._gamelog['resultSets'][0]['rowSet']
 
-		games = 0
 		stat_log = []
 		for game in gameset:
-			if max_games is not None and games >= max_games:
+			if max_games is not None and len(stat_log) >= max_games:
 				break
 			date = game[3].split(',')[0]
-			if stat_type == 'Pts+Rebs+Asts':
-				points = game[headers.index(CONVERT['Points'])]
-				rebounds = game[headers.index(CONVERT['Rebounds'])]
-				assists = game[headers.index(CONVERT['Assists'])]
+			stat_log.append((date, API.game_stat(game, headers, stat_type)))
 
-				stat_log.append((date, points + rebounds + assists))
-			elif stat_type == 'Pts+Rebs':
-				points = game[headers.index(CONVERT['Points'])]
-				rebounds = game[headers.index(CONVERT['Rebounds'])]
+		stat_log.reverse()
 
-				stat_log.append((date, points + rebounds))
-			elif stat_type == 'Pts+Asts':
-				points = game[headers.index(CONVERT['Points'])]
-				assists = game[headers.index(CONVERT['Assists'])]
+		return stat_log
 
-				stat_log.append((date, points + assists))
-			elif stat_type == 'Rebs+Asts':
-				rebounds = game[headers.index(CONVERT['Rebounds'])]
-				assists = game[headers.index(CONVERT['Assists'])]
 
-				stat_log.append(rebounds + assists)
-			elif stat_type == 'Blks+Stls':
-				blocks = game[headers.index(CONVERT['Blocks'])]
-				steals = game[headers.index(CONVERT['Steals'])]
+	def _fetch_season_gamelog(self, year: int) -> list[list]:
+		'''Returns the rows of the player's game log for the season starting in the given year'''
+		return self._fetch('playergamelog', self._pid, year)[0]['resultSets'][0]['rowSet']
 
-				stat_log.append((date, blocks + steals))
-			else:
-				stat_log.append((date, game[headers.index(CONVERT[stat_type])]))
 
-			games += 1
+	def _season_gamelog(self, year: int) -> list[list]:
+		'''Returns the rows of a season of the player's career; the current season is the game log grabbed with
+		the player, so it is never fetched a second time'''
+		if year == CURRENT_SEASON:
+			return self._gamelog['resultSets'][0]['rowSet']
 
-		stat_log.reverse()
-
-		return stat_log
+		return self._fetch_season_gamelog(year)
 
 
-	def get_hit_rates(self, stat_type: str) -> list[dict]:
-		'''Sets dictionaries equal to all the counts for the different hit rate metrics'''
-		self._last5.clear()
-		self._last10.clear()
-		self._season.clear()
-		self._careerlog.clear()
-
-		games = 0
-		current_year = CURRENT_SEASON
-		s = self._bio['resultSets'][0]
+	@staticmethod
+	def season_years(bio: dict) -> list[int]:
+		'''Returns the starting year of every season of a player's career given their CommonPlayerInfo json,
+		newest season first'''
+		s = bio['resultSets'][0]
 		first_year = int(s['rowSet'][0][s['headers'].index('FROM_YEAR')])
-		
-		headers = self._gamelog['resultSets'][0]['headers']
 
-		for year in range(current_year, first_year - 1, -1):
-			latter = year - 2000 + 1
-			if latter < 10:
-				latter = f'0{latter}'
-
-			season = f'{year}-{latter}'
-			
-			data = playergamelog.PlayerGameLog(self._pid, season = season)
-			gamelog = json.loads(data.get_json())['resultSets'][0]['rowSet']
-
-			for game in gamelog:
-				if stat_type == 'Pts+Rebs+Asts':
-					points = game[headers.index(CONVERT['Points'])]
-					rebounds = game[headers.index(CONVERT['Rebounds'])]
-					assists = game[headers.index(CONVERT['Assists'])]
-					stat = points + rebounds + assists
-				elif stat_type == 'Pts+Rebs':
-					points = game[headers.index(CONVERT['Points'])]
-					rebounds = game[headers.index(CONVERT['Rebounds'])]
-					stat = points + rebounds
-				elif stat_type == 'Pts+Asts':
-					points = game[headers.index(CONVERT['Points'])]
-					assists = game[headers.index(CONVERT['Assists'])]
-					stat = points + assists
-				elif stat_type == 'Rebs+Asts':
-					rebounds = game[headers.index(CONVERT['Rebounds'])]
-					assists = game[headers.index(CONVERT['Assists'])]
-					stat = rebounds + assists
-				elif stat_type == 'Blks+Stls':
-					blocks = game[headers.index(CONVERT['Blocks'])]
-					steals = game[headers.index(CONVERT['Steals'])]
-					stat = blocks + steals
-				else:
-					stat = game[headers.index(CONVERT[stat_type])]
+		return list(range(CURRENT_SEASON, first_year - 1, -1))
+
+
+	def career_season_years(self) -> list[int]:
+		'''Returns the starting year of every season of the player's career, newest season first'''
+		return API.season_years(self._bio)
+
 
-				if games < 5:
-					self._last5[stat] += 1
+	def stream_career_gamelog(self):
+		'''Yields (year, rows) for every season of the player's career, newest season first, downloading
+		each season only when it is reached; once the whole career is downloaded it is served from memory'''
+		if self._career_gamelogs is not None:
+			yield from self._career_gamelogs
+			return
 
-				if games < 10:
-					self._last10[stat] += 1
+		loaded = []
+		for year in self.career_season_years():
+			rows = self._season_gamelog(year)
+			loaded.append((year, rows))
+			yield (year, rows)
 
-				if year == CURRENT_SEASON:
-					self._season[stat] += 1
+		self._career_gamelogs = loaded
 
-				self._careerlog[stat] += 1
 
-				games += 1
+	def get_career_gamelog(self) -> list[tuple[int, list]]:
+		'''Returns (year, rows) for every season of the player's career, newest season first;
+		downloaded once per player and reused afterwards'''
+		if self._career_gamelogs is None:
+			for season in self.stream_career_gamelog():
+				pass
+
+		return self._career_gamelogs
+
+
+	def _load_packed_season(self, year: int) -> PackedSeason:
+		'''Returns the packed game log of a season of the player; a past season is packed the first time it is
+		downloaded and memory mapped from the snapshot cache afterwards, while the current season is packed in memory'''
+		if year != CURRENT_SEASON:
+			season = self._snapshots.load_season(self._pid, year)
+			if season is not None:
+				return season
+
+		season = pack_season(year, self._gamelog['resultSets'][0]['headers'], self._season_gamelog(year))
+		if year != CURRENT_SEASON:
+			self._snapshots.save_season(self._pid, season)
+
+		return season
+
+
+	def stream_career_seasons(self):
+		'''Yields the packed game log of every season of the player's career, newest season first, like
+		stream_career_gamelog(); once the whole career is loaded it is served from memory'''
+		if self._career_seasons is not None:
+			yield from self._career_seasons
+			return
+
+		loaded = []
+		for year in self.career_season_years():
+			season = self._load_packed_season(year)
+			loaded.append(season)
+			yield season
+
+		self._career_seasons = loaded
+
+
+	def get_career_seasons(self) -> list[PackedSeason]:
+		'''Returns the packed game log of every season of the player's career, newest season first'''
+		if self._career_seasons is None:
+			for season in self.stream_career_seasons():
+				pass
+
+		return self._career_seasons
+
+
+	@memoized
+	def hit_rate_counts(self, stat_type: str) -> list[dict]:
+		'''Returns the stat counters for the last 5, last 10, current season, and career (see HIT_RATE_WINDOWS)'''
+		counter = HitRateCounter(self._gamelog['resultSets'][0]['headers'], stat_type)
+		for season in self.get_career_seasons():
+			counter.add_packed(season)
+
+		return counter.get_counts()
+
+
+	def get_hit_rates(self, stat_type: str) -> None:
+		'''Sets dictionaries equal to all the counts for the different hit rate metrics'''
+		self._last5, self._last10, self._season, self._careerlog = self.hit_rate_counts(stat_type)
@@ -0,0 +1,272 @@
+# Portable bundles of the snapshot cache for machines without network access: the bios, career rows, and game logs
+# of some players (or the whole league) for chosen seasons, in one gzipped tar with a manifest of checksums
+# Snapshots go in as the columnar .npz files of storage.py and past seasons as the packed .glog files of packed.py,
+# each with the time it was grabbed, so an importing machine behaves exactly as if it had downloaded them itself
+from api import API, CURRENT_SEASON, ENDPOINT_ATTRIBUTES, PLAYER_ENDPOINTS
+from snapshots import SnapshotCache, CACHE_DIRECTORY, REFRESH_POLICY, SEASONAL_ENDPOINTS
+from storage import encode_snapshot, decode_snapshot
+from packed import encode_season, decode_season
+import argparse
+import hashlib
+import tarfile
+import tempfile
+import json
+import time
+import io
+import os
+import numpy
+
+
+BUNDLE_FORMAT = 'nba-stats-bundle'
+BUNDLE_VERSION = 1
+
+# the first member of every bundle, so an import can check every member as it streams past
+MANIFEST = 'manifest.json'
+
+# seasons bundled when none are chosen
+BUNDLE_SEASONS = [CURRENT_SEASON - 1, CURRENT_SEASON]
+
+# endpoints grabbed for the whole league rather than a player, one snapshot per season (pid 0)
+LEAGUE_ENDPOINTS = ['leagueplayergamelog', 'leagueteamgamelog']
+
+
+def _snapshot_name(endpoint: str, pid: int, season: int = None) -> str:
+	'''Returns the member name of a snapshot'''
+	return f'snapshots/{endpoint}_{pid}.npz' if season is None else f'snapshots/{endpoint}_{pid}_{season}.npz'
+
+
+def _season_name(pid: int, year: int) -> str:
+	'''Returns the member name of a packed season'''
+	return f'packed/{pid}_{year}.glog'
+
+
+def _snapshot_bytes(payload: dict, fetched_at: float) -> bytes:
+	'''Returns the .npz bytes of a snapshot in the columnar layout; the tar is compressed as a whole'''
+	buffer = io.BytesIO()
+	numpy.savez(buffer, **encode_snapshot(payload, fetched_at))
+
+	return buffer.getvalue()
+
+
+def bundle_entries(snapshots: SnapshotCache, pids: list[int], seasons: list[int],
+				   league: bool = False) -> tuple[list[tuple], list[tuple]]:
+	'''Returns (entries, missing) of a bundle: (entry, bytes) of everything the snapshot cache has of the players'
+	endpoints and the chosen seasons of their game logs (plus the league's game logs of those seasons), and the
+	(endpoint, pid, season) of everything it doesn't have. Only the cache is read; warm it first (warmer.py).'''
+	entries, missing = [], []
+
+	def _add_snapshot(endpoint: str, pid: int, season: int = None, required: bool = True):
+		snapshot = snapshots.load(endpoint, pid, season)
+		if snapshot is None:
+			if required:
+				missing.append((endpoint, pid, season))
+			return None
+
+		entries.append(({'name': _snapshot_name(endpoint, pid, season), 'kind': 'snapshot', 'endpoint': endpoint,
+						 'pid': pid, 'season': season, 'fetched_at': snapshot[1]}, _snapshot_bytes(*snapshot)))
+		return snapshot[0]
+
+	for pid in pids:
+		bio = None
+		for endpoint in ENDPOINT_ATTRIBUTES:
+			if endpoint in SEASONAL_ENDPOINTS:
+				continue
+
+			payload = _add_snapshot(endpoint, pid, required=endpoint in PLAYER_ENDPOINTS)
+			if endpoint == 'commonplayerinfo':
+				bio = payload
+
+		played = API.season_years(bio) if bio is not None else []
+		for year in sorted(set(seasons) & set(played), reverse=True):
+			_add_snapshot('playergamelog', pid, year)
+
+			packed = snapshots.load_season(pid, year) if year != CURRENT_SEASON else None
+			if packed is not None:
+				entries.append(({'name': _season_name(pid, year), 'kind': 'season', 'pid': pid, 'season': year},
+								encode_season(packed)))
+
+	if league:
+		for endpoint in LEAGUE_ENDPOINTS:
+			for year in sorted(seasons, reverse=True):
+				_add_snapshot(endpoint, 0, year)
+
+	return (entries, missing)
+
+
+def export_bundle(path: str, snapshots: SnapshotCache, pids: list[int], seasons: list[int] = None,
+				  league: bool = False) -> dict:
+	'''Writes a bundle of the players (and the league's game logs if league is set) for the chosen seasons to a
+	gzipped tar, manifest first; returns the manifest. Members are spooled to a temporary file while their
+	checksums are worked out, so a bundle of the whole league never has to fit in memory.'''
+	seasons = BUNDLE_SEASONS if seasons is None else seasons
+	manifest = {'format': BUNDLE_FORMAT, 'version': BUNDLE_VERSION, 'created': time.time(),
+				'current_season': CURRENT_SEASON, 'players': list(pids), 'seasons': sorted(seasons), 'league': league,
+				'entries': [], 'missing': []}
+
+	# one player at a time (then the league), so only one player's members are ever held in memory
+	groups = [([pid], False) for pid in pids] + ([([], True)] if league else [])
+
+	with tempfile.TemporaryFile() as spool:
+		for group, group_league in groups:
+			entries, missing = bundle_entries(snapshots, group, seasons, group_league)
+			manifest['missing'].extend(list(key) for key in missing)
+			for entry, data in entries:
+				spool.write(data)
+				manifest['entries'].append({**entry, 'size': len(data), 'sha256': hashlib.sha256(data).hexdigest()})
+
+		spool.seek(0)
+		with tarfile.open(f'{path}.tmp', 'w:gz') as bundle:
+			_add_member(bundle, MANIFEST, io.BytesIO(json.dumps(manifest).encode()), None)
+			for entry in manifest['entries']:
+				_add_member(bundle, entry['name'], spool, entry['size'])
+
+	# write then rename so a failed export never leaves half a bundle behind
+	os.replace(f'{path}.tmp', path)
+	return manifest
+
+
+def _add_member(bundle: tarfile.TarFile, name: str, file, size: int | None) -> None:
+	'''Adds the next size bytes of a file (all of it with None) to the tar as a member'''
+	if size is None:
+		size = len(file.getvalue())
+
+	info = tarfile.TarInfo(name)
+	info.size = size
+	info.mtime = int(time.time())
+	bundle.addfile(info, file)
+
+
+def import_bundle(path: str, snapshots: SnapshotCache, overwrite: bool = False) -> dict:
+	'''Loads a bundle into the snapshot cache in one streaming pass: every member is checked against the manifest's
+	size and checksum before it is saved with the time it was grabbed, so a corrupt member is never imported. A
+	snapshot the cache already has a newer copy of is skipped unless overwrite is set. Returns the counts of
+	snapshots and seasons imported and skipped; raises ValueError on a bad or incomplete bundle.'''
+	counts = {'snapshots': 0, 'seasons': 0, 'skipped': 0}
+
+	with tarfile.open(path, 'r|gz') as bundle:
+		manifest, expected = None, {}
+		for member in bundle:
+			data = bundle.extractfile(member).read() if member.isfile() else b''
+
+			if manifest is None:
+				if member.name != MANIFEST:
+					raise ValueError(f'{path} is not a bundle: {MANIFEST} has to come first')
+
+				manifest = json.loads(data)
+				if manifest.get('format') != BUNDLE_FORMAT or manifest.get('version', 0) > BUNDLE_VERSION:
+					raise ValueError(f'{path} is not a bundle this version can read')
+				for entry in manifest['entries']:
+					_check_entry(entry, path)
+				expected = {entry['name']: entry for entry in manifest['entries']}
+				continue
+
+			entry = expected.pop(member.name, None)
+			if entry is None:
+				raise ValueError(f'{member.name} is not in the manifest of {path}')
+			if len(data) != entry['size'] or hashlib.sha256(data).hexdigest() != entry['sha256']:
+				raise ValueError(f'{member.name} of {path} does not match its checksum')
+
+			counts[_import_entry(snapshots, entry, data, overwrite)] += 1
+
+	if manifest is None:
+		raise ValueError(f'{path} is empty')
+	if len(expected) > 0:
+		raise ValueError(f'{path} is missing {len(expected)} members, e.g. {next(iter(expected))}')
+
+	return counts
+
+
+def _check_entry(entry: dict, path: str) -> None:
+	'''Raises ValueError unless a manifest entry names a known endpoint with whole number ids and is named after
+	them; the storage backends build file names from these, so a made up entry could otherwise write outside the
+	cache (the checksums only show a member arrived intact, not who made the bundle)'''
+	is_id = lambda value: type(value) is int
+	season = entry.get('season')
+
+	if entry.get('kind') == 'season':
+		valid = is_id(entry.get('pid')) and is_id(season) and entry.get('name') == _season_name(entry['pid'], season)
+	elif entry.get('kind') == 'snapshot':
+		valid = (entry.get('endpoint') in REFRESH_POLICY and is_id(entry.get('pid')) and (season is None or is_id(season))
+				 and entry.get('name') == _snapshot_name(entry['endpoint'], entry['pid'], season)
+				 and isinstance(entry.get('fetched_at'), (int, float)))
+	else:
+		valid = False
+
+	if not valid:
+		raise ValueError(f"{entry.get('name')} of {path} is not a valid bundle entry")
+
+
+def _import_entry(snapshots: SnapshotCache, entry: dict, data: bytes, overwrite: bool) -> str:
+	'''Saves a checked member to the snapshot cache; returns which count it goes to'''
+	if entry['kind'] == 'season':
+		snapshots.save_season(entry['pid'], decode_season(data, entry['name']))
+		return 'seasons'
+
+	if not overwrite:
+		existing = snapshots.load(entry['endpoint'], entry['pid'], entry['season'])
+		if existing is not None and existing[1] >= entry['fetched_at']:
+			return 'skipped'
+
+	with numpy.load(io.BytesIO(data), allow_pickle=False) as arrays:
+		payload, fetched_at = decode_snapshot(arrays)
+	snapshots.save(entry['endpoint'], entry['pid'], payload, entry['season'], fetched_at)
+
+	return 'snapshots'
+
+
+def read_manifest(path: str) -> dict:
+	'''Returns the manifest of a bundle without reading the rest of it'''
+	with tarfile.open(path, 'r|gz') as bundle:
+		for member in bundle:
+			if member.name != MANIFEST:
+				break
+
+			return json.loads(bundle.extractfile(member).read())
+
+	raise ValueError(f'{path} is not a bundle: {MANIFEST} has to come first')
+
+
+def main() -> None:
+	'''Exports a bundle from this machine's snapshot cache, or imports one into it'''
+	# reports imports matplotlib, so only the command pays for it
+	from reports import read_slate
+	from warmer import active_player_ids
+
+	parser = argparse.ArgumentParser(description='Carry the snapshot cache to machines without network access')
+	parser.add_argument('--snapshots', default=CACHE_DIRECTORY, help='directory of the snapshot cache')
+	commands = parser.add_subparsers(dest='command', required=True)
+
+	export = commands.add_parser('export', help='write a bundle of players (or the whole league) for some seasons')
+	export.add_argument('bundle', help='file the bundle is written to')
+	export.add_argument('pids', type=int, nargs='*', help='player ids to bundle')
+	export.add_argument('--slate', help='file of player ids, one per line')
+	export.add_argument('--active', action='store_true', help='bundle every active player')
+	export.add_argument('--league', action='store_true', help='bundle the league wide game logs of the seasons too')
+	export.add_argument('--seasons', type=int, nargs='+', default=BUNDLE_SEASONS, help='starting years, e.g. 2023')
+
+	load = commands.add_parser('import', help='load a bundle into the snapshot cache')
+	load.add_argument('bundle', help='bundle to import')
+	load.add_argument('--overwrite', action='store_true', help='replace snapshots even if the cache has newer ones')
+
+	args = parser.parse_args()
+	snapshots = SnapshotCache(args.snapshots, current_season=CURRENT_SEASON)
+
+	if args.command == 'export':
+		pids = list(args.pids)
+		if args.slate is not None:
+			pids.extend(read_slate(args.slate))
+		if args.active:
+			pids.extend(active_player_ids())
+
+		manifest = export_bundle(args.bundle, snapshots, list(dict.fromkeys(pids)), args.seasons, args.league)
+		print(f"{len(manifest['entries'])} snapshots and seasons written to {args.bundle} "
+			  f"({os.path.getsize(args.bundle) / 1e6:.1f} MB); {len(manifest['missing'])} not in the cache")
+	else:
+		start = time.perf_counter()
+		counts = import_bundle(args.bundle, snapshots, args.overwrite)
+		print(f"{counts['snapshots']} snapshots and {counts['seasons']} seasons imported "
+			  f"({counts['skipped']} already newer) in {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == '__main__':
+	main()
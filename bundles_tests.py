@@ -0,0 +1,139 @@
+# Test portable bundles to ensure an imported cache serves players exactly as if they had been downloaded
+from api import API, CURRENT_SEASON
+from bundles import export_bundle, import_bundle, read_manifest
+from snapshots import SnapshotCache, DAY
+from opponents import OpponentContext
+from screener import Screener
+from sample_data import sample_seasons, stub_downloads, league_gamelog_payload, team_gamelog_payload
+from unittest import mock
+import time
+import tarfile
+import json
+import io
+import tempfile
+import unittest
+import os
+
+
+class BundleTests(unittest.TestCase):
+	def setUp(self):
+		self.directory = tempfile.TemporaryDirectory()
+		self.bundle = os.path.join(self.directory.name, 'bundle.tar.gz')
+		self.seasons = sample_seasons(CURRENT_SEASON - 3)
+
+		# a machine with network access that looked up a player and the league's team game log
+		self.source = SnapshotCache(os.path.join(self.directory.name, 'source'), current_season=CURRENT_SEASON)
+		self.api = API(self.source)
+		stub_downloads(self.api, self.seasons)
+		self.api.get_player_info_by_id(1)
+		self.hit_rates = self.api.get_hit_rates('Points')
+		self.source.save('leagueteamgamelog', 0, team_gamelog_payload(CURRENT_SEASON), CURRENT_SEASON)
+
+		self.offline = SnapshotCache(os.path.join(self.directory.name, 'offline'), current_season=CURRENT_SEASON)
+
+
+	def tearDown(self):
+		self.directory.cleanup()
+
+
+	def test_imported_player_loads_without_downloading(self):
+		manifest = export_bundle(self.bundle, self.source, [1], sorted(self.seasons), league=True)
+		self.assertEqual(read_manifest(self.bundle)['entries'], manifest['entries'])
+		self.assertEqual(len(manifest['missing']), 2 * len(self.seasons) - 1)
+		self.assertNotIn(['leagueteamgamelog', 0, CURRENT_SEASON], manifest['missing'])
+
+		counts = import_bundle(self.bundle, self.offline)
+		self.assertEqual(counts['seasons'], len(self.seasons) - 1)
+		self.assertEqual(counts['skipped'], 0)
+
+		api = API(self.offline)
+		stub_downloads(api, {})
+		self.assertTrue(api.load_cached_player(1))
+		self.assertEqual(api.get_hit_rates('Points'), self.hit_rates)
+		self.assertEqual(api.downloads, [])
+
+		# snapshots keep the time they were grabbed, so they go stale exactly when the originals would
+		self.assertEqual(self.offline.load('commonplayerinfo', 1), self.source.load('commonplayerinfo', 1))
+		self.assertEqual(self.offline.load('leagueteamgamelog', 0, CURRENT_SEASON),
+						 self.source.load('leagueteamgamelog', 0, CURRENT_SEASON))
+
+		# importing again keeps the copies the cache already has
+		self.assertEqual(import_bundle(self.bundle, self.offline)['skipped'], counts['snapshots'])
+
+
+	def test_imported_league_logs_still_load_offline_once_stale(self):
+		self.source.save('leagueplayergamelog', 0, league_gamelog_payload({1: self.seasons[CURRENT_SEASON]}), CURRENT_SEASON)
+		export_bundle(self.bundle, self.source, [1], [CURRENT_SEASON], league=True)
+		import_bundle(self.bundle, self.offline)
+
+		api = API(self.offline)
+		def _offline(endpoint: str, pid: int, season: int = None) -> dict:
+			raise ConnectionError('no network')
+		api._download = _offline
+
+		with mock.patch('snapshots.time.time', return_value=time.time() + 2 * DAY), \
+				mock.patch('screener.players.get_active_players', return_value=[{'id': 1}]):
+			self.assertTrue(self.offline.is_stale('leagueteamgamelog', self.offline.load('leagueteamgamelog', 0,
+																						  CURRENT_SEASON)[1], CURRENT_SEASON))
+			opponents = OpponentContext(api, seasons=1)
+			opponents.load()
+			self.assertTrue(opponents.is_loaded())
+
+			screener = Screener(api, seasons=1, workers=1)
+			try:
+				screener.load()
+				self.assertEqual([result['pid'] for result in screener.screen('Points')], [1])
+			finally:
+				screener.close()
+
+			# nothing to fall back on still fails
+			with self.assertRaises(ConnectionError):
+				api.fetch_league_gamelog(CURRENT_SEASON - 1)
+
+
+	def test_corrupt_or_truncated_bundles_are_refused(self):
+		manifest = export_bundle(self.bundle, self.source, [1], [CURRENT_SEASON])
+		with tarfile.open(self.bundle, 'r:gz') as bundle:
+			members = [(member, bundle.extractfile(member).read()) for member in bundle.getmembers()]
+
+		def _rewrite(members: list[tuple]) -> None:
+			with tarfile.open(self.bundle, 'w:gz') as bundle:
+				for member, data in members:
+					member.size = len(data)
+					bundle.addfile(member, io.BytesIO(data))
+
+		member, data = members[-1]
+		_rewrite(members[:-1] + [(member, data[:-1] + bytes([data[-1] ^ 1]))])
+		with self.assertRaises(ValueError):
+			import_bundle(self.bundle, self.offline)
+
+		_rewrite(members[:-1])
+		with self.assertRaises(ValueError):
+			import_bundle(self.bundle, self.offline)
+		self.assertEqual(len(manifest['entries']), len(members) - 1)
+
+
+	def test_entries_that_escape_the_cache_are_refused(self):
+		manifest = export_bundle(self.bundle, self.source, [1], [CURRENT_SEASON])
+		with tarfile.open(self.bundle, 'r:gz') as bundle:
+			members = [(member, bundle.extractfile(member).read()) for member in bundle.getmembers()]
+
+		for field, value in [('endpoint', '../../escaped'), ('pid', '1/../..'), ('season', 1.5), ('kind', 'other'),
+							 ('name', 'snapshots/other.npz')]:
+			entries = [dict(entry) for entry in manifest['entries']]
+			entries[0][field] = value
+			data = json.dumps({**manifest, 'entries': entries}).encode()
+
+			with tarfile.open(self.bundle, 'w:gz') as bundle:
+				for member, member_data in [(members[0][0], data)] + members[1:]:
+					member.size = len(member_data)
+					bundle.addfile(member, io.BytesIO(member_data))
+
+			with self.assertRaises(ValueError):
+				import_bundle(self.bundle, self.offline)
+			self.assertEqual(self.offline.get_storage().keys(), [])
+			self.assertEqual(sorted(os.listdir(self.directory.name)), ['bundle.tar.gz', 'source'])
+
+
+if __name__ == '__main__':
+	unittest.main()
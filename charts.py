@@ -0,0 +1,199 @@
+# Draws the year by year, game log, and hit rate charts onto matplotlib axes
+# Nothing here touches tkinter, so the window and the headless report renderer (reports.py) draw the same charts
+from dashboard import Dashboard
+from gamelog import ALL_GAMES
+from opponents import OpponentContext, DEFENSE_MARGIN
+from series import OVERLAY_WINDOW
+import numpy
+
+
+# colors
+BLACK = '#000000'
+WHITE = '#ffffff'
+GRAPHGREEN = '#1eeb25'
+GRAPHRED = '#ff2424'
+GRAPHGRAY = '#8f8888'
+GRAPHBLUE = '#03fcfc'
+GRAPHPURPLE = '#c203fc'
+GRAPHGOLD = '#d17219'
+
+
+def overlay_label(kind: str, window: int, scope: str, unit: str) -> str:
+	'''Returns the legend label of an overlay, e.g. 5 Game EWMA or Career Average'''
+	if kind == 'Average':
+		return f'{scope} Average'
+
+	return f'{window} {unit} {kind}'
+
+
+def style_axes(plot, xlabel: str, ylabel: str, labelsize: int = None) -> None:
+	'''Gives a line or bar chart the black background, white labels, and slanted x ticks every chart uses'''
+	plot.set_facecolor(BLACK)
+	plot.set_xlabel(xlabel, color=WHITE)
+	plot.set_ylabel(ylabel, color=WHITE)
+	if labelsize is None:
+		plot.tick_params(axis='x', labelrotation=45)
+	else:
+		plot.tick_params(axis='x', labelrotation=45, labelsize=labelsize)
+	plot.tick_params(color=WHITE, labelcolor=WHITE)
+	plot.spines['bottom'].set_color(WHITE)
+	plot.spines['left'].set_color(WHITE)
+
+
+def year_by_year_series(dashboard: Dashboard, stat_type: str, kind: str = 'Average',
+						window: int = OVERLAY_WINDOW, games: tuple = None) -> tuple[list, list, list]:
+	'''Returns (seasons, per season averages, overlay at each season) of the year by year chart, optionally over
+	just a range of games (whose average is the Average overlay)'''
+	view = dashboard.get(stat_type, games=games)
+	years = [year for year, data in view['year_by_year']]
+	averages = [data for year, data in view['year_by_year']]
+
+	if kind == 'Average':
+		return (years, averages, [view['career_average'] if games is None else view['range_average']] * len(years))
+
+	return (years, averages, dashboard.get_season_overlay(stat_type, kind, window, games).tolist())
+
+
+def draw_year_by_year(plot, years: list, averages: list, trend: list, trend_label: str) -> None:
+	'''Draws the per season averages with the overlay dashed over them'''
+	plot.plot(years, averages, label='Per Year', marker='o', color=GRAPHGOLD)
+	plot.plot(years, trend, label=trend_label, color=WHITE, linestyle='--')
+	plot.legend(facecolor=BLACK, labelcolor=WHITE)
+
+
+def game_log_trend(dashboard: Dashboard, stat_type: str, split: str, values: list, kind: str = 'Average',
+				   window: int = OVERLAY_WINDOW, games: tuple = None) -> list:
+	'''Returns the overlay at each of the given (latest) games of the game log; trend lines are worked out over the
+	whole career so the first games of the season (or range) still have games to look back over'''
+	if kind == 'Average' or len(values) == 0:
+		avg = round(sum(values) / len(values), 1) if len(values) > 0 else 0
+		return [avg] * len(values)
+
+	return dashboard.get_overlay(stat_type, kind, window, split, games)[-len(values):].tolist()
+
+
+def game_log_series(dashboard: Dashboard, stat_type: str, split: str = ALL_GAMES, max_games: int = None,
+					kind: str = 'Average', window: int = OVERLAY_WINDOW, games: tuple = None) -> tuple[list, list, list]:
+	'''Returns (dates, stat, overlay at each game) of the latest max_games games (every game by default) this season,
+	or of a range of games'''
+	season_log = dashboard.get(stat_type, split, games)['season_log']
+	if max_games is not None:
+		season_log = season_log[-max_games:]
+
+	dates = [date for date, data in season_log]
+	values = [data for date, data in season_log]
+
+	return (dates, values, game_log_trend(dashboard, stat_type, split, values, kind, window, games))
+
+
+def draw_game_log(plot, dates: list, values: list, trend: list, trend_label: str) -> tuple:
+	'''Draws a bar per game with the overlay dashed over them; returns (bars, overlay line)'''
+	bars = plot.bar(dates, values, label='Game Log', color=GRAPHPURPLE)
+	line, = plot.plot(dates, trend, label=trend_label, linestyle='--', color=WHITE)
+	plot.legend(facecolor=BLACK, labelcolor=WHITE)
+	plot.set_ylim(bottom=0)
+
+	return (bars, line)
+
+
+def game_log_opponents(dashboard: Dashboard, context: OpponentContext, stat_type: str, split: str = ALL_GAMES,
+					   max_games: int = None, games: tuple = None) -> tuple[list, list]:
+	'''Returns (opponent, what the opponent allowed of the stat over its last games coming in) of every game of
+	game_log_series(), oldest game first; allowed is NaN where the opponent's games aren't loaded'''
+	gamelog = dashboard.get_games(split, games, current_season=games is None)
+	opponents = gamelog.opponents[gamelog.opponent][::-1]
+	allowed = context.allowed_before(opponents, gamelog.date[::-1], stat_type)
+	if max_games is not None:
+		opponents, allowed = opponents[-max_games:], allowed[-max_games:]
+
+	return ([str(opponent) for opponent in opponents], allowed.tolist())
+
+
+def defense_color(allowed: float, league: float) -> str:
+	'''Returns green for a defense that allows more than the league average, red for one that allows less'''
+	if numpy.isnan(allowed) or numpy.isnan(league):
+		return GRAPHGRAY
+	if allowed > league * (1 + DEFENSE_MARGIN):
+		return GRAPHGREEN
+	if allowed < league * (1 - DEFENSE_MARGIN):
+		return GRAPHRED
+
+	return WHITE
+
+
+def annotate_game_log(plot, bars, opponents: list, allowed: list, league: float) -> list:
+	'''Labels every game log bar with its opponent and what they allowed coming in, colored by how soft the
+	defense was; returns the labels so they can follow the bars'''
+	labels = []
+	for bar, opponent, opponent_allowed in zip(bars, opponents, allowed):
+		text = opponent if numpy.isnan(opponent_allowed) else f'{opponent}\n{opponent_allowed:.0f}'
+		labels.append(plot.text(bar.get_x() + bar.get_width() / 2, bar.get_height(), text, ha='center', va='bottom',
+								fontsize=5, color=defense_color(opponent_allowed, league)))
+
+	return labels
+
+
+def hit_rate_categories(dashboard: Dashboard, games: tuple = None) -> list[str]:
+	'''Returns the hit rate chart's row labels; Career says how much of the career is in it while it streams in, and
+	is the whole range when the hit rates are over a range of games'''
+	career = 'Career' if games is None else 'Whole Range'
+	seasons_loaded, seasons_total = dashboard.get_progress()
+	if seasons_loaded < seasons_total:
+		return ['Last 5', 'Last 10', 'Current Season', f'{career}\n({seasons_loaded} of {seasons_total} seasons loaded)']
+
+	return ['Last 5', 'Last 10', 'Current Season', career]
+
+
+def draw_hit_rates(plot, categories: list[str], hit_rates: list[tuple]) -> list:
+	'''Draws a stacked bar of (hit, tied, miss) percentages per category; returns the (miss, tied, hit) bars'''
+	plot.set_facecolor(BLACK)
+	plot.set_xlim((0, 100))
+	plot.get_xaxis().set_visible(False)
+	plot.set_frame_on(False)
+	plot.tick_params(axis='y', length=0, labelcolor=WHITE)
+
+	hit = [hit for hit, tied, miss in hit_rates]
+	tied = [tied for hit, tied, miss in hit_rates]
+	miss = [miss for hit, tied, miss in hit_rates]
+
+	bars = []
+	bars.append(plot.barh(categories, miss, label='Hit', height=0.5, color=GRAPHRED))
+	bars.append(plot.barh(categories, tied, label='Tied', height=0.5, left=miss, color=GRAPHGRAY))
+	start = [miss[x] + tied[x] for x in range(len(miss))]
+	bars.append(plot.barh(categories, hit, label='Miss', height=0.5, left=start, color=GRAPHGREEN))
+	plot.legend()
+
+	return bars
+
+
+def opponent_hit_rates(dashboard: Dashboard, context: OpponentContext, stat_type: str, team: str,
+					   split: str = ALL_GAMES, games: tuple = None) -> list[tuple]:
+	'''Returns the (hit, tied, miss) percentages of every hit rate window adjusted for an upcoming opponent (see
+	OpponentContext.adjusted_hit_rates)'''
+	return context.adjusted_hit_rates(dashboard.get_games(split, games), stat_type, dashboard.get(stat_type)['line'], team)
+
+
+def draw_opponent_adjustment(plot, team: str, factor: float, hit_rates: list[tuple]) -> list:
+	'''Marks where the hit bar of every window would end against the upcoming opponent; returns the artists drawn
+	(the legend is redrawn with them, so redraw it again once they're removed)'''
+	hit = [hit for hit, tied, miss in hit_rates]
+	markers, = plot.plot([100 - rate for rate in hit], range(len(hit)), 'D', markersize=5, color=GRAPHGOLD,
+						 label=f'vs. {team} ({factor:.2f}x)')
+	plot.legend()
+
+	return [markers]
+
+
+def draw_hit_bands(plot, probabilities: list[tuple]) -> list:
+	'''Marks the recency weighted over probability of every window, with its confidence band, on the hit rate bars;
+	returns the artists drawn so they can be removed'''
+	artists = []
+	for y, (estimate, low, high) in enumerate(probabilities):
+		# the hit bar ends at 100, so going over more often moves the marker left
+		band = plot.errorbar(100 - estimate, y, xerr=[[high - estimate], [estimate - low]], fmt='o',
+							 color=WHITE, markersize=3, capsize=3)
+		label = plot.text(101, y, f'{estimate:.0f}%\n({low:.0f}-{high:.0f})', color=WHITE,
+						  va='center', fontsize=8, clip_on=False)
+		artists.extend([band, label])
+
+	return artists
@@ -0,0 +1,123 @@
+# Side by side comparison of several players; each player gets their own API (an API holds one player)
+# and they all load at the same time, so a comparison takes about as long as its slowest player
+from api import API, CURRENT_SEASON
+from gamelog import GameLog
+from concurrent.futures import ThreadPoolExecutor
+import numpy
+
+
+MIN_PLAYERS = 2
+MAX_PLAYERS = 6
+
+# what the year by year averages of the players are lined up by
+ALIGNMENTS = ['Season', 'Age', 'Experience']
+
+
+def load_player(api: API, pid: int) -> API:
+	'''Selects a player in the api from their snapshots (refreshing whatever is stale) or by downloading everything;
+	raises LookupError if neither works'''
+	if api.load_cached_player(pid):
+		try:
+			stale = api.stale_endpoints()
+			if len(stale) > 0:
+				api.apply_refresh(pid, api.fetch_stale(pid, stale))
+		except Exception:
+			# stale data is still worth comparing
+			pass
+	elif not api.get_player_info_by_id(pid):
+		raise LookupError(f'Unable to grab player {pid}')
+
+	return api
+
+
+def load_players(pids: list[int], make_api = API) -> list[API]:
+	'''Loads every player into their own API at the same time; make_api() creates each API'''
+	if not MIN_PLAYERS <= len(pids) <= MAX_PLAYERS:
+		raise ValueError(f'Compare between {MIN_PLAYERS} and {MAX_PLAYERS} players')
+
+	with ThreadPoolExecutor(max_workers=len(pids)) as pool:
+		return list(pool.map(lambda pid: load_player(make_api(), pid), pids))
+
+
+def align(keys: list[numpy.ndarray], values: list[numpy.ndarray]) -> tuple[numpy.ndarray, numpy.ndarray]:
+	'''Joins every player's (keys, values) on their keys; returns (every key sorted, players x keys matrix) with nan
+	where a player has no value for a key'''
+	if len(keys) == 0:
+		return (numpy.zeros(0), numpy.zeros((0, 0)))
+
+	union = numpy.unique(numpy.concatenate(keys))
+	matrix = numpy.full((len(keys), len(union)), numpy.nan)
+	for row, (player_keys, player_values) in enumerate(zip(keys, values)):
+		matrix[row, numpy.searchsorted(union, player_keys)] = player_values
+
+	return (union, matrix)
+
+
+def season_ages(birthdate: str, years: numpy.ndarray) -> numpy.ndarray:
+	'''Returns a player's age in each season (given its starting year), which the NBA counts as of February 1st'''
+	born = numpy.datetime64(birthdate[:10], 'D')
+	february = (numpy.asarray(years) + 1 - 1970).astype('datetime64[Y]') + numpy.timedelta64(31, 'D')
+
+	# whole years between the two dates
+	born_year = born.astype('datetime64[Y]')
+	ages = (february.astype('datetime64[Y]') - born_year).astype(numpy.int64)
+	birthday_later = (born - born_year) > (february - february.astype('datetime64[Y]').astype('datetime64[D]'))
+
+	return ages - birthday_later
+
+
+class Comparison:
+	def __init__(self, apis: list[API]):
+		self._apis = apis
+		self._headers = [api.get_gamelog()['resultSets'][0]['headers'] for api in apis]
+
+
+	def names(self) -> list[str]:
+		'''Returns the name of every player, in order'''
+		return [api.get_bio_info('DISPLAY_FIRST_LAST') for api in self._apis]
+
+
+	def get_pids(self) -> list[int]:
+		'''Returns the id of every player, in order'''
+		return [api.get_pid() for api in self._apis]
+
+
+	def year_by_year(self, stat_type: str, by: str = 'Season') -> tuple[list, numpy.ndarray]:
+		'''Returns (labels, players x labels matrix of per season averages) lined up by one of ALIGNMENTS'''
+		keys, values = [], []
+		for api in self._apis:
+			seasons = api.per_year_convert(stat_type) or []
+			years = numpy.array([int(season[:4]) for season, average in seasons], dtype=numpy.int64)
+			values.append(numpy.array([average for season, average in seasons], dtype=float))
+
+			if by == 'Season':
+				keys.append(years)
+			elif by == 'Age':
+				keys.append(season_ages(api.get_bio_info('BIRTHDATE'), years))
+			elif by == 'Experience':
+				keys.append(years - int(api.get_bio_info('FROM_YEAR')) + 1)
+			else:
+				raise ValueError(f'Unknown alignment {by}')
+
+		union, matrix = align(keys, values)
+		if by == 'Season':
+			return ([API.season_string(int(year)) for year in union], matrix)
+
+		return ([int(key) for key in union], matrix)
+
+
+	def recent(self, stat_type: str, games: int = None) -> tuple[list, numpy.ndarray]:
+		'''Returns (games ago, players x games matrix) of everyone's last games (every game by default) this season,
+		lined up so 0 is each player's latest game'''
+		keys, values = [], []
+		for api, headers in zip(self._apis, self._headers):
+			rows = api.get_gamelog()['resultSets'][0]['rowSet']
+			series = GameLog.from_seasons([(CURRENT_SEASON, rows)], headers).career_series(stat_type)[1]
+			if games is not None:
+				series = series[-games:]
+
+			keys.append(numpy.arange(-len(series) + 1, 1))
+			values.append(series)
+
+		union, matrix = align(keys, values)
+		return ([int(key) for key in union], matrix)
@@ -0,0 +1,103 @@
+# Test the player comparison to ensure players load side by side and their series line up
+from api import API, CURRENT_SEASON
+from compare import Comparison, align, load_players, season_ages
+from sample_data import load_sample_player, sample_seasons, stub_downloads
+from snapshots import SnapshotCache
+import tempfile
+import unittest
+import numpy
+import time
+
+
+# seconds every fake download takes
+DOWNLOAD_TIME = 0.05
+
+
+class AlignTests(unittest.TestCase):
+	def test_missing_keys_are_nan(self):
+		keys, matrix = align([numpy.array([1, 2, 3]), numpy.array([2, 4])],
+							 [numpy.array([10.0, 20.0, 30.0]), numpy.array([5.0, 7.0])])
+
+		self.assertEqual(keys.tolist(), [1, 2, 3, 4])
+		self.assertEqual(numpy.nan_to_num(matrix, nan=-1).tolist(), [[10, 20, 30, -1], [-1, 5, -1, 7]])
+
+
+	def test_ages_are_counted_on_february_first(self):
+		self.assertEqual(season_ages('1995-03-14T00:00:00', numpy.array([2015, 2023])).tolist(), [20, 28])
+		self.assertEqual(season_ages('1995-01-10T00:00:00', numpy.array([2015])).tolist(), [21])
+
+
+class ComparisonTests(unittest.TestCase):
+	def setUp(self):
+		self.apis = [API(), API()]
+		load_sample_player(self.apis[0], 1, sample_seasons(CURRENT_SEASON - 4, 20, pid=1))
+		load_sample_player(self.apis[1], 2, sample_seasons(CURRENT_SEASON - 1, 25, pid=2))
+		self.comparison = Comparison(self.apis)
+
+
+	def test_seasons_line_up_by_year(self):
+		seasons, matrix = self.comparison.year_by_year('Points')
+
+		self.assertEqual(seasons, [API.season_string(year) for year in range(CURRENT_SEASON - 4, CURRENT_SEASON + 1)])
+		self.assertEqual(matrix[0].tolist(), [average for season, average in self.apis[0].per_year_convert('Points')])
+		self.assertTrue(numpy.all(numpy.isnan(matrix[1, :3])))
+
+
+	def test_experience_lines_up_rookie_seasons(self):
+		experience, matrix = self.comparison.year_by_year('Rebounds', 'Experience')
+
+		self.assertEqual(experience, [1, 2, 3, 4, 5])
+		self.assertEqual(matrix[:, 0].tolist(), [self.apis[0].per_year_convert('Rebounds')[0][1],
+												 self.apis[1].per_year_convert('Rebounds')[0][1]])
+
+
+	def test_recent_games_end_together(self):
+		games_ago, matrix = self.comparison.recent('Assists', 25)
+
+		self.assertEqual(games_ago[-1], 0)
+		self.assertEqual(len(games_ago), 25)
+		self.assertTrue(numpy.all(numpy.isnan(matrix[0, :-20])))
+		self.assertFalse(numpy.any(numpy.isnan(matrix[1])))
+
+
+class LoadTests(unittest.TestCase):
+	def setUp(self):
+		self.directory = tempfile.TemporaryDirectory()
+		self.snapshots = SnapshotCache(self.directory.name, current_season=CURRENT_SEASON)
+
+
+	def tearDown(self):
+		self.directory.cleanup()
+
+
+	def _slow_api(self) -> API:
+		'''Returns an API whose downloads each take DOWNLOAD_TIME'''
+		api = API(self.snapshots)
+		stub_downloads(api, sample_seasons())
+		download = api._download
+
+		def _download(endpoint: str, pid: int, season: int = None) -> dict:
+			time.sleep(DOWNLOAD_TIME)
+			return download(endpoint, pid, season)
+		api._download = _download
+
+		return api
+
+
+	def test_players_load_at_the_same_time(self):
+		start = time.perf_counter()
+		apis = load_players([1, 2, 3, 4], self._slow_api)
+		elapsed = time.perf_counter() - start
+
+		# one player makes four downloads one after another
+		self.assertEqual([api.get_pid() for api in apis], [1, 2, 3, 4])
+		self.assertLess(elapsed, 4 * 4 * DOWNLOAD_TIME / 2)
+
+
+	def test_player_count_is_checked(self):
+		with self.assertRaises(ValueError):
+			load_players([1], self._slow_api)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,117 @@
+# Pairwise correlation/covariance of every base stat in CONVERT over a player's game logs
+# Each season is kept as running sums (games, sums, cross products) so seasons can be added or replaced
+# without going back over the rest of the career
+from api import API, CONVERT, CURRENT_SEASON
+from packed import PackedSeason
+import numpy
+
+
+BASE_STATS = list(CONVERT)
+
+# the most recent games any window needs; those rows are kept as is
+RECENT_GAMES = 10
+
+
+def _moments(matrix: numpy.ndarray) -> tuple:
+	'''Returns (games, column sums, cross products) of a games x stats matrix'''
+	return (len(matrix), matrix.sum(axis=0), matrix.T @ matrix)
+
+
+def _covariance(moments: tuple) -> numpy.ndarray:
+	'''Returns the sample covariance matrix given (games, column sums, cross products)'''
+	games, sums, cross = moments
+	if games < 2:
+		return numpy.zeros((len(BASE_STATS), len(BASE_STATS)))
+
+	return (cross - numpy.outer(sums, sums) / games) / (games - 1)
+
+
+class StatCorrelations:
+	def __init__(self, headers: list[str]):
+		# year -> (games, sums, cross products), and year -> that season's newest RECENT_GAMES rows
+		self._columns = [headers.index(CONVERT[stat]) for stat in BASE_STATS]
+		self._seasons = {}
+		self._recent = {}
+
+
+	def season_matrix(self, rows: list[list]) -> numpy.ndarray:
+		'''Returns the games x BASE_STATS matrix of PlayerGameLog rows'''
+		if len(rows) == 0:
+			return numpy.zeros((0, len(BASE_STATS)))
+
+		return numpy.array(rows, dtype=object)[:, self._columns].astype(float)
+
+
+	def add_season(self, year: int, rows: list[list]) -> None:
+		'''Adds (or replaces, e.g. when the current season gets new games) the rows of a season'''
+		self._add_matrix(year, self.season_matrix(rows))
+
+
+	def add_packed(self, season: PackedSeason) -> None:
+		'''Adds (or replaces) a packed season'''
+		matrix = numpy.zeros((len(season), len(BASE_STATS)))
+		for x, stat in enumerate(BASE_STATS):
+			matrix[:, x] = season.stats[CONVERT[stat]]
+
+		self._add_matrix(season.year, matrix)
+
+
+	def _add_matrix(self, year: int, matrix: numpy.ndarray) -> None:
+		'''Keeps the running sums and newest games of a season's games x BASE_STATS matrix'''
+		# the dicts are replaced rather than changed, so a shallow copy is a snapshot later seasons won't change
+		self._seasons = {**self._seasons, year: _moments(matrix)}
+		self._recent = {**self._recent, year: matrix[:RECENT_GAMES]}
+
+
+	def get_games(self, window: str) -> int:
+		'''Returns how many games a window covers'''
+		return self._window_moments(window)[0]
+
+
+	def _window_moments(self, window: str) -> tuple:
+		'''Returns (games, sums, cross products) of one of HIT_RATE_WINDOWS'''
+		if window in ('Last 5', 'Last 10'):
+			recent = [self._recent[year] for year in sorted(self._recent, reverse=True)]
+			matrix = numpy.concatenate(recent) if len(recent) > 0 else numpy.zeros((0, len(BASE_STATS)))
+			return _moments(matrix[:5 if window == 'Last 5' else 10])
+
+		if window == 'Current Season':
+			return self._seasons.get(CURRENT_SEASON, _moments(numpy.zeros((0, len(BASE_STATS)))))
+
+		games = sum(moments[0] for moments in self._seasons.values())
+		sums = sum((moments[1] for moments in self._seasons.values()), numpy.zeros(len(BASE_STATS)))
+		cross = sum((moments[2] for moments in self._seasons.values()), numpy.zeros((len(BASE_STATS), len(BASE_STATS))))
+		return (games, sums, cross)
+
+
+	def covariance(self, window: str = 'Career') -> numpy.ndarray:
+		'''Returns the BASE_STATS x BASE_STATS covariance matrix over a window'''
+		return _covariance(self._window_moments(window))
+
+
+	def correlation(self, window: str = 'Career') -> numpy.ndarray:
+		'''Returns the BASE_STATS x BASE_STATS correlation matrix over a window; a stat that never changed
+		in the window has no correlation, so it is 0 with everything'''
+		covariance = self.covariance(window)
+		deviation = numpy.sqrt(numpy.diag(covariance))
+
+		with numpy.errstate(divide='ignore', invalid='ignore'):
+			correlation = covariance / numpy.outer(deviation, deviation)
+
+		return numpy.nan_to_num(correlation)
+
+
+	def combo_variance(self, stat_type: str, window: str = 'Career') -> tuple[float, float]:
+		'''Returns (variance of a combination stat, what its variance would be if its parts were independent);
+		the difference is how much the correlation between the parts widens (or narrows) the combination'''
+		columns = [BASE_STATS.index(part) for part in self._parts(stat_type)]
+		covariance = self.covariance(window)[numpy.ix_(columns, columns)]
+
+		return (float(covariance.sum()), float(numpy.trace(covariance)))
+
+
+	@staticmethod
+	def _parts(stat_type: str) -> list[str]:
+		'''Returns the base stats a dropdown stat is the sum of'''
+		columns = API.stat_columns(stat_type)
+		return [stat for stat in BASE_STATS if CONVERT[stat] in columns]
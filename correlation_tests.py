@@ -0,0 +1,70 @@
+# Test StatCorrelations class to ensure the running sums give the same matrices as numpy over the raw games
+from api import API, CURRENT_SEASON, CONVERT
+from correlation import StatCorrelations, BASE_STATS
+from dashboard import Dashboard
+from sample_data import load_sample_player, GAMELOG_HEADERS, sample_seasons, season_rows
+import unittest
+import numpy
+
+
+class StatCorrelationsTests(unittest.TestCase):
+	def setUp(self):
+		self.seasons = sample_seasons()
+		self.correlations = StatCorrelations(GAMELOG_HEADERS)
+		for year in sorted(self.seasons, reverse=True):
+			self.correlations.add_season(year, self.seasons[year])
+
+
+	def _matrix(self, rows: list[list]) -> numpy.ndarray:
+		'''The games x BASE_STATS matrix the slow way'''
+		return numpy.array([[row[GAMELOG_HEADERS.index(CONVERT[stat])] for stat in BASE_STATS] for row in rows], dtype=float)
+
+
+	def test_career_matrices_match_numpy(self):
+		rows = [row for year in sorted(self.seasons, reverse=True) for row in self.seasons[year]]
+		matrix = self._matrix(rows)
+
+		numpy.testing.assert_allclose(self.correlations.covariance('Career'), numpy.cov(matrix, rowvar=False))
+		self.assertAlmostEqual(self.correlations.correlation('Career')[0, 0], 1)
+		self.assertEqual(self.correlations.get_games('Career'), len(rows))
+
+
+	def test_recent_windows_cross_into_older_seasons(self):
+		short = {CURRENT_SEASON: season_rows(CURRENT_SEASON, 3), CURRENT_SEASON - 1: season_rows(CURRENT_SEASON - 1, 20)}
+		correlations = StatCorrelations(GAMELOG_HEADERS)
+		for year in sorted(short, reverse=True):
+			correlations.add_season(year, short[year])
+
+		last10 = short[CURRENT_SEASON] + short[CURRENT_SEASON - 1][:7]
+		numpy.testing.assert_allclose(correlations.covariance('Last 10'), numpy.cov(self._matrix(last10), rowvar=False))
+		self.assertEqual(correlations.get_games('Current Season'), 3)
+
+
+	def test_replacing_the_current_season_only_changes_its_sums(self):
+		newer = season_rows(CURRENT_SEASON, 35, seed=3)
+		self.correlations.add_season(CURRENT_SEASON, newer)
+
+		numpy.testing.assert_allclose(self.correlations.covariance('Current Season'), numpy.cov(self._matrix(newer), rowvar=False))
+		self.assertEqual(self.correlations.get_games('Career'), 35 + 2 * len(self.seasons[CURRENT_SEASON - 1]))
+
+
+	def test_combo_variance_is_the_variance_of_the_sum(self):
+		rows = [row for rows in self.seasons.values() for row in rows]
+		combo = [row[24] + row[18] + row[19] for row in rows]
+
+		variance, independent = self.correlations.combo_variance('Pts+Rebs+Asts')
+		self.assertAlmostEqual(variance, numpy.var(combo, ddof=1))
+		self.assertAlmostEqual(independent, sum(numpy.var([row[x] for row in rows], ddof=1) for x in (24, 18, 19)))
+
+
+	def test_dashboard_adds_every_streamed_season(self):
+		api = API()
+		load_sample_player(api, seasons=self.seasons)
+		dashboard = Dashboard(api)
+		dashboard.build()
+
+		numpy.testing.assert_allclose(dashboard.get_correlations().covariance('Career'), self.correlations.covariance('Career'))
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,372 @@
+# Materialized view of everything the interface displays for a single player
+# Built once when a player is selected so changing the stat is just a lookup
+from api import API, STATS, CURRENT_SEASON, HIT_RATE_WINDOWS, HitRateCounter
+from gamelog import GameLog, ALL_GAMES, SPLITS
+from correlation import StatCorrelations
+from series import overlay, OVERLAY_WINDOW
+import copy
+import numpy
+import threading
+
+
+def hit_rate_percentages(counts: dict, line: int) -> tuple[float, float, float]:
+	'''Given a stat counter and a line, returns the (hit, tied, miss) percentages'''
+	total = sum(counts.values())
+	if total == 0:
+		return (0, 0, 0)
+
+	hit = sum(occ for stat, occ in counts.items() if stat > line)
+	miss = sum(occ for stat, occ in counts.items() if stat < line)
+	tied = total - hit - miss
+
+	return (round(hit * 100 / total, 1), round(tied * 100 / total, 1), round(miss * 100 / total, 1))
+
+
+class Dashboard:
+	def __init__(self, api: API):
+		# shallow copy so selecting another player can't swap the data out from under a background build
+		self._api = copy.copy(api)
+		self._pid = api.get_pid()
+
+		# views that only need the data grabbed when the player was selected
+		self._views = {}
+		self._error = None
+		self._ready = threading.Event()
+
+		# hit rates, which fill in as the career streams in one season at a time
+		self._hit_views = {}
+		# stat -> split label -> view of just the games in that group, e.g. only home games
+		self._split_views = {}
+		self._split_labels = [ALL_GAMES]
+
+		# (career game log so far, split of every label, cache); over probabilities and trend overlays are only
+		# worked out for the stat, split, and window being looked at, then cached until the next season streams in
+		self._career_state = (None, {}, {})
+
+		# covariance of the base stats, one season added at a time as the career streams in
+		self._correlations = None
+		self._seasons_loaded = 0
+		self._seasons_total = 0
+		self._stream_error = None
+		self._complete = threading.Event()
+
+		# set when a newer dashboard replaces this one, so the build stops instead of streaming in the rest
+		self._cancelled = threading.Event()
+
+
+	def get_pid(self) -> int:
+		'''Returns the id of the player this dashboard was built for'''
+		return self._pid
+
+
+	def is_ready(self) -> bool:
+		'''Returns whether or not the plots and logs can be drawn (hit rates may still be loading)'''
+		return self._ready.is_set()
+
+
+	def is_complete(self) -> bool:
+		'''Returns whether or not the whole career has streamed in (successfully or not)'''
+		return self._complete.is_set()
+
+
+	def has_failed(self) -> bool:
+		'''Returns whether or not building the views ran into an error'''
+		return self._error is not None
+
+
+	def stream_failed(self) -> bool:
+		'''Returns whether or not downloading the career game logs ran into an error'''
+		return self._stream_error is not None
+
+
+	def get_progress(self) -> tuple[int, int]:
+		'''Returns (seasons loaded, total seasons) of the career stream'''
+		return (self._seasons_loaded, self._seasons_total)
+
+
+	def is_cancelled(self) -> bool:
+		'''Returns whether or not the build was cancelled'''
+		return self._cancelled.is_set()
+
+
+	def cancel(self) -> None:
+		'''Stops the build at the next stat or season; call when a newer dashboard replaces this one, e.g. after a
+		refresh. A cancelled dashboard counts as complete but keeps only what it had built so far.'''
+		self._cancelled.set()
+
+
+	def wait(self, timeout: float = None) -> bool:
+		'''Blocks until the dashboard is completely built; returns whether it finished in time'''
+		return self._complete.wait(timeout)
+
+
+	def build(self) -> None:
+		'''Precomputes the views for every stat in the dropdown, then streams in the career for the hit rates'''
+		try:
+			views = {}
+			for stat_type in STATS:
+				if self.is_cancelled():
+					raise RuntimeError('The dashboard build was cancelled')
+				views[stat_type] = self._build_stat(stat_type)
+
+			self._views = views
+			self._hit_views = {stat_type: self._build_hits(stat_type, [{} for window in HIT_RATE_WINDOWS])
+							   for stat_type in STATS}
+			self._build_splits(GameLog.from_seasons([(CURRENT_SEASON, self._api.get_gamelog()['resultSets'][0]['rowSet'])],
+													self._api.get_gamelog()['resultSets'][0]['headers']), True)
+			self._correlations = StatCorrelations(self._api.get_gamelog()['resultSets'][0]['headers'])
+			self._seasons_total = len(self._api.career_season_years())
+		except Exception as error:
+			self._error = error
+			self._complete.set()
+			return
+		finally:
+			self._ready.set()
+
+		try:
+			if not self.is_cancelled():
+				self._stream_hit_rates()
+		except Exception as error:
+			self._stream_error = error
+		finally:
+			self._complete.set()
+
+
+	def build_async(self, wrap = None) -> None:
+		'''Builds the dashboard on a background thread; poll is_ready()/get_progress() to follow along. wrap(build)
+		returns what the thread runs instead, e.g. ActionProfiler.background to profile the build'''
+		threading.Thread(target=self.build if wrap is None else wrap(self.build), daemon=True).start()
+
+
+	def update_gamelog(self, gamelog: dict) -> bool:
+		'''Swaps in a newer current season game log and recomputes the views built from it without downloading
+		anything; returns False if the career is still streaming in, in which case rebuild the dashboard instead'''
+		if not self.is_complete() or self.has_failed() or self.stream_failed():
+			return False
+
+		self._api.replace_current_season(gamelog)
+		self._views = {stat_type: {**view, 'season_log': self._api.current_season_gamelog(stat_type)}
+					   for stat_type, view in self._views.items()}
+		self._hit_views = {stat_type: self._build_hits(stat_type, self._api.hit_rate_counts(stat_type))
+						   for stat_type in STATS}
+		self._build_splits(GameLog.from_packed(self._api.get_career_seasons(),
+											   self._api.get_gamelog()['resultSets'][0]['headers']), True)
+
+		# only the current season's running sums change
+		correlations = copy.copy(self._correlations)
+		correlations.add_season(CURRENT_SEASON, gamelog['resultSets'][0]['rowSet'])
+		self._correlations = correlations
+
+		return True
+
+
+	def get_correlations(self) -> StatCorrelations:
+		'''Returns the stat correlations of the career loaded so far'''
+		return self._correlations
+
+
+	def get_splits(self) -> list[str]:
+		'''Returns every split label the player has games for, starting with ALL_GAMES'''
+		return list(self._split_labels)
+
+
+	def get(self, stat_type: str, split: str = ALL_GAMES, games: tuple = None) -> dict:
+		'''Returns the precomputed view of the given stat, optionally only over the games of a split label and a
+		range of games (see gamelog.RANGE_PRESETS); a split view swaps in its own season_log and hit_rates and adds
+		split_games and split_average, and a range view swaps in its own season_log (every game of the range),
+		hit_rates, and year_by_year and adds range_games and range_average'''
+		view = {**self._views[stat_type], **self._hit_views[stat_type]}
+
+		split_view = self._split_views.get(stat_type, {}).get(split)
+		if split != ALL_GAMES and split_view is not None:
+			view = {**view,
+					'season_log': split_view['season_log'],
+					'hit_rates': split_view['hit_rates'],
+					'split_games': split_view['games'],
+					'split_average': split_view['average']}
+
+		if games is not None:
+			view = {**view, **self._range_view(stat_type, split, games)}
+
+		return view
+
+
+	def _range_view(self, stat_type: str, split: str, games: tuple) -> dict:
+		'''Works out the views of a stat over a range of the career loaded so far; the range is a slice of the
+		columnar game log, so this is only a few reductions, and it is cached until the next season streams in'''
+		gamelog, split_names, cache = self._career_state
+		if split not in split_names:
+			split = ALL_GAMES
+
+		key = ('range', stat_type, split, games)
+		if key not in cache:
+			ranged = gamelog.select(gamelog.range_slice(games))
+			line = self._views[stat_type]['line']
+			stats = ranged.split_stats(stat_type, split_names.get(split, ALL_GAMES), line).get(split)
+			if stats is None:
+				stats = {'games': [0] * len(HIT_RATE_WINDOWS), 'average': 0, 'hit_rates': [(0, 0, 0)] * len(HIT_RATE_WINDOWS)}
+
+			cache[key] = {'season_log': ranged.game_log(stat_type, split_names.get(split), None if split == ALL_GAMES else split),
+						  'hit_rates': stats['hit_rates'],
+						  'year_by_year': ranged.season_averages(stat_type),
+						  'range_games': stats['games'],
+						  'range_average': stats['average']}
+
+		return cache[key]
+
+
+	def _build_stat(self, stat_type: str) -> dict:
+		'''Computes everything the plots and logs need for a single stat, besides the hit rates'''
+		career_average = self._api.career_convert(stat_type)
+
+		return {'year_by_year': self._api.per_year_convert(stat_type),
+				'career_average': career_average,
+				'season_log': self._api.current_season_gamelog(stat_type),
+				'line': round(career_average) if career_average is not None else 0}
+
+
+	def _build_hits(self, stat_type: str, counts: list[dict]) -> dict:
+		'''Computes the hit rate view of a stat from its counters'''
+		line = self._views[stat_type]['line']
+
+		return {'hit_counts': dict(zip(HIT_RATE_WINDOWS, counts)),
+				'hit_rates': [hit_rate_percentages(window, line) for window in counts]}
+
+
+	def get_probabilities(self, stat_type: str, split: str = ALL_GAMES, games: tuple = None) -> list[tuple]:
+		'''Returns the (estimate, low, high) percentages of going over the stat's line for every window of
+		HIT_RATE_WINDOWS (see GameLog.over_probabilities), optionally only over the games of a split label and a
+		range of games'''
+		gamelog, split_names, cache = self._career_state
+		if split not in split_names:
+			split = ALL_GAMES
+
+		key = ('probabilities', stat_type, split, games)
+		if key not in cache:
+			line = self._views[stat_type]['line']
+			if games is not None:
+				gamelog = gamelog.select(gamelog.range_slice(games))
+			cache[key] = gamelog.over_probabilities(stat_type, line, split_names.get(split),
+													None if split == ALL_GAMES else split)
+
+		return cache[key]
+
+
+	def get_games(self, split: str = ALL_GAMES, games: tuple = None, current_season: bool = False) -> GameLog:
+		'''Returns the columnar game log of the career loaded so far, newest game first, optionally only the games of
+		a split label, a range of games, or the current season (the games the game log chart shows without a range)'''
+		gamelog, split_names, cache = self._career_state
+		if games is not None:
+			gamelog = gamelog.select(gamelog.range_slice(games))
+
+		mask = numpy.ones(len(gamelog), dtype=bool)
+		if split in split_names:
+			labels, codes = gamelog.groups(split_names[split])
+			mask &= codes == labels.index(split)
+		if current_season:
+			mask &= gamelog.season == CURRENT_SEASON
+
+		return gamelog if mask.all() else gamelog.select(mask)
+
+
+	def get_career_series(self, stat_type: str, split: str = ALL_GAMES) -> tuple:
+		'''Returns full resolution (dates, stat) arrays of every game of the career loaded so far, oldest first,
+		optionally only the games of a split label'''
+		gamelog, split_names, cache = self._career_state
+		if split not in split_names:
+			return gamelog.career_series(stat_type)
+
+		return gamelog.career_series(stat_type, split_names[split], split)
+
+
+	def get_overlay(self, stat_type: str, kind: str, window: int = OVERLAY_WINDOW, split: str = ALL_GAMES,
+					games: tuple = None) -> numpy.ndarray:
+		'''Returns one of OVERLAYS over every game of the career loaded so far, lined up with get_career_series();
+		worked out from the columnar game log once per (stat, overlay, window, split), then cached. With a range of
+		games, just the overlay at the games of the range, so its first games still look back before the range.'''
+		gamelog, split_names, cache = self._career_state
+		if split not in split_names:
+			split = ALL_GAMES
+
+		key = ('overlay', stat_type, kind, window, split)
+		if key not in cache:
+			cache[key] = overlay(self.get_career_series(stat_type, split)[1], kind, window)
+
+		if games is None:
+			return cache[key]
+
+		in_range = numpy.zeros(len(gamelog), dtype=bool)
+		in_range[gamelog.range_slice(games)] = True
+		if split != ALL_GAMES:
+			labels, codes = gamelog.groups(split_names[split])
+			in_range = in_range[codes == labels.index(split)]
+
+		# the overlay is oldest game first
+		return cache[key][in_range[::-1]]
+
+
+	def get_season_overlay(self, stat_type: str, kind: str, window: int = OVERLAY_WINDOW,
+						   games: tuple = None) -> numpy.ndarray:
+		'''Returns one of OVERLAYS over the per season averages, lined up with the year_by_year view (of a range of
+		games if given)'''
+		cache = self._career_state[2]
+
+		key = ('season overlay', stat_type, kind, window, games)
+		if key not in cache:
+			averages = self.get(stat_type, games=games)['year_by_year']
+			cache[key] = overlay([average for year, average in averages], kind, window)
+
+		return cache[key]
+
+
+	def _build_splits(self, gamelog: GameLog, season_logs: bool = False) -> None:
+		'''Computes the split views of every stat from the seasons loaded so far; the season logs only depend on the
+		current season, so they are kept from the last build unless season_logs is set'''
+
+		labels = [ALL_GAMES]
+		split_names = {}
+		split_views = {}
+		for stat_type in STATS:
+			line = self._views[stat_type]['line']
+			split_views[stat_type] = {}
+
+			for split in SPLITS:
+				for label, stats in gamelog.split_stats(stat_type, split, line).items():
+					if season_logs:
+						season_log = gamelog.season_log(stat_type, split, label)
+					else:
+						season_log = self._split_views.get(stat_type, {}).get(label, {}).get('season_log', [])
+
+					split_views[stat_type][label] = {**stats, 'season_log': season_log}
+					if stat_type == STATS[0]:
+						labels.append(label)
+						split_names[label] = split
+
+		# swap in whole new dicts so the interface never reads a half updated one
+		self._split_views = split_views
+		self._split_labels = labels
+		self._career_state = (copy.copy(gamelog), split_names, {})
+
+
+	def _stream_hit_rates(self) -> None:
+		'''Counts the career one season at a time, newest first, publishing the hit rates after each season'''
+		headers = self._api.get_gamelog()['resultSets'][0]['headers']
+		counters = {stat_type: HitRateCounter(headers, stat_type) for stat_type in STATS}
+		career = GameLog(headers)
+		correlations = copy.copy(self._correlations)
+
+		for season in self._api.stream_career_seasons():
+			if self.is_cancelled():
+				return
+
+			for counter in counters.values():
+				counter.add_packed(season)
+			career.add_packed(season)
+			self._build_splits(career)
+			correlations.add_packed(season)
+			self._correlations = copy.copy(correlations)
+
+			# swap in a whole new dict so the interface never reads a half updated one
+			self._hit_views = {stat_type: self._build_hits(stat_type, [dict(window) for window in counter.get_counts()])
+							   for stat_type, counter in counters.items()}
+			self._seasons_loaded += 1
@@ -0,0 +1,137 @@
+# Test Dashboard class to ensure the precomputed views match what the API computes on demand
+from api import API, STATS, CURRENT_SEASON, HIT_RATE_WINDOWS, HitRateCounter
+from dashboard import Dashboard, hit_rate_percentages
+from sample_data import load_sample_player, GAMELOG_HEADERS
+import unittest
+
+
+class DashboardTests(unittest.TestCase):
+	def setUp(self):
+		self.api = API()
+		self.seasons = load_sample_player(self.api)
+
+
+	def test_hit_rate_percentages_splits_counts_around_the_line(self):
+		self.assertEqual(hit_rate_percentages({10: 1, 20: 2, 30: 1}, 20), (25.0, 50.0, 25.0))
+
+
+	def test_hit_rate_percentages_returns_zeros_when_there_are_no_games(self):
+		self.assertEqual(hit_rate_percentages({}, 20), (0, 0, 0))
+
+
+	def test_build_precomputes_every_stat(self):
+		dashboard = Dashboard(self.api)
+		dashboard.build()
+
+		self.assertTrue(dashboard.is_ready())
+		self.assertFalse(dashboard.has_failed())
+		for stat_type in STATS:
+			self.assertEqual(dashboard.get(stat_type)['year_by_year'], self.api.per_year_convert(stat_type))
+			self.assertEqual(dashboard.get(stat_type)['season_log'], self.api.current_season_gamelog(stat_type))
+
+
+	def test_build_downloads_each_season_only_once(self):
+		dashboard = Dashboard(self.api)
+		dashboard.build()
+
+		# the current season is the game log grabbed with the player
+		self.assertEqual(sorted(dashboard._api.fetches), [year for year in sorted(self.seasons) if year != CURRENT_SEASON])
+
+
+	def test_hit_counts_cover_every_window(self):
+		dashboard = Dashboard(self.api)
+		dashboard.build()
+
+		counts = dashboard.get('Points')['hit_counts']
+		self.assertEqual(sum(counts['Last 5'].values()), 5)
+		self.assertEqual(sum(counts['Last 10'].values()), 10)
+		self.assertEqual(sum(counts['Current Season'].values()), len(self.seasons[CURRENT_SEASON]))
+		self.assertEqual(sum(counts['Career'].values()), sum(len(rows) for rows in self.seasons.values()))
+
+
+	def test_build_async_finishes_in_the_background(self):
+		dashboard = Dashboard(self.api)
+		dashboard.build_async()
+
+		self.assertTrue(dashboard.wait(10))
+		self.assertEqual(len(dashboard.get('Rebs+Asts')['season_log'][0]), 2)
+
+
+	def test_stream_career_gamelog_downloads_one_season_at_a_time_newest_first(self):
+		stream = self.api.stream_career_gamelog()
+
+		self.assertEqual(next(stream)[0], CURRENT_SEASON)
+		self.assertEqual(self.api.fetches, [])
+		self.assertEqual([year for year, rows in stream], [CURRENT_SEASON - 1, CURRENT_SEASON - 2])
+		self.assertEqual(self.api.fetches, [CURRENT_SEASON - 1, CURRENT_SEASON - 2])
+
+
+	def test_hit_rate_counter_fills_recent_windows_from_the_first_season(self):
+		counter = HitRateCounter(GAMELOG_HEADERS, 'Points')
+		counter.add_season(CURRENT_SEASON, self.seasons[CURRENT_SEASON])
+
+		last5, last10, season, career = counter.get_counts()
+		self.assertEqual(sum(last5.values()), 5)
+		self.assertEqual(sum(last10.values()), 10)
+		self.assertEqual(season, career)
+
+
+	def test_progress_counts_every_season_once_complete(self):
+		dashboard = Dashboard(self.api)
+		dashboard.build()
+
+		self.assertTrue(dashboard.is_complete())
+		self.assertEqual(dashboard.get_progress(), (3, 3))
+		self.assertEqual(dashboard.get('Points')['hit_counts'], dict(zip(HIT_RATE_WINDOWS, self.api.hit_rate_counts('Points'))))
+
+
+	def test_career_download_failure_keeps_the_other_views(self):
+		def _fail(year):
+			raise ConnectionError()
+		self.api._fetch_season_gamelog = _fail
+		dashboard = Dashboard(self.api)
+		dashboard.build()
+
+		self.assertFalse(dashboard.has_failed())
+		self.assertTrue(dashboard.stream_failed())
+		# the current season never needs a download, so its hit rates are still there
+		self.assertEqual(sum(dashboard.get('Points')['hit_counts']['Career'].values()), len(self.seasons[CURRENT_SEASON]))
+
+
+	def test_cancelled_build_stops_streaming_the_career(self):
+		fetches = []
+		def _cancel(year):
+			fetches.append(year)
+			dashboard.cancel()
+			return self.seasons[year]
+		self.api._fetch_season_gamelog = _cancel
+		dashboard = Dashboard(self.api)
+		dashboard.build()
+
+		self.assertTrue(dashboard.is_complete())
+		self.assertTrue(dashboard.is_cancelled())
+		self.assertEqual(fetches, [CURRENT_SEASON - 1])
+		self.assertEqual(dashboard.get_progress(), (1, 3))
+
+
+	def test_build_cancelled_before_it_starts_builds_nothing(self):
+		dashboard = Dashboard(self.api)
+		dashboard.cancel()
+		dashboard.build()
+
+		self.assertTrue(dashboard.is_complete())
+		self.assertTrue(dashboard.has_failed())
+		self.assertEqual(self.api.get_diagnostics()['query_cache']['size'], 0)
+
+
+	def test_build_failure_is_recorded_instead_of_raised(self):
+		self.api._gamelog = None
+		dashboard = Dashboard(self.api)
+		dashboard.build()
+
+		self.assertTrue(dashboard.is_ready())
+		self.assertTrue(dashboard.has_failed())
+
+
+if __name__ == '__main__':
+	unittest.main()
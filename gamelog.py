@@ -0,0 +1,319 @@
+# Columnar game log of a player's career; matchups and dates are parsed once into numpy columns
+# so situational splits (home/away, opponent, rest, back-to-backs) are grouped vectorized reductions
+# Games are in date order, so a range of dates or seasons is found by binary search and is a slice of every column
+from api import API, CONVERT, CURRENT_SEASON, HIT_RATE_WINDOWS
+from probability import bootstrap_over, recency_weights, HALF_LIFE, RESAMPLES
+from packed import PackedSeason, pack_season
+import numpy
+
+
+ALL_GAMES = 'All Games'
+SPLITS = ['Home/Away', 'Opponent', 'Rest Days', 'Back-to-Back']
+
+# days off between games; anything from MAX_REST up is one bucket (and so is a season opener)
+MAX_REST = 3
+REST_LABELS = ['0 Days Rest', '1 Day Rest', '2 Days Rest', '3+ Days Rest']
+
+# a range of games is ('dates', first day, last day) of numpy.datetime64, or ('seasons', first year, last year);
+# None on either end leaves it open, and None instead of a range is the whole career
+WHOLE_CAREER = 'Whole Career'
+RANGE_PRESETS = {WHOLE_CAREER: None,
+				 'This Season': ('seasons', CURRENT_SEASON, CURRENT_SEASON),
+				 'Last 2 Seasons': ('seasons', CURRENT_SEASON - 1, CURRENT_SEASON),
+				 'Last 3 Seasons': ('seasons', CURRENT_SEASON - 2, CURRENT_SEASON)}
+
+
+class GameLog:
+	def __init__(self, headers: list[str]):
+		# seasons are added newest first and their PlayerGameLog rows are newest game first
+		self._headers = headers
+		self._length = 0
+
+		self.season = numpy.zeros(0, dtype=numpy.int16)
+		self.date = numpy.zeros(0, dtype='datetime64[D]')
+		self.date_labels = []
+		self.home = numpy.zeros(0, dtype=bool)
+		self.rest = numpy.zeros(0, dtype=numpy.int64)
+		self.stats = {column: numpy.zeros(0, dtype=numpy.int64) for column in CONVERT.values()}
+
+		self._opponent_names = numpy.zeros(0, dtype=str)
+		self.opponents, self.opponent = numpy.zeros(0, dtype=str), numpy.zeros(0, dtype=numpy.int64)
+
+		# the dates and seasons oldest first, so ranges are binary searches (numpy.searchsorted)
+		self._date_index = numpy.zeros(0, dtype='datetime64[D]')
+		self._season_index = numpy.zeros(0, dtype=numpy.int16)
+
+
+	@staticmethod
+	def from_seasons(seasons: list[tuple[int, list[list]]], headers: list[str]) -> 'GameLog':
+		'''Builds a game log from (year, rows) pairs, newest season first'''
+		gamelog = GameLog(headers)
+		for year, rows in seasons:
+			gamelog.add_season(year, rows)
+
+		return gamelog
+
+
+	@staticmethod
+	def from_packed(seasons: list[PackedSeason], headers: list[str]) -> 'GameLog':
+		'''Builds a game log from packed seasons, newest season first'''
+		gamelog = GameLog(headers)
+		for season in seasons:
+			gamelog.add_packed(season)
+
+		return gamelog
+
+
+	def add_season(self, year: int, rows: list[list]) -> None:
+		'''Parses an older season than any added so far and appends it to the columns'''
+		self.add_packed(pack_season(year, self._headers, rows))
+
+
+	def add_packed(self, season: PackedSeason) -> None:
+		'''Appends a packed season older than any added so far to the columns'''
+		if len(season) == 0:
+			return
+
+		dates = season.date
+
+		# every column is replaced rather than changed in place, so a shallow copy of the game log is a consistent
+		# snapshot even while another thread adds an older season
+		# rest is the days between a game and the one before it (the next row); a season opener gets MAX_REST
+		rest = numpy.full(len(season), MAX_REST, dtype=numpy.int64)
+		rest[:-1] = numpy.clip((dates[:-1] - dates[1:]).astype(numpy.int64) - 1, 0, MAX_REST)
+
+		self.season = numpy.append(self.season, numpy.full(len(season), season.year, dtype=numpy.int16))
+		self.date = numpy.append(self.date, dates)
+		self.date_labels = self.date_labels + season.date_labels()
+		self.home = numpy.append(self.home, season.home())
+		self.rest = numpy.append(self.rest, rest)
+		self.stats = {column: numpy.append(values, season.stats[column]).astype(numpy.int64)
+					  for column, values in self.stats.items()}
+
+		# opponents are categorical: their abbreviations sorted, and each game's index into them
+		self._opponent_names = numpy.append(self._opponent_names, season.opponents())
+		self.opponents, self.opponent = numpy.unique(self._opponent_names, return_inverse=True)
+		self._length += len(season)
+
+		self._date_index = numpy.concatenate([dates[::-1], self._date_index])
+		self._season_index = self.season[::-1].copy()
+
+
+	def __len__(self) -> int:
+		return self._length
+
+
+	def date_range(self, first: numpy.datetime64 = None, last: numpy.datetime64 = None) -> slice:
+		'''Returns the slice of the games played from the first through the last day (either can be None)'''
+		start = 0 if first is None else numpy.searchsorted(self._date_index, numpy.datetime64(first, 'D'), 'left')
+		end = self._length if last is None else numpy.searchsorted(self._date_index, numpy.datetime64(last, 'D'), 'right')
+
+		# the index is oldest first and the columns newest first
+		return slice(int(self._length - max(end, start)), int(self._length - start))
+
+
+	def season_range(self, first: int = None, last: int = None) -> slice:
+		'''Returns the slice of the games of the seasons starting in the first through the last year'''
+		start = 0 if first is None else numpy.searchsorted(self._season_index, first, 'left')
+		end = self._length if last is None else numpy.searchsorted(self._season_index, last, 'right')
+
+		return slice(int(self._length - max(end, start)), int(self._length - start))
+
+
+	def range_slice(self, games: tuple | None) -> slice:
+		'''Returns the slice of a range of games (see RANGE_PRESETS)'''
+		if games is None:
+			return slice(0, self._length)
+
+		kind, first, last = games
+		if kind == 'dates':
+			return self.date_range(first, last)
+		if kind == 'seasons':
+			return self.season_range(first, last)
+
+		raise ValueError(f'Unknown range {kind}')
+
+
+	def select(self, games: slice | numpy.ndarray) -> 'GameLog':
+		'''Returns a game log of just a slice of the games, whose columns are views of this one's so nothing is
+		copied, or of the games where a boolean mask is set'''
+		if not isinstance(games, slice):
+			return self._select_mask(games)
+
+		selected = GameLog(self._headers)
+		selected._length = len(range(*games.indices(self._length)))
+
+		selected.season = self.season[games]
+		selected.date = self.date[games]
+		selected.date_labels = self.date_labels[games]
+		selected.home = self.home[games]
+		selected.rest = self.rest[games]
+		selected.stats = {column: values[games] for column, values in self.stats.items()}
+
+		selected._opponent_names = self._opponent_names[games]
+		selected.opponents, selected.opponent = self.opponents, self.opponent[games]
+
+		# the slice is newest first, so its index is the mirrored slice of this one's
+		start, stop, step = games.indices(self._length)
+		selected._date_index = self._date_index[self._length - stop:self._length - start]
+		selected._season_index = self._season_index[self._length - stop:self._length - start]
+
+		return selected
+
+
+	def _select_mask(self, mask: numpy.ndarray) -> 'GameLog':
+		'''Returns a game log of the games where the mask is set (copies of the columns, still in date order)'''
+		selected = GameLog(self._headers)
+		selected._length = int(numpy.count_nonzero(mask))
+
+		selected.season = self.season[mask]
+		selected.date = self.date[mask]
+		selected.date_labels = [self.date_labels[x] for x in numpy.flatnonzero(mask)]
+		selected.home = self.home[mask]
+		selected.rest = self.rest[mask]
+		selected.stats = {column: values[mask] for column, values in self.stats.items()}
+
+		selected._opponent_names = self._opponent_names[mask]
+		selected.opponents, selected.opponent = self.opponents, self.opponent[mask]
+
+		selected._date_index = selected.date[::-1]
+		selected._season_index = selected.season[::-1]
+
+		return selected
+
+
+	def values(self, stat_type: str) -> numpy.ndarray:
+		'''Returns the dropdown stat of every game, summing combinations'''
+		values = numpy.zeros(self._length, dtype=numpy.int64)
+		for column in API.stat_columns(stat_type):
+			values += self.stats[column]
+
+		return values
+
+
+	def groups(self, split: str) -> tuple[list[str], numpy.ndarray]:
+		'''Returns (labels, group of every game) of a split'''
+		if split == 'Home/Away':
+			return (['Home', 'Away'], numpy.where(self.home, 0, 1))
+		if split == 'Opponent':
+			return ([f'vs. {opponent}' for opponent in self.opponents], self.opponent)
+		if split == 'Rest Days':
+			return (list(REST_LABELS), self.rest)
+		if split == 'Back-to-Back':
+			return (['Back-to-Back', 'Not Back-to-Back'], numpy.where(self.rest == 0, 0, 1))
+		if split == ALL_GAMES:
+			return ([ALL_GAMES], numpy.zeros(self._length, dtype=numpy.int64))
+
+		raise ValueError(f'Unknown split {split}')
+
+
+	def split_stats(self, stat_type: str, split: str, line: float, values: numpy.ndarray = None) -> dict[str, dict]:
+		'''Returns {label: {'games', 'average', 'hit_rates'}} of every group of a split; games and hit_rates
+		have one entry per window of HIT_RATE_WINDOWS, and Last 5/Last 10 are the group's own last games. values
+		swaps in other values of the stat for every game, e.g. adjusted for the opponent.'''
+		labels, codes = self.groups(split)
+		n_groups = len(labels)
+		values = self.values(stat_type) if values is None else values
+
+		# how many games of the same group came after each game, i.e. its position in the group newest first
+		order = numpy.argsort(codes, kind='stable')
+		sizes = numpy.bincount(codes, minlength=n_groups)
+		starts = numpy.cumsum(sizes) - sizes
+		rank = numpy.empty(self._length, dtype=numpy.int64)
+		rank[order] = numpy.arange(self._length) - numpy.repeat(starts, sizes)
+
+		windows = [rank < 5, rank < 10, self.season == CURRENT_SEASON, numpy.ones(self._length, dtype=bool)]
+		hit, miss = values > line, values < line
+
+		averages = numpy.bincount(codes, values, minlength=n_groups) / numpy.maximum(sizes, 1)
+		games = [numpy.bincount(codes, window, minlength=n_groups) for window in windows]
+		hits = [numpy.bincount(codes, window & hit, minlength=n_groups) for window in windows]
+		misses = [numpy.bincount(codes, window & miss, minlength=n_groups) for window in windows]
+
+		stats = {}
+		for group, label in enumerate(labels):
+			if sizes[group] == 0:
+				continue
+
+			rates = []
+			for window in range(len(HIT_RATE_WINDOWS)):
+				total = int(games[window][group])
+				if total == 0:
+					rates.append((0, 0, 0))
+					continue
+
+				hit_count, miss_count = int(hits[window][group]), int(misses[window][group])
+				rates.append((round(hit_count * 100 / total, 1), round((total - hit_count - miss_count) * 100 / total, 1),
+							  round(miss_count * 100 / total, 1)))
+
+			stats[label] = {'games': [int(window[group]) for window in games],
+							'average': round(float(averages[group]), 1),
+							'hit_rates': rates}
+
+		return stats
+
+
+	def over_probabilities(self, stat_type: str, line: float, split: str = None, label: str = None,
+						   half_life: float = HALF_LIFE, resamples: int = RESAMPLES) -> list[tuple]:
+		'''Returns the recency weighted probability of going over the line, with its bootstrap band, as
+		(estimate, low, high) percentages for every window of HIT_RATE_WINDOWS, optionally only over the games
+		of a split label'''
+		mask = numpy.ones(self._length, dtype=bool)
+		if split is not None:
+			labels, codes = self.groups(split)
+			mask = codes == labels.index(label)
+
+		values = self.values(stat_type)[mask]
+		rank = numpy.arange(len(values))
+
+		# one row of weights per window, so every window is estimated at once
+		weights = recency_weights(rank, half_life) * numpy.array([rank < 5, rank < 10,
+																  self.season[mask] == CURRENT_SEASON,
+																  numpy.ones(len(values), dtype=bool)])
+		estimate, low, high = bootstrap_over(weights.sum(axis=1), weights @ (values > line),
+											 (weights ** 2).sum(axis=1), resamples)
+
+		return [(float(estimate[x]), float(low[x]), float(high[x])) for x in range(len(HIT_RATE_WINDOWS))]
+
+
+	def career_series(self, stat_type: str, split: str = None, label: str = None) -> tuple[numpy.ndarray, numpy.ndarray]:
+		'''Returns (dates, stat) of every game of the career loaded so far, oldest game first, only keeping the
+		games in the given group of a split'''
+		mask = numpy.ones(self._length, dtype=bool)
+		if split is not None:
+			labels, codes = self.groups(split)
+			mask = codes == labels.index(label)
+
+		return (self.date[mask][::-1], self.values(stat_type)[mask][::-1])
+
+
+	def season_log(self, stat_type: str, split: str = None, label: str = None) -> list[tuple]:
+		'''Returns [(date, stat)] of the current season, oldest game first like current_season_gamelog(), only
+		keeping the games in the given group of a split'''
+		mask = self.season == CURRENT_SEASON
+		if split is not None:
+			labels, codes = self.groups(split)
+			mask &= codes == labels.index(label)
+
+		values = self.values(stat_type)
+		return [(self.date_labels[x], int(values[x])) for x in numpy.flatnonzero(mask)[::-1]]
+
+
+	def game_log(self, stat_type: str, split: str = None, label: str = None) -> list[tuple]:
+		'''Returns [(date, stat)] of every game, oldest game first like season_log(); dates include the year since a
+		range can span seasons'''
+		mask = numpy.ones(self._length, dtype=bool)
+		if split is not None:
+			labels, codes = self.groups(split)
+			mask = codes == labels.index(label)
+
+		values = self.values(stat_type)
+		return [(str(self.date[x]), int(values[x])) for x in numpy.flatnonzero(mask)[::-1]]
+
+
+	def season_averages(self, stat_type: str) -> list[tuple]:
+		'''Returns [(season, average)] of every season with games, oldest season first like per_year_convert()'''
+		years, codes, counts = numpy.unique(self.season, return_inverse=True, return_counts=True)
+		sums = numpy.bincount(codes, self.values(stat_type), minlength=len(years))
+
+		return [(API.season_string(int(year)), round(float(total / count), 1)) for year, total, count in zip(years, sums, counts)]
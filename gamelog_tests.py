@@ -0,0 +1,142 @@
+# Test GameLog class to ensure the vectorized splits match filtering the game log rows by hand
+from api import API, CURRENT_SEASON, HIT_RATE_WINDOWS
+from dashboard import Dashboard, hit_rate_percentages
+from gamelog import GameLog, ALL_GAMES, RANGE_PRESETS
+from sample_data import load_sample_player, GAMELOG_HEADERS, sample_seasons
+from collections import Counter
+from datetime import datetime
+import numpy
+import unittest
+
+
+class GameLogTests(unittest.TestCase):
+	def setUp(self):
+		self.seasons = sample_seasons()
+		self.career = [(year, self.seasons[year]) for year in sorted(self.seasons, reverse=True)]
+		self.gamelog = GameLog.from_seasons(self.career, GAMELOG_HEADERS)
+
+
+	def _rows(self, keep) -> list[tuple[int, list]]:
+		'''Returns (year, row) of every game of the career that keep(year, row, rest) accepts, newest first'''
+		games = []
+		for year, rows in self.career:
+			for x, row in enumerate(rows):
+				rest = 3
+				if x + 1 < len(rows):
+					days = (datetime.strptime(row[3], '%b %d, %Y') - datetime.strptime(rows[x + 1][3], '%b %d, %Y')).days
+					rest = min(days - 1, 3)
+				if keep(year, row, rest):
+					games.append((year, row))
+
+		return games
+
+
+	def _hit_rates(self, games: list[tuple[int, list]], line: int) -> list[tuple]:
+		'''Hit rates of the given games the slow way, with one counter per window'''
+		points = [(year, API.game_stat(row, GAMELOG_HEADERS, 'Points')) for year, row in games]
+		windows = [points[:5], points[:10], [game for game in points if game[0] == CURRENT_SEASON], points]
+
+		return [hit_rate_percentages(Counter(value for year, value in window), line) for window in windows]
+
+
+	def test_columns_are_parsed_once_per_game(self):
+		self.assertEqual(len(self.gamelog), sum(len(rows) for rows in self.seasons.values()))
+		self.assertEqual(self.gamelog.season[0], CURRENT_SEASON)
+		self.assertEqual(self.gamelog.home[0], ' vs. ' in self.seasons[CURRENT_SEASON][0][4])
+		self.assertEqual(self.gamelog.rest[len(self.seasons[CURRENT_SEASON]) - 1], 3)
+
+
+	def test_home_away_split_matches_filtering_by_hand(self):
+		splits = self.gamelog.split_stats('Points', 'Home/Away', 20)
+
+		home = self._rows(lambda year, row, rest: ' vs. ' in row[4])
+		self.assertEqual(splits['Home']['hit_rates'], self._hit_rates(home, 20))
+		self.assertEqual(splits['Home']['games'][-1] + splits['Away']['games'][-1], len(self.gamelog))
+
+
+	def test_opponent_and_rest_splits_match_filtering_by_hand(self):
+		opponents = self.gamelog.split_stats('Points', 'Opponent', 18)
+		boston = self._rows(lambda year, row, rest: row[4].endswith('BOS'))
+		self.assertEqual(opponents['vs. BOS']['hit_rates'], self._hit_rates(boston, 18))
+
+		back_to_backs = self.gamelog.split_stats('Points', 'Back-to-Back', 18)
+		rested = self._rows(lambda year, row, rest: rest == 0)
+		self.assertEqual(back_to_backs['Back-to-Back']['hit_rates'], self._hit_rates(rested, 18))
+		self.assertEqual(self.gamelog.split_stats('Points', 'Rest Days', 18)['0 Days Rest'], back_to_backs['Back-to-Back'])
+
+
+	def test_season_log_keeps_only_the_split_games_oldest_first(self):
+		season_log = self.gamelog.season_log('Points', 'Home/Away', 'Away')
+		away = [row for row in reversed(self.seasons[CURRENT_SEASON]) if ' @ ' in row[4]]
+
+		self.assertEqual(season_log, [(row[3].split(',')[0], row[24]) for row in away])
+
+
+	def test_date_and_season_ranges_are_slices_of_the_columns(self):
+		since = numpy.datetime64(datetime.strptime(self.seasons[CURRENT_SEASON - 1][9][3], '%b %d, %Y').date(), 'D')
+		games = self.gamelog.range_slice(('dates', since, None))
+		by_hand = self._rows(lambda year, row, rest: datetime.strptime(row[3], '%b %d, %Y').date() >= since)
+		self.assertEqual((games.start, games.stop), (0, len(by_hand)))
+
+		ranged = self.gamelog.select(games)
+		self.assertTrue(numpy.shares_memory(ranged.stats['PTS'], self.gamelog.stats['PTS']))
+		self.assertEqual(ranged.split_stats('Points', ALL_GAMES, 20)[ALL_GAMES]['hit_rates'], self._hit_rates(by_hand, 20))
+		self.assertEqual(ranged.game_log('Points')[0], (str(since), by_hand[-1][1][24]))
+
+		# ranges of seasons, ranges within a season, and ranges without games
+		last_two = self.gamelog.range_slice(('seasons', CURRENT_SEASON - 1, None))
+		self.assertEqual(last_two.stop - last_two.start, len(self.seasons[CURRENT_SEASON]) + len(self.seasons[CURRENT_SEASON - 1]))
+		self.assertEqual([year for year, average in self.gamelog.select(last_two).season_averages('Points')],
+						 [API.season_string(CURRENT_SEASON - 1), API.season_string(CURRENT_SEASON)])
+
+		inside = self.gamelog.select(self.gamelog.date_range(since, since + 3))
+		self.assertTrue(all(since <= date <= since + 3 for date in inside.date))
+		self.assertEqual(len(self.gamelog.select(self.gamelog.date_range('1990-01-01', '1990-12-31'))), 0)
+		self.assertEqual(len(self.gamelog.select(self.gamelog.season_range(CURRENT_SEASON, CURRENT_SEASON - 1))), 0)
+
+
+class DashboardSplitTests(unittest.TestCase):
+	def setUp(self):
+		self.api = API()
+		load_sample_player(self.api)
+		self.dashboard = Dashboard(self.api)
+		self.dashboard.build()
+
+
+	def test_all_games_is_the_unsplit_view(self):
+		self.assertEqual(self.dashboard.get_splits()[0], ALL_GAMES)
+		self.assertEqual(self.dashboard.get('Points', ALL_GAMES), self.dashboard.get('Points'))
+
+
+	def test_every_split_is_precomputed_for_every_stat(self):
+		for label in ['Home', 'Away', 'vs. BOS', 'Back-to-Back', '3+ Days Rest']:
+			self.assertIn(label, self.dashboard.get_splits())
+
+		view = self.dashboard.get('Rebounds', 'Home')
+		self.assertEqual(len(view['hit_rates']), len(HIT_RATE_WINDOWS))
+		self.assertEqual(view['split_games'][2], len(view['season_log']))
+
+
+	def test_unknown_split_falls_back_to_all_games(self):
+		self.assertEqual(self.dashboard.get('Points', 'vs. XYZ'), self.dashboard.get('Points'))
+
+
+	def test_range_views_only_count_the_games_in_the_range(self):
+		this_season = self.dashboard.get('Points', games=RANGE_PRESETS['This Season'])
+		self.assertEqual(this_season['hit_rates'][2], this_season['hit_rates'][3])
+		self.assertEqual(this_season['hit_rates'][2], self.dashboard.get('Points')['hit_rates'][2])
+		self.assertEqual([data for date, data in this_season['season_log']],
+						 [data for date, data in self.dashboard.get('Points')['season_log']])
+		self.assertEqual(this_season['year_by_year'], self.dashboard.get('Points')['year_by_year'][-1:])
+
+		# a split and a range together, and the trend lines of a range still look back before it
+		away = self.dashboard.get('Points', 'Away', RANGE_PRESETS['Last 2 Seasons'])
+		self.assertEqual(away['range_games'][3], len(away['season_log']))
+		self.assertEqual(len(self.dashboard.get_overlay('Points', 'EWMA', 5, 'Away', RANGE_PRESETS['Last 2 Seasons'])),
+						 len(away['season_log']))
+		self.assertEqual(self.dashboard.get_overlay('Points', 'EWMA', 5, games=RANGE_PRESETS['This Season']).tolist(),
+						 self.dashboard.get_overlay('Points', 'EWMA', 5)[-len(this_season['season_log']):].tolist())
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -1,26 +1,43 @@
 # Implements tkinter for user interface
 # Contains all the code pertaining to the front end of the application
 import tkinter
-from tkinter import ttk, messagebox
-from api import API, STATS
+from tkinter import ttk, messagebox, filedialog
+from api import API, STATS, HIT_RATE_WINDOWS, COMBINATIONS, LOAD_PLAN
+from planner import endpoint_views
+from correlation import BASE_STATS
+from series import minmax_indices, visible_range, OVERLAYS, OVERLAY_WINDOW
+from dashboard import Dashboard
+from gamelog import ALL_GAMES, RANGE_PRESETS, WHOLE_CAREER
+from snapshots import format_age
+from polling import GamelogPoller
+from profiling import ActionProfiler, profiled, PROFILE_DIRECTORY
+from screener import Screener, RESULT_COLUMNS, SCREENER_WINDOWS, filter_results, sort_results, export_csv
+from charts import (BLACK, WHITE, GRAPHGREEN, GRAPHRED, GRAPHGRAY, GRAPHBLUE, GRAPHPURPLE, GRAPHGOLD, overlay_label,
+					style_axes, year_by_year_series, draw_year_by_year, game_log_trend, game_log_series, draw_game_log,
+					hit_rate_categories, draw_hit_rates, draw_hit_bands, game_log_opponents, annotate_game_log,
+					opponent_hit_rates, draw_opponent_adjustment)
+from compare import Comparison, load_players, ALIGNMENTS, MIN_PLAYERS, MAX_PLAYERS
+from warmer import CacheWarmer, active_player_ids, format_progress
+from prefetch import Prefetcher, PREFETCH_TOP
+from opponents import OpponentContext, NO_OPPONENT
+from roster import TeamRoster, ROSTER_COLUMNS, ROSTER_WINDOW, team_names, find_team
+from redraw import RedrawScheduler
+from service import ServiceClient
 from datetime import datetime
+import threading
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib import dates as mdates
 import numpy
 
 
-# colors
+# colors (the chart colors are in charts.py)
 LIGHTPURPLE = '#d032db'
 TEAL = '#03fce8'
-BLACK = '#000000'
 LIGHTBLUE = 'lightblue'
-GRAPHGREEN = '#1eeb25'
-GRAPHRED = '#ff2424'
-GRAPHGRAY = '#8f8888'
-GRAPHBLUE = '#03fcfc'
-GRAPHPURPLE = '#c203fc'
-WHITE = '#ffffff'
-GRAPHGOLD = '#d17219'
+
+# line colors of compared players, in the order they were selected
+COMPARE_COLORS = [GRAPHGOLD, GRAPHBLUE, GRAPHPURPLE, GRAPHGREEN, GRAPHRED, WHITE]
 
 # fonts
 TEXT10 = ('Helvetica', 10, 'bold')
@@ -30,7 +47,7 @@ STAT12 = ('Helvetica', 12, 'bold')
 
 
 class Interface:
-	def __init__(self):
+	def __init__(self, profile: bool = False, profile_directory: str = PROFILE_DIRECTORY, service_url: str = None):
 		# create our basic tkinter window
 		self._window = tkinter.Tk()
 
@@ -40,19 +57,143 @@ class Interface:
 
 		self._window.configure(bg=BLACK)
 
-		# create API object for the interface
-		self._api = API()
+		# create API object for the interface; with a service url everything is downloaded through that shared
+		# query service (see service.py) instead of from nba_api
+		self._api = API(service=ServiceClient(service_url) if service_url is not None else None)
+		self._dashboard = None
+
+		# downloads the top search results in the background while the user picks one (see prefetch.py)
+		self._prefetcher = Prefetcher(self._new_api())
+		self._hovered = None
+
+		# game night polling of the selected player's current season game log
+		self._poller = GamelogPoller(lambda pid: self._api.fetch_stale(pid, ['playergamelog'])['playergamelog'])
+		self._live = tkinter.BooleanVar(value=False)
+		self._poll_generation = 0
+
+		self._screener_panel = None
+		self._correlation_panel = None
+		self._roster_panel = None
+
+		# players shown side by side on the year by year and game log charts instead of the selected player
+		self._comparison = None
+
+		# the range of games (see gamelog.RANGE_PRESETS) the year by year, game log, and hit rates are over
+		self._games = None
+
+		# downloads every active player into the snapshot cache in the background while on (see warmer.py)
+		self._warmer = None
+
+		# what every team allows, from the league's team game logs loaded once in the background (see opponents.py)
+		self._opponents = OpponentContext(self._new_api())
+		self._opponents_loading = False
+
+		# captures a profile of every action (see profiling.py) while on; F11 turns it on and off
+		self._profiler = ActionProfiler(profile_directory, enabled=profile)
 
 		# add everything to our window
 		self._add_frames()
 		self._add_elements()
 
+		# changes mark panels dirty, and each dirty panel is redrawn once when the window is next idle (see redraw.py)
+		self._redraw = RedrawScheduler(lambda flush: self._window.after_idle(self._run_redraw, flush))
+		self._register_panels()
+		self._window.bind('<Configure>', lambda event: self._redraw.schedule(), add='+')
+		self._window.bind('<Map>', lambda event: self._redraw.schedule(), add='+')
+
+		# F12 shows api diagnostics
+		self._window.bind('<F12>', self._show_diagnostics)
+		self._window.bind('<F11>', self._toggle_profiling)
+
 
 	def run(self) -> None:
 		'''Runs the program and allows user to see the interface'''
 		self._window.mainloop()
 
 
+	def _show_diagnostics(self, event) -> None:
+		'''Shows internal statistics about the api, like how often memoized queries are reused'''
+		diagnostics = self._api.get_diagnostics()
+		diagnostics['polling'] = self._poller.stats()
+		diagnostics['profiling'] = self._profiler.stats()
+		diagnostics['prefetch'] = self._prefetcher.stats()
+		diagnostics['redraw'] = self._redraw.stats()
+		if self._warmer is not None:
+			diagnostics['warmer'] = self._warmer.progress()
+
+		lines = []
+		for section, stats in diagnostics.items():
+			lines.append(f'[{section}]')
+			lines.extend(f'{name}: {value}' for name, value in stats.items())
+
+		tkinter.messagebox.showinfo(title='Diagnostics', message='\n'.join(lines))
+
+
+	def _toggle_profiling(self, event) -> None:
+		'''Turns capturing a profile of every action on or off'''
+		if self._profiler.is_enabled():
+			self._profiler.disable()
+			message = f'Profiling off; {len(self._profiler.get_captures())} actions captured'
+		else:
+			self._profiler.enable()
+			message = f'Profiling on; every action is written to {self._profiler.get_directory()}'
+
+		tkinter.messagebox.showinfo(title='Profiling', message=message)
+
+
+	def _profile_context(self) -> str:
+		'''Returns what the interface was showing when an action started, written with its profile'''
+		selection = [self._player_listbox.get(index) for index in self._player_listbox.curselection()]
+		return (f'pid={self._api.get_pid()}, selection={selection}, stat={self._stat_dropdown.get()}, '
+				f'split={self._split_dropdown.get()}, overlay={self._get_overlay()}, games={self._games}, '
+				f'comparing={self._comparison is not None}')
+
+
+	def _register_panels(self) -> None:
+		'''Registers how to redraw every panel, named after the views of planner.VIEW_DATA, with the widget it is drawn
+		into so it is skipped while it can't be seen'''
+		self._redraw.register('career stats', self._update_career_stats, self._bio_frame)
+		self._redraw.register('bio', self._update_bio_panels, self._bio_frame)
+		self._redraw.register('year by year', self._update_yby_plot, self._yby_canvas.get_tk_widget())
+		self._redraw.register('game log', self._redraw_game_log, self._gl_canvas.get_tk_widget())
+		self._redraw.register('hit rates', self._update_hit_rates, self._hit_canvas.get_tk_widget())
+		self._redraw.register('season log', self._update_season_log, self._season_log_panel)
+		self._redraw.register('last 5 log', self._update_5_log, self._game_log_panel)
+
+
+	@profiled('redraw')
+	def _run_redraw(self, flush) -> None:
+		'''Runs a pass of the redraw scheduler; profiled on its own since the actions only mark panels dirty'''
+		flush()
+
+
+	def _new_api(self) -> API:
+		'''Returns another api sharing the selected player's snapshot cache and query service'''
+		return API(self._api.get_snapshots(), self._api.get_service())
+
+
+	def _run_in_background(self, work, on_done) -> None:
+		'''Runs work() on a background thread, then calls on_done(result, error) back on the tkinter thread'''
+		outcome = {}
+
+		def _work():
+			try:
+				outcome['result'] = work()
+			except Exception as error:
+				outcome['error'] = error
+
+		thread = threading.Thread(target=_work, daemon=True)
+		thread.start()
+
+		def _poll():
+			if thread.is_alive():
+				self._window.after(50, _poll)
+			else:
+				on_done(outcome.get('result'), outcome.get('error'))
+
+		_poll()
+
+
 	def _add_frames(self) -> None:
 		'''Adds all the frames to the interface'''
 		self._create_title_frame()
@@ -106,9 +247,20 @@ class Interface:
 		self._create_select_player_button()
 		self._create_stat_label()
 		self._create_stat_dropdown()
+		self._create_split_dropdown()
+		self._create_overlay_controls()
+		self._create_live_toggle()
+		self._create_screener_button()
+		self._create_correlation_button()
+		self._create_compare_controls()
+		self._create_warmer_controls()
+		self._create_range_picker()
+		self._create_opponent_picker()
+		self._create_roster_button()
 
 		# elements in the bio frame
 		self._create_bio_title()
+		self._create_freshness_display()
 		self._create_career_stats_title()
 		self._create_career_stats_display()
 		self._create_age_display()
@@ -168,6 +320,10 @@ class Interface:
 
 		self._add_placeholders()
 
+		# a different search makes the last one's results not worth prefetching anymore
+		self._first_name.trace_add('write', lambda *args: self._prefetcher.cancel())
+		self._last_name.trace_add('write', lambda *args: self._prefetcher.cancel())
+
 
 	def _add_placeholders(self) -> None:
 		'''allow first and last name search bars to have placeholders'''
@@ -227,6 +383,7 @@ class Interface:
 		self._panel1.focus_set()
 
 
+	@profiled('search')
 	def _display_matching_players(self) -> None:
 		'''When search player button clicked, displays all matching players on side'''
 		firstname = self._first_name.get()
@@ -241,14 +398,32 @@ class Interface:
 		self._player_listbox.delete(0, tkinter.END)
 		self._player_listbox.insert(0, *players)
 
+		self._hovered = None
+		self._prefetcher.set_results([API.get_player_id(player) for player in players[:PREFETCH_TOP]])
+
 
 	def _create_available_players(self) -> None:
 		'''Adds players to a listbox with available players that can grab stats from'''
-		self._player_listbox = tkinter.Listbox(self._search_frame, height=5, selectmode=tkinter.SINGLE, width=38,
+		self._player_listbox = tkinter.Listbox(self._search_frame, height=5, selectmode=tkinter.EXTENDED, width=38,
 											   font=TEXT10, bg=BLACK, fg=LIGHTBLUE, selectbackground=TEAL,
 											   selectforeground=BLACK, highlightcolor=LIGHTBLUE)
 		self._player_listbox.grid(row=4, column=0, columnspan=2, pady=(0, 10))
 
+		# the user is about to pick one of the results, so start downloading them
+		self._player_listbox.bind('<FocusIn>', lambda event: self._prefetcher.start())
+		self._player_listbox.bind('<Enter>', lambda event: self._prefetcher.start())
+		self._player_listbox.bind('<Motion>', self._prefetch_hovered)
+
+
+	def _prefetch_hovered(self, event) -> None:
+		'''Prefetches the player under the mouse ahead of the other results'''
+		index = self._player_listbox.nearest(event.y)
+		if index < 0 or index == self._hovered:
+			return
+
+		self._hovered = index
+		self._prefetcher.start(first=API.get_player_id(self._player_listbox.get(index)))
+
 
 	def _create_stat_label(self) -> None:
 		'''Just a title for the stat dropdown'''
@@ -267,13 +442,409 @@ class Interface:
 		self._stat_dropdown = ttk.Combobox(self._search_frame, values=STATS, state='readonly', height=4)
 		self._stat_dropdown.set('Points')
 		self._stat_dropdown.bind('<<ComboboxSelected>>', self._dropdown_callback)
-		self._stat_dropdown.grid(row=7, column=0, columnspan=2, pady=(0, 70))
+		self._stat_dropdown.grid(row=7, column=0, columnspan=2, pady=(0, 10))
 
 
-	def _dropdown_callback(self, event) -> None:
+	def _create_split_dropdown(self) -> None:
+		'''Creates a dropdown that only shows games of a situation (home/away, opponent, rest) in the game log and
+		hit rates; the options fill in once the selected player's dashboard is built'''
+		self._split_dropdown = ttk.Combobox(self._search_frame, values=[ALL_GAMES], state='readonly', height=10)
+		self._split_dropdown.set(ALL_GAMES)
+		self._split_dropdown.bind('<<ComboboxSelected>>', self._split_callback)
+		self._split_dropdown.grid(row=8, column=0, columnspan=2, pady=(0, 10))
+
+
+	def _create_overlay_controls(self) -> None:
+		'''Creates the dropdown of the trend line drawn over the year by year and game log charts, and how many
+		games (seasons on the year by year chart) it looks back over'''
+		self._overlay_dropdown = ttk.Combobox(self._search_frame, values=OVERLAYS, state='readonly', width=15)
+		self._overlay_dropdown.set(OVERLAYS[0])
+		self._overlay_dropdown.bind('<<ComboboxSelected>>', self._overlay_callback)
+		self._overlay_dropdown.grid(row=9, column=0, sticky=tkinter.W, pady=(0, 20))
+
+		self._overlay_window = tkinter.Spinbox(self._search_frame, from_=2, to=30, width=5, font=TEXT10,
+											   command=lambda: self._overlay_callback(None))
+		self._overlay_window.delete(0, tkinter.END)
+		self._overlay_window.insert(0, str(OVERLAY_WINDOW))
+		self._overlay_window.bind('<Return>', self._overlay_callback)
+		self._overlay_window.grid(row=9, column=1, sticky=tkinter.E, pady=(0, 20))
+
+
+	@profiled('overlay change')
+	def _overlay_callback(self, event) -> None:
+		'''Redraws the trend lines; overlays are cached by the dashboard, so this never goes back over the games'''
+		if self._has_dashboard():
+			self._redraw.mark('year by year', 'game log')
+
+
+	def _get_overlay(self) -> tuple[str, int]:
+		'''Returns the selected (overlay, window)'''
+		try:
+			window = max(int(self._overlay_window.get()), 1)
+		except ValueError:
+			window = OVERLAY_WINDOW
+
+		return (self._overlay_dropdown.get(), window)
+
+
+	def _overlay_label(self, scope: str, unit: str) -> str:
+		'''Returns the legend label of the selected overlay, e.g. 5 Game EWMA or Career Average'''
+		kind, window = self._get_overlay()
+		return overlay_label(kind, window, scope, unit)
+
+
+	@profiled('split change')
+	def _split_callback(self, event) -> None:
+		'''Redraws just the game log and hit rates; the split views are already precomputed'''
+		if self._has_dashboard():
+			self._redraw.mark('game log', 'hit rates')
+
+
+	def _update_split_options(self) -> None:
+		'''Fills the split dropdown with the selected player's splits, keeping the current split if they have it'''
+		splits = self._dashboard.get_splits()
+		self._split_dropdown.configure(values=splits)
+		if self._split_dropdown.get() not in splits:
+			self._split_dropdown.set(ALL_GAMES)
+
+
+	def _create_live_toggle(self) -> None:
+		'''Creates the checkbox that turns on game night polling of the selected player's game log'''
+		self._live_toggle = tkinter.Checkbutton(self._search_frame, text='Live Game Night Updates', variable=self._live,
+												command=self._live_changed, bg=BLACK, fg=LIGHTBLUE, font=TEXT10,
+												selectcolor=BLACK, activebackground=BLACK, activeforeground=TEAL)
+		self._live_toggle.grid(row=10, column=0, columnspan=2, pady=(0, 30))
+
+
+	def _create_screener_button(self) -> None:
+		'''Creates the button that opens the league wide prop screener'''
+		self._screener_button = tkinter.Button(self._search_frame, text='League Screener', command=self._open_screener,
+											   width=15, bg=LIGHTBLUE, fg=BLACK, font=TEXT10, activebackground=TEAL,
+											   activeforeground=BLACK)
+		self._screener_button.grid(row=11, column=0, sticky=tkinter.W, pady=(0, 20))
+
+
+	def _create_correlation_button(self) -> None:
+		'''Creates the button that opens the heatmap of how the selected player's stats move together'''
+		self._correlation_button = tkinter.Button(self._search_frame, text='Correlations', command=self._open_correlations,
+												  width=15, bg=LIGHTBLUE, fg=BLACK, font=TEXT10, activebackground=TEAL,
+												  activeforeground=BLACK)
+		self._correlation_button.grid(row=11, column=1, sticky=tkinter.E, pady=(0, 20))
+
+
+	def _create_roster_button(self) -> None:
+		'''Creates the button that opens the team roster dashboard, on the selected player's team if they have one'''
+		self._roster_button = tkinter.Button(self._search_frame, text='Team Roster', command=self._open_roster,
+											 width=15, bg=LIGHTBLUE, fg=BLACK, font=TEXT10, activebackground=TEAL,
+											 activeforeground=BLACK)
+		self._roster_button.grid(row=17, column=0, sticky=tkinter.W, pady=(0, 20))
+
+
+	def _create_compare_controls(self) -> None:
+		'''Creates the button that compares the players selected in the search results, and the dropdown of what
+		their year by year averages are lined up by'''
+		self._compare_button = tkinter.Button(self._search_frame, text='Compare Selected', command=self._compare_players,
+											  width=15, bg=LIGHTBLUE, fg=BLACK, font=TEXT10, activebackground=TEAL,
+											  activeforeground=BLACK)
+		self._compare_button.grid(row=12, column=0, sticky=tkinter.W, pady=(0, 20))
+
+		self._alignment_dropdown = ttk.Combobox(self._search_frame, values=ALIGNMENTS, state='readonly', width=15)
+		self._alignment_dropdown.set(ALIGNMENTS[0])
+		self._alignment_dropdown.bind('<<ComboboxSelected>>', self._alignment_callback)
+		self._alignment_dropdown.grid(row=12, column=1, sticky=tkinter.E, pady=(0, 20))
+
+
+	def _create_warmer_controls(self) -> None:
+		'''Creates the button that warms the cache of the whole active league in the background, and its progress'''
+		self._warmer_button = tkinter.Button(self._search_frame, text='Warm Cache', command=self._toggle_warmer,
+											 width=15, bg=LIGHTBLUE, fg=BLACK, font=TEXT10, activebackground=TEAL,
+											 activeforeground=BLACK)
+		self._warmer_button.grid(row=13, column=0, sticky=tkinter.W, pady=(0, 20))
+
+		self._warmer_status = tkinter.StringVar()
+		self._warmer_status.set('')
+		self._warmer_status_label = tkinter.Label(self._search_frame, textvariable=self._warmer_status, bg=BLACK,
+												  fg=GRAPHGRAY, font=TEXT10)
+		self._warmer_status_label.grid(row=13, column=1, sticky=tkinter.E, pady=(0, 20))
+
+
+	def _toggle_warmer(self) -> None:
+		'''Starts warming the cache of every active player, picking up where the last run stopped, or stops it'''
+		if self._warmer is not None and not self._warmer.is_stopped():
+			self._warmer.stop()
+			self._warmer_button.configure(state=tkinter.DISABLED)
+			return
+
+		# shares the snapshots with the selected player, so whoever is warmed opens instantly
+		self._warmer = CacheWarmer(self._new_api())
+		self._warmer.add_players(active_player_ids())
+		self._warmer_button.configure(text='Stop Warming')
+
+		warmer = self._warmer
+		self._run_in_background(warmer.run, lambda progress, error: self._warmer_done(warmer, progress, error))
+		self._update_warmer_status(warmer)
+
+
+	def _update_warmer_status(self, warmer: CacheWarmer) -> None:
+		'''Shows the warmer's progress every second while it runs'''
+		if warmer is not self._warmer or warmer.is_stopped():
+			return
+
+		self._warmer_status.set(format_progress(warmer.progress()))
+		self._window.after(1000, lambda: self._update_warmer_status(warmer))
+
+
+	def _warmer_done(self, warmer: CacheWarmer, progress: dict, error: Exception) -> None:
+		'''Shows how the warmer finished'''
+		warmer.stop()
+		self._warmer_button.configure(text='Warm Cache', state=tkinter.NORMAL)
+		if error is not None:
+			self._warmer_status.set(f'Warming failed: {error}')
+		elif progress['pending'] > 0:
+			self._warmer_status.set(f"Stopped, {progress['pending']} jobs left")
+		else:
+			self._warmer_status.set(f"Warmed: {format_progress(progress)}")
+
+
+	def _create_range_picker(self) -> None:
+		'''Creates the dropdown of ranges of games (e.g. Last 2 Seasons) and the From/To dates of a custom range,
+		e.g. since the trade deadline; the year by year, game log, and hit rates only count the games in it'''
+		self._range_dropdown = ttk.Combobox(self._search_frame, values=list(RANGE_PRESETS), state='readonly', width=15)
+		self._range_dropdown.set(WHOLE_CAREER)
+		self._range_dropdown.bind('<<ComboboxSelected>>', self._range_preset_callback)
+		self._range_dropdown.grid(row=14, column=0, sticky=tkinter.W, pady=(0, 10))
+
+		self._range_button = tkinter.Button(self._search_frame, text='Apply Dates', command=self._apply_date_range,
+											width=15, bg=LIGHTBLUE, fg=BLACK, font=TEXT10, activebackground=TEAL,
+											activeforeground=BLACK)
+		self._range_button.grid(row=14, column=1, sticky=tkinter.E, pady=(0, 10))
+
+		self._range_from = tkinter.Entry(self._search_frame, width=12, font=TEXT10, bg=BLACK, fg=LIGHTBLUE,
+										 insertbackground=TEAL)
+		self._range_from.grid(row=15, column=0, sticky=tkinter.W, pady=(0, 20))
+		self._range_to = tkinter.Entry(self._search_frame, width=12, font=TEXT10, bg=BLACK, fg=LIGHTBLUE,
+									   insertbackground=TEAL)
+		self._range_to.grid(row=15, column=1, sticky=tkinter.E, pady=(0, 20))
+
+
+	def _create_opponent_picker(self) -> None:
+		'''Creates the dropdown of the upcoming opponent, whose defense the hit rates are adjusted for'''
+		self._opponent_dropdown = ttk.Combobox(self._search_frame, values=[NO_OPPONENT], state='readonly', width=15)
+		self._opponent_dropdown.set(NO_OPPONENT)
+		self._opponent_dropdown.bind('<<ComboboxSelected>>', self._opponent_callback)
+		self._opponent_dropdown.grid(row=16, column=0, sticky=tkinter.W, pady=(0, 20))
+
+		self._opponent_status = tkinter.StringVar(value='Opponents not loaded')
+		self._opponent_status_label = tkinter.Label(self._search_frame, textvariable=self._opponent_status, bg=BLACK,
+													fg=LIGHTBLUE, font=TEXT10)
+		self._opponent_status_label.grid(row=16, column=1, sticky=tkinter.E, pady=(0, 20))
+
+
+	def _load_opponents(self) -> None:
+		'''Loads the league's team game logs in the background the first time a player is selected'''
+		if self._opponents.is_loaded() or self._opponents_loading:
+			return
+
+		self._opponents_loading = True
+		self._opponent_status.set('Loading opponents...')
+		self._run_in_background(self._opponents.load, self._opponents_loaded)
+
+
+	def _opponents_loaded(self, result, error: Exception) -> None:
+		'''Fills in the upcoming opponent dropdown and annotates the charts once the team game logs are in'''
+		self._opponents_loading = False
+		if error is not None:
+			self._opponent_status.set('Unable to grab opponents')
+			return
+
+		self._opponent_dropdown['values'] = [NO_OPPONENT] + self._opponents.teams()
+		self._update_opponent_status()
+		if self._has_dashboard():
+			self._redraw.mark('game log', 'hit rates')
+
+
+	def _opponent_callback(self, event) -> None:
+		self._update_opponent_status()
+		if self._has_dashboard() and not self._redraw.is_dirty('hit rates'):
+			self._draw_opponent_adjustment()
+			self._hit_canvas.draw_idle()
+
+
+	def _update_opponent_status(self) -> None:
+		'''Shows what the upcoming opponent has allowed of the stat, and its pace, over its last games'''
+		team = self._opponent_dropdown.get()
+		latest = self._opponents.latest(team) if team != NO_OPPONENT else None
+		if latest is None:
+			self._opponent_status.set(f'{len(self._opponents.teams())} teams loaded')
+			return
+
+		stat_type = self._stat_dropdown.get()
+		allowed = sum(latest[column] for column in API.stat_columns(stat_type))
+		self._opponent_status.set(f"Allows {allowed:.1f} ({self._opponents.factor(team, stat_type):.2f}x), "
+								  f"pace {latest['pace']:.1f}")
+
+
+	def _range_preset_callback(self, event) -> None:
+		'''Switches to one of RANGE_PRESETS, clearing the custom dates'''
+		self._range_from.delete(0, tkinter.END)
+		self._range_to.delete(0, tkinter.END)
+		self._set_range(RANGE_PRESETS[self._range_dropdown.get()])
+
+
+	def _apply_date_range(self) -> None:
+		'''Switches to the games from the From date through the To date (YYYY-MM-DD, either can be left empty)'''
+		try:
+			first, last = (numpy.datetime64(entry.get().strip(), 'D') if entry.get().strip() != '' else None
+						   for entry in [self._range_from, self._range_to])
+		except ValueError:
+			tkinter.messagebox.showerror(title='ERROR', message='Dates must look like 2024-02-08.')
+			return
+
+		self._range_dropdown.set('Custom' if first is not None or last is not None else WHOLE_CAREER)
+		self._set_range(('dates', first, last) if first is not None or last is not None else None)
+
+
+	@profiled('range change')
+	def _set_range(self, games: tuple | None) -> None:
+		'''Redraws the views that depend on the range of games; the dashboard slices its columnar game log, so this
+		never goes back over the career'''
+		self._games = games
+		if self._has_dashboard():
+			self._redraw.mark('year by year', 'season log', 'game log', 'hit rates')
+
+
+	def _alignment_callback(self, event) -> None:
+		if self._comparison is not None:
+			self._redraw.mark('year by year')
+
+
+	@profiled('compare players')
+	def _compare_players(self) -> None:
+		'''Loads every player selected in the search results at the same time, then draws them side by side'''
+		players = [self._player_listbox.get(index) for index in self._player_listbox.curselection()]
+		if not MIN_PLAYERS <= len(players) <= MAX_PLAYERS:
+			errormessage = f'Select between {MIN_PLAYERS} and {MAX_PLAYERS} players to compare.'
+			tkinter.messagebox.showerror(title='ERROR', message=errormessage)
+			return
+
+		# every compared player gets their own api, sharing the snapshots on disk with the selected player's
+		pids = [API.get_player_id(player) for player in players]
+		self._compare_button.configure(state=tkinter.DISABLED)
+		self._run_in_background(lambda: Comparison(load_players(pids, self._new_api)),
+								self._show_comparison)
+
+
+	def _show_comparison(self, comparison: Comparison, error: Exception) -> None:
+		'''Switches the year by year and game log charts over to the compared players'''
+		self._compare_button.configure(state=tkinter.NORMAL)
+		if error is not None:
+			tkinter.messagebox.showerror(title='ERROR', message=f'Unable to compare players: {error}')
+			return
+
+		self._comparison = comparison
+		self._redraw.mark('year by year', 'game log')
+
+
+	def _open_correlations(self) -> None:
+		'''Opens the correlation heatmap window, or brings it back up if it's already open'''
+		if self._correlation_panel is not None and self._correlation_panel.is_open():
+			self._correlation_panel.lift()
+			return
+
+		self._correlation_panel = CorrelationPanel(self._window, lambda: self._dashboard if self._has_dashboard() else None,
+												   self._stat_dropdown.get)
+
+
+	def _open_screener(self) -> None:
+		'''Opens the league screener window, or brings it back up if it's already open'''
+		if self._screener_panel is not None and self._screener_panel.is_open():
+			self._screener_panel.lift()
+			return
+
+		self._screener_panel = ScreenerPanel(self._window, self._api, self._run_in_background, self._select_player_by_id)
+
+
+	def _open_roster(self) -> None:
+		'''Opens the team roster window, or brings it back up if it's already open'''
+		if self._roster_panel is not None and self._roster_panel.is_open():
+			self._roster_panel.lift()
+			return
+
+		team = None
+		if self._api.has_bio():
+			team = find_team(self._api.get_bio_info('TEAM_CITY'), self._api.get_bio_info('TEAM_NAME'))
+
+		self._roster_panel = RosterPanel(self._window, self._new_api(), self._run_in_background, self._select_player_by_id,
+										 self._stat_dropdown.get(), team)
+
+
+	def _live_changed(self) -> None:
+		'''Starts or stops polling when the live checkbox is toggled'''
+		# anything still scheduled from before the toggle belongs to an old generation and stops itself
+		self._poll_generation += 1
+
+		if self._live.get():
+			self._watch_selected_player()
+			self._poll_tick(self._poll_generation)
+		else:
+			for pid in self._poller.watched():
+				self._poller.unwatch(pid)
+
+
+	def _watch_selected_player(self) -> None:
+		'''Makes the poller watch only the selected player'''
+		for pid in self._poller.watched():
+			if pid != self._api.get_pid():
+				self._poller.unwatch(pid)
+
 		if self._api.has_selected_player():
+			self._poller.watch(self._api.get_pid(), self._api.get_gamelog())
+
+
+	def _poll_tick(self, generation: int) -> None:
+		'''Polls whoever is due in the background, then schedules the next check'''
+		if generation != self._poll_generation:
+			return
+
+		self._run_in_background(self._poller.poll,
+								lambda updates, error: self._apply_poll(generation, updates, error))
+
+
+	def _apply_poll(self, generation: int, updates: dict, error: Exception) -> None:
+		'''Merges polled game logs into the selected player and only redraws what changed'''
+		if generation != self._poll_generation:
+			return
+
+		for pid, (gamelog, fetched_at, added, changed) in (updates or {}).items():
+			if not self._api.merge_gamelog(pid, gamelog, fetched_at):
+				continue
+
+			self._update_freshness()
+
+			# recompute from the career already in memory when possible, otherwise rebuild everything
+			if not self._has_dashboard() or not self._dashboard.update_gamelog(self._api.get_gamelog()):
+				self._draw_dashboard_when_ready(self._start_dashboard(), ['game log', 'hit rates'])
+				continue
+
+			if len(added) > 0:
+				self._redraw.mark('game log')
+			else:
+				self._patch_game_log()
+			self._patch_hit_rates()
+
+		self._window.after(int(self._poller.next_check_in() * 1000) + 100, self._poll_tick, generation)
+
+
+	@profiled('stat change')
+	def _dropdown_callback(self, event) -> None:
+		if self._opponents.is_loaded():
+			self._update_opponent_status()
+
+		if self._has_dashboard():
 			self._update_plots()
 			self._update_panel2()
+		elif self._comparison is not None:
+			self._redraw.mark('year by year', 'game log')
 
 
 	def _create_select_player_button(self) -> None:
@@ -284,39 +855,164 @@ class Interface:
 		self._player_select_button.grid(row=5, column=0, columnspan=2, pady=(0, 20))
 
 
+	@profiled('select player')
 	def _select_player(self) -> None:
 		''' Run when a player is selected; updates career stats and displays new info'''
 		selection = self._player_listbox.curselection()
-		if len(selection) > 0:
+		if len(selection) == 1:
 			player = self._player_listbox.get(selection[0])
-			player_id = API.get_player_id(player)
+			self._select_player_by_id(API.get_player_id(player), player)
+		elif len(selection) > 1:
+			# the search results allow several rows for Compare Selected; picking one of them silently would surprise
+			errormessage = 'Select a single player, or use Compare Selected to see several side by side.'
+			tkinter.messagebox.showerror(title='ERROR', message=errormessage)
+		else:
+			errormessage = 'A player must be selected.'
+			tkinter.messagebox.showerror(title='ERROR', message=errormessage)
+			return
 
-			# leave if same player is selected because we don't need to do anything
-			if player_id == self._api.get_pid():
-				return
 
-			if not self._api.get_player_info_by_id(player_id):
-				errormessage = f'Unable to grab {player}\'s data'
-				tkinter.messagebox.showerror(title='ERROR', message=errormessage)
-				return
+	def _select_player_by_id(self, player_id: int, player: str) -> None:
+		'''Selects a player by id, e.g. from the search results or the league screener'''
+		# selecting a player always leaves the comparison
+		comparing = self._comparison is not None
+		self._comparison = None
+
+		# leave if same player is selected because we don't need to do anything
+		if player_id == self._api.get_pid():
+			if comparing:
+				self._redraw.mark('year by year', 'game log')
+			return
 
-			self._update_bio_info()
+		# show whatever was cached last time right away, then make sure it's still current
+		if self._api.load_cached_player(player_id):
+			self._show_selected_player()
+			self._revalidate(player_id)
+		elif self._api.get_player_info_by_id(player_id):
+			self._show_selected_player()
 		else:
-			errormessage = 'A player must be selected.'
+			errormessage = f'Unable to grab {player}\'s data'
 			tkinter.messagebox.showerror(title='ERROR', message=errormessage)
+
+
+	def _show_selected_player(self) -> None:
+		'''Starts building the selected player's dashboard and displays everything that doesn't need it'''
+		self._start_dashboard()
+
+		self._update_bio_info()
+		self._update_freshness()
+
+		if self._live.get():
+			self._watch_selected_player()
+
+		self._load_opponents()
+
+
+	def _start_dashboard(self) -> Dashboard:
+		'''Cancels the build of the dashboard being replaced, then starts building the selected player's; returns it'''
+		if self._dashboard is not None:
+			self._dashboard.cancel()
+
+		self._dashboard = Dashboard(self._api)
+		self._dashboard.build_async(self._profiler.background)
+		return self._dashboard
+
+
+	def _revalidate(self, pid: int) -> None:
+		'''Grabs fresh data in the background for whatever of the selected player is stale'''
+		endpoints = self._api.stale_endpoints()
+		if len(endpoints) == 0:
 			return
 
+		self._update_freshness(refreshing=True)
+		self._run_in_background(lambda: self._api.fetch_stale(pid, endpoints),
+								lambda fresh, error: self._apply_revalidation(pid, fresh, error))
+
+
+	def _apply_revalidation(self, pid: int, fresh: dict, error: Exception) -> None:
+		'''Swaps in the revalidated data and only redraws the labels and charts that changed'''
+		# the user moved on to another player while we were refreshing
+		if pid != self._api.get_pid():
+			return
+
+		if error is not None:
+			self._update_freshness()
+			return
+
+		changed = self._api.apply_refresh(pid, fresh)
+		self._update_freshness()
+
+		# the views built from the endpoints that changed (see planner.py) are the panels to redraw; the ones that
+		# read from the dashboard wait for it to be rebuilt
+		views = endpoint_views(LOAD_PLAN, changed)
+		self._redraw.mark(*[view for view in views if view in ('bio', 'career stats')])
+
+		redraw = [view for view in views if view not in ('bio', 'career stats')]
+		if len(redraw) > 0:
+			self._draw_dashboard_when_ready(self._start_dashboard(), redraw)
+
 
 	def _update_bio_info(self) -> None:
 		'''Basically updates all bio information whenever a new player is selected'''
-		self._update_career_stats()
+		self._redraw.mark('career stats', 'bio')
+
+		self._draw_dashboard_when_ready(self._dashboard)
+
+
+	def _update_bio_panels(self) -> None:
+		'''Updates the age, team, and miscellaneous bio displays'''
 		self._update_age()
 		self._update_team()
 		self._update_misc()
 
-		self._update_plots()
 
-		self._update_panel2()
+	def _has_dashboard(self) -> bool:
+		'''Returns whether or not the selected player's dashboard is built and usable'''
+		return self._dashboard is not None and self._dashboard.is_ready() and not self._dashboard.has_failed()
+
+
+	def _draw_dashboard_when_ready(self, dashboard: Dashboard, redraw: list[str] = None) -> None:
+		'''Waits on the background dashboard build, then marks the given panels dirty (all of them by default)'''
+		# a newer player was selected, so this dashboard is no longer needed
+		if dashboard is not self._dashboard:
+			return
+
+		if not dashboard.is_ready():
+			self._window.after(50, self._draw_dashboard_when_ready, dashboard, redraw)
+			return
+
+		if dashboard.has_failed():
+			tkinter.messagebox.showerror(title='ERROR', message='Unable to grab the player\'s game logs')
+			return
+
+		if redraw is None:
+			self._update_split_options()
+			self._update_plots()
+			self._update_panel2()
+		else:
+			self._redraw.mark(*redraw)
+
+		if redraw is None or 'hit rates' in redraw:
+			self._draw_hit_rates_as_loaded(dashboard, dashboard.get_progress()[0])
+
+
+	def _draw_hit_rates_as_loaded(self, dashboard: Dashboard, seasons_drawn: int) -> None:
+		'''Redraws the hit rates, and refills the split dropdown, every time another season of the career streams in'''
+		if dashboard is not self._dashboard:
+			return
+
+		# completion is read before progress, so a stream that finishes in between is still drawn with every season
+		complete = dashboard.is_complete()
+		seasons_loaded = dashboard.get_progress()[0]
+		if seasons_loaded != seasons_drawn or complete:
+			# older seasons bring opponents the player hasn't faced this season
+			self._update_split_options()
+			self._redraw.mark('hit rates')
+
+		if not complete:
+			self._window.after(100, self._draw_hit_rates_as_loaded, dashboard, seasons_loaded)
+		elif dashboard.stream_failed():
+			tkinter.messagebox.showerror(title='ERROR', message='Unable to grab the player\'s whole career')
 
 
 	def _create_bio_title(self) -> None:
@@ -328,6 +1024,31 @@ class Interface:
 		self._bio_title.grid(row=0, column=0)
 
 
+	def _create_freshness_display(self) -> None:
+		'''Creates the label that says how old the displayed data is'''
+		self._freshness = tkinter.StringVar()
+		self._freshness.set('')
+		self._freshness_display = tkinter.Label(self._bio_title_panel, textvariable=self._freshness, bg=BLACK,
+												font=TEXT10, fg=GRAPHGRAY)
+		self._freshness_display.grid(row=1, column=0)
+
+
+	def _update_freshness(self, refreshing: bool = False) -> None:
+		'''Update the freshness label, flagging data that is older than its refresh policy allows'''
+		age = self._api.get_data_age()
+		if age is None:
+			self._freshness.set('')
+		elif refreshing:
+			self._freshness.set(f'Cached {format_age(age)} ago, refreshing...')
+			self._freshness_display.configure(fg=GRAPHGOLD)
+		elif len(self._api.stale_endpoints()) > 0:
+			self._freshness.set(f'Stale: cached {format_age(age)} ago')
+			self._freshness_display.configure(fg=GRAPHGOLD)
+		else:
+			self._freshness.set('Up to date')
+			self._freshness_display.configure(fg=GRAPHGRAY)
+
+
 	def _create_career_stats_title(self) -> None:
 		'''Basically create a title for the career stats of a player'''
 		self._career_stats_title_panel = tkinter.LabelFrame(self._bio_frame, bg=BLACK, bd=0)
@@ -545,9 +1266,7 @@ class Interface:
 
 	def _update_plots(self) -> None:
 		'''Update plots when stat specified changes'''
-		self._update_yby_plot()
-		self._update_game_log()
-		self._update_hit_rates()
+		self._redraw.mark('year by year', 'game log', 'hit rates')
 
 
 	def _create_yby_plot(self) -> None:
@@ -591,36 +1310,45 @@ class Interface:
 		self._yby_fig.subplots_adjust(bottom=0.2)
 
 		self._yby_plot = self._yby_fig.add_subplot(111)
-		self._yby_plot.set_facecolor(BLACK)
-		self._yby_plot.set_xlabel('Season', color=WHITE)
-		self._yby_plot.set_ylabel(self._stat_dropdown.get(), color=WHITE)
-		self._yby_plot.tick_params(axis='x', labelrotation=45)
-		self._yby_plot.tick_params(color=WHITE, labelcolor=WHITE)
-		self._yby_plot.spines['bottom'].set_color(WHITE)
-		self._yby_plot.spines['left'].set_color(WHITE)
+		style_axes(self._yby_plot, 'Season', self._stat_dropdown.get())
 
-		if not self._api.has_selected_player():
+		if self._comparison is not None:
+			self._draw_compared_yby()
+			return
+
+		if not self._has_dashboard():
 			self._yby_years = ['2015-17', '2017-17', '2017-18', '2018-19', '2019-20',
 						   '2020-21', '2021-22', '2022-23', '2023-24', '2024-25']
 			self._yby_data = [0] * 10
 			self._yby_career_avg = [0] * 10
 			self._yby_plot.set_ylim((0, 30))
 		else:
-			self._yby_years = []
-			self._yby_data = []
-			self._yby_career_avg = []
+			kind, window = self._get_overlay()
+			self._yby_years, self._yby_data, self._yby_career_avg = year_by_year_series(self._dashboard,
+																					 self._stat_dropdown.get(), kind, window,
+																					 self._games)
 
-			for year, data in self._api.per_year_convert(self._stat_dropdown.get()):
-				self._yby_years.append(year)
-				self._yby_data.append(data)
+		draw_year_by_year(self._yby_plot, self._yby_years, self._yby_data, self._yby_career_avg,
+						  self._overlay_label('Career', 'Season'))
 
-			career_avg = self._api.career_convert(self._stat_dropdown.get())
-			self._yby_career_avg = [career_avg] * len(self._yby_years)
 
-		self._yby_plot.plot(self._yby_years, self._yby_data, label = 'Per Year', marker='o', color=GRAPHGOLD)
-		self._yby_plot.plot(self._yby_years, self._yby_career_avg, label='Career Average', color=WHITE, linestyle='--')
-		self._yby_plot.legend(facecolor=BLACK, labelcolor=WHITE)
+		self._yby_canvas.draw()
+
 
+	def _draw_compared_yby(self) -> None:
+		'''Draws a line of year by year averages per compared player, lined up by the selected alignment'''
+		alignment = self._alignment_dropdown.get()
+		keys, matrix = self._comparison.year_by_year(self._stat_dropdown.get(), alignment)
+
+		# seasons a player didn't play are nan, which leaves a gap in their line
+		x = list(range(len(keys)))
+		for name, averages, color in zip(self._comparison.names(), matrix, COMPARE_COLORS):
+			self._yby_plot.plot(x, averages, label=name, marker='o', color=color)
+
+		self._yby_plot.set_xticks(x, [str(key) for key in keys])
+		self._yby_plot.set_xlabel(alignment, color=WHITE)
+		self._yby_plot.set_ylim(bottom=0)
+		self._yby_plot.legend(facecolor=BLACK, labelcolor=WHITE)
 
 		self._yby_canvas.draw()
 
@@ -637,6 +1365,11 @@ class Interface:
 		self._gl_dates = ['Aug 23', 'Aug 25', 'Aug 26', 'Aug 29', 'Aug 31']
 		self._gl_data = [0] * 5
 		self._gl_avg = [0] * 5
+		self._gl_max_games = None
+		self._gl_career = False
+		self._gl_show_career = False
+		self._gl_pan = None
+		self._gl_labels = []
 
 		self._gl_plot = self._gl_fig.add_subplot(111)
 		self._gl_plot.set_facecolor(BLACK)
@@ -648,56 +1381,122 @@ class Interface:
 		self._gl_plot.spines['bottom'].set_color(WHITE)
 		self._gl_plot.spines['left'].set_color(WHITE)
 		
-		self._gl_plot.bar(self._gl_dates, self._gl_data, label='Game Log', color=GRAPHPURPLE)
-		self._gl_plot.plot(self._gl_dates, self._gl_avg, label='Season Average', linestyle='--', color=WHITE)
+		self._gl_bars = self._gl_plot.bar(self._gl_dates, self._gl_data, label='Game Log', color=GRAPHPURPLE)
+		self._gl_avg_line, = self._gl_plot.plot(self._gl_dates, self._gl_avg, label='Season Average', linestyle='--', color=WHITE)
 		self._gl_plot.legend(facecolor=BLACK, labelcolor=WHITE)
 
 		self._gl_canvas = FigureCanvasTkAgg(self._gl_fig, master=self._gl_panel)
 		self._gl_canvas.draw()
-		self._gl_canvas.get_tk_widget().grid(row=0, column=0, columnspan=3)
+		self._gl_canvas.get_tk_widget().grid(row=0, column=0, columnspan=4)
+
+		# zooming and panning only do anything in the career view
+		self._gl_canvas.mpl_connect('scroll_event', self._zoom_career_log)
+		self._gl_canvas.mpl_connect('button_press_event', self._start_career_pan)
+		self._gl_canvas.mpl_connect('motion_notify_event', self._pan_career_log)
+		self._gl_canvas.mpl_connect('button_release_event', self._end_career_pan)
+
+
+	def _redraw_game_log(self) -> None:
+		'''Redraws the game log in whichever view (career, season, last 10, last 5) was picked; compared players
+		only have this season's games loaded, so they never get the career view'''
+		if self._gl_show_career and self._comparison is None and self._has_dashboard():
+			self._update_career_log(keep_view=True)
+		else:
+			self._update_game_log(self._gl_max_games)
 
 
 	def _update_game_log(self, max_games: int = None) -> None:
 		'''Update the bar graph displaying game log when player/stat changes'''
+		self._gl_max_games = max_games
+		self._gl_career = False
+		self._gl_labels = []
 		self._gl_fig.clear()
 		self._gl_fig.subplots_adjust(bottom=0.2)
 
 		self._gl_plot = self._gl_fig.add_subplot(111)
-		self._gl_plot.set_facecolor(BLACK)
-		self._gl_plot.set_xlabel('Game', color=WHITE)
-		self._gl_plot.set_ylabel(self._stat_dropdown.get(), color=WHITE)
-		self._gl_plot.tick_params(axis='x', labelrotation=45, labelsize=5)
-		self._gl_plot.tick_params(labelcolor=WHITE, color=WHITE)
-		self._gl_plot.spines['bottom'].set_color(WHITE)
-		self._gl_plot.spines['left'].set_color(WHITE)
+		style_axes(self._gl_plot, 'Game', self._stat_dropdown.get(), labelsize=5)
+
+		if self._comparison is not None:
+			self._draw_compared_game_log(max_games)
+			return
 
-		if not self._api.has_gamelog():
+		if not self._has_dashboard():
 			self._gl_dates = ['Aug 23', 'Aug 25', 'Aug 26', 'Aug 29', 'Aug 31']
 			self._gl_data = [0] * 5
 			self._gl_avg = [0] * 5
 			self._gl_plot.set_ylim((0, 50))
 		else:
-			self._gl_dates = []
-			self._gl_data = []
-			self._gl_avg = []
+			kind, window = self._get_overlay()
+			self._gl_dates, self._gl_data, self._gl_avg = game_log_series(self._dashboard, self._stat_dropdown.get(),
+																		  self._split_dropdown.get(), max_games, kind, window,
+																		  self._games)
+
+		self._gl_bars, self._gl_avg_line = draw_game_log(self._gl_plot, self._gl_dates, self._gl_data, self._gl_avg,
+														 self._overlay_label('Season', 'Game'))
+
+		if self._has_dashboard() and self._opponents.is_loaded():
+			stat_type = self._stat_dropdown.get()
+			opponents, allowed = game_log_opponents(self._dashboard, self._opponents, stat_type,
+													self._split_dropdown.get(), max_games, self._games)
+			if len(opponents) == len(self._gl_bars):
+				self._gl_labels = annotate_game_log(self._gl_plot, self._gl_bars, opponents, allowed,
+													self._opponents.league(stat_type))
 
-			for date, data in self._api.current_season_gamelog(self._stat_dropdown.get(), max_games):
-				self._gl_dates.append(date)
-				self._gl_data.append(data)
+		self._gl_canvas.draw()
 
-			if len(self._gl_data) <= 0:
-				avg = 0
-			else:
-				avg = round(sum(self._gl_data) / len(self._gl_data), 1)
-			self._gl_avg = [avg] * len(self._gl_data)
 
-		
-		self._gl_plot.bar(self._gl_dates, self._gl_data, label='Game Log', color=GRAPHPURPLE)
-		self._gl_plot.plot(self._gl_dates, self._gl_avg, label='Season Average', linestyle='--', color=WHITE)
-		self._gl_plot.legend(facecolor=BLACK, labelcolor=WHITE)
+	def _patch_game_log(self) -> None:
+		'''Updates the heights of the game log bars in place when stats of games already shown change'''
+		# the selected player isn't on the chart while comparing
+		if self._comparison is not None:
+			return
+
+		# a full redraw is already on its way
+		if self._redraw.is_dirty('game log'):
+			return
+
+		# the career view is resampled from its arrays anyway
+		if self._gl_career:
+			self._redraw.mark('game log')
+			return
+
+		season_log = self._dashboard.get(self._stat_dropdown.get(), self._split_dropdown.get(), self._games)['season_log']
+		if self._gl_max_games is not None:
+			season_log = season_log[-self._gl_max_games:]
+
+		# games were added or removed, so the bars themselves have to change
+		if [date for date, data in season_log] != self._gl_dates:
+			self._redraw.mark('game log')
+			return
 
+		self._gl_data = [data for date, data in season_log]
+		for bar, data in zip(self._gl_bars, self._gl_data):
+			bar.set_height(data)
+		for label, data in zip(self._gl_labels, self._gl_data):
+			label.set_y(data)
 
+		kind, window = self._get_overlay()
+		self._gl_avg = game_log_trend(self._dashboard, self._stat_dropdown.get(), self._split_dropdown.get(), self._gl_data,
+									  kind, window, self._games)
+		self._gl_avg_line.set_ydata(self._gl_avg)
+
+		self._gl_plot.relim()
+		self._gl_plot.autoscale_view()
+		self._gl_plot.set_ylim(bottom=0)
+		self._gl_canvas.draw_idle()
+
+
+	def _draw_compared_game_log(self, max_games: int = None) -> None:
+		'''Draws a line per compared player of their last max_games games this season, lined up so every line
+		ends at that player's latest game'''
+		games_ago, matrix = self._comparison.recent(self._stat_dropdown.get(), max_games)
+
+		for name, values, color in zip(self._comparison.names(), matrix, COMPARE_COLORS):
+			self._gl_plot.plot(games_ago, values, label=name, marker='o', markersize=3, color=color)
+
+		self._gl_plot.set_xlabel('Games Ago', color=WHITE)
 		self._gl_plot.set_ylim(bottom=0)
+		self._gl_plot.legend(facecolor=BLACK, labelcolor=WHITE)
 
 		self._gl_canvas.draw()
 
@@ -705,7 +1504,7 @@ class Interface:
 	def _create_gamelog_buttons(self) -> None:
 		'''Create the buttons that allows user to switch between season, last5, last10 games on gamelog graph'''
 		self._gl_season_button = tkinter.Button(self._gl_panel, text='Season', width=15, bg=LIGHTBLUE, fg=BLACK, font=TEXT10,
-												activebackground=TEAL, activeforeground=BLACK, command=self._update_game_log)
+												activebackground=TEAL, activeforeground=BLACK, command=self._season_change)
 		self._gl_season_button.grid(row=1, column=0, pady=(0, 30))
 
 		self._gl_last10_button = tkinter.Button(self._gl_panel, text='Last 10', width=15, bg=LIGHTBLUE, fg=BLACK, font=TEXT10,
@@ -716,13 +1515,139 @@ class Interface:
 											   activebackground=TEAL, activeforeground=BLACK, command=self._last5_change)
 		self._gl_last5_button.grid(row=1, column=2, pady=(0, 30))
 
+		self._gl_career_button = tkinter.Button(self._gl_panel, text='Career', width=15, bg=LIGHTBLUE, fg=BLACK, font=TEXT10,
+												activebackground=TEAL, activeforeground=BLACK, command=self._career_change)
+		self._gl_career_button.grid(row=1, column=3, pady=(0, 30))
+
 
+	@profiled('season')
+	def _season_change(self) -> None:
+		self._set_game_log_view(None, False)
+
+
+	@profiled('last 10')
 	def _last10_change(self) -> None:
-		self._update_game_log(10)
+		self._set_game_log_view(10, False)
 
 
+	@profiled('last 5')
 	def _last5_change(self) -> None:
-		self._update_game_log(5)
+		self._set_game_log_view(5, False)
+
+
+	@profiled('career')
+	def _career_change(self) -> None:
+		self._set_game_log_view(None, True)
+
+
+	def _set_game_log_view(self, max_games: int | None, career: bool) -> None:
+		'''Picks the latest max_games games this season (every game with None), or the whole career, for the game log'''
+		self._gl_max_games = max_games
+		self._gl_show_career = career
+		self._redraw.mark('game log')
+
+
+	def _update_career_log(self, keep_view: bool = False) -> None:
+		'''Draws every game of the career as a line with the selected trend overlay; only about two points per pixel
+		are drawn, resampled from the full arrays whenever the view is zoomed or panned'''
+		view = self._gl_plot.get_xlim() if keep_view and self._gl_career else None
+		self._gl_career = True
+
+		dates, values = self._dashboard.get_career_series(self._stat_dropdown.get(), self._split_dropdown.get())
+		self._cl_x = mdates.date2num(dates)
+		self._cl_values = values
+		kind, window = self._get_overlay()
+		self._cl_rolling = self._dashboard.get_overlay(self._stat_dropdown.get(), kind, window, self._split_dropdown.get())
+
+		self._gl_fig.clear()
+		self._gl_fig.subplots_adjust(bottom=0.2)
+
+		self._gl_plot = self._gl_fig.add_subplot(111)
+		self._gl_plot.set_facecolor(BLACK)
+		self._gl_plot.set_ylabel(self._stat_dropdown.get(), color=WHITE)
+		self._gl_plot.tick_params(labelcolor=WHITE, color=WHITE, labelsize=7)
+		self._gl_plot.spines['bottom'].set_color(WHITE)
+		self._gl_plot.spines['left'].set_color(WHITE)
+		self._gl_plot.xaxis.set_major_locator(mdates.AutoDateLocator())
+		self._gl_plot.xaxis.set_major_formatter(mdates.ConciseDateFormatter(self._gl_plot.xaxis.get_major_locator()))
+
+		self._cl_line, = self._gl_plot.plot([], [], label='Game Log', color=GRAPHPURPLE, linewidth=0.8)
+		self._cl_rolling_line, = self._gl_plot.plot([], [], label=self._overlay_label('Career', 'Game'), color=WHITE,
+													linewidth=1.5)
+		self._gl_plot.legend(facecolor=BLACK, labelcolor=WHITE, loc='upper left')
+
+		if len(self._cl_x) > 0:
+			self._gl_plot.set_ylim(0, max(int(values.max()), 1) * 1.1)
+			self._gl_plot.set_xlim(view if view is not None else self._career_extent())
+		self._gl_plot.callbacks.connect('xlim_changed', lambda plot: self._resample_career_log())
+
+		self._resample_career_log()
+		self._gl_canvas.draw()
+
+
+	def _career_extent(self) -> tuple[float, float]:
+		'''Returns the x limits that show the whole career'''
+		margin = max((self._cl_x[-1] - self._cl_x[0]) * 0.01, 1)
+		return (self._cl_x[0] - margin, self._cl_x[-1] + margin)
+
+
+	def _resample_career_log(self) -> None:
+		'''Redraws just the visible games at the plot's pixel width from the full resolution arrays'''
+		low, high = self._gl_plot.get_xlim()
+		start, end = visible_range(self._cl_x, low, high)
+
+		buckets = max(int(self._gl_plot.get_window_extent().width) // 2, 1)
+		indices = start + minmax_indices(self._cl_values[start:end], buckets)
+
+		self._cl_line.set_data(self._cl_x[indices], self._cl_values[indices])
+		self._cl_rolling_line.set_data(self._cl_x[indices], self._cl_rolling[indices])
+		self._gl_plot.set_title(f'{end - start} games shown ({len(self._cl_x)} in career), {len(indices)} points drawn',
+								color=WHITE, fontsize=9)
+		self._gl_canvas.draw_idle()
+
+
+	def _zoom_career_log(self, event) -> None:
+		'''Zooms the career view in or out around the mouse with the scroll wheel'''
+		if not self._gl_career or event.inaxes is not self._gl_plot or len(self._cl_x) == 0:
+			return
+
+		low, high = self._gl_plot.get_xlim()
+		scale = 0.8 if event.button == 'up' else 1.25
+		full_low, full_high = self._career_extent()
+
+		low = max(event.xdata - (event.xdata - low) * scale, full_low)
+		high = min(event.xdata + (high - event.xdata) * scale, full_high)
+		if high - low > 1:
+			self._gl_plot.set_xlim(low, high)
+
+
+	def _start_career_pan(self, event) -> None:
+		'''Starts dragging the career view; double clicking shows the whole career again'''
+		if not self._gl_career or event.inaxes is not self._gl_plot or len(self._cl_x) == 0:
+			return
+
+		if event.dblclick:
+			self._gl_plot.set_xlim(self._career_extent())
+			return
+
+		self._gl_pan = (event.x, self._gl_plot.get_xlim())
+
+
+	def _pan_career_log(self, event) -> None:
+		'''Drags the career view sideways, staying within the career'''
+		if not self._gl_career or self._gl_pan is None or event.x is None:
+			return
+
+		start_x, (low, high) = self._gl_pan
+		shift = (start_x - event.x) * (high - low) / self._gl_plot.get_window_extent().width
+
+		full_low, full_high = self._career_extent()
+		shift = min(max(shift, full_low - low), full_high - high)
+		self._gl_plot.set_xlim(low + shift, high + shift)
+
+
+	def _end_career_pan(self, event) -> None:
+		self._gl_pan = None
 
 
 	def _create_hit_rates(self) -> None:
@@ -748,6 +1673,9 @@ class Interface:
 		self._hit_plot.barh(self._hit_cat, self._hit_hit, label='Miss', height=0.4, left=start, color=GRAPHGREEN)
 		self._hit_plot.legend()
 
+		self._hit_band_artists = []
+		self._hit_opponent_artists = []
+
 		self._hit_canvas = FigureCanvasTkAgg(self._hit_fig, master=self._panel1)
 		self._hit_canvas.draw()
 		self._hit_canvas.get_tk_widget().pack()
@@ -755,56 +1683,84 @@ class Interface:
 
 	def _update_hit_rates(self) -> None:
 		'''Updates the hit rates when line changes, stat changes, or player changes'''
-		self._api.get_hit_rates(self._stat_dropdown.get())
-		LINE = round(self._api.career_convert(self._stat_dropdown.get()))
+		if not self._has_dashboard():
+			return
 
 		self._hit_fig.clear()
-		self._hit_fig.subplots_adjust(left=0.2)
+		self._hit_fig.subplots_adjust(left=0.2, right=0.9)
+		self._hit_band_artists = []
+		self._hit_opponent_artists = []
 
 		self._hit_plot = self._hit_fig.add_subplot(111)
-		self._hit_plot.set_facecolor(BLACK)
-		self._hit_plot.set_xlim((0, 100))
-		self._hit_plot.get_xaxis().set_visible(False)
-		self._hit_plot.set_frame_on(False)
-		self._hit_plot.tick_params(axis='y', length=0, labelcolor=WHITE)
 
-		self._hit_hit = [0] * 4
-		self._hit_tied = [0] * 4
-		self._hit_miss = [0] * 4
-		datasets = [self._api.get_last5_counts(), 
-					self._api.get_last10_counts(),
-					self._api.get_season_counts(),
-					self._api.get_career_counts()]
+		hit_rates = self._dashboard.get(self._stat_dropdown.get(), self._split_dropdown.get(), self._games)['hit_rates']
+		self._hit_cat = hit_rate_categories(self._dashboard, self._games)
+		self._hit_hit = [hit for hit, tied, miss in hit_rates]
+		self._hit_tied = [tied for hit, tied, miss in hit_rates]
+		self._hit_miss = [miss for hit, tied, miss in hit_rates]
 
-		for x in range(len(datasets)):
-			for stat, occ in datasets[x].items():
-				if stat > LINE:
-					self._hit_hit[x] += occ
-				elif stat < LINE:
-					self._hit_miss[x] += occ
-				else:
-					self._hit_tied[x] += occ
+		self._hit_bars = draw_hit_rates(self._hit_plot, self._hit_cat, hit_rates)
 
-			self._hit_hit[x] 
+		self._draw_hit_bands()
+		self._draw_opponent_adjustment()
+		self._hit_canvas.draw()
 
-			self._hit_hit[x] = round(self._hit_hit[x] * 100 / sum(datasets[x].values()), 1)
-			self._hit_tied[x] = round(self._hit_tied[x] * 100 / sum(datasets[x].values()), 1)
-			self._hit_miss[x] = round(self._hit_miss[x] * 100 / sum(datasets[x].values()), 1)
 
+	def _draw_hit_bands(self) -> None:
+		'''Marks the recency weighted over probability of every window, with its confidence band, on the hit rate bars'''
+		for artist in self._hit_band_artists:
+			artist.remove()
 
-		self._hit_plot.barh(self._hit_cat, self._hit_miss, label='Hit', height=0.5, color=GRAPHRED)
-		self._hit_plot.barh(self._hit_cat, self._hit_tied, label='Tied', height=0.5, left=self._hit_miss, color=GRAPHGRAY)
-		start = [self._hit_miss[x] + self._hit_tied[x] for x in range(len(self._hit_miss))]
-		self._hit_plot.barh(self._hit_cat, self._hit_hit, label='Miss', height=0.5, left=start, color=GRAPHGREEN)
-		self._hit_plot.legend()
+		probabilities = self._dashboard.get_probabilities(self._stat_dropdown.get(), self._split_dropdown.get(), self._games)
+		self._hit_band_artists = draw_hit_bands(self._hit_plot, probabilities)
 
-		self._hit_canvas.draw()
+
+	def _draw_opponent_adjustment(self) -> None:
+		'''Marks the hit rates of every window adjusted for the upcoming opponent's defense, if one is picked'''
+		for artist in self._hit_opponent_artists:
+			artist.remove()
+		if len(self._hit_opponent_artists) > 0:
+			self._hit_plot.legend()
+		self._hit_opponent_artists = []
+
+		team = self._opponent_dropdown.get()
+		if team == NO_OPPONENT or not self._opponents.is_loaded():
+			return
+
+		stat_type = self._stat_dropdown.get()
+		hit_rates = opponent_hit_rates(self._dashboard, self._opponents, stat_type, team, self._split_dropdown.get(),
+									   self._games)
+		self._hit_opponent_artists = draw_opponent_adjustment(self._hit_plot, team, self._opponents.factor(team, stat_type),
+															  hit_rates)
+
+
+	def _patch_hit_rates(self) -> None:
+		'''Resizes the hit rate bars in place instead of rebuilding the figure'''
+		# a full redraw is already on its way
+		if self._redraw.is_dirty('hit rates'):
+			return
+
+		hit_rates = self._dashboard.get(self._stat_dropdown.get(), self._split_dropdown.get(), self._games)['hit_rates']
+		self._hit_hit = [hit for hit, tied, miss in hit_rates]
+		self._hit_tied = [tied for hit, tied, miss in hit_rates]
+		self._hit_miss = [miss for hit, tied, miss in hit_rates]
+
+		miss_bars, tied_bars, hit_bars = self._hit_bars
+		for x in range(len(self._hit_cat)):
+			miss_bars[x].set_width(self._hit_miss[x])
+			tied_bars[x].set_x(self._hit_miss[x])
+			tied_bars[x].set_width(self._hit_tied[x])
+			hit_bars[x].set_x(self._hit_miss[x] + self._hit_tied[x])
+			hit_bars[x].set_width(self._hit_hit[x])
+
+		self._draw_hit_bands()
+		self._draw_opponent_adjustment()
+		self._hit_canvas.draw_idle()
 
 
 	def _update_panel2(self) -> None:
 		'''Update everything in panel 2'''
-		self._update_season_log()
-		self._update_5_log()
+		self._redraw.mark('season log', 'last 5 log')
 
 
 	def _create_season_log(self) -> None:
@@ -819,13 +1775,16 @@ class Interface:
 
 	def _update_season_log(self) -> None:
 		'''Update log when either the player or stat type changes'''
+		if not self._has_dashboard():
+			return
+
 		for widget in self._season_log_panel.winfo_children():
 			widget.destroy()
 
 		self._season_log_title = tkinter.Label(self._season_log_panel, text='Season Averages', bg=BLACK, fg=TEAL, font=STAT12)
 		self._season_log_title.grid(row=0, column=0, columnspan=2)
 
-		data = self._api.per_year_convert(self._stat_dropdown.get())
+		data = self._dashboard.get(self._stat_dropdown.get(), games=self._games)['year_by_year']
 
 		for x in range(len(data)):
 			year, stat = data[x]
@@ -865,4 +1824,494 @@ class Interface:
 
 
 	def _update_hit_rates_log(self) -> None:
-		pass
\ No newline at end of file
+		pass
+
+
+
+# separate window that ranks every active player by hit rate for a stat, window, and line
+class ScreenerPanel:
+	def __init__(self, parent: tkinter.Tk, api: API, run_in_background, select_player):
+		self._screener = Screener(api)
+		self._run_in_background = run_in_background
+		self._select_player = select_player
+		self._results = []
+
+		# loads and screens still running in the background; the screener is only closed once none are
+		self._running = 0
+		self._sort_key = 'hit'
+		self._descending = True
+
+		self._window = tkinter.Toplevel(parent)
+		self._window.title('League Screener')
+		self._window.geometry('1200x600')
+		self._window.configure(bg=BLACK)
+		self._window.protocol('WM_DELETE_WINDOW', self.close)
+
+		self._create_controls()
+		self._create_table()
+
+		self._set_status('Loading the league game logs...')
+		self._in_background(self._screener.load, self._loaded)
+
+
+	def is_open(self) -> bool:
+		'''Returns whether or not the window is still open'''
+		return self._window is not None
+
+
+	def lift(self) -> None:
+		'''Brings the window in front of the main one'''
+		self._window.lift()
+
+
+	def close(self) -> None:
+		'''Closes the window and frees the screener's shared memory and workers, or leaves that to the last load or
+		screen still running, which would otherwise read freed memory or submit to a shut down pool'''
+		if self._running == 0:
+			self._screener.close()
+		self._window.destroy()
+		self._window = None
+
+
+	def _in_background(self, work, on_done) -> None:
+		'''Runs work() in the background like the main window does, keeping count of what is still running'''
+		self._running += 1
+
+		def _done(result, error: Exception) -> None:
+			self._running -= 1
+			if not self.is_open() and self._running == 0:
+				self._screener.close()
+			on_done(result, error)
+
+		self._run_in_background(work, _done)
+
+
+	def _create_controls(self) -> None:
+		'''Creates the stat, window, line, and filter controls along with the screen and export buttons'''
+		controls = tkinter.Frame(self._window, bg=BLACK)
+		controls.pack(fill=tkinter.X, padx=10, pady=10)
+
+		self._stat = ttk.Combobox(controls, values=STATS, state='readonly', width=14)
+		self._stat.set('Points')
+		self._hit_window = ttk.Combobox(controls, values=SCREENER_WINDOWS, state='readonly', width=14)
+		self._hit_window.set('Last 10')
+
+		self._line = tkinter.Entry(controls, width=8, font=TEXT10)
+		self._line.insert(0, 'career')
+		self._min_games = tkinter.Entry(controls, width=5, font=TEXT10)
+		self._min_games.insert(0, '5')
+		self._name_filter = tkinter.Entry(controls, width=16, font=TEXT10)
+
+		widgets = [('Stat', self._stat), ('Window', self._hit_window), ('Line', self._line),
+				   ('Min Games', self._min_games), ('Name', self._name_filter)]
+		for column, (text, widget) in enumerate(widgets):
+			tkinter.Label(controls, text=text, bg=BLACK, fg=TEAL, font=TEXT10).grid(row=0, column=column, padx=5)
+			widget.grid(row=1, column=column, padx=5)
+
+		self._screen_button = tkinter.Button(controls, text='Screen', command=self._screen, width=10, bg=LIGHTBLUE,
+											 fg=BLACK, font=TEXT10, activebackground=TEAL, activeforeground=BLACK,
+											 state=tkinter.DISABLED)
+		self._screen_button.grid(row=1, column=len(widgets), padx=5)
+
+		self._export_button = tkinter.Button(controls, text='Export CSV', command=self._export, width=10, bg=LIGHTBLUE,
+											 fg=BLACK, font=TEXT10, activebackground=TEAL, activeforeground=BLACK)
+		self._export_button.grid(row=1, column=len(widgets) + 1, padx=5)
+
+		self._status = tkinter.Label(self._window, bg=BLACK, fg=LIGHTBLUE, font=TEXT10, anchor=tkinter.W)
+		self._status.pack(fill=tkinter.X, padx=10)
+
+
+	def _create_table(self) -> None:
+		'''Creates the sortable results table; clicking a heading sorts by it, double clicking a row selects the player'''
+		frame = tkinter.Frame(self._window, bg=BLACK)
+		frame.pack(fill=tkinter.BOTH, expand=True, padx=10, pady=10)
+
+		columns = RESULT_COLUMNS[1:]
+		self._table = ttk.Treeview(frame, columns=columns, show='headings')
+		for column in columns:
+			self._table.heading(column, text=column.replace('_', ' ').title(), command=lambda column=column: self._sort_by(column))
+			self._table.column(column, width=220 if column == 'name' else 90, anchor=tkinter.CENTER)
+		self._table.bind('<Double-1>', self._row_selected)
+
+		scrollbar = ttk.Scrollbar(frame, orient=tkinter.VERTICAL, command=self._table.yview)
+		self._table.configure(yscrollcommand=scrollbar.set)
+
+		self._table.pack(side=tkinter.LEFT, fill=tkinter.BOTH, expand=True)
+		scrollbar.pack(side=tkinter.RIGHT, fill=tkinter.Y)
+
+
+	def _set_status(self, text: str) -> None:
+		'''Shows what the screener is doing below the controls'''
+		self._status.configure(text=text)
+
+
+	def _loaded(self, result, error: Exception) -> None:
+		'''Run once the league game logs are in; screens with the default settings'''
+		if not self.is_open():
+			return
+
+		if error is not None:
+			self._set_status(f'Unable to grab the league game logs: {error}')
+			return
+
+		self._screen_button.configure(state=tkinter.NORMAL)
+		self._screen()
+
+
+	def _screen(self) -> None:
+		'''Scores every player in the background with the current settings'''
+		line = self._line.get().strip().lower()
+		if line != 'career':
+			try:
+				line = float(line)
+			except ValueError:
+				tkinter.messagebox.showerror(title='ERROR', message='The line must be a number or career.', parent=self._window)
+				return
+
+		stat_type, window = self._stat.get(), self._hit_window.get()
+		self._screen_button.configure(state=tkinter.DISABLED)
+		self._set_status(f'Screening {stat_type}, {window}...')
+
+		self._in_background(lambda: self._screener.screen(stat_type, window, line), self._screened)
+
+
+	def _screened(self, results: list[dict], error: Exception) -> None:
+		'''Shows the newly screened results'''
+		if not self.is_open():
+			return
+
+		self._screen_button.configure(state=tkinter.NORMAL)
+		if error is not None:
+			self._set_status(f'Screening failed: {error}')
+			return
+
+		self._results = results
+		self._refresh_table()
+
+
+	def _filtered_results(self) -> list[dict]:
+		'''Returns the results that pass the min games and name filters, in the current sort order'''
+		try:
+			min_games = int(self._min_games.get())
+		except ValueError:
+			min_games = 0
+
+		name = self._name_filter.get().strip() or None
+		return sort_results(filter_results(self._results, min_games, name), self._sort_key, self._descending)
+
+
+	def _refresh_table(self) -> None:
+		'''Redraws the table from the current results'''
+		self._table.delete(*self._table.get_children())
+
+		results = self._filtered_results()
+		for result in results:
+			self._table.insert('', tkinter.END, iid=str(result['pid']), values=[result[column] for column in RESULT_COLUMNS[1:]])
+
+		self._set_status(f'{len(results)} of {len(self._results)} players shown')
+
+
+	def _sort_by(self, column: str) -> None:
+		'''Sorts the table by a column, flipping the order if it's already sorted by it'''
+		self._descending = not self._descending if column == self._sort_key else column != 'name'
+		self._sort_key = column
+		self._refresh_table()
+
+
+	def _row_selected(self, event) -> None:
+		'''Selects the double clicked player in the main window'''
+		row = self._table.focus()
+		if row != '':
+			self._select_player(int(row), self._table.set(row, 'name'))
+
+
+	def _export(self) -> None:
+		'''Exports the results currently in the table to a csv file'''
+		path = filedialog.asksaveasfilename(parent=self._window, defaultextension='.csv',
+											filetypes=[('CSV files', '*.csv')])
+		if path:
+			export_csv(self._filtered_results(), path)
+
+
+
+# separate window with the recent form of every player on a team for a stat, and the team's totals
+class RosterPanel:
+	def __init__(self, parent: tkinter.Tk, api: API, run_in_background, select_player, stat_type: str, team: dict = None):
+		# team is the static team info (roster.find_team) opened on, e.g. the selected player's; every load builds
+		# a new TeamRoster in the background and only the latest one started is swapped in
+		self._api = api
+		self._roster = TeamRoster(api)
+		self._load_generation = 0
+		self._run_in_background = run_in_background
+		self._select_player = select_player
+		self._rows = []
+		self._sort_key = 'average'
+		self._descending = True
+
+		self._window = tkinter.Toplevel(parent)
+		self._window.title('Team Roster')
+		self._window.geometry('1100x600')
+		self._window.configure(bg=BLACK)
+		self._window.protocol('WM_DELETE_WINDOW', self.close)
+
+		self._create_controls(stat_type, team)
+		self._create_table()
+
+		if team is not None:
+			self._load()
+		else:
+			self._set_status('Pick a team')
+
+
+	def is_open(self) -> bool:
+		'''Returns whether or not the window is still open'''
+		return self._window is not None
+
+
+	def lift(self) -> None:
+		'''Brings the window in front of the main one'''
+		self._window.lift()
+
+
+	def close(self) -> None:
+		'''Closes the window'''
+		self._window.destroy()
+		self._window = None
+
+
+	def _create_controls(self, stat_type: str, team: dict | None) -> None:
+		'''Creates the team, stat, and line controls; a new team loads its roster, a new stat or line only recomputes
+		the table'''
+		controls = tkinter.Frame(self._window, bg=BLACK)
+		controls.pack(fill=tkinter.X, padx=10, pady=10)
+
+		self._team = ttk.Combobox(controls, values=team_names(), state='readonly', width=24)
+		if team is not None:
+			self._team.set(team['full_name'])
+		self._team.bind('<<ComboboxSelected>>', lambda event: self._load())
+
+		self._stat = ttk.Combobox(controls, values=STATS, state='readonly', width=14)
+		self._stat.set(stat_type)
+		self._stat.bind('<<ComboboxSelected>>', lambda event: self._refresh_table())
+
+		self._line = tkinter.Entry(controls, width=8, font=TEXT10)
+		self._line.insert(0, 'season')
+		self._line.bind('<Return>', lambda event: self._refresh_table())
+
+		widgets = [('Team', self._team), ('Stat', self._stat), ('Line', self._line)]
+		for column, (text, widget) in enumerate(widgets):
+			tkinter.Label(controls, text=text, bg=BLACK, fg=TEAL, font=TEXT10).grid(row=0, column=column, padx=5)
+			widget.grid(row=1, column=column, padx=5)
+
+		self._reload_button = tkinter.Button(controls, text='Reload', command=self._load, width=10, bg=LIGHTBLUE,
+											 fg=BLACK, font=TEXT10, activebackground=TEAL, activeforeground=BLACK)
+		self._reload_button.grid(row=1, column=len(widgets), padx=5)
+
+		self._status = tkinter.Label(self._window, bg=BLACK, fg=LIGHTBLUE, font=TEXT10, anchor=tkinter.W)
+		self._status.pack(fill=tkinter.X, padx=10)
+
+
+	def _create_table(self) -> None:
+		'''Creates the sortable roster table and the team totals below it; clicking a heading sorts by it, double
+		clicking a row selects the player'''
+		frame = tkinter.Frame(self._window, bg=BLACK)
+		frame.pack(fill=tkinter.BOTH, expand=True, padx=10, pady=10)
+
+		columns = ROSTER_COLUMNS[1:]
+		self._table = ttk.Treeview(frame, columns=columns, show='headings')
+		for column in columns:
+			self._table.heading(column, text=column.title(), command=lambda column=column: self._sort_by(column))
+			self._table.column(column, width=220 if column == 'name' else 90, anchor=tkinter.CENTER)
+		self._table.heading('average', text=f'Last {ROSTER_WINDOW}')
+		self._table.bind('<Double-1>', self._row_selected)
+
+		scrollbar = ttk.Scrollbar(frame, orient=tkinter.VERTICAL, command=self._table.yview)
+		self._table.configure(yscrollcommand=scrollbar.set)
+
+		self._table.pack(side=tkinter.LEFT, fill=tkinter.BOTH, expand=True)
+		scrollbar.pack(side=tkinter.RIGHT, fill=tkinter.Y)
+
+		self._totals = tkinter.Label(self._window, bg=BLACK, fg=WHITE, font=TEXT10, anchor=tkinter.W)
+		self._totals.pack(fill=tkinter.X, padx=10, pady=(0, 10))
+
+
+	def _set_status(self, text: str) -> None:
+		'''Shows what the roster is doing below the controls'''
+		self._status.configure(text=text)
+
+
+	def _load(self) -> None:
+		'''Loads the picked team's roster and every player's game log in the background'''
+		team = find_team(self._team.get())
+		if team is None:
+			return
+
+		self._load_generation += 1
+		generation = self._load_generation
+		roster = TeamRoster(self._api)
+
+		self._team.configure(state=tkinter.DISABLED)
+		self._reload_button.configure(state=tkinter.DISABLED)
+		self._set_status(f"Loading the {team['full_name']} roster...")
+		self._run_in_background(lambda: roster.load(team), lambda result, error: self._loaded(generation, roster, error))
+
+
+	def _loaded(self, generation: int, roster: TeamRoster, error: Exception) -> None:
+		'''Swaps in a loaded roster and shows its table, unless another load has started since'''
+		if not self.is_open() or generation != self._load_generation:
+			return
+
+		self._team.configure(state='readonly')
+		self._reload_button.configure(state=tkinter.NORMAL)
+		if error is not None:
+			self._set_status(f'Unable to grab the roster: {error}')
+			return
+
+		self._roster = roster
+		self._refresh_table()
+
+
+	def _refresh_table(self) -> None:
+		'''Recomputes the table for the current stat and line, then redraws it with the team totals'''
+		if not self._roster.is_loaded():
+			return
+
+		line = self._line.get().strip().lower()
+		if line != 'season':
+			try:
+				line = float(line)
+			except ValueError:
+				tkinter.messagebox.showerror(title='ERROR', message='The line must be a number or season.', parent=self._window)
+				return
+
+		self._rows = self._roster.table(self._stat.get(), line)
+		self._show_rows()
+
+		totals = TeamRoster.totals(self._rows)
+		self._totals.configure(text=f"Team: {totals['average']} {self._stat.get()} per game over the last "
+									f"{ROSTER_WINDOW} ({totals['season']} this season), hit {totals['hit']}%, "
+									f"tied {totals['tied']}%, miss {totals['miss']}% of {totals['games']} games")
+
+		failed = ', '.join(name for pid, name, position in self._roster.failed)
+		self._set_status(f"{self._roster.team['full_name']}: {len(self._rows)} players"
+						 + (f' (unable to grab {failed})' if failed else ''))
+
+
+	def _show_rows(self) -> None:
+		'''Redraws the table rows in the current sort order'''
+		self._table.delete(*self._table.get_children())
+		for row in sort_results(self._rows, self._sort_key, self._descending):
+			self._table.insert('', tkinter.END, iid=str(row['pid']), values=[row[column] for column in ROSTER_COLUMNS[1:]])
+
+
+	def _sort_by(self, column: str) -> None:
+		'''Sorts the table by a column, flipping the order if it's already sorted by it'''
+		self._descending = not self._descending if column == self._sort_key else column not in ['name', 'position']
+		self._sort_key = column
+		self._show_rows()
+
+
+	def _row_selected(self, event) -> None:
+		'''Selects the double clicked player in the main window'''
+		row = self._table.focus()
+		if row != '':
+			self._select_player(int(row), self._table.set(row, 'name'))
+
+
+
+# separate window with a heatmap of how the selected player's base stats move together
+class CorrelationPanel:
+	def __init__(self, parent: tkinter.Tk, get_dashboard, get_stat):
+		# get_dashboard() returns the selected player's dashboard (None until it is built), get_stat() the dropdown stat
+		self._get_dashboard = get_dashboard
+		self._get_stat = get_stat
+		self._drawn = None
+
+		self._window = tkinter.Toplevel(parent)
+		self._window.title('Stat Correlations')
+		self._window.geometry('800x750')
+		self._window.configure(bg=BLACK)
+		self._window.protocol('WM_DELETE_WINDOW', self.close)
+
+		self._hit_window = ttk.Combobox(self._window, values=HIT_RATE_WINDOWS, state='readonly')
+		self._hit_window.set('Career')
+		self._hit_window.bind('<<ComboboxSelected>>', lambda event: self._draw())
+		self._hit_window.pack(pady=10)
+
+		self._fig = Figure(figsize=(9, 8), dpi=80)
+		self._fig.set_facecolor(BLACK)
+		self._canvas = FigureCanvasTkAgg(self._fig, master=self._window)
+		self._canvas.get_tk_widget().pack()
+
+		self._combo_label = tkinter.Label(self._window, bg=BLACK, fg=LIGHTBLUE, font=TEXT10)
+		self._combo_label.pack(pady=10)
+
+		self._follow()
+
+
+	def is_open(self) -> bool:
+		'''Returns whether or not the window is still open'''
+		return self._window is not None
+
+
+	def lift(self) -> None:
+		'''Brings the window in front of the main one'''
+		self._window.lift()
+
+
+	def close(self) -> None:
+		'''Closes the window'''
+		self._window.destroy()
+		self._window = None
+
+
+	def _follow(self) -> None:
+		'''Redraws whenever another player is selected, another season streams in, or the stat changes'''
+		if not self.is_open():
+			return
+
+		dashboard = self._get_dashboard()
+		state = (dashboard, dashboard.get_correlations() if dashboard is not None else None, self._get_stat())
+		if state != self._drawn:
+			self._draw()
+
+		self._window.after(500, self._follow)
+
+
+	def _draw(self) -> None:
+		'''Draws the correlation heatmap of the selected window'''
+		dashboard = self._get_dashboard()
+		correlations = dashboard.get_correlations() if dashboard is not None else None
+		self._drawn = (dashboard, correlations, self._get_stat())
+
+		self._fig.clear()
+		self._fig.subplots_adjust(left=0.2, bottom=0.2)
+		plot = self._fig.add_subplot(111)
+		plot.set_facecolor(BLACK)
+
+		if correlations is None:
+			self._combo_label.configure(text='Select a player to see how their stats move together')
+			self._canvas.draw()
+			return
+
+		window = self._hit_window.get()
+		matrix = correlations.correlation(window)
+
+		image = plot.imshow(matrix, cmap='coolwarm', vmin=-1, vmax=1)
+		plot.set_xticks(range(len(BASE_STATS)), BASE_STATS, rotation=60, ha='right', color=WHITE, fontsize=8)
+		plot.set_yticks(range(len(BASE_STATS)), BASE_STATS, color=WHITE, fontsize=8)
+		plot.set_title(f'{window} ({correlations.get_games(window)} games)', color=TEAL)
+		for row in range(len(BASE_STATS)):
+			for column in range(len(BASE_STATS)):
+				plot.text(column, row, f'{matrix[row, column]:.2f}', ha='center', va='center', fontsize=7, color=BLACK)
+		self._fig.colorbar(image, ax=plot).ax.tick_params(labelcolor=WHITE)
+
+		stat_type = self._get_stat()
+		if stat_type in COMBINATIONS:
+			variance, independent = correlations.combo_variance(stat_type, window)
+			self._combo_label.configure(text=f'{stat_type}: standard deviation {max(variance, 0) ** 0.5:.1f}, '
+											 f'{independent ** 0.5:.1f} if its parts were independent')
+		else:
+			self._combo_label.configure(text='Pick a combination stat to see how its parts widen or narrow it')
+
+		self._canvas.draw()
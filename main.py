@@ -1,11 +1,19 @@
 # Complete application
 from interface import Interface 
+from profiling import PROFILE_DIRECTORY
+import argparse
 
 
 def main() -> None:
-	program = Interface()
+	parser = argparse.ArgumentParser(description='NBA Statistics Analyzer')
+	parser.add_argument('--profile', action='store_true', help='capture a cProfile and tracemalloc file per action')
+	parser.add_argument('--profile-dir', default=PROFILE_DIRECTORY, help='directory the captures are written to')
+	parser.add_argument('--service', default=None, help='url of a shared query service (service.py) to download through')
+	args = parser.parse_args()
+
+	program = Interface(args.profile, args.profile_dir, args.service)
 	program.run()
 
 
 if __name__ == '__main__':
-	main()
\ No newline at end of file
+	main()
@@ -0,0 +1,106 @@
+# Bounded memoization for the API query methods
+# Results are keyed by player id so a player's entries can be dropped when their data is refreshed, and by the
+# version of that data so a copy of an api still holding older data can't put its results back under the newer
+from collections import OrderedDict
+import functools
+import inspect
+import itertools
+import threading
+
+
+class QueryCache:
+	def __init__(self, maxsize: int = 512):
+		self._maxsize = maxsize
+		self._entries = OrderedDict()
+		self._lock = threading.Lock()
+
+		# versions handed to the apis sharing this cache, never reused
+		self._versions = itertools.count(1)
+
+		# diagnostics
+		self._hits = 0
+		self._misses = 0
+		self._evictions = 0
+		self._invalidations = 0
+
+
+	def get(self, key: tuple) -> tuple[bool, object]:
+		'''Returns (found, value) for the key and marks it as recently used'''
+		with self._lock:
+			if key in self._entries:
+				self._entries.move_to_end(key)
+				self._hits += 1
+				return (True, self._entries[key])
+
+			self._misses += 1
+			return (False, None)
+
+
+	def put(self, key: tuple, value: object) -> None:
+		'''Stores a value, evicting the least recently used entry if the cache is full'''
+		with self._lock:
+			self._entries[key] = value
+			self._entries.move_to_end(key)
+
+			while len(self._entries) > self._maxsize:
+				self._entries.popitem(last=False)
+				self._evictions += 1
+
+
+	def invalidate(self, pid: int) -> int:
+		'''Drops every entry belonging to the given player; returns how many were dropped'''
+		with self._lock:
+			stale = [key for key in self._entries if key[0] == pid]
+			for key in stale:
+				del self._entries[key]
+
+			self._invalidations += len(stale)
+			return len(stale)
+
+
+	def next_version(self) -> int:
+		'''Returns a data version no api sharing this cache has had yet'''
+		with self._lock:
+			return next(self._versions)
+
+
+	def clear(self) -> None:
+		'''Drops every entry'''
+		with self._lock:
+			self._entries.clear()
+
+
+	def stats(self) -> dict:
+		'''Returns the size and hit statistics of the cache'''
+		with self._lock:
+			lookups = self._hits + self._misses
+			return {'size': len(self._entries),
+					'maxsize': self._maxsize,
+					'hits': self._hits,
+					'misses': self._misses,
+					'hit_rate': round(self._hits * 100 / lookups, 1) if lookups > 0 else 0,
+					'evictions': self._evictions,
+					'invalidations': self._invalidations}
+
+
+def memoized(method):
+	'''Decorator for API methods that are pure functions of the selected player's data;
+	results are cached in the api's QueryCache under (pid, data version, method, arguments)'''
+	signature = inspect.signature(method)
+
+	@functools.wraps(method)
+	def wrapper(self, *args, **kwargs):
+		# the same call written differently (positional or keyword, or leaving out a default) shares one entry
+		arguments = signature.bind(self, *args, **kwargs)
+		arguments.apply_defaults()
+		key = (self._pid, self._version, method.__name__, tuple(arguments.arguments.items())[1:])
+
+		found, value = self._memo.get(key)
+		if found:
+			return value
+
+		value = method(self, *args, **kwargs)
+		self._memo.put(key, value)
+		return value
+
+	return wrapper
@@ -0,0 +1,106 @@
+# Test QueryCache and the memoized API query methods
+from api import API, CURRENT_SEASON
+from memo import QueryCache
+from sample_data import load_sample_player, season_rows, gamelog_payload
+import copy
+import unittest
+
+
+class QueryCacheTests(unittest.TestCase):
+	def setUp(self):
+		self.cache = QueryCache(maxsize=2)
+
+
+	def test_get_returns_not_found_for_missing_keys(self):
+		self.assertEqual(self.cache.get((1, 'career_convert', ('Points',), ())), (False, None))
+
+
+	def test_get_returns_stored_value(self):
+		self.cache.put((1, 'career_convert', ('Points',), ()), 25.0)
+		self.assertEqual(self.cache.get((1, 'career_convert', ('Points',), ())), (True, 25.0))
+
+
+	def test_put_evicts_least_recently_used_entry(self):
+		self.cache.put((1, 'a', (), ()), 1)
+		self.cache.put((1, 'b', (), ()), 2)
+		self.cache.get((1, 'a', (), ()))
+		self.cache.put((1, 'c', (), ()), 3)
+
+		self.assertTrue(self.cache.get((1, 'a', (), ()))[0])
+		self.assertFalse(self.cache.get((1, 'b', (), ()))[0])
+		self.assertEqual(self.cache.stats()['evictions'], 1)
+
+
+	def test_invalidate_only_drops_the_given_player(self):
+		self.cache.put((1, 'a', (), ()), 1)
+		self.cache.put((2, 'a', (), ()), 2)
+
+		self.assertEqual(self.cache.invalidate(1), 1)
+		self.assertFalse(self.cache.get((1, 'a', (), ()))[0])
+		self.assertTrue(self.cache.get((2, 'a', (), ()))[0])
+
+
+	def test_stats_reports_hit_rate(self):
+		self.cache.put((1, 'a', (), ()), 1)
+		self.cache.get((1, 'a', (), ()))
+		self.cache.get((1, 'b', (), ()))
+
+		self.assertEqual(self.cache.stats()['hit_rate'], 50.0)
+
+
+class MemoizedAPITests(unittest.TestCase):
+	def setUp(self):
+		self.api = API()
+		load_sample_player(self.api)
+
+
+	def test_repeated_queries_are_served_from_the_cache(self):
+		first = self.api.current_season_gamelog('Points', 10)
+		second = self.api.current_season_gamelog('Points', 10)
+
+		self.assertIs(first, second)
+		self.assertEqual(self.api.get_diagnostics()['query_cache']['hits'], 1)
+
+
+	def test_different_params_are_cached_separately(self):
+		self.assertEqual(len(self.api.current_season_gamelog('Points', 5)), 5)
+		self.assertEqual(len(self.api.current_season_gamelog('Points', 10)), 10)
+
+
+	def test_the_same_call_written_differently_shares_an_entry(self):
+		first = self.api.current_season_gamelog('Points')
+		self.assertIs(self.api.current_season_gamelog(stat_type='Points'), first)
+		self.assertIs(self.api.current_season_gamelog('Points', max_games=None), first)
+
+		stats = self.api.get_diagnostics()['query_cache']
+		self.assertEqual((stats['hits'], stats['misses'], stats['size']), (2, 1, 1))
+
+
+	def test_refreshing_a_player_invalidates_their_results(self):
+		before = self.api.career_convert('Points')
+		load_sample_player(self.api, seasons={2023: []})
+
+		self.assertNotEqual(self.api.career_convert('Points'), before)
+
+
+	def test_a_copy_with_older_data_cannot_refill_the_cache(self):
+		self.api._set_player(1, {'playergamelog': (gamelog_payload(season_rows(CURRENT_SEASON, 10)), 0)})
+		building = copy.copy(self.api)
+
+		refreshed = gamelog_payload(season_rows(CURRENT_SEASON, 11))
+		self.assertEqual(self.api.apply_refresh(1, {'playergamelog': (refreshed, 1)}), ['playergamelog'])
+
+		self.assertEqual(len(building.current_season_gamelog('Points')), 10)
+		self.assertEqual(len(self.api.current_season_gamelog('Points')), 11)
+
+
+	def test_hit_rate_counts_only_download_the_career_once(self):
+		self.api.hit_rate_counts('Points')
+		self.api.hit_rate_counts('Points')
+		self.api.get_hit_rates('Rebounds')
+
+		self.assertEqual(len(self.api.fetches), 2)
+
+
+if __name__ == '__main__':
+	unittest.main()
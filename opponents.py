@@ -0,0 +1,225 @@
+# Opponent defensive context: what every team has allowed, and at what pace, over its last games
+# Built from the league wide team game logs (one request per season), so no game of a player ever needs a request
+# of its own; every game is paired with the opponent's row of the same game, then the rolling aggregates of every
+# team are running sums over its games in date order, and "entering a date" is a binary search
+from api import API, CONVERT, CURRENT_SEASON, HIT_RATE_WINDOWS
+from gamelog import GameLog, ALL_GAMES
+import numpy
+
+
+# every column kept per team; combinations are summed from these
+BASE_STATS = list(CONVERT.values())
+
+# how many of a team's latest games its rolling aggregates are over
+OPPONENT_WINDOW = 10
+
+# seasons of team game logs loaded, so the first games of a season still look back over the end of the last one
+CONTEXT_SEASONS = 2
+
+# how far from the league average a defense has to be to count as soft or tough
+DEFENSE_MARGIN = 0.05
+
+# the upcoming opponent dropdown's choice for no adjustment
+NO_OPPONENT = 'No Opponent'
+
+
+def possessions(fga: numpy.ndarray, fta: numpy.ndarray, oreb: numpy.ndarray, tov: numpy.ndarray) -> numpy.ndarray:
+	'''Returns the usual estimate of a team's possessions in a game from its box score'''
+	return fga + 0.44 * fta - oreb + tov
+
+
+class OpponentContext:
+	def __init__(self, api: API, seasons: int = CONTEXT_SEASONS, window: int = OPPONENT_WINDOW):
+		# one row per team game, sorted by team then date; rolling[column] is the team's average allowed over its
+		# last window games up to and including that row
+		# every array lives in one dict that a load replaces whole, since loads run on a background thread while the
+		# interface reads; each query reads self._games once, so it never sees half of a load
+		self._api = api
+		self._seasons = seasons
+		self._window = window
+
+		self._games = {'teams': numpy.zeros(0, dtype=str),
+					   'team': numpy.zeros(0, dtype=numpy.int64),
+					   'date': numpy.zeros(0, dtype='datetime64[D]'),
+					   'keys': numpy.zeros(0, dtype=numpy.int64),
+					   'allowed': {column: numpy.zeros(0) for column in BASE_STATS},
+					   'rolling': {column: numpy.zeros(0) for column in BASE_STATS},
+					   'pace': numpy.zeros(0),
+					   'rolling_pace': numpy.zeros(0)}
+
+
+	def is_loaded(self) -> bool:
+		'''Returns whether or not any team games have been loaded'''
+		return len(self._games['team']) > 0
+
+
+	def load(self) -> None:
+		'''Grabs the team game log of every season of context (one request each, cached like any snapshot)'''
+		self.load_gamelogs([(year, self._api.fetch_league_team_gamelog(year))
+							for year in range(CURRENT_SEASON, CURRENT_SEASON - self._seasons, -1)])
+
+
+	def load_gamelogs(self, team_gamelogs: list[tuple[int, dict]]) -> None:
+		'''Builds the rolling aggregates from already grabbed team game logs'''
+		columns = {}
+		for year, payload in team_gamelogs:
+			result = payload['resultSets'][0]
+			if len(result['rowSet']) == 0:
+				continue
+
+			for header, values in zip(result['headers'], zip(*result['rowSet'])):
+				columns.setdefault(header, []).append(values)
+
+		if len(columns) == 0:
+			return
+
+		column = lambda header: numpy.concatenate([numpy.asarray(values) for values in columns[header]])
+		games = column('GAME_ID').astype(str)
+		names = column('TEAM_ABBREVIATION').astype(str)
+		dates = column('GAME_DATE').astype('datetime64[D]')
+
+		# both teams of a game end up next to each other, so a row's opponent is its neighbour
+		order = numpy.lexsort((names, games))
+		games, names, dates = games[order], names[order], dates[order]
+		paired = numpy.zeros(len(games), dtype=bool)
+		same_game = games[:-1] == games[1:]
+		first = numpy.flatnonzero(same_game & numpy.append(True, ~same_game[:-1]))
+		paired[first] = paired[first + 1] = True
+
+		opponent = numpy.arange(len(games))
+		opponent[first], opponent[first + 1] = first + 1, first
+
+		stats = {header: column(header)[order].astype(numpy.float64) for header in BASE_STATS + ['FTA', 'MIN']}
+		pace = possessions(stats['FGA'], stats['FTA'], stats['OREB'], stats['TOV'])
+		pace = 48 * (pace + pace[opponent]) / 2 / numpy.maximum(stats['MIN'] / 5, 1)
+
+		# a game only missing its opponent's row (e.g. still being played) says nothing about the defense
+		keep = numpy.flatnonzero(paired)
+		teams, team = numpy.unique(names[keep], return_inverse=True)
+		by_team = numpy.lexsort((dates[keep], team))
+		rows = keep[by_team]
+
+		team = team[by_team]
+		date = dates[rows]
+		allowed = {header: stats[header][opponent[rows]] for header in BASE_STATS}
+
+		# published in one assignment, so a reader on another thread sees all of the old load or all of the new one
+		self._games = {'teams': teams,
+					   'team': team,
+					   'date': date,
+					   'keys': (team << 32) + date.astype(numpy.int64),
+					   'allowed': allowed,
+					   'rolling': {header: self._rolling_mean(team, values) for header, values in allowed.items()},
+					   'pace': pace[rows],
+					   'rolling_pace': self._rolling_mean(team, pace[rows])}
+
+
+	def _rolling_mean(self, team: numpy.ndarray, values: numpy.ndarray) -> numpy.ndarray:
+		'''Returns the mean of every row's last window rows of the same team (fewer at the start of its games)'''
+		sums = numpy.concatenate([[0.0], numpy.cumsum(values)])
+		rows = numpy.arange(len(values))
+		team_start = numpy.searchsorted(team, team, 'left')
+		start = numpy.maximum(team_start, rows - self._window + 1)
+
+		return (sums[rows + 1] - sums[start]) / (rows + 1 - start)
+
+
+	def teams(self) -> list[str]:
+		'''Returns the abbreviation of every team with games loaded, sorted'''
+		return [str(team) for team in self._games['teams']]
+
+
+	@staticmethod
+	def _team_codes(games: dict, teams: numpy.ndarray) -> numpy.ndarray:
+		'''Returns the index of every abbreviation into teams(), or -1 for a team without games loaded'''
+		codes = numpy.searchsorted(games['teams'], teams)
+		codes = numpy.minimum(codes, max(len(games['teams']) - 1, 0))
+		known = len(games['teams']) > 0 and games['teams'][codes] == teams
+
+		return numpy.where(known, codes, -1)
+
+
+	@staticmethod
+	def _rows_before(games: dict, teams: numpy.ndarray, dates: numpy.ndarray) -> numpy.ndarray:
+		'''Returns every team's last row before the date, or -1 if it has no games loaded before then'''
+		codes = OpponentContext._team_codes(games, numpy.asarray(teams, dtype=str))
+		keys = (codes << 32) + numpy.asarray(dates, dtype='datetime64[D]').astype(numpy.int64)
+		rows = numpy.searchsorted(games['keys'], keys, 'left') - 1
+
+		found = (codes >= 0) & (rows >= 0)
+		found[found] = games['team'][rows[found]] == codes[found]
+		return numpy.where(found, rows, -1)
+
+
+	def _stat_values(self, aggregates: dict, stat_type: str) -> numpy.ndarray:
+		'''Sums the per column values of a dropdown stat'''
+		return sum(aggregates[column] for column in API.stat_columns(stat_type))
+
+
+	def allowed_before(self, teams: numpy.ndarray, dates: numpy.ndarray, stat_type: str) -> numpy.ndarray:
+		'''Returns what each team allowed per game of a stat over its last window games before each date, e.g. the
+		defense a player's opponent brought into every game; NaN where nothing was loaded before that date'''
+		games = self._games
+		rows = self._rows_before(games, teams, dates)
+		if len(games['team']) == 0:
+			return numpy.full(len(rows), numpy.nan)
+
+		return numpy.where(rows >= 0, self._stat_values(games['rolling'], stat_type)[rows], numpy.nan)
+
+
+	def pace_before(self, teams: numpy.ndarray, dates: numpy.ndarray) -> numpy.ndarray:
+		'''Returns each team's possessions per 48 minutes over its last window games before each date'''
+		games = self._games
+		rows = self._rows_before(games, teams, dates)
+		if len(games['team']) == 0:
+			return numpy.full(len(rows), numpy.nan)
+
+		return numpy.where(rows >= 0, games['rolling_pace'][rows], numpy.nan)
+
+
+	def league(self, stat_type: str) -> float:
+		'''Returns what the average team allowed per game of a stat over every loaded game'''
+		games = self._games
+		if len(games['team']) == 0:
+			return float('nan')
+
+		return float(self._stat_values(games['allowed'], stat_type).mean())
+
+
+	def latest(self, team: str) -> dict:
+		'''Returns a team's current rolling aggregates: {'games', 'pace', and every column of BASE_STATS allowed}'''
+		games = self._games
+		row = self._rows_before(games, [team], [numpy.datetime64('9999-12-31')])[0]
+		if row < 0:
+			return None
+
+		latest = {header: float(games['rolling'][header][row]) for header in BASE_STATS}
+		latest['pace'] = float(games['rolling_pace'][row])
+		latest['games'] = int(min(self._window, row + 1 - numpy.searchsorted(games['team'], games['team'][row], 'left')))
+
+		return latest
+
+
+	def factor(self, team: str, stat_type: str) -> float:
+		'''Returns how much more (above 1) or less (below 1) of a stat a team currently allows than the league'''
+		latest = self.latest(team)
+		if latest is None:
+			return 1.0
+
+		return sum(latest[column] for column in API.stat_columns(stat_type)) / self.league(stat_type)
+
+
+	def adjusted_hit_rates(self, gamelog: GameLog, stat_type: str, line: float, team: str) -> list[tuple]:
+		'''Returns the (hit, tied, miss) percentages of every window of HIT_RATE_WINDOWS if each game had been
+		against the team: every game's stat is scaled by what the team allows now over what that game's opponent
+		allowed coming in (the league average where that isn't loaded)'''
+		league = self.league(stat_type)
+		faced = self.allowed_before(gamelog.opponents[gamelog.opponent], gamelog.date, stat_type)
+		faced = numpy.where(numpy.isnan(faced), league, faced)
+
+		values = gamelog.values(stat_type) * (self.factor(team, stat_type) * league / faced)
+		adjusted = gamelog.split_stats(stat_type, ALL_GAMES, line, values).get(ALL_GAMES)
+		if adjusted is None:
+			return [(0, 0, 0)] * len(HIT_RATE_WINDOWS)
+
+		return adjusted['hit_rates']
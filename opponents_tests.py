@@ -0,0 +1,67 @@
+# Test the opponent context to ensure rolling allowed stats only look back before each date and adjust the hit rates
+from api import API, CURRENT_SEASON, HIT_RATE_WINDOWS
+from dashboard import Dashboard
+from opponents import OpponentContext, OPPONENT_WINDOW
+from snapshots import SnapshotCache
+from storage import MemoryStorage
+from sample_data import load_sample_player, sample_seasons, team_gamelog_payload
+from charts import game_log_opponents, game_log_series, opponent_hit_rates
+import numpy
+import unittest
+
+
+class OpponentContextTests(unittest.TestCase):
+	def setUp(self):
+		self.payloads = [(CURRENT_SEASON, team_gamelog_payload(CURRENT_SEASON, allowed={'BOS': 90, 'DEN': 130})),
+						 (CURRENT_SEASON - 1, team_gamelog_payload(CURRENT_SEASON - 1))]
+		self.context = OpponentContext(None)
+		self.context.load_gamelogs(self.payloads)
+
+
+	def test_rolling_allowed_matches_the_opponents_rows(self):
+		rows = [row for year, payload in self.payloads for row in payload['resultSets'][0]['rowSet']]
+		headers = self.payloads[0][1]['resultSets'][0]['headers']
+		team, game, day, points = (headers.index(header) for header in ['TEAM_ABBREVIATION', 'GAME_ID', 'GAME_DATE', 'PTS'])
+		before = numpy.datetime64(f'{CURRENT_SEASON}-11-20')
+
+		# what BOS allowed is what its opponents scored, in its last games before the date
+		boston_games = {row[game] for row in rows if row[team] == 'BOS'}
+		allowed = sorted((row[day], row[points]) for row in rows
+						 if row[game] in boston_games and row[team] != 'BOS' and numpy.datetime64(row[day]) < before)
+		expected = numpy.mean([points for day, points in allowed[-OPPONENT_WINDOW:]])
+
+		self.assertAlmostEqual(self.context.allowed_before(['BOS'], [before], 'Points')[0], expected)
+		self.assertTrue(numpy.isnan(self.context.allowed_before(['BOS'], [numpy.datetime64('2000-01-01')], 'Points')[0]))
+		self.assertTrue(numpy.isnan(self.context.allowed_before(['XXX'], [before], 'Points')[0]))
+
+		# soft and tough defenses stand out against the league
+		self.assertGreater(self.context.factor('DEN', 'Points'), 1.1)
+		self.assertLess(self.context.factor('BOS', 'Points'), 0.9)
+		self.assertEqual(self.context.factor('XXX', 'Points'), 1.0)
+		self.assertEqual(self.context.latest('BOS')['games'], OPPONENT_WINDOW)
+		self.assertTrue(80 < self.context.latest('BOS')['pace'] < 120)
+
+
+	def test_upcoming_opponent_adjusts_the_hit_rates(self):
+		api = API(SnapshotCache(None, current_season=CURRENT_SEASON, storage=MemoryStorage()))
+		load_sample_player(api, seasons=sample_seasons(CURRENT_SEASON - 1))
+		dashboard = Dashboard(api)
+		dashboard.build()
+
+		# one annotation per bar of the game log, looked up from the context (which has no api to download with)
+		dates, values, trend = game_log_series(dashboard, 'Points', max_games=10)
+		opponents, allowed = game_log_opponents(dashboard, self.context, 'Points', max_games=10)
+		self.assertEqual(len(opponents), len(dates))
+		self.assertEqual(opponents[-1], api.get_gamelog()['resultSets'][0]['rowSet'][0][4][-3:])
+		self.assertFalse(numpy.isnan(allowed[-1]))
+
+		hit_rates = dashboard.get('Points')['hit_rates']
+		soft = opponent_hit_rates(dashboard, self.context, 'Points', 'DEN')
+		tough = opponent_hit_rates(dashboard, self.context, 'Points', 'BOS')
+		self.assertEqual(len(soft), len(HIT_RATE_WINDOWS))
+		self.assertGreater(soft[3][0], hit_rates[3][0])
+		self.assertLess(tough[3][0], hit_rates[3][0])
+
+
+if __name__ == '__main__':
+	unittest.main()
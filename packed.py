@@ -0,0 +1,183 @@
+# Compact binary game logs of single seasons; seasons before the current one never change, so they are packed once
+# into small fixed width columns (box score counts in int8/int16, matchups dictionary encoded, dates as datetime64)
+# and memory mapped afterwards, so opening a long career reads no json and copies nothing
+from datetime import datetime
+import numpy
+import threading
+import json
+import os
+
+
+# every whole number box score column of a PlayerGameLog row that is packed
+BOX_SCORE_COLUMNS = ['FGM', 'FGA', 'FG3M', 'FG3A', 'FTM', 'FTA', 'OREB', 'DREB', 'REB', 'AST', 'STL', 'BLK', 'TOV',
+					 'PF', 'PTS']
+
+# a packed file is MAGIC, the length of its json header (4 bytes, little endian), the header, then every column
+MAGIC = b'NBAGLOG1'
+
+# columns start on multiples of this many bytes
+ALIGNMENT = 8
+
+# the smallest of these a column fits in is the one it is packed as
+INT_TYPES = [numpy.int8, numpy.int16, numpy.int32, numpy.int64]
+
+
+def _smallest_int(values: numpy.ndarray) -> numpy.dtype:
+	'''Returns the smallest integer type every value fits in'''
+	if len(values) == 0:
+		return numpy.dtype(numpy.int8)
+
+	low, high = int(values.min()), int(values.max())
+	for int_type in INT_TYPES:
+		if numpy.iinfo(int_type).min <= low and high <= numpy.iinfo(int_type).max:
+			return numpy.dtype(int_type)
+
+	raise ValueError(f'{low} to {high} does not fit in 64 bits')
+
+
+class PackedSeason:
+	def __init__(self, year: int, date: numpy.ndarray, matchup: numpy.ndarray, matchups: list[str],
+				 stats: dict[str, numpy.ndarray]):
+		# one entry per game, newest game first like PlayerGameLog; matchup indexes the matchups dictionary
+		# the arrays are read only views of the file when the season was memory mapped
+		self.year = year
+		self.date = date
+		self.matchup = matchup
+		self.matchups = matchups
+		self.stats = stats
+
+
+	def __len__(self) -> int:
+		return len(self.date)
+
+
+	def total(self, columns: list[str]) -> numpy.ndarray:
+		'''Returns the sum of the given columns of every game as int64, e.g. PTS, REB, AST for Pts+Rebs+Asts'''
+		values = numpy.zeros(len(self), dtype=numpy.int64)
+		for column in columns:
+			values += self.stats[column]
+
+		return values
+
+
+	def home(self) -> numpy.ndarray:
+		'''Returns whether each game was at home, e.g. GSW vs. BOS rather than GSW @ BOS'''
+		return numpy.array([' vs. ' in matchup for matchup in self.matchups], dtype=bool)[self.matchup]
+
+
+	def opponents(self) -> numpy.ndarray:
+		'''Returns the opponent abbreviation of each game'''
+		# the extra entry keeps it an array of strings even for a season without games
+		return numpy.array([matchup.split(' ')[-1] for matchup in self.matchups] + [''])[self.matchup]
+
+
+	def date_labels(self) -> list[str]:
+		'''Returns the date of each game like the game log shows it, e.g. OCT 24'''
+		return [day.strftime('%b %d').upper() for day in self.date.tolist()]
+
+
+def pack_season(year: int, headers: list[str], rows: list[list]) -> PackedSeason:
+	'''Packs the PlayerGameLog rows of a season; raises ValueError if a box score column isn't whole numbers'''
+	date_index, matchup_index = headers.index('GAME_DATE'), headers.index('MATCHUP')
+
+	date = numpy.array([datetime.strptime(row[date_index], '%b %d, %Y').date() for row in rows], dtype='datetime64[D]')
+	matchups, matchup = numpy.unique(numpy.array([row[matchup_index] for row in rows], dtype=str), return_inverse=True)
+
+	stats = {}
+	for column in BOX_SCORE_COLUMNS:
+		values = numpy.array([row[headers.index(column)] for row in rows])
+		if len(values) > 0 and values.dtype.kind not in 'iu':
+			raise ValueError(f'{column} of the {year} season is not whole numbers')
+		stats[column] = values.astype(_smallest_int(values))
+
+	return PackedSeason(year, date, matchup.astype(_smallest_int(matchup)), matchups.tolist(), stats)
+
+
+def encode_season(season: PackedSeason) -> bytes:
+	'''Returns the bytes of a packed season file: MAGIC, the header's length and json, then every column aligned'''
+	arrays = [('date', season.date), ('matchup', season.matchup)] + list(season.stats.items())
+
+	columns = []
+	offset = 0
+	for name, array in arrays:
+		columns.append([name, array.dtype.str, offset])
+		offset += -(-array.nbytes // ALIGNMENT) * ALIGNMENT
+
+	header = json.dumps({'year': season.year, 'games': len(season), 'matchups': season.matchups,
+						 'columns': columns}).encode()
+	# the first column starts on an aligned offset too
+	header += b' ' * (-(len(MAGIC) + 4 + len(header)) % ALIGNMENT)
+
+	parts = [MAGIC, len(header).to_bytes(4, 'little'), header]
+	for name, array in arrays:
+		data = numpy.ascontiguousarray(array).tobytes()
+		parts.extend([data, b'\0' * (-len(data) % ALIGNMENT)])
+
+	return b''.join(parts)
+
+
+def write_season(path: str, season: PackedSeason) -> None:
+	'''Writes a packed season to a file, atomically'''
+	# write then rename so a crash never leaves half a season behind
+	with open(f'{path}.tmp', 'wb') as file:
+		file.write(encode_season(season))
+	os.replace(f'{path}.tmp', path)
+
+
+def read_season(path: str) -> PackedSeason:
+	'''Memory maps a packed season; its columns are read only views of the file, paged in as they are used'''
+	return decode_season(numpy.memmap(path, dtype=numpy.uint8, mode='r'), path)
+
+
+def decode_season(raw: bytes | numpy.ndarray, name: str = 'data') -> PackedSeason:
+	'''Returns the packed season of the bytes of a packed season file; its columns are views of the bytes'''
+	raw = numpy.frombuffer(raw, dtype=numpy.uint8) if isinstance(raw, bytes) else raw
+	if raw[:len(MAGIC)].tobytes() != MAGIC:
+		raise ValueError(f'{name} is not a packed season')
+	length = int.from_bytes(raw[len(MAGIC):len(MAGIC) + 4].tobytes(), 'little')
+	header = json.loads(raw[len(MAGIC) + 4:len(MAGIC) + 4 + length].tobytes())
+
+	start = len(MAGIC) + 4 + length
+	games = header['games']
+
+	arrays = {}
+	for column, dtype, offset in header['columns']:
+		dtype = numpy.dtype(dtype)
+		arrays[column] = raw[start + offset:start + offset + games * dtype.itemsize].view(dtype)
+
+	date, matchup = arrays.pop('date'), arrays.pop('matchup')
+	return PackedSeason(header['year'], date, matchup, header['matchups'], arrays)
+
+
+class PackedSeasons:
+	def __init__(self, directory: str = None):
+		# one {pid}_{year}.glog file per season; without a directory seasons are only kept in memory
+		self._directory = directory
+		self._seasons = {}
+		self._lock = threading.Lock()
+
+
+	def _path(self, pid: int, year: int) -> str:
+		return os.path.join(self._directory, f'{pid}_{year}.glog')
+
+
+	def load(self, pid: int, year: int) -> PackedSeason | None:
+		'''Returns the packed season of a player, memory mapped, or None if it was never saved'''
+		if self._directory is None:
+			return self._seasons.get((pid, year))
+
+		try:
+			return read_season(self._path(pid, year))
+		except (OSError, ValueError, KeyError):
+			return None
+
+
+	def save(self, pid: int, season: PackedSeason) -> None:
+		'''Stores the packed season of a player, replacing the previous one'''
+		with self._lock:
+			if self._directory is None:
+				self._seasons[(pid, season.year)] = season
+				return
+
+			os.makedirs(self._directory, exist_ok=True)
+			write_season(self._path(pid, season.year), season)
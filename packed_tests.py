@@ -0,0 +1,133 @@
+# Test packed seasons to ensure they keep every game of the json rows in small memory mapped columns
+from api import API, CURRENT_SEASON, HitRateCounter, STATS
+from gamelog import GameLog, SPLITS
+from packed import pack_season, read_season, write_season, BOX_SCORE_COLUMNS
+from snapshots import SnapshotCache
+from sample_data import GAMELOG_HEADERS, sample_seasons, season_rows, stub_downloads
+import numpy
+import tempfile
+import unittest
+import os
+
+
+class PackedSeasonTests(unittest.TestCase):
+	def setUp(self):
+		self.directory = tempfile.TemporaryDirectory()
+		self.rows = season_rows(2021, 82)
+		self.season = pack_season(2021, GAMELOG_HEADERS, self.rows)
+
+
+	def tearDown(self):
+		self.directory.cleanup()
+
+
+	def _column(self, header: str) -> list:
+		return [row[GAMELOG_HEADERS.index(header)] for row in self.rows]
+
+
+	def test_columns_are_small_and_matchups_are_a_dictionary(self):
+		for column in BOX_SCORE_COLUMNS:
+			self.assertEqual(self.season.stats[column].dtype, numpy.int8)
+			self.assertEqual(self.season.stats[column].tolist(), self._column(column))
+
+		self.assertEqual(self.season.matchup.dtype, numpy.int8)
+		self.assertEqual(len(self.season.matchups), len(set(self._column('MATCHUP'))))
+		self.assertEqual([self.season.matchups[x] for x in self.season.matchup], self._column('MATCHUP'))
+		self.assertEqual(self.season.date_labels(), [date.split(',')[0] for date in self._column('GAME_DATE')])
+
+
+	def test_written_season_is_memory_mapped(self):
+		path = os.path.join(self.directory.name, 'season.glog')
+		write_season(path, self.season)
+		mapped = read_season(path)
+
+		self.assertEqual(mapped.year, 2021)
+		self.assertEqual(mapped.matchups, self.season.matchups)
+		self.assertTrue(numpy.array_equal(mapped.date, self.season.date))
+		self.assertTrue(numpy.array_equal(mapped.home(), self.season.home()))
+		self.assertTrue(numpy.array_equal(mapped.opponents(), self.season.opponents()))
+		for column in BOX_SCORE_COLUMNS:
+			self.assertTrue(numpy.array_equal(mapped.stats[column], self.season.stats[column]))
+			self.assertFalse(mapped.stats[column].flags.writeable)
+
+		# one byte per game for every box score column
+		self.assertLess(os.path.getsize(path), 4096)
+
+
+	def test_empty_seasons_round_trip(self):
+		path = os.path.join(self.directory.name, 'empty.glog')
+		write_season(path, pack_season(2021, GAMELOG_HEADERS, []))
+		self.assertEqual(len(read_season(path)), 0)
+		self.assertEqual(len(read_season(path).opponents()), 0)
+
+
+	def test_rows_with_missing_stats_are_not_packed(self):
+		self.rows[3][GAMELOG_HEADERS.index('STL')] = None
+		with self.assertRaises(ValueError):
+			pack_season(2021, GAMELOG_HEADERS, self.rows)
+
+
+	def test_packed_seasons_feed_the_game_log_and_hit_rates(self):
+		career = [(year, rows) for year, rows in sorted(sample_seasons().items(), reverse=True)]
+		packed = [pack_season(year, GAMELOG_HEADERS, rows) for year, rows in career]
+
+		gamelog = GameLog.from_packed(packed, GAMELOG_HEADERS)
+		self.assertEqual(len(gamelog), sum(len(rows) for year, rows in career))
+		for stat_type in STATS:
+			by_rows, by_packed = HitRateCounter(GAMELOG_HEADERS, stat_type), HitRateCounter(GAMELOG_HEADERS, stat_type)
+			for (year, rows), season in zip(career, packed):
+				by_rows.add_season(year, rows)
+				by_packed.add_packed(season)
+			self.assertEqual(by_packed.get_counts(), by_rows.get_counts())
+
+			for split in SPLITS:
+				self.assertEqual(gamelog.split_stats(stat_type, split, 10),
+								 GameLog.from_seasons(career, GAMELOG_HEADERS).split_stats(stat_type, split, 10))
+
+
+class CareerSeasonsTests(unittest.TestCase):
+	def setUp(self):
+		self.directory = tempfile.TemporaryDirectory()
+		self.seasons = sample_seasons(CURRENT_SEASON - 5)
+
+
+	def tearDown(self):
+		self.directory.cleanup()
+
+
+	def _api(self) -> API:
+		api = API(SnapshotCache(self.directory.name, current_season=CURRENT_SEASON))
+		stub_downloads(api, self.seasons)
+		api.get_player_info_by_id(1)
+		return api
+
+
+	def test_past_seasons_are_packed_once(self):
+		api = self._api()
+		self.assertEqual([season.year for season in api.get_career_seasons()], sorted(self.seasons, reverse=True))
+		self.assertEqual(len(os.listdir(os.path.join(self.directory.name, 'packed'))), len(self.seasons) - 1)
+
+		# without the json of past seasons, the next api still opens the career from the packed files
+		for year in self.seasons:
+			if year != CURRENT_SEASON:
+				api.get_snapshots().get_storage().delete('playergamelog', 1, year)
+
+		reopened = self._api()
+		reopened.downloads.clear()
+		self.assertEqual(reopened.hit_rate_counts('Points'), api.hit_rate_counts('Points'))
+		self.assertEqual(reopened.downloads, [])
+
+
+	def test_new_current_season_games_replace_only_the_current_season(self):
+		api = self._api()
+		past = api.get_career_seasons()[1:]
+
+		newer = season_rows(CURRENT_SEASON, 35)
+		api.replace_current_season({'resultSets': [{'headers': GAMELOG_HEADERS, 'rowSet': newer}]})
+
+		self.assertEqual(len(api.get_career_seasons()[0]), 35)
+		self.assertEqual(api.get_career_seasons()[1:], past)
+
+
+if __name__ == '__main__':
+	unittest.main()
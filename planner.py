@@ -0,0 +1,59 @@
+# Plans which endpoints a player load downloads: every view names the data it reads, and every piece of data names
+# the endpoints it can be derived from, so the fewest endpoints that cover every view are grabbed and the rest is
+# derived locally (e.g. the year by year chart from the season rows of the career stats)
+from itertools import combinations
+
+
+# the data each view shown when a player is selected reads
+VIEW_DATA = {'bio': ['bio'],
+			 'career stats': ['career averages'],
+			 'year by year': ['season averages', 'career averages'],
+			 'season log': ['season averages'],
+			 'game log': ['current season games'],
+			 'hit rates': ['career seasons', 'current season games', 'career averages']}
+
+# the endpoints each piece of data can be derived from, the one it is derived from best first
+DATA_SOURCES = {'bio': ['commonplayerinfo'],
+				'career averages': ['playercareerstats'],
+				'season averages': ['playercareerstats', 'playerdashboardbyyearoveryear'],
+				'career seasons': ['commonplayerinfo'],
+				'current season games': ['playergamelog']}
+
+
+def plan(views: list[str] = None) -> dict[str, str]:
+	'''Returns {data: endpoint it is derived from} for every piece of data the views read (every view by default),
+	using the fewest endpoints possible; ties go to the endpoints the data prefers'''
+	views = list(VIEW_DATA) if views is None else views
+	needed = list(dict.fromkeys(data for view in views for data in VIEW_DATA[view]))
+	endpoints = list(dict.fromkeys(endpoint for data in needed for endpoint in DATA_SOURCES[data]))
+
+	best = None
+	for size in range(len(endpoints) + 1):
+		for chosen in combinations(endpoints, size):
+			if all(any(endpoint in chosen for endpoint in DATA_SOURCES[data]) for data in needed):
+				choice = {data: next(endpoint for endpoint in DATA_SOURCES[data] if endpoint in chosen) for data in needed}
+				# how far down its sources each piece of data had to go
+				rank = sum(DATA_SOURCES[data].index(endpoint) for data, endpoint in choice.items())
+				if best is None or rank < best[0]:
+					best = (rank, choice)
+
+		if best is not None:
+			return best[1]
+
+	raise ValueError(f'No endpoints cover {needed}')
+
+
+def plan_endpoints(load_plan: dict[str, str]) -> list[str]:
+	'''Returns the distinct endpoints a plan downloads, in the order its data was listed'''
+	return list(dict.fromkeys(load_plan.values()))
+
+
+def view_endpoints(load_plan: dict[str, str]) -> dict[str, list[str]]:
+	'''Returns the endpoints every view of a plan needs'''
+	return {view: list(dict.fromkeys(load_plan[data] for data in VIEW_DATA[view]))
+			for view in VIEW_DATA if all(data in load_plan for data in VIEW_DATA[view])}
+
+
+def endpoint_views(load_plan: dict[str, str], endpoints: list[str]) -> list[str]:
+	'''Returns the views of a plan that read from any of the endpoints, e.g. to redraw once they changed'''
+	return [view for view, needs in view_endpoints(load_plan).items() if any(endpoint in endpoints for endpoint in needs)]
@@ -0,0 +1,76 @@
+# Test the load planner to ensure a player load grabs the fewest endpoints and derives every view from them
+from api import API, CURRENT_SEASON, LOAD_PLAN, PLAYER_ENDPOINTS, STATS
+from planner import plan, plan_endpoints, view_endpoints, endpoint_views, VIEW_DATA
+from snapshots import SnapshotCache
+from storage import MemoryStorage
+from sample_data import load_sample_player, sample_seasons, stub_downloads, year_by_year_payload
+from unittest import mock
+import unittest
+
+
+class PlannerTests(unittest.TestCase):
+	def test_every_view_is_covered_by_the_fewest_endpoints(self):
+		load_plan = plan()
+		self.assertEqual(sorted(plan_endpoints(load_plan)), ['commonplayerinfo', 'playercareerstats', 'playergamelog'])
+		self.assertEqual(load_plan['season averages'], 'playercareerstats')
+		self.assertEqual(set(view_endpoints(load_plan)), set(VIEW_DATA))
+
+		# a view on its own still takes the source its data prefers
+		self.assertEqual(plan(['season log']), {'season averages': 'playercareerstats'})
+
+
+	def test_changed_endpoints_report_the_views_to_redraw(self):
+		load_plan = plan()
+		self.assertEqual(endpoint_views(load_plan, ['commonplayerinfo']), ['bio', 'hit rates'])
+		self.assertEqual(endpoint_views(load_plan, ['playergamelog']), ['game log', 'hit rates'])
+		self.assertEqual(endpoint_views(load_plan, []), [])
+
+
+class ConsolidatedLoadTests(unittest.TestCase):
+	def setUp(self):
+		self.seasons = sample_seasons(CURRENT_SEASON - 3)
+		self.api = API(SnapshotCache(None, current_season=CURRENT_SEASON, storage=MemoryStorage()))
+		stub_downloads(self.api, self.seasons)
+
+
+	def test_player_load_makes_one_request_per_planned_endpoint(self):
+		self.assertTrue(self.api.get_player_info_by_id(1))
+		self.assertEqual(sorted(endpoint for endpoint, pid, season in self.api.downloads), sorted(PLAYER_ENDPOINTS))
+
+		# the career history reuses the current season's log instead of grabbing it again
+		self.api.downloads.clear()
+		self.api.get_hit_rates('Points')
+		self.assertEqual(sorted(season for endpoint, pid, season in self.api.downloads),
+						 [year for year in sorted(self.seasons) if year != CURRENT_SEASON])
+
+
+	def test_year_by_year_derived_from_career_stats_matches_the_dashboard(self):
+		load_sample_player(self.api, seasons=self.seasons)
+		derived = {stat_type: self.api.per_year_convert(stat_type) for stat_type in STATS}
+
+		self.api._year_by_year = year_by_year_payload(self.seasons)
+		self.api.invalidate_player(1)
+		with mock.patch.dict(LOAD_PLAN, {'season averages': 'playerdashboardbyyearoveryear'}):
+			for stat_type in STATS:
+				self.assertEqual(derived[stat_type], self.api.per_year_convert(stat_type))
+
+
+	def test_traded_seasons_use_the_total_row(self):
+		load_sample_player(self.api, seasons=self.seasons)
+		seasons = self.api.get_careerstats()['resultSets'][0]
+		points = seasons['headers'].index('PTS')
+		team = seasons['headers'].index('TEAM_ABBREVIATION')
+
+		traded = seasons['rowSet'][1]
+		first_team, second_team, total = list(traded), list(traded), list(traded)
+		first_team[team], first_team[points] = 'BOS', 40.0
+		second_team[team], second_team[points] = 'MIA', 2.0
+		total[team] = 'TOT'
+		seasons['rowSet'][1:2] = [first_team, second_team, total]
+
+		self.assertEqual(self.api.get_year_by_year_stat_avg('PTS')[1], (traded[1], round(traded[points], 1)))
+		self.assertEqual(len(self.api.get_year_by_year_stat_avg('PTS')), len(self.seasons))
+
+
+if __name__ == '__main__':
+	unittest.main()
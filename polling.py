@@ -0,0 +1,166 @@
+# Game night polling of the current season game log of watched players
+# Players whose log isn't changing get checked less and less often, and all players share a request budget
+from collections import deque
+import threading
+import time
+
+
+# seconds between checks of a player whose game log just changed
+POLL_INTERVAL = 60
+
+# checks of a player back off by this factor every time nothing changed, up to MAX_POLL_INTERVAL
+BACKOFF = 2
+MAX_POLL_INTERVAL = 15 * 60
+
+# max requests across every watched player within BUDGET_WINDOW seconds
+REQUEST_BUDGET = 20
+BUDGET_WINDOW = 60
+
+
+def diff_gamelog(old: dict | None, new: dict) -> tuple[list[str], list[str]]:
+	'''Compares two PlayerGameLog payloads by game id; returns the (added, changed) game ids'''
+	headers = new['resultSets'][0]['headers']
+	game_index = headers.index('Game_ID')
+	new_rows = {row[game_index]: row for row in new['resultSets'][0]['rowSet']}
+
+	old_rows = {}
+	if old is not None:
+		old_rows = {row[game_index]: row for row in old['resultSets'][0]['rowSet']}
+
+	added = [game_id for game_id in new_rows if game_id not in old_rows]
+	changed = [game_id for game_id, row in new_rows.items() if game_id in old_rows and old_rows[game_id] != row]
+
+	return (added, changed)
+
+
+class GamelogPoller:
+	def __init__(self, fetch, interval: float = POLL_INTERVAL, max_interval: float = MAX_POLL_INTERVAL,
+				 backoff: float = BACKOFF, budget: int = REQUEST_BUDGET, clock = time.monotonic):
+		# fetch(pid) returns (PlayerGameLog payload, time grabbed) of the player's current season
+		self._fetch = fetch
+		self._interval = interval
+		self._max_interval = max_interval
+		self._backoff = backoff
+		self._budget = budget
+		self._clock = clock
+
+		# pid -> {'interval', 'next', 'gamelog'}
+		self._watched = {}
+		self._requests = deque()
+		self._lock = threading.RLock()
+
+		# diagnostics
+		self._polls = 0
+		self._updates = 0
+		self._failures = 0
+		self._throttled = 0
+
+
+	def watch(self, pid: int, gamelog: dict = None) -> None:
+		'''Starts polling a player; gamelog is the payload we already have so the first poll can be diffed'''
+		with self._lock:
+			if pid not in self._watched:
+				self._watched[pid] = {'interval': self._interval, 'next': self._clock(), 'gamelog': gamelog}
+
+
+	def unwatch(self, pid: int) -> None:
+		'''Stops polling a player'''
+		with self._lock:
+			self._watched.pop(pid, None)
+
+
+	def watched(self) -> list[int]:
+		'''Returns the ids of every watched player'''
+		with self._lock:
+			return list(self._watched)
+
+
+	def _remaining_budget(self) -> int:
+		'''Returns how many requests can still be made in the current budget window'''
+		while len(self._requests) > 0 and self._clock() - self._requests[0] >= BUDGET_WINDOW:
+			self._requests.popleft()
+
+		return self._budget - len(self._requests)
+
+
+	def due(self) -> list[int]:
+		'''Returns the players that are due for a check, most overdue first, capped by the request budget'''
+		with self._lock:
+			now = self._clock()
+			due = sorted((state['next'], pid) for pid, state in self._watched.items() if state['next'] <= now)
+
+			allowed = max(self._remaining_budget(), 0)
+			self._throttled += max(len(due) - allowed, 0)
+
+			return [pid for next_check, pid in due[:allowed]]
+
+
+	def next_check_in(self) -> float:
+		'''Returns how many seconds until the next player is due (or the budget frees up)'''
+		with self._lock:
+			if len(self._watched) == 0:
+				return self._interval
+
+			wait = max(min(state['next'] for state in self._watched.values()) - self._clock(), 0)
+			if self._remaining_budget() <= 0:
+				wait = max(wait, BUDGET_WINDOW - (self._clock() - self._requests[0]))
+
+			return wait
+
+
+	def _reschedule(self, pid: int, changed: bool) -> None:
+		'''Checks a changing player again soon and backs off from one that isn't changing'''
+		state = self._watched.get(pid)
+		if state is None:
+			return
+
+		if changed:
+			state['interval'] = self._interval
+		else:
+			state['interval'] = min(state['interval'] * self._backoff, self._max_interval)
+
+		state['next'] = self._clock() + state['interval']
+
+
+	def poll(self) -> dict[int, tuple]:
+		'''Checks every due player; returns {pid: (payload, time grabbed, added game ids, changed game ids)}
+		for just the players whose game log changed'''
+		updates = {}
+		for pid in self.due():
+			with self._lock:
+				self._requests.append(self._clock())
+				self._polls += 1
+
+			try:
+				payload, fetched_at = self._fetch(pid)
+			except Exception:
+				with self._lock:
+					self._failures += 1
+					self._reschedule(pid, False)
+				continue
+
+			with self._lock:
+				# the player could have been unwatched while we were waiting on the request
+				if pid not in self._watched:
+					continue
+
+				added, changed = diff_gamelog(self._watched[pid]['gamelog'], payload)
+				self._watched[pid]['gamelog'] = payload
+				self._reschedule(pid, len(added) + len(changed) > 0)
+
+				if len(added) + len(changed) > 0:
+					self._updates += 1
+					updates[pid] = (payload, fetched_at, added, changed)
+
+		return updates
+
+
+	def stats(self) -> dict:
+		'''Returns polling statistics for diagnostics'''
+		with self._lock:
+			return {'watched': len(self._watched),
+					'polls': self._polls,
+					'updates': self._updates,
+					'failures': self._failures,
+					'throttled': self._throttled,
+					'requests_in_window': self._budget - self._remaining_budget()}
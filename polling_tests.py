@@ -0,0 +1,129 @@
+# Test GamelogPoller and merging polled game logs into the API and dashboard
+from api import API, CURRENT_SEASON
+from dashboard import Dashboard
+from polling import GamelogPoller, diff_gamelog, POLL_INTERVAL, BACKOFF, MAX_POLL_INTERVAL
+from sample_data import load_sample_player, gamelog_payload, season_rows, GAMELOG_HEADERS
+import unittest
+
+
+class FakeClock:
+	def __init__(self):
+		self.now = 0.0
+
+	def __call__(self) -> float:
+		return self.now
+
+
+class GamelogPollerTests(unittest.TestCase):
+	def setUp(self):
+		self.clock = FakeClock()
+		self.gamelogs = {1: gamelog_payload(season_rows(CURRENT_SEASON, 10))}
+		self.requests = []
+
+		def _fetch(pid):
+			self.requests.append(pid)
+			return (self.gamelogs[pid], self.clock.now)
+
+		self.poller = GamelogPoller(_fetch, budget=3, clock=self.clock)
+
+
+	def test_diff_gamelog_detects_added_and_changed_games(self):
+		old = gamelog_payload(season_rows(CURRENT_SEASON, 3))
+		rows = season_rows(CURRENT_SEASON, 4)
+		rows[1][GAMELOG_HEADERS.index('PTS')] += 1
+
+		added, changed = diff_gamelog(old, gamelog_payload(rows))
+		self.assertEqual(added, [rows[0][GAMELOG_HEADERS.index('Game_ID')]])
+		self.assertEqual(changed, [rows[1][GAMELOG_HEADERS.index('Game_ID')]])
+
+
+	def test_unchanged_game_log_is_not_reported_and_backs_off(self):
+		self.poller.watch(1, self.gamelogs[1])
+
+		self.assertEqual(self.poller.poll(), {})
+		self.assertEqual(self.poller.next_check_in(), POLL_INTERVAL * BACKOFF)
+
+
+	def test_changed_game_log_is_reported_and_checked_again_soon(self):
+		self.poller.watch(1, gamelog_payload(season_rows(CURRENT_SEASON, 9)))
+
+		updates = self.poller.poll()
+		self.assertEqual(len(updates[1][2]), 1)
+		self.assertEqual(self.poller.next_check_in(), POLL_INTERVAL)
+
+
+	def test_backoff_is_capped(self):
+		self.poller.watch(1, self.gamelogs[1])
+		for x in range(20):
+			self.clock.now += MAX_POLL_INTERVAL
+			self.poller.poll()
+
+		self.assertEqual(self.poller.next_check_in(), MAX_POLL_INTERVAL)
+
+
+	def test_players_that_are_not_due_are_not_requested(self):
+		self.poller.watch(1, self.gamelogs[1])
+		self.poller.poll()
+		self.poller.poll()
+
+		self.assertEqual(self.requests, [1])
+
+
+	def test_request_budget_is_shared_by_every_watched_player(self):
+		for pid in range(1, 6):
+			self.gamelogs[pid] = self.gamelogs[1]
+			self.poller.watch(pid, self.gamelogs[1])
+
+		self.poller.poll()
+		self.assertEqual(len(self.requests), 3)
+		self.assertEqual(self.poller.stats()['throttled'], 2)
+
+		self.clock.now += 60
+		self.poller.poll()
+		self.assertEqual(len(self.requests), 5)
+
+
+	def test_failed_requests_back_off(self):
+		def _fail(pid):
+			raise ConnectionError()
+		poller = GamelogPoller(_fail, clock=self.clock)
+		poller.watch(1)
+
+		self.assertEqual(poller.poll(), {})
+		self.assertEqual(poller.stats()['failures'], 1)
+		self.assertEqual(poller.next_check_in(), POLL_INTERVAL * BACKOFF)
+
+
+class MergeGamelogTests(unittest.TestCase):
+	def setUp(self):
+		self.api = API()
+		self.seasons = load_sample_player(self.api)
+
+
+	def test_merge_gamelog_updates_the_current_season_in_place(self):
+		self.api.get_career_gamelog()
+		gamelog = gamelog_payload(season_rows(CURRENT_SEASON, 31))
+
+		self.assertTrue(self.api.merge_gamelog(1, gamelog, 0))
+		self.assertEqual(len(self.api.current_season_gamelog('Points')), 31)
+		self.assertEqual(len(self.api.get_career_gamelog()[0][1]), 31)
+		self.assertEqual(len(self.api.fetches), 2)
+
+
+	def test_merge_gamelog_ignores_other_players(self):
+		self.assertFalse(self.api.merge_gamelog(2, gamelog_payload([]), 0))
+
+
+	def test_dashboard_update_gamelog_recomputes_without_downloading(self):
+		dashboard = Dashboard(self.api)
+		dashboard.build()
+		gamelog = gamelog_payload(season_rows(CURRENT_SEASON, 31))
+
+		self.assertTrue(dashboard.update_gamelog(gamelog))
+		self.assertEqual(len(dashboard.get('Points')['season_log']), 31)
+		self.assertEqual(sum(dashboard.get('Points')['hit_counts']['Current Season'].values()), 31)
+		self.assertEqual(len(self.api.fetches), 2)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,142 @@
+# Speculatively downloads the top search results into the snapshot cache while the user is still choosing one,
+# so selecting any of them opens from the cache instead of waiting on nba_api
+# Runs on one low priority thread: rate limited, capped at a budget of downloads per search, and cancelled as soon
+# as the search changes
+from api import API
+from warmer import JobQueue, RateLimiter, player_jobs, warm_job
+import threading
+
+
+# search results prefetched once the listbox is focused or hovered
+PREFETCH_TOP = 3
+
+# max downloads per search; past seasons of long careers would otherwise take the whole budget of stats.nba.com
+PREFETCH_BUDGET = 24
+
+# max downloads per second, well under the warmer's so the selected player's own downloads come first
+PREFETCH_RATE = 1
+
+
+class Prefetcher:
+	def __init__(self, api: API, top: int = PREFETCH_TOP, budget: int = PREFETCH_BUDGET, rate: float = PREFETCH_RATE,
+				 limiter: RateLimiter = None):
+		# only the api's snapshot cache is used, never its selected player, so it can share the interface's cache;
+		# every search gets its own queue and stop event, so a cancelled search's thread can't touch the next one
+		self._api = api
+		self._top = top
+		self._budget = budget
+		self._limiter = limiter if limiter is not None else RateLimiter(rate)
+
+		self._results = []
+		self._queue = JobQueue()
+		self._stop = threading.Event()
+		self._thread = None
+		self._downloads = 0
+		self._lock = threading.Lock()
+
+		self._stats = {'searches': 0, 'cancelled': 0, 'downloads': 0, 'cached': 0, 'failed': 0, 'over budget': 0}
+
+
+	def set_results(self, pids: list[int]) -> None:
+		'''Starts a new search; nothing is downloaded until start()'''
+		self.cancel()
+		with self._lock:
+			self._results = list(pids)
+			self._stats['searches'] += 1
+
+
+	def cancel(self) -> None:
+		'''Stops prefetching the current search; a download already running still finishes into the cache'''
+		with self._lock:
+			if self._thread is not None:
+				self._stats['cancelled'] += 1
+
+			self._stop.set()
+			self._results = []
+			self._queue = JobQueue()
+			self._stop = threading.Event()
+			self._thread = None
+			self._downloads = 0
+
+
+	def start(self, first: int = None) -> None:
+		'''Prefetches the top results of the search, plus the hovered player (first) ahead of them; every player's
+		bio, career, year by year, and current season log come before anyone's past seasons'''
+		with self._lock:
+			pids = self._results[:self._top]
+			if first is not None:
+				pids = [first] + [pid for pid in pids if pid != first]
+
+			jobs = [job for pid in pids for job in player_jobs(pid)]
+			if len(jobs) == 0 or self._queue.add(jobs, first=True) == 0:
+				return
+
+			if self._thread is None:
+				self._thread = threading.Thread(target=self._work, args=(self._queue, self._stop), daemon=True)
+				self._thread.start()
+
+
+	def join(self, timeout: float = None) -> bool:
+		'''Waits for the current search to finish prefetching; returns whether it did'''
+		thread = self._thread
+		if thread is not None:
+			thread.join(timeout)
+			return not thread.is_alive()
+
+		return True
+
+
+	def _work(self, queue: JobQueue, stop: threading.Event) -> None:
+		'''Runs a search's jobs until they're done, the budget is spent, or the search is cancelled'''
+		while True:
+			job = queue.take(stop)
+
+			with self._lock:
+				if queue is not self._queue:
+					return
+
+				# jobs start() adds once this thread is gone start another thread
+				if job is None or self._downloads >= self._budget:
+					if job is not None:
+						self._stats['over budget'] += 1
+					self._thread = None
+					return
+
+			try:
+				downloaded, seasons = warm_job(self._api, job, self._wait(stop))
+			except Exception as error:
+				if stop.is_set():
+					return
+				queue.fail(job, error)
+				with self._lock:
+					self._stats['failed'] += 1
+				continue
+
+			queue.complete(job)
+			with self._lock:
+				if queue is self._queue:
+					self._downloads += downloaded
+				self._stats['downloads' if downloaded else 'cached'] += 1
+
+			# past seasons go to the back, behind every top result's endpoints
+			queue.add(seasons)
+
+
+	def _wait(self, stop: threading.Event):
+		'''Returns the wait before a download, which gives up once the search is cancelled'''
+		def _wait():
+			self._limiter.wait()
+			if stop.is_set():
+				raise InterruptedError('prefetch cancelled')
+
+		return _wait
+
+
+	def stats(self) -> dict:
+		'''Returns how many searches there were, were cancelled, or ran out of budget, and how many jobs were
+		downloaded, already cached, failed, or are still pending'''
+		with self._lock:
+			stats = dict(self._stats)
+			stats['pending'] = self._queue.counts()['pending']
+
+		return stats
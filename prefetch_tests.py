@@ -0,0 +1,102 @@
+# Test the prefetcher to ensure the top search results open from the cache, within the budget, until cancelled
+from api import API, CURRENT_SEASON, PLAYER_ENDPOINTS
+from snapshots import SnapshotCache
+from storage import MemoryStorage
+from prefetch import Prefetcher
+from sample_data import sample_download, sample_seasons
+import threading
+import unittest
+
+
+class FakeLimiter:
+	def __init__(self):
+		# holds every download until released, so tests can cancel a search midway
+		self.waits = 0
+		self.released = threading.Event()
+		self.released.set()
+
+
+	def wait(self) -> None:
+		self.waits += 1
+		self.released.wait(5)
+
+
+class PrefetcherTests(unittest.TestCase):
+	def setUp(self):
+		self.seasons = {pid: sample_seasons(CURRENT_SEASON - 2, 10, pid=pid) for pid in range(1, 6)}
+		self.snapshots = SnapshotCache(None, current_season=CURRENT_SEASON, storage=MemoryStorage())
+		self.downloads = []
+		self.limiter = FakeLimiter()
+
+
+	def _api(self) -> API:
+		'''Returns an api whose downloads come from the sample seasons of each player'''
+		api = API(self.snapshots)
+
+		def _download(endpoint: str, pid: int, season: int = None) -> dict:
+			self.downloads.append((endpoint, pid, season))
+			return sample_download(self.seasons[pid], endpoint, pid, season)
+
+		api._download = _download
+		return api
+
+
+	def _prefetcher(self, budget: int = 100) -> Prefetcher:
+		return Prefetcher(self._api(), top=2, budget=budget, limiter=self.limiter)
+
+
+	def test_top_results_are_selected_from_the_cache(self):
+		prefetcher = self._prefetcher()
+		prefetcher.set_results([1, 2, 3])
+		prefetcher.start(first=4)
+		self.assertTrue(prefetcher.join(5))
+
+		# every player's endpoints come before anyone's past seasons, hovered player first
+		first_seasons = min(x for x, job in enumerate(self.downloads) if job[2] not in (None, CURRENT_SEASON))
+		self.assertEqual({job[1] for job in self.downloads[:first_seasons]}, {4, 1, 2})
+		self.assertEqual(self.downloads[0][1], 4)
+		self.assertNotIn(3, {job[1] for job in self.downloads})
+
+		for pid in [4, 1, 2]:
+			api = self._api()
+			self.downloads.clear()
+			self.assertTrue(api.load_cached_player(pid))
+			self.assertEqual(api.stale_endpoints(), [])
+			api.hit_rate_counts('Points')
+			self.assertEqual(self.downloads, [])
+
+
+	def test_budget_caps_downloads_per_search(self):
+		prefetcher = self._prefetcher(budget=5)
+		prefetcher.set_results([1, 2])
+		prefetcher.start()
+		self.assertTrue(prefetcher.join(5))
+		self.assertEqual(len(self.downloads), 5)
+		self.assertEqual(prefetcher.stats()['over budget'], 1)
+
+		# a new search gets a new budget, and what is already cached doesn't count against it
+		prefetcher.set_results([1, 3])
+		prefetcher.start()
+		self.assertTrue(prefetcher.join(5))
+		self.assertEqual(len(self.downloads), 10)
+		self.assertEqual(prefetcher.stats()['cached'], len(PLAYER_ENDPOINTS))
+
+
+	def test_changing_the_search_cancels_it(self):
+		self.limiter.released.clear()
+		prefetcher = self._prefetcher()
+		prefetcher.set_results([1, 2])
+		prefetcher.start()
+
+		prefetcher.set_results([3])
+		self.limiter.released.set()
+		prefetcher.start()
+		self.assertTrue(prefetcher.join(5))
+
+		self.assertEqual({job[1] for job in self.downloads}, {3})
+		self.assertEqual(prefetcher.stats()['cancelled'], 1)
+		self.assertEqual(len([job for job in self.downloads if job[2] in (None, CURRENT_SEASON)]), len(PLAYER_ENDPOINTS))
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,48 @@
+# Estimates the probability a player goes over a line, with a bootstrap confidence band
+# Games are weighted by recency and everything is vectorized over groups (windows, players) at once
+import numpy
+
+
+# how many bootstrap resamples back each confidence band
+RESAMPLES = 4000
+
+# a game HALF_LIFE games older than the newest one counts half as much; None weighs every game the same
+HALF_LIFE = 20
+
+# width of the confidence band, e.g. 0.9 is the 5th to 95th percentile
+CONFIDENCE = 0.9
+
+# the generator is seeded so the same games always give the same band
+SEED = 0
+
+
+def recency_weights(rank: numpy.ndarray, half_life: float = HALF_LIFE) -> numpy.ndarray:
+	'''Returns the weight of each game given how many newer games there are (0 for the newest)'''
+	if half_life is None:
+		return numpy.ones(len(rank))
+
+	return 0.5 ** (rank / half_life)
+
+
+def bootstrap_over(weight_totals: numpy.ndarray, over_totals: numpy.ndarray, square_totals: numpy.ndarray,
+				   resamples: int = RESAMPLES, confidence: float = CONFIDENCE, seed: int = SEED) -> tuple:
+	'''Given per group sums of the weights, of the weights of games over the line, and of the squared weights,
+	returns (estimate, low, high) arrays in percent
+
+	Resampling a group's games with replacement only matters through how many of them went over, which is
+	binomial, so each resample is one binomial draw over the group's effective number of games'''
+	weight_totals = numpy.asarray(weight_totals, dtype=float)
+	played = weight_totals > 0
+
+	estimate = numpy.zeros(len(weight_totals))
+	estimate[played] = numpy.asarray(over_totals, dtype=float)[played] / weight_totals[played]
+
+	# effective sample size of weighted games (Kish); equals the number of games when every weight is 1
+	games = numpy.ones(len(weight_totals), dtype=numpy.int64)
+	games[played] = numpy.maximum(numpy.round(weight_totals[played] ** 2 / numpy.asarray(square_totals)[played]), 1)
+
+	rng = numpy.random.default_rng(seed)
+	draws = rng.binomial(games[:, None], estimate[:, None], size=(len(weight_totals), resamples)) / games[:, None]
+	low, high = numpy.quantile(draws, [(1 - confidence) / 2, (1 + confidence) / 2], axis=1)
+
+	return (numpy.round(estimate * 100, 1), numpy.round(low * 100, 1) * played, numpy.round(high * 100, 1) * played)
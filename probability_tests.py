@@ -0,0 +1,69 @@
+# Test the bootstrap over probabilities to ensure they agree with the raw hit rates and stay reproducible
+from api import API, HIT_RATE_WINDOWS
+from dashboard import Dashboard
+from gamelog import GameLog
+from probability import bootstrap_over, recency_weights
+from sample_data import load_sample_player, GAMELOG_HEADERS, sample_seasons
+import unittest
+import numpy
+
+
+class BootstrapTests(unittest.TestCase):
+	def test_unweighted_estimate_is_the_hit_rate(self):
+		estimate, low, high = bootstrap_over([10, 4], [7, 1], [10, 4])
+
+		self.assertEqual(estimate.tolist(), [70.0, 25.0])
+		self.assertTrue(numpy.all(low <= estimate) and numpy.all(estimate <= high))
+
+
+	def test_band_matches_resampling_the_games_themselves(self):
+		over = numpy.array([True] * 12 + [False] * 8)
+		rng = numpy.random.default_rng(1)
+		resampled = over[rng.integers(0, len(over), size=(20000, len(over)))].mean(axis=1) * 100
+
+		estimate, low, high = bootstrap_over([20], [12], [20], resamples=20000)
+		self.assertAlmostEqual(low[0], numpy.quantile(resampled, 0.05), delta=2.5)
+		self.assertAlmostEqual(high[0], numpy.quantile(resampled, 0.95), delta=2.5)
+
+
+	def test_same_seed_gives_the_same_band(self):
+		self.assertEqual(str(bootstrap_over([30], [17], [30], seed=4)), str(bootstrap_over([30], [17], [30], seed=4)))
+
+
+	def test_groups_without_games_are_zero(self):
+		estimate, low, high = bootstrap_over([0, 5], [0, 5], [0, 5])
+
+		self.assertEqual((estimate[0], low[0], high[0]), (0, 0, 0))
+		self.assertEqual((estimate[1], low[1], high[1]), (100, 100, 100))
+
+
+	def test_recency_weights_halve_every_half_life(self):
+		self.assertEqual(recency_weights(numpy.array([0, 10, 20]), 10).tolist(), [1, 0.5, 0.25])
+		self.assertEqual(recency_weights(numpy.array([0, 10]), None).tolist(), [1, 1])
+
+
+class OverProbabilityTests(unittest.TestCase):
+	def test_without_recency_weighting_the_estimate_is_the_over_rate(self):
+		seasons = sample_seasons()
+		gamelog = GameLog.from_seasons([(year, seasons[year]) for year in sorted(seasons, reverse=True)], GAMELOG_HEADERS)
+		values = gamelog.values('Points')
+
+		probabilities = gamelog.over_probabilities('Points', 20, half_life=None)
+		self.assertEqual(len(probabilities), len(HIT_RATE_WINDOWS))
+		self.assertEqual(probabilities[0][0], round(float(numpy.mean(values[:5] > 20)) * 100, 1))
+		self.assertEqual(probabilities[-1][0], round(float(numpy.mean(values > 20)) * 100, 1))
+
+
+	def test_dashboard_probabilities_follow_the_split(self):
+		api = API()
+		load_sample_player(api)
+		dashboard = Dashboard(api)
+		dashboard.build()
+
+		everything = dashboard.get_probabilities('Points')
+		self.assertEqual(dashboard.get_probabilities('Points', 'Not A Split'), everything)
+		self.assertNotEqual(dashboard.get_probabilities('Points', 'Home'), everything)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,171 @@
+# Captures a cProfile profile and the tracemalloc allocations of single UI actions, e.g. selecting a veteran
+# Every profiled action writes <time>_<action>.prof (open with pstats or snakeviz) and <time>_<action>_memory.txt
+from datetime import datetime
+import cProfile
+import functools
+import tracemalloc
+import threading
+import time
+import os
+import re
+
+
+PROFILE_DIRECTORY = os.path.join(os.path.expanduser('~'), '.nba_stats_analyzer', 'profiles')
+
+# lines of code listed in the memory file, by how much more memory they hold after the action
+TOP_ALLOCATIONS = 25
+
+# frames of the stack kept per allocation
+TRACEMALLOC_FRAMES = 5
+
+
+class ActionProfiler:
+	def __init__(self, directory: str = PROFILE_DIRECTORY, enabled: bool = False):
+		self._directory = directory
+		self._enabled = False
+		self._started_tracemalloc = False
+		self._active = threading.Lock()
+		self._captures = []
+
+		# (action, context, started) of the action being captured on the tkinter thread, if any
+		self._action = None
+
+		if enabled:
+			self.enable()
+
+
+	def is_enabled(self) -> bool:
+		'''Returns whether or not actions are being profiled'''
+		return self._enabled
+
+
+	def get_directory(self) -> str:
+		'''Returns the directory captures are written to'''
+		return self._directory
+
+
+	def enable(self) -> None:
+		'''Starts profiling actions; tracemalloc is started here since it only sees allocations made after it starts'''
+		if not tracemalloc.is_tracing():
+			tracemalloc.start(TRACEMALLOC_FRAMES)
+			self._started_tracemalloc = True
+		self._enabled = True
+
+
+	def disable(self) -> None:
+		'''Stops profiling actions, and stops tracemalloc if enable() started it'''
+		self._enabled = False
+		if self._started_tracemalloc:
+			tracemalloc.stop()
+			self._started_tracemalloc = False
+
+
+	def get_captures(self) -> list[tuple[str, str]]:
+		'''Returns the (profile, memory) files of every action captured so far, oldest first'''
+		return list(self._captures)
+
+
+	def stats(self) -> dict:
+		'''Returns profiling statistics, shown in diagnostics'''
+		return {'enabled': self._enabled, 'captures': len(self._captures), 'directory': self._directory}
+
+
+	def run(self, action: str, context: str, function, *args, **kwargs):
+		'''Calls function(*args, **kwargs), capturing it as the given action when profiling is on; an action started
+		while another is being captured (e.g. one callback calling another) is part of the outer capture'''
+		if not self._enabled or not self._active.acquire(blocking=False):
+			return function(*args, **kwargs)
+
+		started = datetime.now()
+		self._action = (action, context, started)
+		try:
+			return self._capture(action, context, started, function, *args, **kwargs)
+		finally:
+			self._action = None
+			self._active.release()
+
+
+	def background(self, function):
+		'''Returns the function wrapped so that, run on another thread, it is captured as part of the action being
+		captured right now, e.g. the dashboard build a player selection starts, which cProfile on the tkinter thread
+		never sees; it is written next to the action's files as <time>_<action>_background once the action's own
+		capture is done. Returns the function unchanged when no action is being captured.'''
+		if self._action is None:
+			return function
+
+		action, context, started = self._action
+
+		@functools.wraps(function)
+		def wrapper(*args, **kwargs):
+			# only one cProfile can be enabled at a time, so the work waits for the action's capture to finish, and
+			# actions started while it runs aren't captured
+			with self._active:
+				return self._capture(f'{action} background', f'{context}, started by {action}', started, function,
+									 *args, **kwargs)
+
+		return wrapper
+
+
+	def _capture(self, action: str, context: str, started: datetime, function, *args, **kwargs):
+		'''Calls function(*args, **kwargs) under its own cProfile (which only sees the calling thread) and writes
+		the capture'''
+		profile = cProfile.Profile()
+		before = tracemalloc.take_snapshot()
+		tracemalloc.reset_peak()
+		baseline = tracemalloc.get_traced_memory()[0]
+		start = time.perf_counter()
+		try:
+			profile.enable()
+			try:
+				return function(*args, **kwargs)
+			finally:
+				profile.disable()
+		finally:
+			elapsed = time.perf_counter() - start
+			peak = tracemalloc.get_traced_memory()[1] - baseline
+			after = tracemalloc.take_snapshot()
+			self._write(action, context, started, elapsed, profile, before, after, peak)
+
+
+	def _write(self, action: str, context: str, started: datetime, elapsed: float, profile: cProfile.Profile,
+			   before: tracemalloc.Snapshot, after: tracemalloc.Snapshot, peak: int) -> None:
+		'''Writes the profile and the top allocations of a captured action'''
+		os.makedirs(self._directory, exist_ok=True)
+		name = f"{started.strftime('%Y%m%d-%H%M%S-%f')}_{re.sub(r'[^0-9A-Za-z-]+', '_', action)}"
+		profile_path = os.path.join(self._directory, f'{name}.prof')
+		memory_path = os.path.join(self._directory, f'{name}_memory.txt')
+
+		profile.dump_stats(profile_path)
+
+		# only memory allocated by this program, not by tracemalloc itself
+		filters = [tracemalloc.Filter(False, tracemalloc.__file__)]
+		differences = after.filter_traces(filters).compare_to(before.filter_traces(filters), 'lineno')
+
+		with open(memory_path, 'w') as file:
+			file.write(f'action: {action}\n')
+			file.write(f'context: {context}\n')
+			file.write(f'started: {started.isoformat()}\n')
+			file.write(f'elapsed: {elapsed * 1000:.1f} ms\n')
+			file.write(f'peak memory above the start: {peak / 1024:.1f} KiB\n')
+			file.write(f'net allocated: {sum(difference.size_diff for difference in differences) / 1024:.1f} KiB\n\n')
+			file.write(f'top {TOP_ALLOCATIONS} allocations by growth:\n')
+			for difference in differences[:TOP_ALLOCATIONS]:
+				file.write(f'{difference}\n')
+
+		self._captures.append((profile_path, memory_path))
+
+
+def profiled(action: str):
+	'''Decorator for Interface callbacks; the call is captured by the interface's ActionProfiler as the action,
+	with the interface's _profile_context() written alongside it'''
+	def decorator(method):
+		@functools.wraps(method)
+		def wrapper(self, *args, **kwargs):
+			if not self._profiler.is_enabled():
+				return method(self, *args, **kwargs)
+
+			return self._profiler.run(action, self._profile_context(), method, self, *args, **kwargs)
+
+		return wrapper
+
+	return decorator
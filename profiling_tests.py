@@ -0,0 +1,107 @@
+# Test the action profiler to ensure each captured action leaves a readable profile and allocation report
+from profiling import ActionProfiler, profiled
+import tempfile
+import threading
+import unittest
+import pstats
+import os
+
+
+def _allocate(count: int) -> list:
+	return [str(x) * 4 for x in range(count)]
+
+
+class Panel:
+	def __init__(self, profiler: ActionProfiler):
+		self._profiler = profiler
+		self.kept = []
+
+
+	def _profile_context(self) -> str:
+		return 'stat=Blks+Stls'
+
+
+	@profiled('outer')
+	def outer(self) -> int:
+		self.kept = _allocate(20000)
+		return self.inner()
+
+
+	@profiled('select')
+	def select(self) -> threading.Thread:
+		# like a player selection starting the dashboard build on another thread
+		thread = threading.Thread(target=self._profiler.background(lambda: _allocate(5000)))
+		thread.start()
+		return thread
+
+
+	@profiled('inner')
+	def inner(self) -> int:
+		return len(self.kept)
+
+
+class ProfilerTests(unittest.TestCase):
+	def setUp(self):
+		self.directory = tempfile.TemporaryDirectory()
+		self.profiler = ActionProfiler(self.directory.name)
+
+
+	def tearDown(self):
+		self.profiler.disable()
+		self.directory.cleanup()
+
+
+	def test_nothing_is_written_while_disabled(self):
+		self.assertEqual(Panel(self.profiler).outer(), 20000)
+		self.assertEqual(os.listdir(self.directory.name), [])
+
+
+	def test_action_writes_its_profile_and_allocations(self):
+		self.profiler.enable()
+		self.assertEqual(Panel(self.profiler).outer(), 20000)
+
+		# the inner action is part of the outer capture
+		self.assertEqual(len(self.profiler.get_captures()), 1)
+		profile_path, memory_path = self.profiler.get_captures()[0]
+		self.assertTrue(profile_path.endswith('_outer.prof'))
+
+		functions = [function for filename, line, function in pstats.Stats(profile_path).stats]
+		self.assertIn('_allocate', functions)
+		self.assertIn('inner', functions)
+
+		with open(memory_path) as file:
+			memory = file.read()
+		self.assertIn('action: outer', memory)
+		self.assertIn('context: stat=Blks+Stls', memory)
+		self.assertIn('profiling_tests.py', memory.split('allocations by growth:')[1])
+
+
+	def test_background_work_started_by_an_action_is_captured_with_it(self):
+		self.assertIs(self.profiler.background(_allocate), _allocate)
+
+		self.profiler.enable()
+		Panel(self.profiler).select().join()
+
+		(action_profile, action_memory), (background_profile, background_memory) = self.profiler.get_captures()
+		self.assertTrue(action_profile.endswith('_select.prof'))
+		self.assertTrue(background_profile.endswith('_select_background.prof'))
+		self.assertEqual(os.path.basename(action_profile)[:22], os.path.basename(background_profile)[:22])
+
+		self.assertNotIn('_allocate', [function for filename, line, function in pstats.Stats(action_profile).stats])
+		self.assertIn('_allocate', [function for filename, line, function in pstats.Stats(background_profile).stats])
+		with open(background_memory) as file:
+			self.assertIn('started by select', file.read())
+
+
+	def test_failed_action_is_still_captured(self):
+		self.profiler.enable()
+		with self.assertRaises(ZeroDivisionError):
+			self.profiler.run('divide', '', lambda: 1 / 0)
+
+		self.assertEqual(len(self.profiler.get_captures()), 1)
+		self.assertEqual(self.profiler.run('after', '', lambda: 2), 2)
+		self.assertEqual(len(self.profiler.get_captures()), 2)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,95 @@
+# Coalesced redraws for the tkinter interface: changes mark panels dirty instead of redrawing them, and a single
+# after_idle pass redraws every dirty panel at most once, so e.g. a stat change then a Last 5 click before the
+# window gets back to idle draws the game log once
+# Panels that can't be seen (hidden, or off the edge of the window) stay dirty until they can be
+from collections.abc import Callable
+
+
+def widget_visible(widget) -> bool:
+	'''Returns whether or not any part of a tkinter widget is on screen: it and everything it's in are mapped, and
+	it isn't scrolled or pushed past the edge of its window'''
+	if not widget.winfo_viewable():
+		return False
+
+	top = widget.winfo_toplevel()
+	left, upper = widget.winfo_rootx(), widget.winfo_rooty()
+	right, lower = left + widget.winfo_width(), upper + widget.winfo_height()
+	top_left, top_upper = top.winfo_rootx(), top.winfo_rooty()
+
+	return (right > top_left and left < top_left + top.winfo_width()
+			and lower > top_upper and upper < top_upper + top.winfo_height())
+
+
+class RedrawScheduler:
+	def __init__(self, after_idle: Callable, is_visible: Callable = widget_visible):
+		# panels are drawn in the order they were registered; after_idle(callback) is the window's after_idle, and
+		# is_visible(widget) says whether a panel's widget can be seen
+		self._after_idle = after_idle
+		self._is_visible = is_visible
+		self._panels = {}
+		self._dirty = set()
+		self._scheduled = False
+
+		self._stats = {'marks': 0, 'coalesced': 0, 'passes': 0, 'draws': 0, 'hidden': 0}
+
+
+	def register(self, panel: str, draw: Callable, widget=None) -> None:
+		'''Registers how to redraw a panel; a panel with a widget is only drawn while the widget is visible'''
+		self._panels[panel] = (draw, widget)
+
+
+	def mark(self, *panels: str) -> None:
+		'''Marks panels dirty; they're redrawn once the window is idle'''
+		for panel in panels:
+			if panel not in self._panels:
+				raise ValueError(f'Unknown panel {panel}')
+
+			self._stats['marks'] += 1
+			if panel in self._dirty:
+				self._stats['coalesced'] += 1
+			self._dirty.add(panel)
+
+		self.schedule()
+
+
+	def is_dirty(self, panel: str) -> bool:
+		'''Returns whether or not a panel is waiting to be redrawn, e.g. so an in place patch can be skipped'''
+		return panel in self._dirty
+
+
+	def schedule(self) -> None:
+		'''Schedules a redraw pass if anything is dirty, e.g. once a hidden panel may have become visible'''
+		if len(self._dirty) > 0 and not self._scheduled:
+			self._scheduled = True
+			self._after_idle(self.flush)
+
+
+	def flush(self) -> list[str]:
+		'''Redraws every dirty panel that is visible, in registration order; returns the panels drawn'''
+		self._scheduled = False
+		self._stats['passes'] += 1
+
+		drawn = []
+		for panel, (draw, widget) in self._panels.items():
+			if panel not in self._dirty:
+				continue
+			if widget is not None and not self._is_visible(widget):
+				self._stats['hidden'] += 1
+				continue
+
+			# a panel marked again while it draws (e.g. a redraw that needs another) is drawn in the next pass
+			self._dirty.discard(panel)
+			draw()
+			drawn.append(panel)
+			self._stats['draws'] += 1
+
+		return drawn
+
+
+	def stats(self) -> dict:
+		'''Returns how many marks there were, how many of them were coalesced into a redraw already pending, how many
+		passes ran and panels they drew, how many times a panel was skipped for being hidden, and what is dirty'''
+		stats = dict(self._stats)
+		stats['dirty'] = sorted(self._dirty)
+
+		return stats
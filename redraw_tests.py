@@ -0,0 +1,82 @@
+# Test the redraw scheduler to ensure dirty panels are redrawn once per idle pass, and hidden ones wait until visible
+from redraw import RedrawScheduler
+import unittest
+
+
+class RedrawSchedulerTests(unittest.TestCase):
+	def setUp(self):
+		# after_idle just queues the pass, so a test decides when the window goes idle
+		self.idle = []
+		self.visible = {'chart': True, 'log': True}
+		self.draws = []
+		self.scheduler = RedrawScheduler(self.idle.append, lambda widget: self.visible[widget])
+
+		for panel, widget in [('bio', None), ('game log', 'chart'), ('hit rates', 'chart'), ('season log', 'log')]:
+			self.scheduler.register(panel, lambda panel=panel: self.draws.append(panel), widget)
+
+
+	def _go_idle(self) -> None:
+		while len(self.idle) > 0:
+			self.idle.pop(0)()
+
+
+	def test_marks_before_idle_are_coalesced_into_one_pass(self):
+		# e.g. a stat change then a Last 5 click
+		self.scheduler.mark('game log', 'hit rates')
+		self.scheduler.mark('game log')
+		self.assertEqual(len(self.idle), 1)
+		self.assertEqual(self.draws, [])
+
+		self._go_idle()
+		self.assertEqual(self.draws, ['game log', 'hit rates'])
+		self.assertEqual(self.scheduler.stats()['coalesced'], 1)
+		self.assertEqual(self.scheduler.stats()['passes'], 1)
+
+		# panels are drawn in the order they were registered, whatever order they were marked in
+		self.draws.clear()
+		self.scheduler.mark('season log', 'bio')
+		self._go_idle()
+		self.assertEqual(self.draws, ['bio', 'season log'])
+		self.assertFalse(self.scheduler.is_dirty('bio'))
+
+		with self.assertRaises(ValueError):
+			self.scheduler.mark('nothing')
+
+
+	def test_hidden_panels_wait_until_visible(self):
+		self.visible['log'] = False
+		self.scheduler.mark('season log', 'game log')
+		self._go_idle()
+		self.assertEqual(self.draws, ['game log'])
+		self.assertTrue(self.scheduler.is_dirty('season log'))
+
+		# nothing is scheduled again until the window says something may have become visible
+		self.assertEqual(self.idle, [])
+		self.scheduler.mark('season log')
+		self._go_idle()
+		self.assertEqual(self.draws, ['game log'])
+
+		self.visible['log'] = True
+		self.scheduler.schedule()
+		self._go_idle()
+		self.assertEqual(self.draws, ['game log', 'season log'])
+		self.assertEqual(self.scheduler.stats()['dirty'], [])
+
+
+	def test_marking_while_drawing_draws_again_next_pass(self):
+		def _draw_game_log():
+			self.draws.append('game log')
+			if self.draws.count('game log') == 1:
+				self.scheduler.mark('game log', 'hit rates')
+
+		self.scheduler.register('game log', _draw_game_log, 'chart')
+		self.scheduler.mark('game log')
+		self.idle.pop(0)()
+		self.assertEqual(self.draws, ['game log', 'hit rates'])
+
+		self._go_idle()
+		self.assertEqual(self.draws, ['game log', 'hit rates', 'game log'])
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,198 @@
+# Headless report renderer; draws a one page report (year by year, game log, and hit rates, exactly as the
+# window draws them) of every player on a slate to png/pdf on the Agg backend, spread over a process pool
+# Every worker keeps one figure and one api for all of its reports, so a report is just a redraw and a save
+from api import API, CURRENT_SEASON, STATS
+from charts import (BLACK, WHITE, overlay_label, style_axes, year_by_year_series, draw_year_by_year, game_log_series,
+					draw_game_log, hit_rate_categories, draw_hit_rates, draw_hit_bands)
+from compare import load_player
+from dashboard import Dashboard
+from gamelog import ALL_GAMES
+from series import OVERLAYS, OVERLAY_WINDOW
+from snapshots import SnapshotCache, CACHE_DIRECTORY
+from nba_api.stats.static import players
+from concurrent.futures import ProcessPoolExecutor
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+import multiprocessing
+import argparse
+import time
+import os
+import re
+
+
+REPORT_DIRECTORY = os.path.join(os.path.expanduser('~'), '.nba_stats_analyzer', 'reports')
+
+REPORT_FORMATS = ['png', 'pdf']
+
+# one page: the year by year and game log charts over the hit rates
+REPORT_SIZE = (12, 12)
+REPORT_DPI = 80
+
+# reports per second each worker should reach when every player's data is already in the snapshot cache; nearly
+# all of a report's time is matplotlib laying out and rasterizing the figure, so it scales with workers
+TARGET_THROUGHPUT = 2
+
+# the figure and api of this process, made once by _start_worker()
+_worker = {}
+
+
+def _start_worker(snapshots_directory: str) -> None:
+	'''Makes the one figure and api every report rendered in this process reuses'''
+	figure = Figure(figsize=REPORT_SIZE, dpi=REPORT_DPI)
+	FigureCanvasAgg(figure)
+
+	_worker['figure'] = figure
+	_worker['api'] = API(SnapshotCache(snapshots_directory, current_season=CURRENT_SEASON))
+	_worker['snapshots_directory'] = snapshots_directory
+
+
+def report_path(directory: str, pid: int, stat_type: str, extension: str) -> str:
+	'''Returns the file a report is saved to, e.g. 201939_Pts_Rebs.png'''
+	return os.path.join(directory, f"{pid}_{re.sub(r'[^0-9A-Za-z-]+', '_', stat_type)}.{extension}")
+
+
+def draw_report(figure: Figure, dashboard: Dashboard, name: str, stat_type: str, split: str = ALL_GAMES,
+				kind: str = 'Average', window: int = OVERLAY_WINDOW) -> None:
+	'''Redraws the figure as a player's report for a stat'''
+	figure.clear()
+	figure.set_facecolor(BLACK)
+	figure.suptitle(f'{name}: {stat_type}' + ('' if split == ALL_GAMES else f' ({split})'), color=WHITE, fontsize=15)
+
+	yby_plot, gl_plot, hit_plot = figure.subplots(3, 1, gridspec_kw={'height_ratios': [4, 4, 3]})
+	figure.subplots_adjust(left=0.12, right=0.88, top=0.94, bottom=0.04, hspace=0.45)
+
+	style_axes(yby_plot, 'Season', stat_type)
+	years, averages, trend = year_by_year_series(dashboard, stat_type, kind, window)
+	draw_year_by_year(yby_plot, years, averages, trend, overlay_label(kind, window, 'Career', 'Season'))
+
+	style_axes(gl_plot, 'Game', stat_type, labelsize=5)
+	dates, values, trend = game_log_series(dashboard, stat_type, split, None, kind, window)
+	draw_game_log(gl_plot, dates, values, trend, overlay_label(kind, window, 'Season', 'Game'))
+
+	draw_hit_rates(hit_plot, hit_rate_categories(dashboard), dashboard.get(stat_type, split)['hit_rates'])
+	draw_hit_bands(hit_plot, dashboard.get_probabilities(stat_type, split))
+
+
+def _render_player(pid: int, stat_types: list[str], directory: str, formats: list[str], split: str, kind: str,
+				   window: int) -> list[str]:
+	'''Renders every report of a player with this process's figure and api; returns the files written'''
+	api = load_player(_worker['api'], pid)
+	dashboard = Dashboard(api)
+	dashboard.build()
+	if dashboard.has_failed():
+		raise RuntimeError(f'Unable to build the dashboard of player {pid}')
+
+	name = api.get_bio_info('DISPLAY_FIRST_LAST')
+	figure = _worker['figure']
+
+	paths = []
+	for stat_type in stat_types:
+		draw_report(figure, dashboard, name, stat_type, split, kind, window)
+		for extension in formats:
+			paths.append(report_path(directory, pid, stat_type, extension))
+			figure.savefig(paths[-1], facecolor=BLACK)
+
+	return paths
+
+
+class ReportFarm:
+	def __init__(self, directory: str = REPORT_DIRECTORY, workers: int = None, snapshots_directory: str = CACHE_DIRECTORY):
+		self._directory = directory
+		self._workers = workers if workers is not None else os.cpu_count()
+		self._snapshots_directory = snapshots_directory
+		self._pool = None
+
+
+	def render(self, pids: list[int], stat_types: list[str] = None, formats: list[str] = None, split: str = ALL_GAMES,
+			   kind: str = 'Average', window: int = OVERLAY_WINDOW) -> list[dict]:
+		'''Renders a report per player and stat (every stat by default) as png (by default) and/or pdf; returns
+		{'pid', 'paths', 'error'} per player, in order, where a player that couldn't be rendered has an error'''
+		stat_types = stat_types if stat_types is not None else STATS
+		formats = formats if formats is not None else ['png']
+		os.makedirs(self._directory, exist_ok=True)
+		job = (stat_types, self._directory, formats, split, kind, window)
+
+		if self._workers <= 1 or len(pids) <= 1:
+			if _worker.get('snapshots_directory') != self._snapshots_directory:
+				_start_worker(self._snapshots_directory)
+
+			results = []
+			for pid in pids:
+				try:
+					results.append({'pid': pid, 'paths': _render_player(pid, *job), 'error': None})
+				except Exception as error:
+					results.append({'pid': pid, 'paths': [], 'error': error})
+
+			return results
+
+		if self._pool is None:
+			# spawn so workers don't inherit the tkinter threads of the parent
+			self._pool = ProcessPoolExecutor(self._workers, mp_context=multiprocessing.get_context('spawn'),
+											 initializer=_start_worker, initargs=(self._snapshots_directory,))
+
+		futures = [self._pool.submit(_render_player, pid, *job) for pid in pids]
+
+		results = []
+		for pid, future in zip(pids, futures):
+			try:
+				results.append({'pid': pid, 'paths': future.result(), 'error': None})
+			except Exception as error:
+				results.append({'pid': pid, 'paths': [], 'error': error})
+
+		return results
+
+
+	def close(self) -> None:
+		'''Shuts the process pool down'''
+		if self._pool is not None:
+			self._pool.shutdown()
+			self._pool = None
+
+
+def read_slate(path: str) -> list[int]:
+	'''Returns the player ids of a slate file, one per line; blank lines and lines starting with # are skipped'''
+	with open(path) as file:
+		return [int(line.strip()) for line in file if line.strip() != '' and not line.strip().startswith('#')]
+
+
+def main() -> None:
+	'''Renders the reports of a slate headlessly and prints the throughput'''
+	parser = argparse.ArgumentParser(description='Render a one page report of every player on a slate')
+	parser.add_argument('pids', type=int, nargs='*', help='player ids to render')
+	parser.add_argument('--slate', help='file of player ids, one per line')
+	parser.add_argument('--active', action='store_true', help='render every active player')
+	parser.add_argument('--stats', nargs='+', default=STATS, choices=STATS)
+	parser.add_argument('--formats', nargs='+', default=['png'], choices=REPORT_FORMATS)
+	parser.add_argument('--split', default=ALL_GAMES, help='e.g. Home, Away, or vs. BOS')
+	parser.add_argument('--overlay', default='Average', choices=OVERLAYS)
+	parser.add_argument('--window', type=int, default=OVERLAY_WINDOW)
+	parser.add_argument('--workers', type=int, default=None)
+	parser.add_argument('--out', default=REPORT_DIRECTORY, help='directory the reports are written to')
+	args = parser.parse_args()
+
+	pids = list(args.pids)
+	if args.slate is not None:
+		pids.extend(read_slate(args.slate))
+	if args.active:
+		pids.extend(player['id'] for player in players.get_active_players())
+
+	workers = args.workers if args.workers is not None else os.cpu_count()
+	farm = ReportFarm(args.out, workers)
+	try:
+		start = time.perf_counter()
+		results = farm.render(pids, args.stats, args.formats, args.split, args.overlay, args.window)
+		elapsed = time.perf_counter() - start
+	finally:
+		farm.close()
+
+	for result in results:
+		if result['error'] is not None:
+			print(f"{result['pid']}: {result['error']}")
+
+	reports = sum(len(result['paths']) for result in results) // len(args.formats)
+	rate = reports / elapsed if elapsed > 0 else 0
+	print(f'{reports} reports in {elapsed:.1f} s ({rate:.1f} reports/s, target {TARGET_THROUGHPUT * workers}) written to {args.out}')
+
+
+if __name__ == '__main__':
+	main()
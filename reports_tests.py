@@ -0,0 +1,77 @@
+# Test the headless report renderer to ensure reports render from cached data in and out of process
+from api import API, CURRENT_SEASON
+from reports import ReportFarm, report_path, read_slate
+from sample_data import sample_seasons, stub_downloads
+from snapshots import SnapshotCache
+import tempfile
+import unittest
+import os
+
+
+PIDS = [1, 2, 3]
+
+
+class ReportTests(unittest.TestCase):
+	def setUp(self):
+		self.directory = tempfile.TemporaryDirectory()
+		self.snapshots = os.path.join(self.directory.name, 'snapshots')
+		self.out = os.path.join(self.directory.name, 'reports')
+
+		# grab every player once so the reports render from the snapshot cache alone
+		for pid in PIDS:
+			api = API(SnapshotCache(self.snapshots, current_season=CURRENT_SEASON))
+			stub_downloads(api, sample_seasons(pid=pid))
+			api.get_player_info_by_id(pid)
+			api.get_career_gamelog()
+
+
+	def tearDown(self):
+		self.directory.cleanup()
+
+
+	def test_reports_render_from_snapshots(self):
+		farm = ReportFarm(self.out, workers=1, snapshots_directory=self.snapshots)
+		results = farm.render(PIDS, ['Points', 'Pts+Rebs'], ['png', 'pdf'])
+
+		self.assertEqual([result['error'] for result in results], [None] * len(PIDS))
+		self.assertEqual(results[0]['paths'], [report_path(self.out, 1, 'Points', 'png'), report_path(self.out, 1, 'Points', 'pdf'),
+											   report_path(self.out, 1, 'Pts+Rebs', 'png'), report_path(self.out, 1, 'Pts+Rebs', 'pdf')])
+		for result in results:
+			for path in result['paths']:
+				self.assertGreater(os.path.getsize(path), 0)
+
+
+	def test_players_that_fail_are_reported(self):
+		farm = ReportFarm(self.out, workers=1, snapshots_directory=self.snapshots)
+		API._download, download = (lambda self, endpoint, pid, season=None: 1 / 0), API._download
+		try:
+			results = farm.render([1, 99], ['Points'])
+		finally:
+			API._download = download
+
+		self.assertIsNone(results[0]['error'])
+		self.assertIsNotNone(results[1]['error'])
+
+
+	def test_process_pool_writes_the_same_reports(self):
+		farm = ReportFarm(self.out, workers=2, snapshots_directory=self.snapshots)
+		try:
+			results = farm.render(PIDS, ['Rebounds'])
+		finally:
+			farm.close()
+
+		self.assertEqual([result['paths'] for result in results],
+						 [[report_path(self.out, pid, 'Rebounds', 'png')] for pid in PIDS])
+		self.assertTrue(all(os.path.exists(result['paths'][0]) for result in results))
+
+
+	def test_slate_file_skips_comments(self):
+		path = os.path.join(self.directory.name, 'slate.txt')
+		with open(path, 'w') as file:
+			file.write('# tonight\n1\n\n2\n')
+
+		self.assertEqual(read_slate(path), [1, 2])
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,157 @@
+# Team roster dashboard: the recent form of every player on a team for one stat at once, plus the team's totals
+# A roster is one request (CommonTeamRoster, cached like any snapshot), then every player's current season game log
+# is fetched at the same time through the snapshot cache, so a whole roster takes about as long as one player
+# Their games are packed and concatenated into one block of columns, so the table is a few vectorized reductions
+from api import API, CONVERT, CURRENT_SEASON
+from packed import pack_season
+from nba_api.stats.static import teams
+from concurrent.futures import ThreadPoolExecutor
+import numpy
+
+
+# every column kept in the block; combinations are summed from these
+BASE_STATS = list(CONVERT.values())
+
+# how many of a player's latest games their recent form is over
+ROSTER_WINDOW = 10
+
+# game logs fetched at the same time; a roster is usually 15 to 18 players
+ROSTER_WORKERS = 8
+
+ROSTER_COLUMNS = ['pid', 'name', 'position', 'games', 'average', 'season', 'line', 'hit', 'tied', 'miss']
+
+
+def team_names() -> list[str]:
+	'''Returns the full name of every team, sorted'''
+	return sorted(team['full_name'] for team in teams.get_teams())
+
+
+def find_team(city: str, name: str = None) -> dict | None:
+	'''Returns the static team info ({'id', 'full_name', 'abbreviation', 'nickname', 'city', ...}) given a full name,
+	or the TEAM_CITY and TEAM_NAME of a bio; the nickname alone decides when the city is written differently (e.g.
+	LA Clippers); None if no team matches, e.g. a free agent's empty city'''
+	full_name = city if name is None else f'{city} {name}'
+	for team in teams.get_teams():
+		if team['full_name'] == full_name:
+			return team
+
+	if name is not None:
+		matching = [team for team in teams.get_teams() if team['nickname'] == name]
+		if len(matching) == 1:
+			return matching[0]
+
+	return None
+
+
+def roster_players(payload: dict) -> list[tuple[int, str, str]]:
+	'''Returns (pid, name, position) of every player of a CommonTeamRoster json, in roster order'''
+	result = payload['resultSets'][0]
+	pid, name, position = (result['headers'].index(header) for header in ['PLAYER_ID', 'PLAYER', 'POSITION'])
+
+	return [(int(row[pid]), row[name], row[position]) for row in result['rowSet']]
+
+
+class TeamRoster:
+	def __init__(self, api: API, workers: int = ROSTER_WORKERS, window: int = ROSTER_WINDOW):
+		# players' games are back to back in the block, newest game first; offsets[x]:offsets[x + 1] are player x's
+		self._api = api
+		self._workers = workers
+		self._window = window
+
+		self.team = None
+		self.players = []
+		self.failed = []
+		self.offsets = numpy.zeros(1, dtype=numpy.int64)
+		self.stats = {column: numpy.zeros(0, dtype=numpy.int64) for column in BASE_STATS}
+
+
+	def load(self, team: dict, year: int = CURRENT_SEASON) -> None:
+		'''Grabs a team's roster then the season's game log of every player on it at the same time, each from the
+		snapshot cache unless it is stale; players whose game log can't be grabbed are left out (see failed)'''
+		players = roster_players(self._api.fetch_team_roster(team['id'], year))
+
+		with ThreadPoolExecutor(max_workers=max(min(self._workers, len(players)), 1)) as pool:
+			gamelogs = list(pool.map(lambda player: self._fetch_gamelog(player[0], year), players))
+
+		self.load_gamelogs(team, list(zip(players, gamelogs)), year)
+
+
+	def _fetch_gamelog(self, pid: int, year: int) -> dict | None:
+		'''Returns a player's game log json of the season, or None if it can't be grabbed'''
+		try:
+			return self._api.fetch_snapshot('playergamelog', pid, year)[0]
+		except Exception:
+			return None
+
+
+	def load_gamelogs(self, team: dict, gamelogs: list[tuple[tuple, dict | None]], year: int = CURRENT_SEASON) -> None:
+		'''Builds the block from already grabbed ((pid, name, position), PlayerGameLog json) pairs'''
+		players, failed, seasons = [], [], []
+		for player, gamelog in gamelogs:
+			try:
+				result = gamelog['resultSets'][0]
+				seasons.append(pack_season(year, result['headers'], result['rowSet']))
+				players.append(player)
+			except (TypeError, KeyError, IndexError, ValueError):
+				failed.append(player)
+
+		counts = [len(season) for season in seasons]
+		self.team = team
+		self.players = players
+		self.failed = failed
+		self.offsets = numpy.concatenate([[0], numpy.cumsum(counts, dtype=numpy.int64)])
+		self.stats = {column: numpy.concatenate([numpy.zeros(0, dtype=numpy.int64)]
+												+ [season.stats[column].astype(numpy.int64) for season in seasons])
+					  for column in BASE_STATS}
+
+
+	def is_loaded(self) -> bool:
+		'''Returns whether or not a roster has been loaded'''
+		return self.team is not None
+
+
+	def table(self, stat_type: str, line = 'season') -> list[dict]:
+		'''Returns a row per player of their last window games of a stat in one vectorized pass: games, average,
+		season average, and the hit/tied/miss percentages against the line, a number or 'season' to use each
+		player's (rounded) season average; in roster order'''
+		counts = numpy.diff(self.offsets)
+		n_players = len(counts)
+
+		values = numpy.zeros(self.offsets[-1], dtype=numpy.int64)
+		for column in API.stat_columns(stat_type):
+			values += self.stats[column]
+
+		player = numpy.repeat(numpy.arange(n_players), counts)
+		recent = numpy.arange(len(values)) - self.offsets[:-1][player] < self._window
+
+		seasons = numpy.bincount(player, values, minlength=n_players) / numpy.maximum(counts, 1)
+		lines = numpy.round(seasons) if line == 'season' else numpy.full(n_players, float(line))
+
+		game_lines = lines[player]
+		games = numpy.bincount(player, recent, minlength=n_players).astype(numpy.int64)
+		sums = numpy.bincount(player, recent * values, minlength=n_players)
+		hits = numpy.bincount(player, recent & (values > game_lines), minlength=n_players)
+		misses = numpy.bincount(player, recent & (values < game_lines), minlength=n_players)
+		total = numpy.maximum(games, 1)
+
+		averages = numpy.round(sums / total, 1)
+		hit, miss = numpy.round(hits * 100 / total, 1), numpy.round(misses * 100 / total, 1)
+		tied = numpy.round((games - hits - misses) * 100 / total, 1)
+
+		return [{'pid': pid, 'name': name, 'position': position, 'games': int(games[x]),
+				 'average': float(averages[x]), 'season': float(round(seasons[x], 1)), 'line': float(lines[x]),
+				 'hit': float(hit[x]), 'tied': float(tied[x]), 'miss': float(miss[x])}
+				for x, (pid, name, position) in enumerate(self.players)]
+
+
+	@staticmethod
+	def totals(table: list[dict]) -> dict:
+		'''Returns the team's totals of a table: players, games, the sums of the players' averages (what the roster
+		puts up per game), and the hit/tied/miss percentages over every player's games'''
+		games = sum(row['games'] for row in table)
+		counted = lambda key: sum(row[key] * row['games'] for row in table) / max(games, 1)
+
+		return {'players': len(table), 'games': games,
+				'average': round(sum(row['average'] for row in table), 1),
+				'season': round(sum(row['season'] for row in table), 1),
+				'hit': round(counted('hit'), 1), 'tied': round(counted('tied'), 1), 'miss': round(counted('miss'), 1)}
@@ -0,0 +1,73 @@
+# Test the team roster dashboard to ensure the vectorized table matches each player's own game log
+from api import API, CURRENT_SEASON
+from roster import TeamRoster, find_team, roster_players
+from snapshots import SnapshotCache
+from storage import MemoryStorage
+from sample_data import gamelog_payload, roster_payload, season_rows
+import threading
+import unittest
+
+
+class RosterTests(unittest.TestCase):
+	def setUp(self):
+		self.team = find_team('Golden State', 'Warriors')
+		self.pids = [1, 2, 3, 4]
+		self.rows = {pid: season_rows(CURRENT_SEASON, 4 + 3 * pid, pid, seed=pid) for pid in self.pids}
+
+		self.api = API(SnapshotCache(None, current_season=CURRENT_SEASON, storage=MemoryStorage()))
+		self.downloads = []
+		self.threads = set()
+
+		def _download(endpoint: str, pid: int, season: int = None) -> dict:
+			self.downloads.append((endpoint, pid, season))
+			self.threads.add(threading.get_ident())
+			if endpoint == 'commonteamroster':
+				return roster_payload(pid, season, self.pids)
+			if pid == 4:
+				raise ConnectionError('timed out')
+			return gamelog_payload(self.rows[pid])
+
+		self.api._download = _download
+
+
+	def test_teams_are_found_from_bio_fields(self):
+		self.assertEqual(self.team['abbreviation'], 'GSW')
+		self.assertEqual(find_team('LA', 'Clippers')['abbreviation'], 'LAC')
+		self.assertIsNone(find_team('', ''))
+
+
+	def test_table_matches_each_players_games(self):
+		roster = TeamRoster(self.api, window=5)
+		roster.load(self.team)
+
+		self.assertEqual([pid for pid, name, position in roster.players], [1, 2, 3])
+		self.assertEqual(roster.failed, [(4, 'Player 4', 'G')])
+		self.assertEqual(sorted(self.downloads)[0], ('commonteamroster', self.team['id'], CURRENT_SEASON))
+		self.assertGreater(len(self.threads), 1)
+
+		table = roster.table('Pts+Rebs', 10)
+		for row in table:
+			values = [game[24] + game[18] for game in self.rows[row['pid']]]
+			recent = values[:5]
+			self.assertEqual(row['games'], len(recent))
+			self.assertEqual(row['average'], round(sum(recent) / len(recent), 1))
+			self.assertEqual(row['season'], round(sum(values) / len(values), 1))
+			self.assertEqual(row['hit'], round(100 * sum(value > 10 for value in recent) / len(recent), 1))
+
+		totals = TeamRoster.totals(table)
+		self.assertEqual(totals['players'], 3)
+		self.assertEqual(totals['games'], 15)
+		self.assertAlmostEqual(totals['average'], sum(row['average'] for row in table))
+
+		# a second look comes from the snapshot cache
+		self.downloads.clear()
+		TeamRoster(self.api).load(self.team)
+		self.assertEqual(self.downloads, [('playergamelog', 4, CURRENT_SEASON)])
+
+
+	def test_roster_players(self):
+		self.assertEqual(roster_players(roster_payload(1, CURRENT_SEASON, [7, 8]))[1], (8, 'Player 8', 'F'))
+
+
+if __name__ == '__main__':
+	unittest.main()
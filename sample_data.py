@@ -0,0 +1,229 @@
+# Builds fake nba_api payloads so tests can run without hitting stats.nba.com
+from api import API, CURRENT_SEASON
+from snapshots import SnapshotCache
+from storage import MemoryStorage
+from datetime import date, datetime, timedelta
+import random
+
+
+GAMELOG_HEADERS = ['SEASON_ID', 'Player_ID', 'Game_ID', 'GAME_DATE', 'MATCHUP', 'WL', 'MIN', 'FGM', 'FGA',
+				   'FG_PCT', 'FG3M', 'FG3A', 'FG3_PCT', 'FTM', 'FTA', 'FT_PCT', 'OREB', 'DREB', 'REB', 'AST',
+				   'STL', 'BLK', 'TOV', 'PF', 'PTS', 'PLUS_MINUS', 'VIDEO_AVAILABLE']
+
+CAREER_HEADERS = ['PLAYER_ID', 'LEAGUE_ID', 'Team_ID', 'GP', 'GS', 'MIN', 'FGM', 'FGA', 'FG_PCT',
+				  'FG3M', 'FG3A', 'FG3_PCT', 'FTM', 'FTA', 'FT_PCT', 'OREB', 'DREB', 'REB', 'AST',
+				  'STL', 'BLK', 'TOV', 'PF', 'PTS']
+
+SEASON_HEADERS = ['PLAYER_ID', 'SEASON_ID', 'LEAGUE_ID', 'TEAM_ID', 'TEAM_ABBREVIATION', 'PLAYER_AGE', 'GP', 'GS',
+				  'MIN'] + CAREER_HEADERS[6:]
+
+YEAR_BY_YEAR_HEADERS = ['GROUP_SET', 'GROUP_VALUE', 'TEAM_ID', 'TEAM_ABBREVIATION', 'MAX_GAME_DATE', 'GP',
+						'FGM', 'FGA', 'FG3M', 'FTM', 'OREB', 'DREB', 'REB', 'AST', 'TOV', 'STL', 'BLK', 'PTS']
+
+BIO_HEADERS = ['PERSON_ID', 'FIRST_NAME', 'LAST_NAME', 'DISPLAY_FIRST_LAST', 'BIRTHDATE', 'HEIGHT', 'WEIGHT',
+			   'SEASON_EXP', 'TEAM_ID', 'TEAM_NAME', 'TEAM_ABBREVIATION', 'TEAM_CITY', 'FROM_YEAR', 'TO_YEAR',
+			   'DRAFT_YEAR', 'DRAFT_ROUND', 'DRAFT_NUMBER']
+
+LEAGUE_GAMELOG_HEADERS = ['SEASON_ID', 'PLAYER_ID', 'PLAYER_NAME', 'TEAM_ID', 'TEAM_ABBREVIATION', 'TEAM_NAME',
+						  'GAME_ID', 'GAME_DATE', 'MATCHUP', 'WL', 'MIN', 'FGM', 'FGA', 'FG_PCT', 'FG3M', 'FG3A',
+						  'FG3_PCT', 'FTM', 'FTA', 'FT_PCT', 'OREB', 'DREB', 'REB', 'AST', 'STL', 'BLK', 'TOV', 'PF',
+						  'PTS', 'PLUS_MINUS', 'FANTASY_PTS', 'VIDEO_AVAILABLE']
+
+TEAM_GAMELOG_HEADERS = ['SEASON_ID', 'TEAM_ID', 'TEAM_ABBREVIATION', 'TEAM_NAME', 'GAME_ID', 'GAME_DATE', 'MATCHUP',
+						'WL', 'MIN', 'FGM', 'FGA', 'FG_PCT', 'FG3M', 'FG3A', 'FG3_PCT', 'FTM', 'FTA', 'FT_PCT', 'OREB',
+						'DREB', 'REB', 'AST', 'STL', 'BLK', 'TOV', 'PF', 'PTS', 'PLUS_MINUS', 'VIDEO_AVAILABLE']
+
+ROSTER_HEADERS = ['TeamID', 'SEASON', 'LeagueID', 'PLAYER', 'NICKNAME', 'PLAYER_SLUG', 'NUM', 'POSITION', 'HEIGHT',
+				  'WEIGHT', 'BIRTH_DATE', 'AGE', 'EXP', 'SCHOOL', 'PLAYER_ID', 'HOW_ACQUIRED']
+
+OPPONENTS = ['BOS', 'LAL', 'DEN', 'MIA', 'PHX', 'NYK', 'DAL', 'MIL']
+
+
+def season_rows(year: int, games: int, pid: int = 1, seed: int = 0) -> list[list]:
+	'''Returns a season's worth of game log rows, newest game first like nba_api'''
+	rng = random.Random(seed * 10000 + year)
+	rows = []
+	day = date(year, 10, 24)
+
+	for x in range(games):
+		fgm, fga = rng.randint(3, 12), rng.randint(12, 24)
+		fg3m, ftm = rng.randint(0, 5), rng.randint(0, 8)
+		oreb, dreb = rng.randint(0, 3), rng.randint(2, 9)
+		matchup = f'GSW vs. {OPPONENTS[x % len(OPPONENTS)]}' if x % 2 == 0 else f'GSW @ {OPPONENTS[x % len(OPPONENTS)]}'
+
+		rows.append([f'2{year}', pid, f'00{year % 100:02d}{x:05d}', day.strftime('%b %d, %Y').upper(), matchup,
+					 rng.choice(['W', 'L']), rng.randint(20, 40), fgm, fga, round(fgm / fga, 3), fg3m,
+					 fg3m + rng.randint(0, 5), 0.4, ftm, ftm + rng.randint(0, 2), 0.8, oreb, dreb, oreb + dreb,
+					 rng.randint(1, 10), rng.randint(0, 3), rng.randint(0, 2), rng.randint(0, 5), rng.randint(0, 5),
+					 2 * fgm + fg3m + ftm, rng.randint(-15, 15), 1])
+
+		day += timedelta(days=rng.choice([1, 2, 2, 3]))
+
+	rows.reverse()
+	return rows
+
+
+def _column_total(rows: list[list], header: str) -> int:
+	'''Sums a single game log column'''
+	index = GAMELOG_HEADERS.index(header)
+	return sum(row[index] for row in rows)
+
+
+def _averages(rows: list[list]) -> list[float]:
+	'''Returns the per game averages of the career stat columns over some game log rows'''
+	games = max(len(rows), 1)
+	return [0.5 if header.endswith('_PCT') else round(_column_total(rows, header) / games, 1)
+			for header in CAREER_HEADERS[6:]]
+
+
+def career_payload(pid: int, seasons: dict[int, list]) -> dict:
+	'''Builds a PlayerCareerStats payload (per game) whose season and career averages match the given seasons'''
+	rows = [row for gamelog in seasons.values() for row in gamelog]
+	career = [pid, '00', 0, len(rows), len(rows), 30.0] + _averages(rows)
+
+	season_rows = [[pid, API.season_string(year), '00', 1610612744, 'GSW', 25, len(seasons[year]), len(seasons[year]), 30.0]
+				   + _averages(seasons[year]) for year in sorted(seasons) if len(seasons[year]) > 0]
+
+	return {'resource': 'playercareerstats', 'parameters': {'PlayerID': pid},
+			'resultSets': [{'name': 'SeasonTotalsRegularSeason', 'headers': SEASON_HEADERS, 'rowSet': season_rows},
+						   {'name': 'CareerTotalsRegularSeason', 'headers': CAREER_HEADERS, 'rowSet': [career]}]}
+
+
+def year_by_year_payload(seasons: dict[int, list]) -> dict:
+	'''Builds a PlayerDashboardByYearOverYear payload of season totals, newest season first'''
+	rows = []
+	for year in sorted(seasons, reverse=True):
+		gamelog = seasons[year]
+		if len(gamelog) == 0:
+			continue
+
+		row = ['By Year', API.season_string(year), 0, 'GSW', '', len(gamelog)]
+		row.extend(_column_total(gamelog, header) for header in YEAR_BY_YEAR_HEADERS[6:])
+		rows.append(row)
+
+	return {'resultSets': [{'name': 'OverallPlayerDashboard', 'headers': [], 'rowSet': []},
+						   {'name': 'ByYearPlayerDashboard', 'headers': YEAR_BY_YEAR_HEADERS, 'rowSet': rows}]}
+
+
+def bio_payload(pid: int, from_year: int) -> dict:
+	'''Builds a CommonPlayerInfo payload'''
+	bio = [pid, 'Sample', 'Player', 'Sample Player', '1995-03-14T00:00:00', '6-5', '210',
+		   CURRENT_SEASON - from_year, 1610612744, 'Warriors', 'GSW', 'Golden State', from_year, CURRENT_SEASON,
+		   str(from_year), '1', '7']
+
+	return {'resultSets': [{'name': 'CommonPlayerInfo', 'headers': BIO_HEADERS, 'rowSet': [bio]}]}
+
+
+def gamelog_payload(rows: list[list]) -> dict:
+	'''Wraps game log rows in a PlayerGameLog payload'''
+	return {'resultSets': [{'name': 'PlayerGameLog', 'headers': GAMELOG_HEADERS, 'rowSet': rows}]}
+
+
+def league_gamelog_payload(players: dict[int, list[list]]) -> dict:
+	'''Builds a LeagueGameLog payload (player mode) of one season from {pid: PlayerGameLog rows}, oldest game first'''
+	rows = []
+	for pid, gamelog in players.items():
+		for row in gamelog:
+			stats = dict(zip(GAMELOG_HEADERS, row))
+			game_date = datetime.strptime(stats['GAME_DATE'], '%b %d, %Y').strftime('%Y-%m-%d')
+			rows.append([stats['SEASON_ID'], pid, f'Player {pid}', 1610612744, 'GSW', 'Golden State Warriors',
+						 stats['Game_ID'], game_date, stats['MATCHUP'], stats['WL']]
+						+ [stats[header] for header in LEAGUE_GAMELOG_HEADERS[10:30]] + [0.0, 1])
+
+	rows.sort(key=lambda row: row[7])
+	return {'resultSets': [{'name': 'LeagueGameLog', 'headers': LEAGUE_GAMELOG_HEADERS, 'rowSet': rows}]}
+
+
+def team_gamelog_payload(year: int, games: int = 40, teams: list[str] = None, allowed: dict[str, int] = None) -> dict:
+	'''Builds a LeagueGameLog payload (team mode) of one season where every team plays the next one round robin, two
+	rows per game; a team in allowed gives up that many points every game (its opponents score them)'''
+	teams = ['GSW'] + OPPONENTS if teams is None else teams
+	allowed = {} if allowed is None else allowed
+	rng = random.Random(year)
+	rows = []
+	day = date(year, 10, 24)
+
+	for x in range(games):
+		home, away = teams[x % len(teams)], teams[(x + 1 + x // len(teams)) % len(teams)]
+		if home == away:
+			away = teams[(x + 1) % len(teams)]
+
+		for team, opponent in [(home, away), (away, home)]:
+			fgm, fga = rng.randint(35, 48), rng.randint(80, 95)
+			fg3m, ftm = rng.randint(8, 18), rng.randint(10, 25)
+			oreb, dreb = rng.randint(6, 14), rng.randint(30, 40)
+			points = allowed.get(opponent, 2 * fgm + fg3m + ftm)
+			matchup = f'{team} vs. {opponent}' if team == home else f'{team} @ {opponent}'
+
+			rows.append([f'2{year}', 1610612700 + teams.index(team), team, team, f'00{year % 100:02d}{x:05d}',
+						 day.strftime('%Y-%m-%d'), matchup, rng.choice(['W', 'L']), 240, fgm, fga, round(fgm / fga, 3),
+						 fg3m, fg3m + rng.randint(15, 25), 0.36, ftm, ftm + rng.randint(0, 6), 0.78, oreb, dreb,
+						 oreb + dreb, rng.randint(18, 32), rng.randint(4, 12), rng.randint(2, 8), rng.randint(8, 18),
+						 rng.randint(15, 25), points, rng.randint(-20, 20), 1])
+
+		day += timedelta(days=1)
+
+	return {'resultSets': [{'name': 'LeagueGameLog', 'headers': TEAM_GAMELOG_HEADERS, 'rowSet': rows}]}
+
+
+def roster_payload(team_id: int, year: int, pids: list[int]) -> dict:
+	'''Builds a CommonTeamRoster payload of the given players'''
+	rows = [[team_id, str(year), '00', f'Player {pid}', 'Player', f'player-{pid}', str(x), ['G', 'F', 'C'][x % 3],
+			 '6-5', '210', 'MAR 14, 1995', 28.0, '5', 'Sample', pid, None] for x, pid in enumerate(pids)]
+
+	return {'resultSets': [{'name': 'CommonTeamRoster', 'headers': ROSTER_HEADERS, 'rowSet': rows}]}
+
+
+def sample_seasons(first_year: int = CURRENT_SEASON - 2, games: int = 30, pid: int = 1) -> dict[int, list]:
+	'''Returns {year: rows} for every season from first_year through the current season'''
+	return {year: season_rows(year, games, pid) for year in range(first_year, CURRENT_SEASON + 1)}
+
+
+def load_sample_player(api: API, pid: int = 1, seasons: dict[int, list] = None) -> dict[int, list]:
+	'''Loads a fake player into the api as if get_player_info_by_id had been called; older seasons
+	are served by a stubbed downloader that counts how many times it is called'''
+	if seasons is None:
+		seasons = sample_seasons(pid=pid)
+
+	api._career = career_payload(pid, seasons)
+	api._bio = bio_payload(pid, min(seasons))
+	api._year_by_year = None
+	api._gamelog = gamelog_payload(seasons.get(CURRENT_SEASON, []))
+	api._career_gamelogs = None
+	api._career_seasons = None
+	api._pid = pid
+	api.invalidate_player(pid)
+
+	# a snapshot cache of its own in memory, so seasons packed for another fake player are never read back
+	api._snapshots = SnapshotCache(None, current_season=CURRENT_SEASON, storage=MemoryStorage())
+
+	api.fetches = []
+	def _fetch_season_gamelog(year: int) -> list[list]:
+		api.fetches.append(year)
+		return seasons.get(year, [])
+	api._fetch_season_gamelog = _fetch_season_gamelog
+
+	return seasons
+
+
+def sample_download(seasons: dict[int, list], endpoint: str, pid: int, season: int = None) -> dict:
+	'''Returns the payload a player endpoint would download for a player with the given seasons'''
+	if endpoint == 'playercareerstats':
+		return career_payload(pid, seasons)
+	if endpoint == 'commonplayerinfo':
+		return bio_payload(pid, min(seasons))
+	if endpoint == 'playerdashboardbyyearoveryear':
+		return year_by_year_payload(seasons)
+
+	return gamelog_payload(seasons.get(season, []))
+
+
+def stub_downloads(api: API, seasons: dict[int, list]) -> None:
+	'''Serves every nba_api download of the api from the given seasons; downloads are recorded in api.downloads'''
+	api.downloads = []
+
+	def _download(endpoint: str, pid: int, season: int = None) -> dict:
+		api.downloads.append((endpoint, pid, season))
+		return sample_download(seasons, endpoint, pid, season)
+
+	api._download = _download
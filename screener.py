@@ -0,0 +1,371 @@
+# League wide prop screener; ranks every active player by hit rate for a stat, window, and line
+# Every player's games live in one shared memory block of columns so a process pool can score them
+# without pickling any per-player data
+from api import API, CONVERT, CURRENT_SEASON, HIT_RATE_WINDOWS, STATS
+from probability import bootstrap_over, recency_weights, RESAMPLES, SEED
+from nba_api.stats.static import players
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
+import multiprocessing
+import argparse
+import csv
+import os
+import numpy
+
+
+# every column kept in the block; combinations are summed from these
+BASE_STATS = list(CONVERT.values())
+
+# how many seasons (counting the current one) are loaded into the screener by default
+SCREENER_SEASONS = 3
+
+# the hit rate windows, except that the last covers only the loaded seasons rather than the whole career
+SCREENER_WINDOWS = HIT_RATE_WINDOWS[:-1] + ['Loaded Seasons']
+
+# career stats fetched at the same time, one request per player unless the snapshot cache has them (see warmer.py)
+CAREER_WORKERS = 8
+
+# players per chunk handed to a worker
+CHUNK_SIZE = 64
+
+RESULT_COLUMNS = ['pid', 'name', 'games', 'average', 'line', 'hit', 'tied', 'miss', 'over', 'over_low', 'over_high']
+
+
+class LeagueBlock:
+	def __init__(self, shm: shared_memory.SharedMemory, n_players: int, n_games: int, owner: bool):
+		# layout: offsets (n_players + 1 int64), pids (n_players int64), then one float64 row per column of BASE_STATS
+		# of career averages (n_players each, nan if unknown), seasons (n_games int16), then one int16 row per column
+		# of BASE_STATS (n_games each)
+		self._shm = shm
+		self._owner = owner
+		self.n_players = n_players
+		self.n_games = n_games
+
+		position = 0
+		self.offsets = numpy.ndarray((n_players + 1,), dtype=numpy.int64, buffer=shm.buf, offset=position)
+		position += self.offsets.nbytes
+		self.pids = numpy.ndarray((n_players,), dtype=numpy.int64, buffer=shm.buf, offset=position)
+		position += self.pids.nbytes
+		self.careers = numpy.ndarray((len(BASE_STATS), n_players), dtype=numpy.float64, buffer=shm.buf, offset=position)
+		position += self.careers.nbytes
+		self.seasons = numpy.ndarray((n_games,), dtype=numpy.int16, buffer=shm.buf, offset=position)
+		position += self.seasons.nbytes
+		self.stats = numpy.ndarray((len(BASE_STATS), n_games), dtype=numpy.int16, buffer=shm.buf, offset=position)
+
+
+	@staticmethod
+	def size(n_players: int, n_games: int) -> int:
+		'''Returns how many bytes a block of the given dimensions needs'''
+		return 8 * (n_players * (len(BASE_STATS) + 2) + 1) + 2 * n_games * (len(BASE_STATS) + 1)
+
+
+	@staticmethod
+	def create(pids: numpy.ndarray, offsets: numpy.ndarray, seasons: numpy.ndarray, stats: numpy.ndarray,
+			   careers: numpy.ndarray = None) -> 'LeagueBlock':
+		'''Copies the given columns into a new shared memory block; career averages are unknown unless given'''
+		n_players, n_games = len(pids), len(seasons)
+		shm = shared_memory.SharedMemory(create=True, size=max(LeagueBlock.size(n_players, n_games), 1))
+
+		block = LeagueBlock(shm, n_players, n_games, True)
+		block.offsets[:] = offsets
+		block.pids[:] = pids
+		block.careers[:] = numpy.nan if careers is None else careers
+		block.seasons[:] = seasons
+		block.stats[:] = stats
+
+		return block
+
+
+	@staticmethod
+	def attach(spec: tuple) -> 'LeagueBlock':
+		'''Attaches to a block created in another process, given its spec()'''
+		name, n_players, n_games = spec
+		return LeagueBlock(shared_memory.SharedMemory(name=name), n_players, n_games, False)
+
+
+	def spec(self) -> tuple:
+		'''Returns what another process needs to attach to this block'''
+		return (self._shm.name, self.n_players, self.n_games)
+
+
+	def close(self) -> None:
+		'''Detaches from the block, freeing it if this process created it'''
+		# numpy views have to go before the memory can be closed
+		del self.offsets, self.pids, self.careers, self.seasons, self.stats
+		self._shm.close()
+		if self._owner:
+			self._shm.unlink()
+
+
+def career_averages(payload: dict | None) -> list[float]:
+	'''Returns the career per game average of every column of BASE_STATS of a PlayerCareerStats json (per game, as
+	the api grabs it), or nan for each if there is no career row, e.g. the json couldn't be grabbed'''
+	if payload is None or len(payload['resultSets'][1]['rowSet']) == 0:
+		return [numpy.nan] * len(BASE_STATS)
+
+	careerstats = payload['resultSets'][1]
+	return [float(careerstats['rowSet'][0][careerstats['headers'].index(column)]) for column in BASE_STATS]
+
+
+def build_league_block(league_gamelogs: list[tuple[int, dict]], active: set[int] = None,
+					   careers: dict[int, dict] = None) -> tuple[LeagueBlock, dict]:
+	'''Given (season year, LeagueGameLog json) pairs, groups every player's games together, newest game first,
+	into one shared memory block, along with the career averages of the {pid: PlayerCareerStats json} given;
+	returns the block and {pid: name}'''
+	pids, dates, seasons, stats = [], [], [], []
+	names = {}
+
+	for year, payload in league_gamelogs:
+		headers = payload['resultSets'][0]['headers']
+		rows = payload['resultSets'][0]['rowSet']
+		if len(rows) == 0:
+			continue
+
+		table = numpy.array(rows, dtype=object)
+		season_pids = table[:, headers.index('PLAYER_ID')].astype(numpy.int64)
+		keep = numpy.ones(len(rows), dtype=bool) if active is None else numpy.isin(season_pids, list(active))
+
+		pids.append(season_pids[keep])
+		dates.append(table[keep, headers.index('GAME_DATE')].astype('datetime64[D]'))
+		seasons.append(numpy.full(keep.sum(), year, dtype=numpy.int16))
+		stats.append(numpy.array([table[keep, headers.index(column)] for column in BASE_STATS], dtype=numpy.int16))
+		names.update(zip(season_pids[keep].tolist(), table[keep, headers.index('PLAYER_NAME')].tolist()))
+
+	if len(pids) == 0:
+		return (LeagueBlock.create(numpy.zeros(0, numpy.int64), numpy.zeros(1, numpy.int64),
+								   numpy.zeros(0, numpy.int16), numpy.zeros((len(BASE_STATS), 0), numpy.int16)), {})
+
+	pids = numpy.concatenate(pids)
+	dates = numpy.concatenate(dates)
+	seasons = numpy.concatenate(seasons)
+	stats = numpy.concatenate(stats, axis=1)
+
+	# by player, then newest game first
+	order = numpy.lexsort((-dates.astype(numpy.int64), pids))
+	pids, seasons, stats = pids[order], seasons[order], stats[:, order]
+
+	unique_pids, starts = numpy.unique(pids, return_index=True)
+	offsets = numpy.append(starts, len(pids))
+	averages = numpy.array([career_averages((careers or {}).get(pid)) for pid in unique_pids.tolist()],
+						   dtype=numpy.float64).reshape(len(unique_pids), len(BASE_STATS)).T
+
+	return (LeagueBlock.create(unique_pids, offsets, seasons, stats, averages), names)
+
+
+def score_players(block: LeagueBlock, start: int, end: int, stat_type: str, window: str, line,
+				  resamples: int = RESAMPLES) -> dict:
+	'''Scores players [start, end) of the block in one vectorized pass; line is a number or 'career' to use
+	each player's rounded career average from their career stats, like the hit rate panel does (their average over
+	the loaded seasons if it is unknown); over is the recency weighted probability of going over the line and
+	over_low/over_high its bootstrap band'''
+	offsets = block.offsets[start:end + 1]
+	low, high = offsets[0], offsets[-1]
+	counts = numpy.diff(offsets)
+	n_players = end - start
+
+	values = numpy.zeros(high - low, dtype=numpy.int32)
+	for column in API.stat_columns(stat_type):
+		values += block.stats[BASE_STATS.index(column), low:high]
+
+	player = numpy.repeat(numpy.arange(n_players), counts)
+	position = numpy.arange(high - low) - numpy.repeat(offsets[:-1] - low, counts)
+
+	averages = numpy.bincount(player, values, minlength=n_players) / numpy.maximum(counts, 1)
+	if line == 'career':
+		# summed column by column in the order career_convert() adds them, so the rounding matches exactly
+		career = numpy.zeros(n_players, dtype=numpy.float64)
+		for column in API.stat_columns(stat_type):
+			career = career + block.careers[BASE_STATS.index(column), start:end]
+		lines = numpy.where(numpy.isnan(career), numpy.round(averages), numpy.round(career))
+	else:
+		lines = numpy.full(n_players, float(line))
+
+	if window == 'Last 5':
+		mask = position < 5
+	elif window == 'Last 10':
+		mask = position < 10
+	elif window == 'Current Season':
+		mask = block.seasons[low:high] == CURRENT_SEASON
+	elif window == 'Loaded Seasons':
+		mask = numpy.ones(high - low, dtype=bool)
+	else:
+		raise ValueError(f'{window} is not one of {SCREENER_WINDOWS}')
+
+	game_lines = lines[player]
+	games = numpy.bincount(player, mask, minlength=n_players)
+	hits = numpy.bincount(player, mask & (values > game_lines), minlength=n_players)
+	misses = numpy.bincount(player, mask & (values < game_lines), minlength=n_players)
+	total = numpy.maximum(games, 1)
+
+	# seeded by where the chunk starts so scoring in a pool gives the same bands as scoring in process
+	weights = recency_weights(position) * mask
+	over, over_low, over_high = bootstrap_over(numpy.bincount(player, weights, minlength=n_players),
+											   numpy.bincount(player, weights * (values > game_lines), minlength=n_players),
+											   numpy.bincount(player, weights ** 2, minlength=n_players),
+											   resamples, seed=SEED + start)
+
+	return {'pid': block.pids[start:end].copy(),
+			'games': games,
+			'average': numpy.round(averages, 1),
+			'line': lines,
+			'hit': numpy.round(hits * 100 / total, 1),
+			'tied': numpy.round((games - hits - misses) * 100 / total, 1),
+			'miss': numpy.round(misses * 100 / total, 1),
+			'over': over,
+			'over_low': over_low,
+			'over_high': over_high}
+
+
+def _score_chunk(spec: tuple, start: int, end: int, stat_type: str, window: str, line) -> dict:
+	'''Process pool worker; attaches to the shared block instead of receiving player data'''
+	block = LeagueBlock.attach(spec)
+	try:
+		return score_players(block, start, end, stat_type, window, line)
+	finally:
+		block.close()
+
+
+def sort_results(results: list[dict], key: str = 'hit', descending: bool = True) -> list[dict]:
+	'''Sorts screener results by one of RESULT_COLUMNS'''
+	return sorted(results, key=lambda result: result[key], reverse=descending)
+
+
+def filter_results(results: list[dict], min_games: int = 0, name: str = None) -> list[dict]:
+	'''Keeps results with at least min_games games in the window and, if given, a name containing name'''
+	return [result for result in results if result['games'] >= min_games
+			and (name is None or name.lower() in result['name'].lower())]
+
+
+def export_csv(results: list[dict], path: str) -> None:
+	'''Writes screener results to a csv file'''
+	with open(path, 'w', newline='') as file:
+		writer = csv.DictWriter(file, fieldnames=RESULT_COLUMNS)
+		writer.writeheader()
+		writer.writerows(results)
+
+
+class Screener:
+	def __init__(self, api: API, seasons: int = SCREENER_SEASONS, workers: int = None):
+		self._api = api
+		self._seasons = seasons
+		self._workers = workers if workers is not None else os.cpu_count()
+
+		self._block = None
+		self._names = {}
+		self._pool = None
+
+
+	def is_loaded(self) -> bool:
+		'''Returns whether or not the league's games have been loaded into the block'''
+		return self._block is not None
+
+
+	def load(self) -> None:
+		'''Grabs the league game log of every screened season (one request each), then the career stats of every
+		player in them at the same time through the snapshot cache, and builds the shared block'''
+		active = {player['id'] for player in players.get_active_players()}
+		league_gamelogs = [(year, self._api.fetch_league_gamelog(year))
+						   for year in range(CURRENT_SEASON, CURRENT_SEASON - self._seasons, -1)]
+
+		pids = sorted({int(row[payload['resultSets'][0]['headers'].index('PLAYER_ID')])
+					   for year, payload in league_gamelogs for row in payload['resultSets'][0]['rowSet']} & active)
+		with ThreadPoolExecutor(max_workers=max(min(CAREER_WORKERS, len(pids)), 1)) as pool:
+			careers = dict(zip(pids, pool.map(self._fetch_career, pids)))
+
+		self.load_gamelogs(league_gamelogs, active, careers)
+
+
+	def _fetch_career(self, pid: int) -> dict | None:
+		'''Returns a player's PlayerCareerStats json, or None if it can't be grabbed'''
+		try:
+			return self._api.fetch_snapshot('playercareerstats', pid)[0]
+		except Exception:
+			return None
+
+
+	def load_gamelogs(self, league_gamelogs: list[tuple[int, dict]], active: set[int] = None,
+					  careers: dict[int, dict] = None) -> None:
+		'''Builds the shared block from already grabbed league game logs and {pid: PlayerCareerStats json}'''
+		self.close()
+		self._block, self._names = build_league_block(league_gamelogs, active, careers)
+
+
+	def screen(self, stat_type: str, window: str = 'Last 10', line = 'career') -> list[dict]:
+		'''Scores every player in the block, splitting them into chunks across the process pool'''
+		chunks = [(start, min(start + CHUNK_SIZE, self._block.n_players))
+				  for start in range(0, self._block.n_players, CHUNK_SIZE)]
+
+		if self._workers <= 1 or len(chunks) <= 1:
+			scored = [score_players(self._block, start, end, stat_type, window, line) for start, end in chunks]
+		else:
+			if self._pool is None:
+				# spawn so workers don't inherit the tkinter threads of the parent
+				self._pool = ProcessPoolExecutor(self._workers, mp_context=multiprocessing.get_context('spawn'))
+
+			futures = [self._pool.submit(_score_chunk, self._block.spec(), start, end, stat_type, window, line)
+					   for start, end in chunks]
+			scored = [future.result() for future in futures]
+
+		results = []
+		for chunk in scored:
+			for x in range(len(chunk['pid'])):
+				pid = int(chunk['pid'][x])
+				results.append({'pid': pid,
+								'name': self._names.get(pid, str(pid)),
+								'games': int(chunk['games'][x]),
+								'average': float(chunk['average'][x]),
+								'line': float(chunk['line'][x]),
+								'hit': float(chunk['hit'][x]),
+								'tied': float(chunk['tied'][x]),
+								'miss': float(chunk['miss'][x]),
+								'over': float(chunk['over'][x]),
+								'over_low': float(chunk['over_low'][x]),
+								'over_high': float(chunk['over_high'][x])})
+
+		return results
+
+
+	def close(self) -> None:
+		'''Frees the shared block and shuts the process pool down'''
+		if self._block is not None:
+			self._block.close()
+			self._block = None
+
+		if self._pool is not None:
+			self._pool.shutdown()
+			self._pool = None
+
+
+def main() -> None:
+	'''Runs the screener headlessly and prints or exports the results'''
+	parser = argparse.ArgumentParser(description='Rank every active player by hit rate')
+	parser.add_argument('--stat', default='Points', choices=STATS)
+	parser.add_argument('--window', default='Last 10', choices=SCREENER_WINDOWS)
+	parser.add_argument('--line', default='career', help='a number, or career to use each player\'s career average')
+	parser.add_argument('--seasons', type=int, default=SCREENER_SEASONS)
+	parser.add_argument('--min-games', type=int, default=1)
+	parser.add_argument('--sort', default='hit', choices=RESULT_COLUMNS)
+	parser.add_argument('--top', type=int, default=25)
+	parser.add_argument('--workers', type=int, default=None)
+	parser.add_argument('--out', help='csv file to write every result to')
+	args = parser.parse_args()
+
+	screener = Screener(API(), args.seasons, args.workers)
+	try:
+		screener.load()
+		results = filter_results(screener.screen(args.stat, args.window, args.line), args.min_games)
+		results = sort_results(results, args.sort)
+
+		if args.out is not None:
+			export_csv(results, args.out)
+
+		for result in results[:args.top]:
+			print(f"{result['name']:<28}{result['games']:>4} games  avg {result['average']:>5}  line {result['line']:>5}  "
+				  f"hit {result['hit']:>5}%  tied {result['tied']:>5}%  miss {result['miss']:>5}%  "
+				  f"over {result['over']:>5}% ({result['over_low']}-{result['over_high']})")
+	finally:
+		screener.close()
+
+
+if __name__ == '__main__':
+	main()
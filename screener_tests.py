@@ -0,0 +1,132 @@
+# Test the league screener to ensure its vectorized scores match the per-player hit rates
+from api import API, CURRENT_SEASON, HIT_RATE_WINDOWS
+from dashboard import hit_rate_percentages
+from sample_data import league_gamelog_payload, load_sample_player, season_rows, career_payload
+from screener import Screener, SCREENER_WINDOWS, build_league_block, filter_results, sort_results, export_csv
+import screener
+import tempfile
+import unittest
+import csv
+import os
+
+
+PIDS = [1, 2, 3, 4, 5]
+
+
+class ScreenerTests(unittest.TestCase):
+	def setUp(self):
+		# pid -> {year: rows}; one player has no current season games
+		self.players = {pid: {year: season_rows(year, 0 if (pid == 5 and year == CURRENT_SEASON) else 20 + pid, pid, pid)
+							  for year in range(CURRENT_SEASON - 1, CURRENT_SEASON + 1)} for pid in PIDS}
+		self.league = [(year, league_gamelog_payload({pid: seasons[year] for pid, seasons in self.players.items()}))
+					   for year in range(CURRENT_SEASON, CURRENT_SEASON - 2, -1)]
+
+		self.screener = Screener(API(), seasons=2, workers=1)
+		self.screener.load_gamelogs(self.league)
+
+
+	def tearDown(self):
+		self.screener.close()
+
+
+	def test_block_groups_games_by_player_newest_first(self):
+		block, names = build_league_block(self.league)
+		try:
+			self.assertEqual(block.pids.tolist(), PIDS)
+			self.assertEqual(names[2], 'Player 2')
+			self.assertEqual(block.offsets[-1], sum(len(rows) for seasons in self.players.values() for rows in seasons.values()))
+			self.assertEqual(block.seasons[block.offsets[0]], CURRENT_SEASON)
+		finally:
+			block.close()
+
+
+	def test_block_keeps_only_active_players(self):
+		block, names = build_league_block(self.league, active={2, 4})
+		try:
+			self.assertEqual(block.pids.tolist(), [2, 4])
+		finally:
+			block.close()
+
+
+	def test_scores_match_the_hit_rate_panel(self):
+		# every season of these players is loaded, so the loaded seasons are their whole career
+		for window, panel_window in zip(SCREENER_WINDOWS, HIT_RATE_WINDOWS):
+			results = {result['pid']: result for result in self.screener.screen('Pts+Rebs', window, 20)}
+
+			for pid, seasons in self.players.items():
+				api = API()
+				load_sample_player(api, pid, seasons)
+				counts = dict(zip(HIT_RATE_WINDOWS, api.hit_rate_counts('Pts+Rebs')))[panel_window]
+
+				result = results[pid]
+				self.assertEqual(result['games'], sum(counts.values()))
+				self.assertEqual((result['hit'], result['tied'], result['miss']),
+								 tuple(round(rate, 1) for rate in hit_rate_percentages(counts, 20)))
+
+
+	def test_career_line_is_the_hit_rate_panels_line(self):
+		# a veteran whose career goes back well before the loaded seasons
+		careers = {pid: career_payload(pid, {**seasons, CURRENT_SEASON - 5: season_rows(CURRENT_SEASON - 5, 60, pid, 10 * pid)})
+				   for pid, seasons in self.players.items()}
+		self.screener.load_gamelogs(self.league, careers=careers)
+
+		for stat_type in ['Points', 'Pts+Rebs+Asts']:
+			results = {result['pid']: result for result in self.screener.screen(stat_type, 'Last 10', 'career')}
+			for pid in PIDS:
+				api = API()
+				api._career = careers[pid]
+				self.assertEqual(results[pid]['line'], round(api.career_convert(stat_type)))
+
+		# the loaded seasons alone would have given other lines
+		self.screener.load_gamelogs(self.league)
+		self.assertNotEqual([result['line'] for result in self.screener.screen('Pts+Rebs+Asts', 'Last 10', 'career')],
+							[results[pid]['line'] for pid in PIDS])
+
+
+	def test_career_line_falls_back_to_the_loaded_seasons_without_career_stats(self):
+		results = {result['pid']: result for result in self.screener.screen('Points', 'Last 10', 'career')}
+
+		for pid, seasons in self.players.items():
+			points = [row[24] for rows in seasons.values() for row in rows]
+			self.assertEqual(results[pid]['line'], round(sum(points) / len(points)))
+
+
+	def test_unknown_windows_are_refused(self):
+		with self.assertRaises(ValueError):
+			self.screener.screen('Points', 'Career', 'career')
+
+
+	def test_process_pool_matches_scoring_in_process(self):
+		chunk_size = screener.CHUNK_SIZE
+		screener.CHUNK_SIZE = 2
+		pooled = Screener(API(), seasons=2, workers=2)
+		try:
+			pooled.load_gamelogs(self.league)
+			self.assertEqual(pooled.screen('Points', 'Last 10', 'career'), self.screener.screen('Points', 'Last 10', 'career'))
+		finally:
+			pooled.close()
+			screener.CHUNK_SIZE = chunk_size
+
+
+	def test_over_probability_sits_inside_its_band(self):
+		for result in self.screener.screen('Rebounds', 'Loaded Seasons', 'career'):
+			self.assertLessEqual(result['over_low'], result['over'])
+			self.assertLessEqual(result['over'], result['over_high'])
+
+
+	def test_filter_sort_and_export(self):
+		results = self.screener.screen('Assists', 'Current Season', 4.5)
+		results = sort_results(filter_results(results, min_games=1), 'hit')
+
+		self.assertNotIn(5, [result['pid'] for result in results])
+		self.assertEqual([result['hit'] for result in results], sorted((result['hit'] for result in results), reverse=True))
+
+		with tempfile.TemporaryDirectory() as directory:
+			path = os.path.join(directory, 'screen.csv')
+			export_csv(results, path)
+			with open(path, newline='') as file:
+				self.assertEqual(len(list(csv.DictReader(file))), len(results))
+
+
+if __name__ == '__main__':
+	unittest.main()
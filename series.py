@@ -0,0 +1,96 @@
+# Vectorized helpers for drawing long stat series (a whole career of games)
+# Trend overlays are single passes over the series and downsampling keeps each pixel's min and max so spikes survive
+import bisect
+import numpy
+
+
+# trend lines that can be drawn over the game log and year by year charts; Average is the flat average
+OVERLAYS = ['Average', 'Rolling Mean', 'EWMA', 'Rolling Median']
+
+# default games (or seasons, on the year by year chart) a trend line looks back over
+OVERLAY_WINDOW = 5
+
+
+def rolling_average(values: numpy.ndarray, window: int = OVERLAY_WINDOW) -> numpy.ndarray:
+	'''Returns the average of every value and the window - 1 before it from one cumulative sum; nan until there
+	are enough values'''
+	averages = numpy.full(len(values), numpy.nan)
+	if len(values) >= window:
+		sums = numpy.cumsum(numpy.concatenate([[0.0], values]))
+		averages[window - 1:] = (sums[window:] - sums[:-window]) / window
+
+	return averages
+
+
+def rolling_median(values: numpy.ndarray, window: int = OVERLAY_WINDOW) -> numpy.ndarray:
+	'''Returns the median of every value and the window - 1 before it; nan until there are enough values. The
+	window is kept sorted as it slides, one bisect to drop the oldest value and one to add the newest, so it is
+	one pass of O(log window) searches instead of sorting every window again'''
+	medians = numpy.full(len(values), numpy.nan)
+	if len(values) < window:
+		return medians
+
+	values = values.tolist()
+	middle = window // 2
+	ordered = sorted(values[:window - 1])
+	for x in range(window - 1, len(values)):
+		bisect.insort(ordered, values[x])
+		medians[x] = ordered[middle] if window % 2 == 1 else (ordered[middle - 1] + ordered[middle]) / 2
+		del ordered[bisect.bisect_left(ordered, values[x - window + 1])]
+
+	return medians
+
+
+def ewma(values: numpy.ndarray, span: int = OVERLAY_WINDOW) -> numpy.ndarray:
+	'''Returns the exponentially weighted moving average with the given span (weight 2 / (span + 1) on the newest
+	value), updated one value at a time'''
+	alpha = 2 / (span + 1)
+	averages = numpy.empty(len(values))
+
+	level = float(values[0]) if len(values) > 0 else 0.0
+	for x, value in enumerate(values.tolist()):
+		level += alpha * (value - level)
+		averages[x] = level
+
+	return averages
+
+
+def overlay(values: numpy.ndarray, kind: str, window: int = OVERLAY_WINDOW) -> numpy.ndarray:
+	'''Returns one of OVERLAYS over a series, oldest value first'''
+	values = numpy.asarray(values, dtype=float)
+	if kind == 'Average':
+		return numpy.full(len(values), values.mean() if len(values) > 0 else 0.0)
+	if kind == 'Rolling Mean':
+		return rolling_average(values, window)
+	if kind == 'EWMA':
+		return ewma(values, window)
+	if kind == 'Rolling Median':
+		return rolling_median(values, window)
+
+	raise ValueError(f'Unknown overlay {kind}')
+
+
+def minmax_indices(values: numpy.ndarray, buckets: int) -> numpy.ndarray:
+	'''Returns the indices of the smallest and largest value of each of buckets equal slices of values, in order;
+	a line through just those looks the same as one through every value when drawn about buckets pixels wide'''
+	length = len(values)
+	if length <= 2 * buckets:
+		return numpy.arange(length)
+
+	bucket = numpy.arange(length) * buckets // length
+
+	# sorting by bucket, then by value, puts each bucket's min first and its max last
+	order = numpy.lexsort((values, bucket))
+	sizes = numpy.bincount(bucket, minlength=buckets)
+	ends = numpy.cumsum(sizes)
+
+	return numpy.unique(numpy.concatenate([order[ends - sizes], order[ends - 1]]))
+
+
+def visible_range(x: numpy.ndarray, low: float, high: float) -> tuple[int, int]:
+	'''Returns the [start, end) indices of the sorted x values between low and high, plus one more on each side
+	so the line still runs off the edges of the plot'''
+	start = max(int(numpy.searchsorted(x, low, side='left')) - 1, 0)
+	end = min(int(numpy.searchsorted(x, high, side='right')) + 1, len(x))
+
+	return (start, end)
@@ -0,0 +1,106 @@
+# Test the series helpers to ensure downsampling keeps every spike and rolling averages match a plain loop
+from series import rolling_average, rolling_median, ewma, overlay, minmax_indices, visible_range
+from api import API, CURRENT_SEASON
+from dashboard import Dashboard
+from sample_data import load_sample_player, sample_seasons
+from numpy.lib.stride_tricks import sliding_window_view
+import unittest
+import numpy
+
+
+class SeriesTests(unittest.TestCase):
+	def setUp(self):
+		self.values = numpy.random.default_rng(0).integers(0, 50, size=1600)
+
+
+	def test_rolling_average_matches_a_loop(self):
+		averages = rolling_average(self.values, 10)
+
+		self.assertTrue(numpy.all(numpy.isnan(averages[:9])))
+		self.assertAlmostEqual(averages[9], self.values[:10].mean())
+		self.assertAlmostEqual(averages[-1], self.values[-10:].mean())
+
+
+	def test_rolling_average_of_too_few_games_is_nan(self):
+		self.assertTrue(numpy.all(numpy.isnan(rolling_average(numpy.arange(3), 10))))
+
+
+	def test_rolling_median_matches_a_loop(self):
+		medians = rolling_median(self.values, 7)
+
+		self.assertTrue(numpy.all(numpy.isnan(medians[:6])))
+		for x in (6, 500, 1599):
+			self.assertEqual(medians[x], numpy.median(self.values[x - 6:x + 1]))
+
+
+	def test_rolling_median_matches_sorting_every_window(self):
+		values = self.values.astype(float) / 2
+		for window in (1, 2, 6, 7, 50):
+			medians = rolling_median(values, window)
+			self.assertTrue(numpy.array_equal(medians[window - 1:],
+											  numpy.median(sliding_window_view(values, window), axis=1)))
+
+
+	def test_ewma_weighs_the_newest_value_by_two_over_span_plus_one(self):
+		averages = ewma(numpy.array([10, 20, 20, 0]), 3)
+
+		self.assertEqual(averages.tolist(), [10, 15, 17.5, 8.75])
+
+
+	def test_average_overlay_is_flat(self):
+		self.assertEqual(overlay(numpy.array([1, 2, 3, 6]), 'Average').tolist(), [3, 3, 3, 3])
+		with self.assertRaises(ValueError):
+			overlay(self.values, 'Moving Mode')
+
+
+	def test_downsampling_keeps_each_buckets_min_and_max(self):
+		indices = minmax_indices(self.values, 100)
+
+		self.assertLessEqual(len(indices), 200)
+		self.assertTrue(numpy.all(numpy.diff(indices) > 0))
+		for bucket in numpy.array_split(numpy.arange(1600), 100):
+			kept = self.values[numpy.intersect1d(indices, bucket)]
+			self.assertEqual(kept.max(), self.values[bucket].max())
+			self.assertEqual(kept.min(), self.values[bucket].min())
+
+
+	def test_short_series_are_not_downsampled(self):
+		self.assertEqual(minmax_indices(self.values[:150], 100).tolist(), list(range(150)))
+
+
+	def test_visible_range_runs_one_past_each_edge(self):
+		x = numpy.arange(0, 100, 10.0)
+		self.assertEqual(visible_range(x, 25, 55), (2, 7))
+		self.assertEqual(visible_range(x, -100, 1000), (0, 10))
+
+
+	def test_dashboard_career_series_is_oldest_first_and_full_resolution(self):
+		api = API()
+		seasons = load_sample_player(api, seasons=sample_seasons(CURRENT_SEASON - 15, 82))
+		dashboard = Dashboard(api)
+		dashboard.build()
+
+		dates, values = dashboard.get_career_series('Points')
+		self.assertEqual(len(values), sum(len(rows) for rows in seasons.values()))
+		self.assertTrue(numpy.all(numpy.diff(dates).astype(int) > 0))
+		self.assertEqual(values[-1], seasons[CURRENT_SEASON][0][24])
+		self.assertLess(len(dashboard.get_career_series('Points', 'Home')[1]), len(values))
+
+
+	def test_dashboard_overlays_are_cached_per_stat_overlay_and_window(self):
+		api = API()
+		load_sample_player(api)
+		dashboard = Dashboard(api)
+		dashboard.build()
+
+		trend = dashboard.get_overlay('Points', 'EWMA', 4)
+		self.assertIs(dashboard.get_overlay('Points', 'EWMA', 4), trend)
+		self.assertIsNot(dashboard.get_overlay('Points', 'EWMA', 5), trend)
+		numpy.testing.assert_allclose(trend, ewma(dashboard.get_career_series('Points')[1], 4))
+
+		seasons = dashboard.get_season_overlay('Rebounds', 'Rolling Mean', 2)
+		self.assertEqual(len(seasons), len(dashboard.get('Rebounds')['year_by_year']))
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,378 @@
+# Shared query service; one process keeps the snapshot cache and answers every analyst desktop over HTTP/JSON, so a
+# player is downloaded once for the whole room instead of once per desktop
+# Identical requests that arrive while one is already being answered wait for that answer instead of repeating it
+# Run it with python service.py --port 8750, and point the app at it with python main.py --service http://host:8750
+from api import API, CURRENT_SEASON, STATS, QUERY_CACHE_SIZE
+from memo import QueryCache
+from snapshots import SnapshotCache, CACHE_DIRECTORY, REFRESH_POLICY
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, parse_qs, urlencode
+from urllib.error import HTTPError
+import urllib.request
+import threading
+import argparse
+import asyncio
+import json
+import time
+
+
+SERVICE_PORT = 8750
+
+# threads answering requests that need a download or a query; the event loop itself only parses and writes
+SERVICE_WORKERS = 8
+
+# players whose loaded api is kept; beyond that the least recently asked for is dropped (its snapshots stay cached)
+SERVICE_PLAYERS = 64
+
+# a snapshot asked for fresh (e.g. by a desktop's live polling) is downloaded again only if it is older than this,
+# so desktops polling the same player at the same time share one download
+FRESH_AGE = 30
+
+# largest request the service reads, in bytes
+MAX_REQUEST = 64 * 1024
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 500: 'Internal Server Error'}
+
+
+class RequestError(Exception):
+	def __init__(self, status: int, message: str):
+		super().__init__(message)
+		self.status = status
+
+
+def _json_counts(counts: list[dict]) -> list[dict]:
+	'''Returns hit rate counters with their keys as strings, since json keys have to be'''
+	return [{str(stat): games for stat, games in window.items()} for window in counts]
+
+
+class QueryService:
+	def __init__(self, snapshots: SnapshotCache = None, make_api = None, workers: int = SERVICE_WORKERS,
+				 max_players: int = SERVICE_PLAYERS):
+		# every api shares the snapshot cache and one query cache; make_api(snapshots, query_cache) makes them
+		self._snapshots = snapshots if snapshots is not None else SnapshotCache(current_season=CURRENT_SEASON)
+		self._memo = QueryCache(QUERY_CACHE_SIZE)
+		self._make_api = make_api if make_api is not None else lambda snapshots, memo: API(snapshots, query_cache=memo)
+		self._executor = ThreadPoolExecutor(workers)
+		self._max_players = max_players
+
+		# pid -> (api with the player selected, lock held while it is used); least recently asked for first
+		self._players = OrderedDict()
+		self._players_lock = threading.Lock()
+
+		# pid -> queries using (or waiting on) the player's api; those players are never evicted
+		self._users = {}
+
+		# request key -> future of the answer, while it is being answered
+		self._in_flight = {}
+
+		self._loop = None
+		self._server = None
+		self._thread = None
+
+		# diagnostics
+		self._requests = 0
+		self._shared = 0
+		self._errors = 0
+		self._clients = 0
+
+
+	def _player(self, pid: int) -> tuple[API, threading.Lock]:
+		'''Returns the api of a player and the lock held while it is used, making them the first time; the player
+		is in use until _release(pid)'''
+		with self._players_lock:
+			if pid not in self._players:
+				self._players[pid] = (self._make_api(self._snapshots, self._memo), threading.Lock())
+			self._players.move_to_end(pid)
+			self._users[pid] = self._users.get(pid, 0) + 1
+			self._evict()
+
+			return self._players[pid]
+
+
+	def _release(self, pid: int) -> None:
+		'''Marks one use of a player's api as done, evicting whoever is now past max_players'''
+		with self._players_lock:
+			self._users[pid] -= 1
+			if self._users[pid] == 0:
+				del self._users[pid]
+			self._evict()
+
+
+	def _evict(self) -> None:
+		'''Drops the least recently asked for players past max_players, skipping those in use so a player never has
+		two apis (and two locks) at once; call with _players_lock held'''
+		idle = [pid for pid in self._players if pid not in self._users]
+		for pid in idle[:max(len(self._players) - self._max_players, 0)]:
+			del self._players[pid]
+
+
+	def _query(self, pid: int, query) -> object:
+		'''Runs query(api) on a player's api, loading the player (or refreshing what is stale) first; queries of
+		the same player run one at a time'''
+		api, lock = self._player(pid)
+		try:
+			with lock:
+				if not api.has_selected_player():
+					if not api.get_player_info_by_id(pid):
+						raise RequestError(404, f'Unable to load player {pid}')
+				else:
+					stale = api.stale_endpoints()
+					if len(stale) > 0:
+						api.apply_refresh(pid, api.fetch_stale(pid, stale))
+
+				return query(api)
+		finally:
+			self._release(pid)
+
+
+	def _snapshot(self, endpoint: str, pid: int, season: int | None, fresh: bool) -> dict:
+		'''Returns a snapshot from the shared cache, downloading it if it is stale (or, if fresh, only seconds old)'''
+		api = self._make_api(self._snapshots, self._memo)
+		snapshot = self._snapshots.load(endpoint, pid, season)
+		if fresh and (snapshot is None or time.time() - snapshot[1] > FRESH_AGE):
+			payload, fetched_at = api.download_snapshot(endpoint, pid, season)
+		else:
+			payload, fetched_at = api.fetch_snapshot(endpoint, pid, season)
+
+		return {'payload': payload, 'fetched_at': fetched_at}
+
+
+	def answer(self, path: str, params: dict[str, str]):
+		'''Answers a request (blocking); returns what is sent back as json'''
+		if path == '/search':
+			return {'players': API.search_players(first_name=params.get('first_name'), last_name=params.get('last_name'))}
+		if path == '/stats':
+			return self.stats()
+
+		parts = path.strip('/').split('/')
+		if len(parts) != 3 or parts[0] not in ('snapshot', 'player'):
+			raise RequestError(404, f'Unknown path {path}')
+
+		try:
+			pid = int(parts[2] if parts[0] == 'snapshot' else parts[1])
+			season = int(params['season']) if 'season' in params else None
+			games = int(params['games']) if 'games' in params else None
+		except ValueError as error:
+			raise RequestError(400, f'Bad request: {error}')
+
+		if parts[0] == 'snapshot':
+			if parts[1] not in REFRESH_POLICY:
+				raise RequestError(404, f'Unknown endpoint {parts[1]}')
+			return self._snapshot(parts[1], pid, season, params.get('fresh') == '1')
+
+		stat_type = params.get('stat', STATS[0])
+		if stat_type not in STATS:
+			raise RequestError(400, f'Unknown stat {stat_type}')
+
+		query = parts[2]
+		if query == 'year_by_year':
+			return {'values': self._query(pid, lambda api: api.per_year_convert(stat_type))}
+		if query == 'career':
+			return {'value': self._query(pid, lambda api: api.career_convert(stat_type))}
+		if query == 'gamelog':
+			return {'values': self._query(pid, lambda api: api.current_season_gamelog(stat_type, games))}
+		if query == 'hit_rates':
+			return {'counts': _json_counts(self._query(pid, lambda api: api.hit_rate_counts(stat_type)))}
+
+		raise RequestError(404, f'Unknown query {query}')
+
+
+	async def _coalesced(self, path: str, params: dict[str, str]):
+		'''Answers a request on the executor, or waits for the same request that is already being answered'''
+		key = (path, tuple(sorted(params.items())))
+		if key in self._in_flight:
+			self._shared += 1
+			return await asyncio.shield(self._in_flight[key])
+
+		future = self._loop.run_in_executor(self._executor, self.answer, path, params)
+		self._in_flight[key] = future
+		try:
+			return await future
+		finally:
+			del self._in_flight[key]
+
+
+	async def _respond(self, method: str, target: str) -> tuple[int, dict]:
+		'''Returns (status, json) of a request'''
+		if method != 'GET':
+			return (405, {'error': f'{method} is not supported'})
+
+		url = urlsplit(target)
+		params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+		try:
+			return (200, await self._coalesced(url.path, params))
+		except RequestError as error:
+			return (error.status, {'error': str(error)})
+		except Exception as error:
+			self._errors += 1
+			return (500, {'error': f'{type(error).__name__}: {error}'})
+
+
+	async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+		'''Serves the requests of one connection, keeping it open between them (HTTP/1.1 keep-alive)'''
+		self._clients += 1
+		try:
+			while True:
+				line = await reader.readline()
+				if line == b'':
+					break
+
+				method, target, version = line.decode('latin-1').split()
+				headers = {}
+				size = len(line)
+				while True:
+					header = await reader.readline()
+					size += len(header)
+					if header in (b'\r\n', b'\n', b'') or size > MAX_REQUEST:
+						break
+					name, separator, value = header.decode('latin-1').partition(':')
+					headers[name.strip().lower()] = value.strip()
+
+				if int(headers.get('content-length', 0)) > 0:
+					await reader.readexactly(min(int(headers['content-length']), MAX_REQUEST))
+
+				self._requests += 1
+				status, answer = await self._respond(method, target)
+				body = json.dumps(answer).encode()
+				keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+
+				writer.write((f'HTTP/1.1 {status} {REASONS[status]}\r\nContent-Type: application/json\r\n'
+							  f'Content-Length: {len(body)}\r\nConnection: {"keep-alive" if keep_alive else "close"}\r\n\r\n')
+							 .encode('latin-1') + body)
+				await writer.drain()
+
+				if not keep_alive:
+					break
+		except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+			pass
+		finally:
+			self._clients -= 1
+			writer.close()
+
+
+	async def serve(self, host: str = '127.0.0.1', port: int = SERVICE_PORT) -> None:
+		'''Serves requests on the running event loop until it is stopped'''
+		self._loop = asyncio.get_running_loop()
+		self._server = await asyncio.start_server(self._handle, host, port, limit=MAX_REQUEST)
+		async with self._server:
+			await self._server.serve_forever()
+
+
+	def start(self, host: str = '127.0.0.1', port: int = 0) -> str:
+		'''Serves requests on an event loop of its own, in the background; returns the url of the service'''
+		ready = threading.Event()
+
+		def _run():
+			loop = asyncio.new_event_loop()
+			self._loop = loop
+
+			async def _listen():
+				self._server = await asyncio.start_server(self._handle, host, port, limit=MAX_REQUEST)
+				ready.set()
+
+			loop.run_until_complete(_listen())
+			loop.run_forever()
+			loop.run_until_complete(loop.shutdown_asyncgens())
+			loop.close()
+
+		self._thread = threading.Thread(target=_run, daemon=True)
+		self._thread.start()
+		ready.wait()
+
+		return f'http://{host}:{self._server.sockets[0].getsockname()[1]}'
+
+
+	def close(self) -> None:
+		'''Stops serving and shuts the worker threads down'''
+		if self._thread is not None:
+			def _stop():
+				self._server.close()
+				self._loop.stop()
+
+			self._loop.call_soon_threadsafe(_stop)
+			self._thread.join()
+			self._thread = None
+
+		self._executor.shutdown()
+
+
+	def stats(self) -> dict:
+		'''Returns service statistics: requests, how many were answered by a request already in flight, errors,
+		open connections, loaded players, and the shared query cache'''
+		return {'requests': self._requests, 'coalesced': self._shared, 'errors': self._errors,
+				'clients': self._clients, 'players': len(self._players), 'query_cache': self._memo.stats()}
+
+
+class ServiceClient:
+	def __init__(self, url: str, timeout: float = 60):
+		# talks to a QueryService; hand it to API(service=...) to download through the service
+		self._url = url.rstrip('/')
+		self._timeout = timeout
+
+
+	def get(self, path: str, **params) -> dict:
+		'''Requests a path of the service; raises LookupError for a missing player and RuntimeError for other errors'''
+		params = {name: value for name, value in params.items() if value is not None}
+		url = f'{self._url}{path}' + (f'?{urlencode(params)}' if len(params) > 0 else '')
+		try:
+			with urllib.request.urlopen(url, timeout=self._timeout) as response:
+				return json.loads(response.read())
+		except HTTPError as error:
+			message = json.loads(error.read()).get('error', str(error))
+			if error.code == 404:
+				raise LookupError(message)
+			raise RuntimeError(message)
+
+
+	def fetch_snapshot(self, endpoint: str, pid: int, season: int = None, fresh: bool = False) -> tuple[dict, float]:
+		'''Returns (json, time grabbed) of an endpoint from the service's cache'''
+		snapshot = self.get(f'/snapshot/{endpoint}/{pid}', season=season, fresh=1 if fresh else None)
+		return (snapshot['payload'], snapshot['fetched_at'])
+
+
+	def search_players(self, first_name: str = None, last_name: str = None) -> list[str]:
+		return self.get('/search', first_name=first_name, last_name=last_name)['players']
+
+
+	def per_year_convert(self, pid: int, stat_type: str) -> list | None:
+		return self.get(f'/player/{pid}/year_by_year', stat=stat_type)['values']
+
+
+	def career_convert(self, pid: int, stat_type: str):
+		return self.get(f'/player/{pid}/career', stat=stat_type)['value']
+
+
+	def current_season_gamelog(self, pid: int, stat_type: str, max_games: int = None) -> list | None:
+		return self.get(f'/player/{pid}/gamelog', stat=stat_type, games=max_games)['values']
+
+
+	def hit_rate_counts(self, pid: int, stat_type: str) -> list[dict]:
+		'''Returns the hit rate counters like API.hit_rate_counts(), with int keys again'''
+		counts = self.get(f'/player/{pid}/hit_rates', stat=stat_type)['counts']
+		return [{int(stat): games for stat, games in window.items()} for window in counts]
+
+
+	def stats(self) -> dict:
+		return self.get('/stats')
+
+
+def main() -> None:
+	'''Runs the service until interrupted'''
+	parser = argparse.ArgumentParser(description='Serve one shared, warm cache of nba_api data to every desktop')
+	parser.add_argument('--host', default='0.0.0.0')
+	parser.add_argument('--port', type=int, default=SERVICE_PORT)
+	parser.add_argument('--snapshots', default=CACHE_DIRECTORY, help='directory of the shared snapshot cache')
+	parser.add_argument('--workers', type=int, default=SERVICE_WORKERS)
+	args = parser.parse_args()
+
+	service = QueryService(SnapshotCache(args.snapshots, current_season=CURRENT_SEASON), workers=args.workers)
+	print(f'Serving on {args.host}:{args.port}')
+	try:
+		asyncio.run(service.serve(args.host, args.port))
+	except KeyboardInterrupt:
+		pass
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,133 @@
+# Test the query service on localhost to ensure desktops share its cache and identical requests are coalesced
+from api import API, CURRENT_SEASON, PLAYER_ENDPOINTS
+from snapshots import SnapshotCache
+from storage import MemoryStorage
+from service import QueryService, ServiceClient
+from sample_data import sample_download, sample_seasons, stub_downloads
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import tempfile
+import unittest
+import time
+
+
+# how long every fake download takes, so concurrent requests overlap
+DOWNLOAD_TIME = 0.05
+
+
+class QueryServiceTests(unittest.TestCase):
+	def setUp(self):
+		self.directory = tempfile.TemporaryDirectory()
+		self.seasons = {1: sample_seasons(pid=1), 2: sample_seasons(CURRENT_SEASON - 1, pid=2)}
+		self.downloads = []
+		self.lock = threading.Lock()
+
+		self.service = QueryService(SnapshotCache(self.directory.name, current_season=CURRENT_SEASON), self._make_api)
+		self.client = ServiceClient(self.service.start())
+
+
+	def tearDown(self):
+		self.service.close()
+		self.directory.cleanup()
+
+
+	def _make_api(self, snapshots: SnapshotCache, memo) -> API:
+		'''Returns a service api whose downloads come from the sample seasons'''
+		api = API(snapshots, query_cache=memo)
+
+		def _download(endpoint: str, pid: int, season: int = None) -> dict:
+			if pid not in self.seasons:
+				raise ConnectionError('no such player')
+			time.sleep(DOWNLOAD_TIME)
+			with self.lock:
+				self.downloads.append((endpoint, pid, season))
+			return sample_download(self.seasons[pid], endpoint, pid, season)
+
+		api._download = _download
+		return api
+
+
+	def _desktop(self) -> API:
+		'''Returns an api like a desktop pointed at the service; it never downloads from nba_api itself'''
+		api = API(SnapshotCache(None, current_season=CURRENT_SEASON, storage=MemoryStorage()), self.client)
+		api._download = None
+		return api
+
+
+	def test_queries_match_a_local_api(self):
+		local = API(SnapshotCache(None, current_season=CURRENT_SEASON, storage=MemoryStorage()))
+		stub_downloads(local, self.seasons[1])
+		local.get_player_info_by_id(1)
+
+		for stat_type in ['Points', 'Pts+Rebs+Asts', 'Blks+Stls']:
+			self.assertEqual(self.client.per_year_convert(1, stat_type), [list(x) for x in local.per_year_convert(stat_type)])
+			self.assertEqual(self.client.career_convert(1, stat_type), local.career_convert(stat_type))
+			self.assertEqual(self.client.current_season_gamelog(1, stat_type, 5),
+							 [list(x) for x in local.current_season_gamelog(stat_type, 5)])
+			self.assertEqual(self.client.hit_rate_counts(1, stat_type), [dict(x) for x in local.hit_rate_counts(stat_type)])
+
+
+	def test_concurrent_clients_share_one_download_per_endpoint(self):
+		with ThreadPoolExecutor(40) as pool:
+			answers = list(pool.map(lambda x: self.client.hit_rate_counts(1 + x % 2, 'Points'), range(40)))
+
+		self.assertEqual(answers[0], answers[2])
+		self.assertEqual(len(self.downloads), len(set(self.downloads)))
+		self.assertEqual(self.client.stats()['players'], 2)
+		self.assertGreater(self.client.stats()['coalesced'], 0)
+
+
+	def test_desktops_download_through_the_service(self):
+		first, second = self._desktop(), self._desktop()
+		self.assertTrue(first.get_player_info_by_id(1))
+		downloaded = len(self.downloads)
+		self.assertEqual(downloaded, len(PLAYER_ENDPOINTS))
+
+		self.assertTrue(second.get_player_info_by_id(1))
+		self.assertEqual(second.hit_rate_counts('Points'), first.hit_rate_counts('Points'))
+		self.assertEqual(len(self.downloads), downloaded + len(self.seasons[1]) - 1)
+
+		# live polling asks for fresh data, but desktops polling within FRESH_AGE of each other share a download
+		first.fetch_stale(1, ['playergamelog'])
+		second.fetch_stale(1, ['playergamelog'])
+		self.assertEqual(self.downloads.count(('playergamelog', 1, CURRENT_SEASON)), 1)
+
+
+	def test_a_player_in_use_is_not_evicted(self):
+		service = QueryService(SnapshotCache(self.directory.name, current_season=CURRENT_SEASON), self._make_api,
+							   max_players=1)
+		started, finish = threading.Event(), threading.Event()
+		def _hold(api: API) -> API:
+			started.set()
+			finish.wait(10)
+			return api
+
+		with ThreadPoolExecutor(1) as pool:
+			held = pool.submit(service._query, 1, _hold)
+			self.assertTrue(started.wait(10))
+
+			# asking for another player while the first is still in use can't drop the first one's api
+			try:
+				self.assertEqual(service._query(2, lambda api: list(service._players)), [1, 2])
+			finally:
+				finish.set()
+
+			self.assertIs(service._query(1, lambda api: api), held.result(10))
+
+		self.assertEqual(list(service._players), [1])
+		service.close()
+
+
+	def test_errors(self):
+		with self.assertRaises(LookupError):
+			self.client.per_year_convert(99, 'Points')
+		with self.assertRaises(RuntimeError):
+			self.client.per_year_convert(1, 'Dunks')
+		with self.assertRaises(LookupError):
+			self.client.get('/player/1/dunks')
+		with self.assertRaises(RuntimeError):
+			self.client.get('/player/one/career')
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,99 @@
+# Keeps the last raw json grabbed from each nba_api endpoint on disk
+# so a player can be shown instantly and revalidated in the background
+from storage import make_storage, STORAGE_BACKEND
+from packed import PackedSeason, PackedSeasons
+import os
+import time
+
+
+CACHE_DIRECTORY = os.path.join(os.path.expanduser('~'), '.nba_stats_analyzer', 'snapshots')
+
+HOUR = 60 * 60
+DAY = 24 * HOUR
+
+# how old (in seconds) a snapshot can be before it should be grabbed again
+# bios barely change; the game log changes every night there's a game
+REFRESH_POLICY = {'commonplayerinfo': 7 * DAY,
+				  'playercareerstats': DAY,
+				  'playerdashboardbyyearoveryear': DAY,
+				  'playergamelog': 12 * HOUR,
+				  'leagueplayergamelog': 12 * HOUR,
+				  'leagueteamgamelog': 12 * HOUR,
+				  'commonteamroster': DAY}
+
+# endpoints grabbed per season; seasons before the current one are final
+SEASONAL_ENDPOINTS = ['playergamelog', 'leagueplayergamelog', 'leagueteamgamelog', 'commonteamroster']
+
+
+class SnapshotCache:
+	def __init__(self, directory: str | None = CACHE_DIRECTORY, refresh_policy: dict = None, current_season: int = None,
+				 storage = None):
+		self._refresh_policy = dict(REFRESH_POLICY)
+		if refresh_policy is not None:
+			self._refresh_policy.update(refresh_policy)
+
+		# game logs of seasons before this one are final, so they never go stale
+		self._current_season = current_season
+
+		# where the snapshots actually live (see storage.py); STORAGE_BACKEND in the directory by default
+		self._storage = storage if storage is not None else make_storage(STORAGE_BACKEND, directory)
+
+		# packed game logs of past seasons (see packed.py) in a folder of the directory; None keeps them in memory
+		self._packed = PackedSeasons(os.path.join(directory, 'packed') if directory is not None else None)
+
+
+	def get_storage(self):
+		'''Returns the storage backend the snapshots are kept in'''
+		return self._storage
+
+
+	def load(self, endpoint: str, pid: int, season: int = None) -> tuple[dict, float] | None:
+		'''Returns (payload, time it was grabbed) of the last snapshot, or None if there isn't one'''
+		return self._storage.load(endpoint, pid, season)
+
+
+	def save(self, endpoint: str, pid: int, payload: dict, season: int = None, fetched_at: float = None) -> float:
+		'''Stores a snapshot, replacing the previous one; returns the time it was grabbed, now unless it was grabbed
+		earlier by someone else (e.g. a query service)'''
+		fetched_at = fetched_at if fetched_at is not None else time.time()
+		self._storage.save(endpoint, pid, payload, fetched_at, season)
+
+		return fetched_at
+
+
+	def load_season(self, pid: int, year: int) -> PackedSeason | None:
+		'''Returns the packed game log of a past season, memory mapped, or None if it was never packed'''
+		return self._packed.load(pid, year)
+
+
+	def save_season(self, pid: int, season: PackedSeason) -> None:
+		'''Stores the packed game log of a past season; those never change, so it is never refreshed'''
+		self._packed.save(pid, season)
+
+
+	def max_age(self, endpoint: str, season: int = None) -> float | None:
+		'''Returns how old a snapshot of the endpoint can get before it is stale; None means never'''
+		if endpoint in SEASONAL_ENDPOINTS and season is not None and self._current_season is not None \
+				and season < self._current_season:
+			return None
+
+		return self._refresh_policy[endpoint]
+
+
+	def is_stale(self, endpoint: str, fetched_at: float | None, season: int = None) -> bool:
+		'''Returns whether a snapshot grabbed at fetched_at should be grabbed again; missing snapshots are stale'''
+		if fetched_at is None:
+			return True
+
+		max_age = self.max_age(endpoint, season)
+		return max_age is not None and time.time() - fetched_at > max_age
+
+
+def format_age(seconds: float) -> str:
+	'''Returns a short human readable age, e.g. 5 min or 3 h'''
+	if seconds < HOUR:
+		return f'{int(seconds // 60)} min'
+	if seconds < DAY:
+		return f'{int(seconds // HOUR)} h'
+
+	return f'{int(seconds // DAY)} days'
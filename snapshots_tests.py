@@ -0,0 +1,131 @@
+# Test SnapshotCache and the stale-while-revalidate player loading in the API
+from api import API, CURRENT_SEASON, PLAYER_ENDPOINTS
+from snapshots import SnapshotCache, format_age, DAY, HOUR
+from sample_data import sample_seasons, season_rows, stub_downloads
+import tempfile
+import time
+import unittest
+
+
+class SnapshotCacheTests(unittest.TestCase):
+	def setUp(self):
+		self.directory = tempfile.TemporaryDirectory()
+		self.snapshots = SnapshotCache(self.directory.name, current_season=CURRENT_SEASON)
+
+
+	def tearDown(self):
+		self.directory.cleanup()
+
+
+	def test_load_returns_None_when_nothing_was_saved(self):
+		self.assertIsNone(self.snapshots.load('commonplayerinfo', 1))
+
+
+	def test_load_returns_what_was_saved(self):
+		fetched_at = self.snapshots.save('playergamelog', 1, {'rows': [1, 2]}, 2022)
+		self.assertEqual(self.snapshots.load('playergamelog', 1, 2022), ({'rows': [1, 2]}, fetched_at))
+
+
+	def test_cache_without_a_directory_keeps_snapshots_in_memory(self):
+		snapshots = SnapshotCache(None, current_season=CURRENT_SEASON)
+		fetched_at = snapshots.save('playergamelog', 1, {'rows': [1, 2]}, 2022)
+
+		self.assertEqual(snapshots.load('playergamelog', 1, 2022), ({'rows': [1, 2]}, fetched_at))
+		self.assertIsNone(snapshots.load('commonplayerinfo', 1))
+
+
+	def test_is_stale_follows_the_refresh_policy_of_each_endpoint(self):
+		two_days_ago = time.time() - 2 * DAY
+		self.assertFalse(self.snapshots.is_stale('commonplayerinfo', two_days_ago))
+		self.assertTrue(self.snapshots.is_stale('playercareerstats', two_days_ago))
+
+
+	def test_refresh_policy_can_be_overridden(self):
+		snapshots = SnapshotCache(self.directory.name, refresh_policy={'commonplayerinfo': HOUR})
+		self.assertTrue(snapshots.is_stale('commonplayerinfo', time.time() - 2 * HOUR))
+
+
+	def test_past_season_game_logs_never_go_stale(self):
+		long_ago = time.time() - 365 * DAY
+		self.assertFalse(self.snapshots.is_stale('playergamelog', long_ago, CURRENT_SEASON - 1))
+		self.assertTrue(self.snapshots.is_stale('playergamelog', long_ago, CURRENT_SEASON))
+
+
+	def test_format_age(self):
+		self.assertEqual(format_age(90), '1 min')
+		self.assertEqual(format_age(3 * HOUR + 5), '3 h')
+		self.assertEqual(format_age(2 * DAY), '2 days')
+
+
+class StaleWhileRevalidateTests(unittest.TestCase):
+	def setUp(self):
+		self.directory = tempfile.TemporaryDirectory()
+		self.seasons = sample_seasons()
+
+		self.api = API(SnapshotCache(self.directory.name, current_season=CURRENT_SEASON))
+		stub_downloads(self.api, self.seasons)
+
+
+	def tearDown(self):
+		self.directory.cleanup()
+
+
+	def _age_player(self, seconds: float) -> None:
+		'''Pretends the selected player's data was grabbed the given number of seconds ago'''
+		for endpoint in PLAYER_ENDPOINTS:
+			self.api._fetched_at[endpoint] = time.time() - seconds
+
+
+	def test_load_cached_player_fails_without_snapshots(self):
+		self.assertFalse(self.api.load_cached_player(1))
+
+
+	def test_load_cached_player_uses_snapshots_without_downloading(self):
+		self.api.get_player_info_by_id(1)
+		fresh = API(SnapshotCache(self.directory.name, current_season=CURRENT_SEASON))
+		stub_downloads(fresh, self.seasons)
+
+		self.assertTrue(fresh.load_cached_player(1))
+		self.assertEqual(fresh.downloads, [])
+		self.assertEqual(fresh.get_bio(), self.api.get_bio())
+
+
+	def test_fresh_snapshots_are_not_downloaded_again(self):
+		self.api.get_player_info_by_id(1)
+		self.api.get_career_gamelog()
+		self.api.downloads.clear()
+
+		self.api._pid = None
+		self.api.get_player_info_by_id(1)
+		self.api.get_career_gamelog()
+		self.assertEqual(self.api.downloads, [])
+
+
+	def test_stale_endpoints_follow_the_refresh_policy(self):
+		self.api.get_player_info_by_id(1)
+		self.assertEqual(self.api.stale_endpoints(), [])
+
+		self._age_player(DAY + HOUR)
+		self.assertEqual(sorted(self.api.stale_endpoints()),
+						 ['playercareerstats', 'playergamelog'])
+
+
+	def test_apply_refresh_only_reports_endpoints_that_changed(self):
+		self.api.get_player_info_by_id(1)
+		self.seasons[CURRENT_SEASON] = season_rows(CURRENT_SEASON, 31)
+
+		fresh = self.api.fetch_stale(1, ['commonplayerinfo', 'playergamelog'])
+		self.assertEqual(self.api.apply_refresh(1, fresh), ['playergamelog'])
+		self.assertEqual(len(self.api.current_season_gamelog('Points')), 31)
+
+
+	def test_apply_refresh_ignores_a_player_that_is_no_longer_selected(self):
+		self.api.get_player_info_by_id(1)
+		fresh = self.api.fetch_stale(1, ['playergamelog'])
+		self.api._pid = 2
+
+		self.assertEqual(self.api.apply_refresh(1, fresh), [])
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,382 @@
+# Storage backends for the raw json snapshots of every nba_api endpoint (bios, career rows, year by year rows,
+# and game logs per season); SnapshotCache keeps the refresh policy and hands the bytes to one of these
+# Every backend stores (payload, time grabbed) under (endpoint, pid, season) and passes storage_tests.py
+import json
+import os
+import sqlite3
+import threading
+import time
+import argparse
+import tempfile
+import numpy
+
+
+# backend used when none is given; set NBA_STATS_STORAGE to memory, json, columnar, or sqlite to pick another
+STORAGE_BACKEND = os.environ.get('NBA_STATS_STORAGE', 'json')
+
+
+def _file_name(endpoint: str, pid: int, season: int = None) -> str:
+	'''Returns the file name (without extension) of a snapshot'''
+	if season is None:
+		return f'{endpoint}_{pid}'
+
+	return f'{endpoint}_{pid}_{season}'
+
+
+def _parse_file_name(name: str) -> tuple[str, int, int | None] | None:
+	'''Returns the (endpoint, pid, season) of a snapshot file name, or None if it isn't one'''
+	parts = name.split('_')
+	try:
+		if len(parts) == 2:
+			return (parts[0], int(parts[1]), None)
+		if len(parts) == 3:
+			return (parts[0], int(parts[1]), int(parts[2]))
+	except ValueError:
+		pass
+
+	return None
+
+
+class MemoryStorage:
+	def __init__(self, directory: str = None):
+		# (endpoint, pid, season) -> (payload, time grabbed); payloads are shared, so callers shouldn't modify them
+		self._snapshots = {}
+		self._lock = threading.Lock()
+
+
+	def load(self, endpoint: str, pid: int, season: int = None) -> tuple[dict, float] | None:
+		'''Returns (payload, time it was grabbed), or None if it was never saved'''
+		return self._snapshots.get((endpoint, pid, season))
+
+
+	def save(self, endpoint: str, pid: int, payload: dict, fetched_at: float, season: int = None) -> None:
+		'''Stores a snapshot, replacing the previous one'''
+		with self._lock:
+			self._snapshots[(endpoint, pid, season)] = (payload, fetched_at)
+
+
+	def delete(self, endpoint: str, pid: int, season: int = None) -> None:
+		'''Drops a snapshot if there is one'''
+		with self._lock:
+			self._snapshots.pop((endpoint, pid, season), None)
+
+
+	def keys(self) -> list[tuple[str, int, int | None]]:
+		'''Returns the (endpoint, pid, season) of every stored snapshot'''
+		return list(self._snapshots)
+
+
+	def close(self) -> None:
+		pass
+
+
+class JsonStorage:
+	def __init__(self, directory: str):
+		# one {'fetched_at', 'payload'} json file per snapshot
+		self._directory = directory
+		self._lock = threading.Lock()
+
+
+	def _path(self, endpoint: str, pid: int, season: int = None) -> str:
+		return os.path.join(self._directory, f'{_file_name(endpoint, pid, season)}.json')
+
+
+	def load(self, endpoint: str, pid: int, season: int = None) -> tuple[dict, float] | None:
+		'''Returns (payload, time it was grabbed), or None if it was never saved'''
+		try:
+			with open(self._path(endpoint, pid, season)) as file:
+				snapshot = json.load(file)
+
+			return (snapshot['payload'], snapshot['fetched_at'])
+		except (OSError, ValueError, KeyError):
+			return None
+
+
+	def save(self, endpoint: str, pid: int, payload: dict, fetched_at: float, season: int = None) -> None:
+		'''Stores a snapshot, replacing the previous one'''
+		path = self._path(endpoint, pid, season)
+
+		with self._lock:
+			os.makedirs(self._directory, exist_ok=True)
+
+			# write then rename so a crash never leaves half a snapshot behind
+			with open(f'{path}.tmp', 'w') as file:
+				json.dump({'fetched_at': fetched_at, 'payload': payload}, file)
+			os.replace(f'{path}.tmp', path)
+
+
+	def delete(self, endpoint: str, pid: int, season: int = None) -> None:
+		'''Drops a snapshot if there is one'''
+		try:
+			os.remove(self._path(endpoint, pid, season))
+		except FileNotFoundError:
+			pass
+
+
+	def keys(self) -> list[tuple[str, int, int | None]]:
+		'''Returns the (endpoint, pid, season) of every stored snapshot'''
+		if not os.path.isdir(self._directory):
+			return []
+
+		keys = [_parse_file_name(name[:-len('.json')]) for name in os.listdir(self._directory) if name.endswith('.json')]
+		return [key for key in keys if key is not None]
+
+
+	def close(self) -> None:
+		pass
+
+
+def _encode_column(values: list) -> tuple[str, numpy.ndarray]:
+	'''Returns (kind, array) of a column; columns of only ints, floats, or strings get a typed array and anything
+	else (None, mixed types) is kept as json'''
+	kinds = {type(value) for value in values}
+	try:
+		if kinds == {int}:
+			return ('int', numpy.array(values, dtype=numpy.int64))
+		if kinds == {float}:
+			return ('float', numpy.array(values, dtype=numpy.float64))
+		if kinds == {str}:
+			return ('str', numpy.array(values, dtype=str))
+	except OverflowError:
+		pass
+
+	return ('json', numpy.array([json.dumps(values)]))
+
+
+def _decode_column(kind: str, array: numpy.ndarray) -> list:
+	'''Returns the values of a column written by _encode_column()'''
+	if kind == 'json':
+		return json.loads(str(array[0]))
+
+	return array.tolist()
+
+
+def _is_tabular(payload: dict) -> bool:
+	'''Returns whether every result set of a payload is a table of rows as wide as its headers'''
+	try:
+		return all(isinstance(result_set['headers'], list) and isinstance(result_set['rowSet'], list)
+				   and all(len(row) == len(result_set['headers']) for row in result_set['rowSet'])
+				   for result_set in payload['resultSets'])
+	except (KeyError, TypeError):
+		return False
+
+
+def encode_snapshot(payload: dict, fetched_at: float) -> dict[str, numpy.ndarray]:
+	'''Returns the arrays of a snapshot in the columnar layout: every column of every result set as its own typed
+	array, plus the rest of the payload as json in meta'''
+	arrays = {}
+	if not _is_tabular(payload):
+		meta = {'fetched_at': fetched_at, 'payload': payload}
+	else:
+		tables = []
+		for x, result_set in enumerate(payload['resultSets']):
+			columns = list(zip(*result_set['rowSet'])) if len(result_set['rowSet']) > 0 else [[] for header in result_set['headers']]
+
+			kinds = []
+			for y, column in enumerate(columns):
+				kind, arrays[f'{x}_{y}'] = _encode_column(list(column))
+				kinds.append(kind)
+
+			tables.append({'result_set': {key: value for key, value in result_set.items() if key != 'rowSet'},
+						   'rows': len(result_set['rowSet']), 'kinds': kinds})
+
+		meta = {'fetched_at': fetched_at, 'tables': tables,
+				'payload': {key: value for key, value in payload.items() if key != 'resultSets'}}
+
+	arrays['meta'] = numpy.array([json.dumps(meta)])
+	return arrays
+
+
+def decode_snapshot(arrays) -> tuple[dict, float]:
+	'''Returns (payload, time it was grabbed) of arrays written by encode_snapshot(), e.g. an open .npz file'''
+	meta = json.loads(str(arrays['meta'][0]))
+	if 'tables' not in meta:
+		return (meta['payload'], meta['fetched_at'])
+
+	result_sets = []
+	for x, table in enumerate(meta['tables']):
+		columns = [_decode_column(kind, arrays[f'{x}_{y}']) for y, kind in enumerate(table['kinds'])]
+		rows = [list(row) for row in zip(*columns)] if len(columns) > 0 else [[] for row in range(table['rows'])]
+		result_sets.append({**table['result_set'], 'rowSet': rows})
+
+	return ({**meta['payload'], 'resultSets': result_sets}, meta['fetched_at'])
+
+
+class ColumnarStorage:
+	def __init__(self, directory: str):
+		# one .npz file per snapshot holding every column of every result set as its own typed array, plus the rest
+		# of the payload as json; a game log is mostly int and float columns, so it loads without parsing any text
+		self._directory = directory
+		self._lock = threading.Lock()
+
+
+	def _path(self, endpoint: str, pid: int, season: int = None) -> str:
+		return os.path.join(self._directory, f'{_file_name(endpoint, pid, season)}.npz')
+
+
+	def load(self, endpoint: str, pid: int, season: int = None) -> tuple[dict, float] | None:
+		'''Returns (payload, time it was grabbed), or None if it was never saved'''
+		try:
+			with numpy.load(self._path(endpoint, pid, season), allow_pickle=False) as arrays:
+				return decode_snapshot(arrays)
+		except (OSError, ValueError, KeyError):
+			return None
+
+
+	def save(self, endpoint: str, pid: int, payload: dict, fetched_at: float, season: int = None) -> None:
+		'''Stores a snapshot, replacing the previous one'''
+		arrays = encode_snapshot(payload, fetched_at)
+		path = self._path(endpoint, pid, season)
+
+		with self._lock:
+			os.makedirs(self._directory, exist_ok=True)
+
+			# write then rename so a crash never leaves half a snapshot behind
+			with open(f'{path}.tmp', 'wb') as file:
+				numpy.savez(file, **arrays)
+			os.replace(f'{path}.tmp', path)
+
+
+	def delete(self, endpoint: str, pid: int, season: int = None) -> None:
+		'''Drops a snapshot if there is one'''
+		try:
+			os.remove(self._path(endpoint, pid, season))
+		except FileNotFoundError:
+			pass
+
+
+	def keys(self) -> list[tuple[str, int, int | None]]:
+		'''Returns the (endpoint, pid, season) of every stored snapshot'''
+		if not os.path.isdir(self._directory):
+			return []
+
+		keys = [_parse_file_name(name[:-len('.npz')]) for name in os.listdir(self._directory) if name.endswith('.npz')]
+		return [key for key in keys if key is not None]
+
+
+	def close(self) -> None:
+		pass
+
+
+class SQLiteStorage:
+	def __init__(self, directory: str):
+		# one table in snapshots.sqlite3; a season of None is stored as -1 so it can be part of the primary key
+		os.makedirs(directory, exist_ok=True)
+		self._connection = sqlite3.connect(os.path.join(directory, 'snapshots.sqlite3'), check_same_thread=False)
+		self._lock = threading.Lock()
+
+		with self._lock, self._connection:
+			# write ahead logging lets report and screener worker processes read while another process writes
+			self._connection.execute('PRAGMA journal_mode=WAL')
+			self._connection.execute('CREATE TABLE IF NOT EXISTS snapshots (endpoint TEXT, pid INTEGER, season INTEGER, '
+									 'fetched_at REAL, payload TEXT, PRIMARY KEY (endpoint, pid, season))')
+
+
+	def load(self, endpoint: str, pid: int, season: int = None) -> tuple[dict, float] | None:
+		'''Returns (payload, time it was grabbed), or None if it was never saved'''
+		with self._lock:
+			row = self._connection.execute('SELECT payload, fetched_at FROM snapshots WHERE endpoint = ? AND pid = ? '
+										   'AND season = ?', (endpoint, pid, -1 if season is None else season)).fetchone()
+
+		if row is None:
+			return None
+
+		return (json.loads(row[0]), row[1])
+
+
+	def save(self, endpoint: str, pid: int, payload: dict, fetched_at: float, season: int = None) -> None:
+		'''Stores a snapshot, replacing the previous one'''
+		with self._lock, self._connection:
+			self._connection.execute('INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?, ?, ?)',
+									 (endpoint, pid, -1 if season is None else season, fetched_at, json.dumps(payload)))
+
+
+	def delete(self, endpoint: str, pid: int, season: int = None) -> None:
+		'''Drops a snapshot if there is one'''
+		with self._lock, self._connection:
+			self._connection.execute('DELETE FROM snapshots WHERE endpoint = ? AND pid = ? AND season = ?',
+									 (endpoint, pid, -1 if season is None else season))
+
+
+	def keys(self) -> list[tuple[str, int, int | None]]:
+		'''Returns the (endpoint, pid, season) of every stored snapshot'''
+		with self._lock:
+			rows = self._connection.execute('SELECT endpoint, pid, season FROM snapshots').fetchall()
+
+		return [(endpoint, pid, None if season == -1 else season) for endpoint, pid, season in rows]
+
+
+	def close(self) -> None:
+		'''Closes the database'''
+		with self._lock:
+			self._connection.close()
+
+
+STORAGE_BACKENDS = {'memory': MemoryStorage,
+					'json': JsonStorage,
+					'columnar': ColumnarStorage,
+					'sqlite': SQLiteStorage}
+
+
+def make_storage(backend: str, directory: str):
+	'''Creates one of STORAGE_BACKENDS keeping its files in the directory; without a directory there is nowhere to
+	keep files, so the snapshots are kept in memory whatever the backend'''
+	if backend not in STORAGE_BACKENDS:
+		raise ValueError(f'Unknown storage backend {backend}; pick one of {", ".join(STORAGE_BACKENDS)}')
+
+	if directory is None:
+		return MemoryStorage()
+
+	return STORAGE_BACKENDS[backend](directory)
+
+
+def benchmark(storage, snapshots: dict[tuple, dict], repeats: int = 3) -> dict:
+	'''Saves then loads every {(endpoint, pid, season): payload} the given number of times; returns the average
+	milliseconds per save and per load, and whether every load matched what was saved'''
+	save_time = 0.0
+	load_time = 0.0
+	matches = True
+
+	for repeat in range(repeats):
+		start = time.perf_counter()
+		for (endpoint, pid, season), payload in snapshots.items():
+			storage.save(endpoint, pid, payload, float(repeat), season)
+		save_time += time.perf_counter() - start
+
+		start = time.perf_counter()
+		for (endpoint, pid, season), payload in snapshots.items():
+			matches = matches and storage.load(endpoint, pid, season) == (payload, float(repeat))
+		load_time += time.perf_counter() - start
+
+	operations = max(repeats * len(snapshots), 1)
+	return {'save_ms': save_time * 1000 / operations, 'load_ms': load_time * 1000 / operations, 'matches': matches}
+
+
+def main() -> None:
+	'''Benchmarks every backend on fake game logs and prints milliseconds per save and load'''
+	# sample_data imports the api, which imports this module through snapshots.py
+	from sample_data import gamelog_payload, season_rows
+
+	parser = argparse.ArgumentParser(description='Benchmark the snapshot storage backends')
+	parser.add_argument('--players', type=int, default=50)
+	parser.add_argument('--games', type=int, default=82)
+	parser.add_argument('--repeats', type=int, default=3)
+	args = parser.parse_args()
+
+	snapshots = {('playergamelog', pid, 2022): gamelog_payload(season_rows(2022, args.games, pid, pid))
+				 for pid in range(1, args.players + 1)}
+
+	for backend in STORAGE_BACKENDS:
+		with tempfile.TemporaryDirectory() as directory:
+			storage = make_storage(backend, directory)
+			try:
+				result = benchmark(storage, snapshots, args.repeats)
+			finally:
+				storage.close()
+
+		print(f"{backend:<10} save {result['save_ms']:>7.3f} ms  load {result['load_ms']:>7.3f} ms  "
+			  f"{'ok' if result['matches'] else 'MISMATCH'}")
+
+
+if __name__ == '__main__':
+	main()
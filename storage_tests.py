@@ -0,0 +1,130 @@
+# Conformance and benchmark suite every storage backend has to pass; add a backend by subclassing StorageConformance
+from api import API, CURRENT_SEASON
+from snapshots import SnapshotCache
+from storage import MemoryStorage, JsonStorage, ColumnarStorage, SQLiteStorage, make_storage, benchmark, STORAGE_BACKENDS
+from sample_data import bio_payload, career_payload, gamelog_payload, sample_seasons, season_rows, stub_downloads, year_by_year_payload
+import tempfile
+import unittest
+
+
+class StorageConformance:
+	backend = None
+
+	def setUp(self):
+		self.directory = tempfile.TemporaryDirectory()
+		self.storage = make_storage(self.backend, self.directory.name)
+
+
+	def tearDown(self):
+		self.storage.close()
+		self.directory.cleanup()
+
+
+	def test_missing_snapshots_load_as_None(self):
+		self.assertIsNone(self.storage.load('commonplayerinfo', 1))
+		self.assertIsNone(self.storage.load('playergamelog', 1, 2022))
+
+
+	def test_every_endpoint_round_trips(self):
+		seasons = sample_seasons()
+		payloads = {('commonplayerinfo', 1, None): bio_payload(1, min(seasons)),
+					('playercareerstats', 1, None): career_payload(1, seasons),
+					('playerdashboardbyyearoveryear', 1, None): year_by_year_payload(seasons),
+					('playergamelog', 1, CURRENT_SEASON): gamelog_payload(seasons[CURRENT_SEASON]),
+					('playergamelog', 1, CURRENT_SEASON - 1): gamelog_payload([])}
+
+		for (endpoint, pid, season), payload in payloads.items():
+			self.storage.save(endpoint, pid, payload, 100.5, season)
+
+		for (endpoint, pid, season), payload in payloads.items():
+			self.assertEqual(self.storage.load(endpoint, pid, season), (payload, 100.5))
+		self.assertEqual(sorted(self.storage.keys(), key=str), sorted(payloads, key=str))
+
+
+	def test_seasons_are_kept_apart(self):
+		self.storage.save('playergamelog', 1, {'season': 2021}, 1.0, 2021)
+		self.storage.save('playergamelog', 1, {'season': 2022}, 2.0, 2022)
+		self.storage.save('playergamelog', 2, {'season': 2022}, 3.0, 2022)
+
+		self.assertEqual(self.storage.load('playergamelog', 1, 2021), ({'season': 2021}, 1.0))
+		self.assertEqual(self.storage.load('playergamelog', 2, 2022), ({'season': 2022}, 3.0))
+
+
+	def test_save_replaces_and_delete_drops(self):
+		self.storage.save('commonplayerinfo', 1, {'old': True}, 1.0)
+		self.storage.save('commonplayerinfo', 1, {'old': False}, 2.0)
+		self.assertEqual(self.storage.load('commonplayerinfo', 1), ({'old': False}, 2.0))
+
+		self.storage.delete('commonplayerinfo', 1)
+		self.storage.delete('commonplayerinfo', 1)
+		self.assertIsNone(self.storage.load('commonplayerinfo', 1))
+
+
+	def test_irregular_values_round_trip(self):
+		payload = {'resultSets': [{'name': 'Mixed', 'headers': ['A', 'B', 'C', 'D'],
+								   'rowSet': [[1, 2.5, None, 'x'], [2, 3, 'y', True], [2 ** 70, 0.0, 'z', False]]}],
+				   'parameters': {'PlayerID': 1}}
+		self.storage.save('playergamelog', 1, payload, 5.0, 2022)
+		self.assertEqual(self.storage.load('playergamelog', 1, 2022), (payload, 5.0))
+
+
+	def test_api_reads_a_player_through_the_backend(self):
+		seasons = sample_seasons()
+		api = API(SnapshotCache(self.directory.name, current_season=CURRENT_SEASON, storage=self.storage))
+		stub_downloads(api, seasons)
+		self.assertTrue(api.get_player_info_by_id(1))
+		api.get_career_gamelog()
+
+		cached = API(SnapshotCache(self.directory.name, current_season=CURRENT_SEASON, storage=self.storage))
+		self.assertTrue(cached.load_cached_player(1))
+		self.assertEqual(cached.get_career_gamelog(), api.get_career_gamelog())
+		self.assertEqual(cached.per_year_convert('Points'), api.per_year_convert('Points'))
+
+
+	def test_benchmark(self):
+		snapshots = {('playergamelog', pid, 2022): gamelog_payload(season_rows(2022, 82, pid, pid)) for pid in range(1, 11)}
+		result = benchmark(self.storage, snapshots, repeats=2)
+
+		self.assertTrue(result['matches'])
+		self.assertGreater(result['save_ms'], 0)
+		self.assertGreater(result['load_ms'], 0)
+
+
+class MemoryStorageTests(StorageConformance, unittest.TestCase):
+	backend = 'memory'
+
+
+class JsonStorageTests(StorageConformance, unittest.TestCase):
+	backend = 'json'
+
+
+class ColumnarStorageTests(StorageConformance, unittest.TestCase):
+	backend = 'columnar'
+
+
+class SQLiteStorageTests(StorageConformance, unittest.TestCase):
+	backend = 'sqlite'
+
+
+class ConfigTests(unittest.TestCase):
+	def test_every_backend_has_a_conformance_suite(self):
+		tested = {cls.backend for cls in StorageConformance.__subclasses__()}
+		self.assertEqual(tested, set(STORAGE_BACKENDS))
+
+
+	def test_make_storage_picks_the_backend(self):
+		with tempfile.TemporaryDirectory() as directory:
+			self.assertIsInstance(make_storage('memory', directory), MemoryStorage)
+			self.assertIsInstance(make_storage('json', directory), JsonStorage)
+			self.assertIsInstance(make_storage('columnar', directory), ColumnarStorage)
+
+			storage = make_storage('sqlite', directory)
+			self.assertIsInstance(storage, SQLiteStorage)
+			storage.close()
+
+			with self.assertRaises(ValueError):
+				make_storage('parquet', directory)
+
+
+if __name__ == '__main__':
+	unittest.main()
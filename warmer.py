@@ -0,0 +1,376 @@
+# Warms the snapshot cache before tip-off: every endpoint of every player on a slate (or the whole active league),
+# bio, career, year by year, and every season's game log, so selecting any of them later never waits on a download
+# Jobs go through a queue journaled to disk, so a crash or Ctrl-C picks up where it left off on the next run
+from api import API, CURRENT_SEASON, PLAYER_ENDPOINTS
+from packed import pack_season
+from nba_api.stats.static import players
+from collections import deque
+import threading
+import argparse
+import json
+import time
+import os
+
+
+WARMER_JOURNAL = os.path.join(os.path.expanduser('~'), '.nba_stats_analyzer', 'warmer.jsonl')
+
+# jobs run at the same time
+WARMER_WORKERS = 4
+
+# max downloads per second across every worker; stats.nba.com starts refusing requests well before this is a bottleneck
+WARMER_RATE = 2
+
+# seconds between progress reports of the command
+REPORT_INTERVAL = 5
+
+
+class RateLimiter:
+	def __init__(self, rate: float, clock = time.monotonic, sleep = time.sleep):
+		# hands out one slot every 1 / rate seconds; callers sleep until their slot comes up
+		self._interval = 1 / rate
+		self._clock = clock
+		self._sleep = sleep
+		self._next = 0
+		self._lock = threading.Lock()
+
+
+	def wait(self) -> None:
+		'''Blocks until the next request is allowed'''
+		with self._lock:
+			now = self._clock()
+			slot = max(now, self._next)
+			self._next = slot + self._interval
+
+		if slot > now:
+			self._sleep(slot - now)
+
+
+class JobQueue:
+	def __init__(self, path: str = None):
+		# jobs are (endpoint, pid, season); every add, completion, and failure is appended to the journal at path
+		# as a json line, and replaying it on the next run restores the jobs that never completed
+		self._path = path
+		self._pending = deque()
+		self._queued = set()
+		self._done = set()
+		self._failed = {}
+		self._running = set()
+		self._condition = threading.Condition()
+
+		if path is not None and os.path.exists(path):
+			self._replay()
+
+
+	def _replay(self) -> None:
+		'''Restores the queue from the journal; jobs that failed last time are tried again'''
+		with open(self._path) as file:
+			for line in file:
+				try:
+					entry = json.loads(line)
+				except ValueError:
+					# the last line of a crashed run can be cut off
+					continue
+
+				if 'add' in entry:
+					self._enqueue([tuple(job) for job in entry['add']], entry.get('first', False))
+				elif 'done' in entry:
+					self._done.add(tuple(entry['done']))
+
+		self._pending = deque(job for job in self._pending if job not in self._done)
+
+
+	def _journal(self, entry: dict) -> None:
+		if self._path is None:
+			return
+
+		os.makedirs(os.path.dirname(self._path) or '.', exist_ok=True)
+		with open(self._path, 'a') as file:
+			file.write(json.dumps(entry) + '\n')
+
+
+	def _enqueue(self, jobs: list[tuple], first: bool) -> list[tuple]:
+		'''Queues the jobs that aren't already queued; returns them'''
+		jobs = [job for job in dict.fromkeys(jobs) if job not in self._queued]
+		self._queued.update(jobs)
+		if first:
+			self._pending.extendleft(reversed(jobs))
+		else:
+			self._pending.extend(jobs)
+
+		return jobs
+
+
+	def add(self, jobs: list[tuple], first: bool = False) -> int:
+		'''Queues jobs at the back (or the front) unless they were already queued; returns how many were new'''
+		with self._condition:
+			jobs = self._enqueue(jobs, first)
+			if len(jobs) > 0:
+				self._journal({'add': jobs, 'first': first})
+				self._condition.notify_all()
+
+			return len(jobs)
+
+
+	def take(self, stop: threading.Event = None) -> tuple | None:
+		'''Returns the next job, waiting while running jobs may still queue more; None once there's nothing left
+		or stop is set'''
+		with self._condition:
+			while len(self._pending) == 0 and len(self._running) > 0 and not (stop is not None and stop.is_set()):
+				self._condition.wait(0.1)
+
+			if len(self._pending) == 0 or (stop is not None and stop.is_set()):
+				return None
+
+			job = self._pending.popleft()
+			self._running.add(job)
+			return job
+
+
+	def complete(self, job: tuple) -> None:
+		'''Marks a job as done for good'''
+		with self._condition:
+			self._running.discard(job)
+			self._done.add(job)
+			self._journal({'done': job})
+			self._condition.notify_all()
+
+
+	def fail(self, job: tuple, error: Exception) -> None:
+		'''Marks a job as failed; it isn't tried again until the queue is replayed'''
+		with self._condition:
+			self._running.discard(job)
+			self._failed[job] = error
+			self._journal({'failed': job, 'error': str(error)})
+			self._condition.notify_all()
+
+
+	def counts(self) -> dict:
+		'''Returns how many jobs are done, failed, running, and pending'''
+		with self._condition:
+			return {'done': len(self._done), 'failed': len(self._failed), 'running': len(self._running),
+					'pending': len(self._pending)}
+
+
+	def get_failures(self) -> dict[tuple, Exception]:
+		'''Returns the error of every job that failed in this run'''
+		with self._condition:
+			return dict(self._failed)
+
+
+	def clear(self) -> None:
+		'''Forgets every job and deletes the journal'''
+		with self._condition:
+			self._pending.clear()
+			self._queued.clear()
+			self._done.clear()
+			self._failed.clear()
+			if self._path is not None and os.path.exists(self._path):
+				os.remove(self._path)
+
+
+def active_player_ids() -> list[int]:
+	'''Returns the id of every active player'''
+	return [player['id'] for player in players.get_active_players()]
+
+
+def player_jobs(pid: int) -> list[tuple]:
+	'''Returns the jobs of a player's endpoints; the seasons of their game log are queued once their bio is in'''
+	return [(endpoint, pid, API.player_season(endpoint)) for endpoint in PLAYER_ENDPOINTS]
+
+
+def warm_job(api: API, job: tuple, wait = None) -> tuple[bool, list[tuple]]:
+	'''Makes sure the snapshot of a job is in the api's cache and fresh, downloading it (after calling wait()) only
+	if it isn't; returns whether it was downloaded and, for a bio, the jobs of the player's seasons'''
+	endpoint, pid, season = job
+	snapshots = api.get_snapshots()
+
+	payload = None
+	downloaded = not api.has_fresh_snapshot(endpoint, pid, season)
+	if downloaded:
+		if wait is not None:
+			wait()
+		payload = api.download_snapshot(endpoint, pid, season)[0]
+
+	seasons = []
+	if endpoint == 'commonplayerinfo':
+		payload = payload if payload is not None else snapshots.load(endpoint, pid, season)[0]
+		seasons = [('playergamelog', pid, year) for year in API.season_years(payload)]
+	elif endpoint == 'playergamelog' and season != CURRENT_SEASON and snapshots.load_season(pid, season) is None:
+		# past seasons are packed too (see packed.py), as if the player had been opened
+		gamelog = (payload if payload is not None else snapshots.load(endpoint, pid, season)[0])['resultSets'][0]
+		snapshots.save_season(pid, pack_season(season, gamelog['headers'], gamelog['rowSet']))
+
+	return (downloaded, seasons)
+
+
+class CacheWarmer:
+	def __init__(self, api: API = None, journal: str = WARMER_JOURNAL, workers: int = WARMER_WORKERS,
+				 rate: float = WARMER_RATE, limiter: RateLimiter = None):
+		# only the api's snapshot cache is used, never its selected player, so it can be the interface's
+		self._api = api if api is not None else API()
+		self._queue = JobQueue(journal)
+		self._workers = workers
+		self._limiter = limiter if limiter is not None else RateLimiter(rate)
+		self._stop = threading.Event()
+
+		# this run
+		self._started = None
+		self._completed = 0
+		self._downloads = 0
+		self._lock = threading.Lock()
+
+
+	def add_players(self, pids: list[int]) -> int:
+		'''Queues every endpoint of the players; returns how many jobs were new'''
+		return self._queue.add([job for pid in pids for job in player_jobs(pid)])
+
+
+	def _warm(self, job: tuple) -> None:
+		'''Makes sure the snapshot of a job is in the cache and fresh, downloading it only if it isn't'''
+		downloaded, seasons = warm_job(self._api, job, self._limiter.wait)
+		if downloaded:
+			with self._lock:
+				self._downloads += 1
+
+		# the player's seasons go to the front, so each player is done before the next one is started
+		self._queue.add(seasons, first=True)
+
+
+	def _work(self) -> None:
+		'''Runs jobs until the queue is empty or the warmer is stopped'''
+		while True:
+			job = self._queue.take(self._stop)
+			if job is None:
+				return
+
+			try:
+				self._warm(job)
+			except Exception as error:
+				self._queue.fail(job, error)
+			else:
+				self._queue.complete(job)
+
+			with self._lock:
+				self._completed += 1
+
+
+	def run(self) -> dict:
+		'''Runs every queued job on the workers; returns progress() once the queue is empty or stop() is called.
+		The journal is deleted once every job is done without failures.'''
+		self._stop.clear()
+		self._started = time.monotonic()
+		self._completed = 0
+		self._downloads = 0
+
+		threads = [threading.Thread(target=self._work, daemon=True) for x in range(self._workers)]
+		for thread in threads:
+			thread.start()
+
+		try:
+			for thread in threads:
+				# joined with a timeout so Ctrl-C reaches the main thread
+				while thread.is_alive():
+					thread.join(0.2)
+		except KeyboardInterrupt:
+			# the jobs already running still finish and make it into the journal
+			self.stop()
+			for thread in threads:
+				thread.join()
+			raise
+
+		progress = self.progress()
+		if progress['pending'] == 0 and progress['failed'] == 0:
+			self._queue.clear()
+
+		return progress
+
+
+	def stop(self) -> None:
+		'''Lets the running jobs finish and starts no more; the rest stay in the journal for the next run'''
+		self._stop.set()
+
+
+	def is_stopped(self) -> bool:
+		'''Returns whether stop() was called'''
+		return self._stop.is_set()
+
+
+	def get_failures(self) -> dict[tuple, Exception]:
+		'''Returns the error of every job that failed in this run'''
+		return self._queue.get_failures()
+
+
+	def progress(self) -> dict:
+		'''Returns the job counts, downloads, throughput (jobs per second this run), and the seconds left at that
+		pace; the ETA only counts jobs queued so far, so it grows as bios queue their seasons'''
+		progress = self._queue.counts()
+		with self._lock:
+			elapsed = time.monotonic() - self._started if self._started is not None else 0
+			progress['downloads'] = self._downloads
+			progress['throughput'] = self._completed / elapsed if elapsed > 0 else 0
+
+		remaining = progress['pending'] + progress['running']
+		progress['eta'] = remaining / progress['throughput'] if progress['throughput'] > 0 else None
+
+		return progress
+
+
+def format_progress(progress: dict) -> str:
+	'''Returns a one line summary of progress(), e.g. 120/480 jobs, 1.9 jobs/s, ETA 3 min'''
+	total = progress['done'] + progress['failed'] + progress['running'] + progress['pending']
+	line = f"{progress['done']}/{total} jobs, {progress['throughput']:.1f} jobs/s"
+	if progress['eta'] is not None:
+		line += f", ETA {int(progress['eta'] // 60)} min {int(progress['eta'] % 60)} s"
+	if progress['failed'] > 0:
+		line += f", {progress['failed']} failed"
+
+	return line
+
+
+def main() -> None:
+	'''Warms the cache of a slate or the active league, printing progress until it is done or interrupted'''
+	# reports imports matplotlib, so only the command pays for it
+	from reports import read_slate
+
+	parser = argparse.ArgumentParser(description='Download everything the app shows for a slate of players')
+	parser.add_argument('pids', type=int, nargs='*', help='player ids to warm')
+	parser.add_argument('--slate', help='file of player ids, one per line')
+	parser.add_argument('--active', action='store_true', help='warm every active player')
+	parser.add_argument('--workers', type=int, default=WARMER_WORKERS)
+	parser.add_argument('--rate', type=float, default=WARMER_RATE, help='max downloads per second')
+	parser.add_argument('--journal', default=WARMER_JOURNAL, help='where progress is kept between runs')
+	args = parser.parse_args()
+
+	pids = list(args.pids)
+	if args.slate is not None:
+		pids.extend(read_slate(args.slate))
+	if args.active:
+		pids.extend(active_player_ids())
+
+	warmer = CacheWarmer(journal=args.journal, workers=args.workers, rate=args.rate)
+	resumed = warmer.progress()['pending']
+	warmer.add_players(pids)
+	if resumed > 0:
+		print(f'Resuming {resumed} jobs from {args.journal}')
+
+	def _report():
+		while not warmer.is_stopped():
+			time.sleep(REPORT_INTERVAL)
+			print(format_progress(warmer.progress()), flush=True)
+
+	threading.Thread(target=_report, daemon=True).start()
+	try:
+		progress = warmer.run()
+	except KeyboardInterrupt:
+		print(f"Stopped; {warmer.progress()['pending']} jobs left in {args.journal}")
+		return
+	finally:
+		warmer.stop()
+
+	for job, error in warmer.get_failures().items():
+		print(f'{job}: {error}')
+	print(f"Done: {format_progress(progress)}, {progress['downloads']} downloads")
+
+
+if __name__ == '__main__':
+	main()
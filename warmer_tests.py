@@ -0,0 +1,150 @@
+# Test the cache warmer to ensure a slate ends up fully cached and an interrupted run resumes where it stopped
+from api import API, CURRENT_SEASON, PLAYER_ENDPOINTS
+from snapshots import SnapshotCache
+from warmer import CacheWarmer, JobQueue, RateLimiter, format_progress
+from sample_data import sample_download, sample_seasons, stub_downloads
+import tempfile
+import unittest
+import os
+
+
+class FakeLimiter:
+	def __init__(self, warmer_stops_after: int = None):
+		self.waits = 0
+		self.warmer = None
+		self._stops_after = warmer_stops_after
+
+
+	def wait(self) -> None:
+		self.waits += 1
+		if self.waits == self._stops_after:
+			self.warmer.stop()
+
+
+class RateLimiterTests(unittest.TestCase):
+	def test_requests_are_spaced_by_the_rate(self):
+		slept = []
+		limiter = RateLimiter(2, clock=lambda: 100.0, sleep=slept.append)
+		for x in range(3):
+			limiter.wait()
+
+		self.assertEqual(slept, [0.5, 1.0])
+
+
+class CacheWarmerTests(unittest.TestCase):
+	def setUp(self):
+		self.directory = tempfile.TemporaryDirectory()
+		self.journal = os.path.join(self.directory.name, 'warmer.jsonl')
+		self.seasons = {1: sample_seasons(CURRENT_SEASON - 3, 10, pid=1), 2: sample_seasons(CURRENT_SEASON - 1, 10, pid=2)}
+		self.snapshots = SnapshotCache(os.path.join(self.directory.name, 'snapshots'), current_season=CURRENT_SEASON)
+		self.downloads = []
+
+
+	def tearDown(self):
+		self.directory.cleanup()
+
+
+	def _warmer(self, limiter: FakeLimiter = None, fail: set = frozenset()) -> CacheWarmer:
+		'''Returns a warmer whose downloads come from the sample seasons of each player'''
+		api = API(self.snapshots)
+
+		def _download(endpoint: str, pid: int, season: int = None) -> dict:
+			if (endpoint, pid, season) in fail:
+				raise ConnectionError('timed out')
+			self.downloads.append((endpoint, pid, season))
+			return sample_download(self.seasons[pid], endpoint, pid, season)
+
+		api._download = _download
+		limiter = limiter if limiter is not None else FakeLimiter()
+		warmer = CacheWarmer(api, self.journal, workers=2, limiter=limiter)
+		limiter.warmer = warmer
+
+		return warmer
+
+
+	def _every_job(self) -> set:
+		jobs = set()
+		for pid, seasons in self.seasons.items():
+			jobs.update((endpoint, pid, API.player_season(endpoint)) for endpoint in PLAYER_ENDPOINTS)
+			jobs.update(('playergamelog', pid, year) for year in seasons)
+
+		return jobs
+
+
+	def test_slate_ends_up_fully_cached(self):
+		warmer = self._warmer()
+		warmer.add_players([1, 2])
+		progress = warmer.run()
+
+		self.assertEqual(sorted(self.downloads, key=str), sorted(self._every_job(), key=str))
+		self.assertEqual((progress['pending'], progress['failed'], progress['downloads']), (0, 0, len(self._every_job())))
+		self.assertFalse(os.path.exists(self.journal))
+
+		# past seasons are packed too, and a player opens without downloading anything
+		self.assertIsNotNone(self.snapshots.load_season(1, CURRENT_SEASON - 3))
+		api = API(self.snapshots)
+		stub_downloads(api, self.seasons[1])
+		self.assertTrue(api.get_player_info_by_id(1))
+		api.hit_rate_counts('Points')
+		self.assertEqual(api.downloads, [])
+
+		# warming again downloads nothing
+		self.downloads.clear()
+		warmer = self._warmer()
+		warmer.add_players([1, 2])
+		self.assertEqual(warmer.run()['downloads'], 0)
+
+
+	def test_interrupted_run_resumes_without_repeating_jobs(self):
+		warmer = self._warmer(FakeLimiter(warmer_stops_after=3))
+		warmer.add_players([1, 2])
+		progress = warmer.run()
+		self.assertGreater(progress['pending'], 0)
+		self.assertTrue(os.path.exists(self.journal))
+
+		resumed = self._warmer()
+		self.assertEqual(resumed.progress()['pending'], progress['pending'])
+		resumed.add_players([1, 2])
+		resumed.run()
+
+		self.assertEqual(sorted(self.downloads, key=str), sorted(self._every_job(), key=str))
+		self.assertFalse(os.path.exists(self.journal))
+
+
+	def test_failed_jobs_are_retried_on_the_next_run(self):
+		failing = ('playergamelog', 1, CURRENT_SEASON - 2)
+		warmer = self._warmer(fail={failing})
+		warmer.add_players([1, 2])
+		progress = warmer.run()
+
+		self.assertEqual(progress['failed'], 1)
+		self.assertIn(failing, warmer.get_failures())
+		self.assertIn('1 failed', format_progress(progress))
+
+		retry = self._warmer()
+		self.assertEqual(retry.progress()['pending'], 1)
+		retry.run()
+		self.assertIn(failing, self.downloads)
+		self.assertFalse(os.path.exists(self.journal))
+
+
+class JobQueueTests(unittest.TestCase):
+	def test_journal_keeps_only_unfinished_jobs(self):
+		with tempfile.TemporaryDirectory() as directory:
+			path = os.path.join(directory, 'queue.jsonl')
+			queue = JobQueue(path)
+			queue.add([('a', 1, None), ('b', 1, None)])
+			queue.add([('c', 1, 2020)], first=True)
+			queue.add([('a', 1, None)])
+			queue.complete(queue.take())
+
+			with open(path, 'a') as file:
+				file.write('{"done": ["b", 1')
+
+			replayed = JobQueue(path)
+			self.assertEqual(replayed.counts(), {'done': 1, 'failed': 0, 'running': 0, 'pending': 2})
+			self.assertEqual(replayed.take(), ('a', 1, None))
+
+
+if __name__ == '__main__':
+	unittest.main()